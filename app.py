@@ -9,7 +9,8 @@ import os
 import sys
 import logging
 import time
-from datetime import datetime, timedelta
+import click
+from datetime import datetime, timedelta, timezone
 from flask import Flask, request, jsonify, render_template, session, redirect, url_for, make_response, flash
 from flask_sqlalchemy import SQLAlchemy
 from sqlalchemy import text
@@ -117,6 +118,91 @@ login_manager.login_view = 'auth.login'
 login_manager.login_message = 'Please log in to access the dashboard.'
 login_manager.login_message_category = 'info'
 
+# Tiered response/data cache: per-process LRU, Redis, optional encrypted disk
+from utils.cache_manager import init_cache_manager, enable_cache_invalidation, cached_route
+init_cache_manager(app)
+
+# JWT API authentication - verified-token cache and shared revocation list
+from utils.jwt_auth import init_jwt_auth
+init_jwt_auth(app)
+
+# Per-request Redis time budget - later calls in a request get what is left of it
+from utils.redis_client import init_redis_deadlines
+init_redis_deadlines(app)
+
+
+# Cached schema readiness state (per worker process) - keeps migration checks off the request path
+_schema_checked = False
+_schema_ready = False
+
+def ensure_schema_ready(force=False):
+    """Run the vessel schema migration check once and cache the result"""
+    global _schema_checked, _schema_ready
+    
+    if _schema_checked and not force:
+        return _schema_ready
+    
+    try:
+        from production_db_migration import initialize_production_migration, run_migration_if_needed
+        
+        # Re-initialize so the schema inspector doesn't serve cached column lists
+        initialize_production_migration(app, db)
+        migration_success, migration_result = run_migration_if_needed()
+        if migration_success and migration_result:
+            logger.info(f"✅ Production migration completed: {len(migration_result)} columns added: {migration_result}")
+        elif migration_success:
+            logger.info("✅ Database schema is up to date - no migration needed")
+        else:
+            logger.warning(f"⚠️  Migration had issues: {migration_result}")
+        _schema_ready = bool(migration_success)
+    except Exception as migration_error:
+        logger.error(f"❌ Migration system error: {migration_error}")
+        _schema_ready = False
+    
+    _schema_checked = True
+    return _schema_ready
+
+def _is_undefined_column_error(error):
+    """Check whether a query failed because the vessels table is missing columns"""
+    message = str(error)
+    return "UndefinedColumn" in message or "does not exist" in message or "no such column" in message
+
+def _emergency_vessel_column_fix():
+    """Add missing vessel columns with direct SQL after a query hit an undefined column"""
+    global _schema_ready
+    
+    missing_columns = [
+        'operation_start_date', 'operation_end_date', 'shipping_line',
+        'vessel_type', 'port_of_call', 'stevedoring_company', 'operation_type',
+        'berth_assignment', 'operations_manager', 'team_assignments', 'cargo_configuration'
+    ]
+    
+    with db.engine.connect() as connection:
+        # Start a transaction for all column additions
+        trans = connection.begin()
+        try:
+            for column in missing_columns:
+                try:
+                    if column.endswith('_date'):
+                        connection.execute(text(f"ALTER TABLE vessels ADD COLUMN IF NOT EXISTS {column} DATE"))
+                    elif column in ['team_assignments', 'cargo_configuration']:
+                        connection.execute(text(f"ALTER TABLE vessels ADD COLUMN IF NOT EXISTS {column} TEXT"))
+                    else:
+                        connection.execute(text(f"ALTER TABLE vessels ADD COLUMN IF NOT EXISTS {column} VARCHAR(100)"))
+                    logger.info(f"✅ Added missing column: {column}")
+                except Exception as col_error:
+                    logger.warning(f"⚠️  Could not add column {column}: {col_error}")
+                    # Continue with other columns even if one fails
+            
+            trans.commit()
+            logger.info("✅ Database migration transaction completed")
+        except Exception as trans_error:
+            trans.rollback()
+            logger.error(f"❌ Migration transaction failed, rolled back: {trans_error}")
+            raise trans_error
+    
+    # Re-run the full migration check for anything the direct fix doesn't cover
+    ensure_schema_ready(force=True)
 
 # Database initialization function (used by wsgi.py)
 def init_database():
@@ -129,25 +215,10 @@ def init_database():
         logger.info("✅ Database tables created successfully")
         
         # Step 2: Run production database migration to add any missing columns
-        try:
-            from production_db_migration import initialize_production_migration, run_migration_if_needed
-            
-            # Initialize migration system
-            migration_system = initialize_production_migration(app, db)
-            logger.info("✅ Production migration system initialized")
-            
-            # Run migration if needed
-            with app.app_context():
-                migration_success, migration_result = run_migration_if_needed()
-                if migration_success and migration_result:
-                    logger.info(f"✅ Production migration completed: {len(migration_result)} columns added: {migration_result}")
-                elif migration_success and not migration_result:
-                    logger.info("✅ Database schema is up to date - no migration needed")
-                else:
-                    logger.warning(f"⚠️  Migration had issues: {migration_result}")
-                    
-        except Exception as migration_error:
-            logger.error(f"❌ Migration system error: {migration_error}")
+        # and cache the schema readiness flag used by request handlers
+        if ensure_schema_ready(force=True):
+            logger.info("✅ Database schema readiness confirmed")
+        else:
             # Don't fail init_database completely, but log the issue
             logger.warning("⚠️  Continuing database initialization without migration")
         
@@ -159,7 +230,16 @@ def init_database():
         except Exception as vessel_model_error:
             logger.error(f"❌ Vessel model initialization error: {vessel_model_error}")
         
-        # Step 4: Create demo users
+        # Step 4: Seed cargo tally running totals for tallies recorded before the totals table existed
+        try:
+            seeded_totals = CargoTallyTotal.backfill()
+            if seeded_totals:
+                logger.info(f"✅ Seeded {seeded_totals} cargo tally running totals")
+        except Exception as totals_error:
+            db.session.rollback()
+            logger.error(f"❌ Cargo tally total backfill error: {totals_error}")
+        
+        # Step 5: Create demo users
         users_created = []
         
         # Create simple demo user if it doesn't exist
@@ -174,7 +254,7 @@ def init_database():
             users_created.append('demo@maritime.test')
             logger.info("✅ Demo user created: demo@maritime.test")
         
-        # Step 5: Commit all changes
+        # Step 6: Commit all changes
         db.session.commit()
         logger.info(f"🎯 Database initialization completed successfully!")
         logger.info(f"📊 Users created: {users_created}")
@@ -208,15 +288,35 @@ def init_database_endpoint():
         return jsonify({'error': f'Database initialization failed: {str(e)}'}), 500
 
 # API Routes
+# Vessel writes invalidate these by tag; CacheManager caps the hour-long TTLs at
+# CACHE_UNSHARED_TIMEOUT while invalidations cannot reach the other workers
 @app.route('/api/vessels/summary')
+@cached_route(timeout=3600, key_prefix='vessel_summary', tags=('vessels',))
 def api_vessels_summary():
-    """Get vessel summary for dashboard"""
+    """
+    Get vessel summary for dashboard
+    
+    Query parameters:
+        fields: comma-separated vessel columns to return (default: summary columns)
+        expand: comma-separated JSON columns to include, e.g. team_assignments,cargo_configuration
+    """
     try:
-        vessels = Vessel.query.all()
+        fields = [name.strip() for name in request.args.get('fields', '').split(',') if name.strip()]
+        expand = [name.strip() for name in request.args.get('expand', '').split(',') if name.strip()]
+        
+        invalid_expand = [name for name in expand if name not in VESSEL_JSON_FIELDS]
+        if invalid_expand:
+            return jsonify({'error': f"Unknown expand fields: {', '.join(invalid_expand)}"}), 400
+        
+        try:
+            vessels = Vessel.get_summary_dicts(fields=fields or None, expand=expand)
+        except ValueError as field_error:
+            return jsonify({'error': str(field_error)}), 400
+        
         summary = {
             'total_vessels': len(vessels),
-            'active_vessels': len([v for v in vessels if v.status in ['arrived', 'berthed', 'operations_active']]),
-            'vessels': [v.to_dict() for v in vessels],
+            'active_vessels': sum(1 for v in vessels if v['status'] in VESSEL_ACTIVE_STATUSES),
+            'vessels': vessels,
             'timestamp': datetime.utcnow().isoformat()
         }
         return jsonify(summary)
@@ -225,6 +325,7 @@ def api_vessels_summary():
         return jsonify({'error': 'Failed to fetch vessel summary'}), 500
 
 @app.route('/api/vessels/<int:vessel_id>')
+@cached_route(timeout=3600, key_prefix='vessel_details', tags=('vessel:{vessel_id}',))
 def api_vessel_details(vessel_id):
     """Get individual vessel details"""
     try:
@@ -248,30 +349,28 @@ def api_vessel_cargo_tally(vessel_id):
                 'vessel_id': vessel_id,
                 'vessel_name': vessel.name,
                 'recent_tallies': [tally.to_dict() for tally in tallies],
-                'total_loaded': sum([t.cargo_count for t in CargoTally.query.filter_by(vessel_id=vessel_id, tally_type='loaded').all()]),
+                'total_loaded': CargoTallyTotal.get_total(vessel_id, 'loaded'),
                 'progress': vessel.progress_percentage
             })
         
         elif request.method == 'POST':
-            # Add new tally entry
+            # Add new tally entry - running totals and progress are updated in the same transaction
             data = request.get_json()
             
-            tally = CargoTally(
+            tally = CargoTally.create_tally(
                 vessel_id=vessel_id,
-                tally_type=data.get('tally_type', 'loaded'),
                 cargo_count=int(data.get('cargo_count', 1)),
+                tally_type=data.get('tally_type', 'loaded'),
+                vessel=vessel,
                 location=data.get('location', ''),
                 notes=data.get('notes', ''),
                 shift_period=data.get('shift_period', 'morning')
             )
+            total_loaded = CargoTallyTotal.get_total(vessel_id, 'loaded')
             
-            db.session.add(tally)
-            db.session.commit()
-            
-            # Update vessel progress
-            total_loaded = sum([t.cargo_count for t in CargoTally.query.filter_by(vessel_id=vessel_id, tally_type='loaded').all()])
-            progress = (total_loaded / vessel.total_cargo_capacity) * 100 if vessel.total_cargo_capacity > 0 else 0
-            vessel.update_progress(progress)
+            publish_cargo_tally(vessel_id, tally.to_dict(), total_loaded=total_loaded)
+            publish_vessel_progress(vessel_id, vessel.progress_percentage)
+            offline_data_manager.invalidate_vessel(vessel_id, vessel.progress_percentage)
             
             return jsonify({
                 'success': True,
@@ -284,6 +383,108 @@ def api_vessel_cargo_tally(vessel_id):
         logger.error(f"API cargo tally error: {e}")
         return jsonify({'error': 'Failed to process cargo tally'}), 500
 
+@app.route('/api/cargo-tally/batch', methods=['POST'])
+@csrf.exempt
+def api_cargo_tally_batch():
+    """Ingest a batch of cargo tallies for one or more vessels in a single transaction"""
+    from marshmallow import ValidationError
+    from utils.api_validators import bulk_cargo_tally_item_schema
+    
+    started = time.perf_counter()
+    try:
+        data = request.get_json(silent=True) or {}
+        items = data.get('tallies')
+        if not isinstance(items, list) or not items:
+            return jsonify({'error': 'tallies must be a non-empty list'}), 400
+        
+        max_items = app.config.get('CARGO_TALLY_BULK_MAX_ITEMS', 1000)
+        if len(items) > max_items:
+            return jsonify({'error': f'Batch too large: {len(items)} tallies (max {max_items})'}), 413
+        
+        # Validate every entry before touching the database
+        results = []
+        valid = []
+        for index, item in enumerate(items):
+            try:
+                entry = bulk_cargo_tally_item_schema.load(item if isinstance(item, dict) else {})
+            except ValidationError as err:
+                results.append({'index': index, 'success': False, 'errors': err.messages})
+                continue
+            result = {'index': index, 'success': True, 'vessel_id': entry['vessel_id']}
+            if entry.get('client_id'):
+                result['client_id'] = entry['client_id']
+            results.append(result)
+            valid.append((result, entry))
+        
+        # One query for every referenced vessel
+        vessel_ids = {entry['vessel_id'] for _, entry in valid}
+        vessels = {v.id: v for v in Vessel.query.filter(Vessel.id.in_(vessel_ids)).all()} if vessel_ids else {}
+        
+        accepted = []
+        rows = []
+        for result, entry in valid:
+            if entry['vessel_id'] not in vessels:
+                result['success'] = False
+                result['errors'] = {'vessel_id': ['Vessel not found']}
+                continue
+            timestamp = entry.get('timestamp')
+            if timestamp and timestamp.tzinfo:
+                timestamp = timestamp.astimezone(timezone.utc).replace(tzinfo=None)
+            row = {
+                'vessel_id': entry['vessel_id'],
+                'tally_type': entry['tally_type'],
+                'cargo_count': entry['cargo_count'],
+                'location': entry.get('location') or '',
+                'notes': entry.get('notes') or '',
+                'shift_period': entry.get('shift_period')
+            }
+            if timestamp:
+                row['timestamp'] = timestamp
+            accepted.append(result)
+            rows.append(row)
+        
+        if rows:
+            tallies = CargoTally.create_tallies_bulk(
+                rows, vessels, chunk_size=app.config.get('CARGO_TALLY_BATCH_SIZE', 100)
+            )
+            for result, tally in zip(accepted, tallies):
+                result['tally_id'] = tally.id
+        
+        affected = {row['vessel_id'] for row in rows}
+        vessel_results = {
+            vessel_id: {
+                'new_progress': vessels[vessel_id].progress_percentage,
+                'total_loaded': CargoTallyTotal.get_total(vessel_id, 'loaded')
+            }
+            for vessel_id in affected
+        }
+        for vessel_id, summary in vessel_results.items():
+            # One event per vessel rather than per row so replayed batches don't flood clients
+            entries = sum(1 for row in rows if row['vessel_id'] == vessel_id)
+            publish_cargo_tally(vessel_id, None, entries=entries, total_loaded=summary['total_loaded'])
+            publish_vessel_progress(vessel_id, summary['new_progress'])
+            offline_data_manager.invalidate_vessel(vessel_id, summary['new_progress'])
+        
+        duration = time.perf_counter() - started
+        return jsonify({
+            'success': bool(rows),
+            'results': results,
+            'vessels': {str(vessel_id): summary for vessel_id, summary in vessel_results.items()},
+            'metadata': {
+                'received': len(items),
+                'inserted': len(rows),
+                'rejected': len(items) - len(rows),
+                'vessels_updated': len(affected),
+                'duration_ms': round(duration * 1000, 2),
+                'rows_per_second': round(len(rows) / duration, 1) if duration > 0 else None,
+                'timestamp': datetime.utcnow().isoformat()
+            }
+        }), 201 if rows else 400
+        
+    except Exception as e:
+        logger.error(f"API cargo tally batch error: {e}")
+        return jsonify({'error': 'Failed to process cargo tally batch'}), 500
+
 # Vessel details page route
 @app.route('/vessel/<vessel_id>')
 @login_required
@@ -293,9 +494,7 @@ def vessel_details(vessel_id):
         # Check if it's an offline vessel ID
         if str(vessel_id).startswith('offline_'):
             # Handle offline vessel
-            from utils.offline_data_manager import OfflineDataManager
-            offline_manager = OfflineDataManager()
-            offline_vessels = offline_manager.get_offline_vessels()
+            offline_vessels = offline_data_manager.get_offline_vessels()
             
             vessel_data = next((v for v in offline_vessels if v.get('offline_id') == vessel_id), None)
             if not vessel_data:
@@ -353,18 +552,21 @@ from routes.auth import auth_bp
 from routes.wizard import wizard_bp
 from routes.document_processing import document_bp
 from routes.sync_routes import sync_bp
-from routes.offline_dashboard import offline_dashboard_bp
+from routes.offline_dashboard import offline_dashboard_bp, offline_data_manager
 from routes.health_production import health_bp
+from routes.live_updates import live_updates_bp
 app.register_blueprint(auth_bp, url_prefix='/auth')
 app.register_blueprint(wizard_bp, url_prefix='/wizard')
 app.register_blueprint(document_bp, url_prefix='/document')
 app.register_blueprint(sync_bp, url_prefix='/sync')
 app.register_blueprint(offline_dashboard_bp, url_prefix='/offline-dashboard')
 app.register_blueprint(health_bp)  # No prefix - health checks at /health
+app.register_blueprint(live_updates_bp, url_prefix='/live')
 
 csrf.exempt(document_bp)
 csrf.exempt(sync_bp)
 csrf.exempt(offline_dashboard_bp)
+csrf.exempt(live_updates_bp)
 
 # SECURITY FIX: Remove CSRF exemption from auth routes to prevent CSRF attacks
 # csrf.exempt(auth_bp)  # REMOVED - auth routes should be CSRF protected
@@ -387,13 +589,86 @@ def inject_csp_nonce():
 
 # Import models after db initialization
 from models.user import create_user_model
-from models.vessel import create_vessel_model
+from models.vessel import create_vessel_model, JSON_FIELDS as VESSEL_JSON_FIELDS, ACTIVE_STATUSES as VESSEL_ACTIVE_STATUSES
 from models.cargo_tally import create_cargo_tally_model
+from models.cargo_tally_total import create_cargo_tally_total_model
+from models.sync_queue import create_sync_queue_entry_model, create_sync_queue_counter_model
+from models.sync_change import create_sync_change_model, enable_change_tracking
+from utils.live_events import publish_cargo_tally, publish_vessel_progress
 
 # Create models
 User = create_user_model(db)
 Vessel = create_vessel_model(db)
 CargoTally = create_cargo_tally_model(db)
+CargoTallyTotal = create_cargo_tally_total_model(db)
+SyncQueueEntry = create_sync_queue_entry_model(db)
+SyncQueueCounter = create_sync_queue_counter_model(db)
+SyncChange = create_sync_change_model(db)
+
+# Delta sync: every vessel and cargo tally write is logged with a sequence number
+enable_change_tracking(db, Vessel, CargoTally)
+# Vessel and tally commits invalidate cached responses tagged with the vessel
+enable_cache_invalidation(db, Vessel, CargoTally)
+
+# CLI command to reconcile cargo tally running totals
+@app.cli.command('reconcile-tally-totals')
+@click.option('--vessel-id', type=int, default=None, help='Only reconcile totals for this vessel')
+def reconcile_tally_totals_command(vessel_id):
+    """Rebuild cargo tally running totals from the raw tally rows"""
+    corrections = CargoTallyTotal.rebuild(vessel_id=vessel_id)
+    for correction in corrections:
+        click.echo(
+            f"vessel {correction['vessel_id']} {correction['tally_type']}: "
+            f"{correction['old_total']} -> {correction['new_total']} "
+            f"({correction['old_entries']} -> {correction['new_entries']} entries)"
+        )
+    click.echo(f"Reconciled cargo tally totals: {len(corrections)} corrected")
+
+# CLI command to recount sync queue status counters
+@app.cli.command('rebuild-sync-counters')
+def rebuild_sync_counters_command():
+    """Recount sync queue statistics from the persisted queue rows"""
+    SyncQueueCounter.rebuild()
+    counts = SyncQueueCounter.get_counts()
+    for (table_name, status), count in sorted(counts.items()):
+        click.echo(f"{table_name} {status}: {count}")
+    click.echo(f"Rebuilt sync queue counters: {sum(counts.values())} records")
+
+# CLI command to trim the delta sync change log
+@app.cli.command('prune-sync-changes')
+@click.option('--days', type=int, default=7, help='Keep changes from the last N days')
+def prune_sync_changes_command(days):
+    """Delete old delta sync changes - clients further behind get a full snapshot"""
+    deleted = SyncChange.prune(older_than_days=days)
+    click.echo(f"Pruned {deleted} sync changes older than {days} days")
+
+# CLI entry point for a standalone sync worker process (SYNC_WORKER_MODE=external)
+@app.cli.command('sync-worker')
+@click.option('--once', is_flag=True, help='Drain the current queue and exit')
+@click.option('--batch-size', type=int, default=None, help='Records per batch (default SYNC_WORKER_BATCH_SIZE)')
+def sync_worker_command(once, batch_size):
+    """Drain the sync queue in the foreground with adaptive backoff"""
+    from routes.sync_routes import sync_worker
+    if batch_size:
+        app.config['SYNC_WORKER_BATCH_SIZE'] = batch_size
+    
+    if not once:
+        click.echo("Sync worker running - Ctrl+C to stop")
+        sync_worker.run_forever(app)
+        return
+    
+    sync_worker.configure(app)
+    while True:
+        delay = sync_worker.run_once()
+        if sync_worker.state != 'draining':
+            break
+        time.sleep(delay)
+    with app.app_context():
+        metrics = sync_worker.get_metrics()
+    click.echo(
+        f"Sync worker {metrics['state']}: {metrics['records_processed']} records in {metrics['batches']} batches, "
+        f"{metrics['queue_depth']} pending, lag {metrics['lag_seconds']}s"
+    )
 
 # Login manager user loader
 @login_manager.user_loader
@@ -407,139 +682,32 @@ def load_user(user_id):
 def dashboard():
     """Main dashboard with vessel overview - Production-grade with comprehensive error handling"""
     try:
-        logger.info("🚢 Loading dashboard...")
+        # Schema readiness is checked once per worker at startup; this only runs
+        # if the worker skipped init_database()
+        if not _schema_checked:
+            ensure_schema_ready()
         
-        # Step 1: Perform database health check
+        # Single projected query - the dashboard list only needs the summary columns
         try:
-            # Test basic database connectivity
-            with db.engine.connect() as connection:
-                connection.execute(text("SELECT 1"))
-            logger.info("✅ Database connectivity confirmed")
-        except Exception as db_health_error:
-            logger.error(f"❌ Database health check failed: {db_health_error}")
-            flash('Database connectivity issues detected. Please try again.', 'error')
-            return render_template('dashboard.html', vessels=[], vessel_count=0)
-        
-        # Step 2: Ensure vessel model is created and migration is applied
-        try:
-            from models.vessel import create_vessel_model
-            Vessel = create_vessel_model(db)
-            logger.info("✅ Vessel model initialized with production compatibility")
-        except Exception as model_error:
-            logger.error(f"❌ Vessel model initialization failed: {model_error}")
-            flash('System model initialization error. Administrators have been notified.', 'error')
-            return render_template('dashboard.html', vessels=[], vessel_count=0)
-        
-        # Step 3: Attempt to run emergency migration if still missing columns
-        try:
-            from production_db_migration import run_migration_if_needed
-            migration_success, migration_result = run_migration_if_needed()
-            if migration_success and migration_result:
-                logger.info(f"✅ Emergency migration completed: {len(migration_result)} columns added")
-        except Exception as emergency_migration_error:
-            logger.warning(f"⚠️  Emergency migration failed: {emergency_migration_error}")
-        
-        # Step 4: Query vessels with comprehensive error handling
-        vessels = []
-        try:
-            # Force session refresh to see latest data
-            db.session.expire_all()
-            db.session.commit()  # Ensure any pending transactions are committed
-            # Test query with minimal columns first
-            vessel_count = Vessel.query.count()
-            logger.info(f"📊 Found {vessel_count} vessels in database")
-
-            # Debug: List vessel IDs and names
-            vessel_ids = db.session.query(Vessel.id, Vessel.name).all()
-            logger.info(f"🔍 Vessel IDs in database: {[f'ID:{v[0]} Name:{v[1]}' for v in vessel_ids]}")
-
-            # Now attempt full query
-            vessels = Vessel.query.all()
-            logger.info(f"✅ Successfully queried {len(vessels)} vessels")
-
-            # Debug: Log vessel details
-            for v in vessels:
-                logger.info(f"📋 Vessel: ID={v.id}, Name={v.name}, Status={v.status}, Created={getattr(v, 'created_at', 'N/A')}")
-            
+            vessel_data = Vessel.get_summary_dicts()
         except Exception as query_error:
+            db.session.rollback()
             logger.error(f"❌ Vessel query failed: {query_error}")
             
-            # Try to determine if it's a column issue
-            if "UndefinedColumn" in str(query_error) or "does not exist" in str(query_error):
-                logger.error("🚨 Column compatibility error detected - forcing migration")
-                try:
-                    # Force migration with direct SQL
-                    missing_columns = [
-                        'operation_start_date', 'operation_end_date', 'shipping_line',
-                        'vessel_type', 'port_of_call', 'stevedoring_company', 'operation_type',
-                        'berth_assignment', 'operations_manager', 'team_assignments', 'cargo_configuration'
-                    ]
-                    
-                    with db.engine.connect() as connection:
-                        # Start a transaction for all column additions
-                        trans = connection.begin()
-                        try:
-                            for column in missing_columns:
-                                try:
-                                    if column.endswith('_date'):
-                                        connection.execute(text(f"ALTER TABLE vessels ADD COLUMN IF NOT EXISTS {column} DATE"))
-                                    elif column in ['team_assignments', 'cargo_configuration']:
-                                        connection.execute(text(f"ALTER TABLE vessels ADD COLUMN IF NOT EXISTS {column} TEXT"))
-                                    else:
-                                        connection.execute(text(f"ALTER TABLE vessels ADD COLUMN IF NOT EXISTS {column} VARCHAR(100)"))
-                                    logger.info(f"✅ Added missing column: {column}")
-                                except Exception as col_error:
-                                    logger.warning(f"⚠️  Could not add column {column}: {col_error}")
-                                    # Continue with other columns even if one fails
-                            
-                            trans.commit()
-                            logger.info("✅ Database migration transaction completed")
-                        except Exception as trans_error:
-                            trans.rollback()
-                            logger.error(f"❌ Migration transaction failed, rolled back: {trans_error}")
-                            raise trans_error
-                    
-                    # Retry query after adding columns
-                    vessels = Vessel.query.all()
-                    logger.info(f"✅ Query successful after emergency column addition: {len(vessels)} vessels")
-                    
-                except Exception as emergency_fix_error:
-                    logger.error(f"❌ Emergency column fix failed: {emergency_fix_error}")
-                    vessels = []
-            else:
-                vessels = []
-        
-        # Step 5: Safely serialize vessel data
-        vessel_data = []
-        serialization_errors = 0
-        
-        for vessel in vessels:
+            if not _is_undefined_column_error(query_error):
+                flash('Database connectivity issues detected. Please try again.', 'error')
+                return render_template('dashboard.html', vessels=[], vessel_count=0)
+            
+            logger.error("🚨 Column compatibility error detected - forcing migration")
             try:
-                vessel_dict = vessel.to_dict(include_progress=True)
-                vessel_data.append(vessel_dict)
-            except Exception as vessel_error:
-                logger.warning(f"⚠️  Failed to serialize vessel {vessel.id}: {vessel_error}")
-                serialization_errors += 1
-                # Create minimal vessel data as fallback
-                try:
-                    minimal_vessel = {
-                        'id': getattr(vessel, 'id', 'unknown'),
-                        'name': getattr(vessel, 'name', 'Unknown Vessel'),
-                        'status': getattr(vessel, 'status', 'unknown'),
-                        'vessel_type': 'Auto Only',
-                        'port_of_call': 'Colonel Island',
-                        'progress_percentage': 0,
-                        'shipping_line': 'K-line'
-                    }
-                    vessel_data.append(minimal_vessel)
-                    logger.info(f"✅ Created fallback data for vessel {vessel.id}")
-                except Exception as fallback_error:
-                    logger.error(f"❌ Fallback vessel data creation failed: {fallback_error}")
-                    # Skip this vessel entirely
-                    continue
-        
-        if serialization_errors > 0:
-            flash(f'Some vessel data could not be loaded ({serialization_errors} vessels affected). System is running in compatibility mode.', 'warning')
+                _emergency_vessel_column_fix()
+                vessel_data = Vessel.get_summary_dicts()
+                logger.info(f"✅ Query successful after emergency column addition: {len(vessel_data)} vessels")
+            except Exception as emergency_fix_error:
+                db.session.rollback()
+                logger.error(f"❌ Emergency column fix failed: {emergency_fix_error}")
+                flash('Some vessel data could not be loaded. System is running in compatibility mode.', 'warning')
+                vessel_data = []
         
         logger.info(f"🎯 Dashboard loaded successfully with {len(vessel_data)} vessels")
         return render_template('dashboard.html', 
@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Fallback Cache Benchmark
+Compares InMemoryFallbackCache against the previous engine, which swept every
+TTL entry on each get(), at 1k, 10k and 100k keys
+
+Each run fills the cache to the key count with the default TTL, then times a
+mixed workload of reads (90%) and writes (10%) over random keys.
+
+Usage: python benchmark_fallback_cache.py [--sizes 1000,10000,100000] [--ops 20000]
+"""
+
+import sys
+import argparse
+import random
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+
+# Add project root to path
+project_root = Path(__file__).parent
+sys.path.insert(0, str(project_root))
+
+from utils.redis_client import InMemoryFallbackCache
+
+
+class LegacyFallbackCache:
+    """The previous engine: full expiry sweep on every read"""
+
+    def __init__(self, max_size=1000, default_ttl=300):
+        self.max_size = max_size
+        self.default_ttl = default_ttl
+        self._cache = OrderedDict()
+        self._expiry = {}
+        self._lock = threading.RLock()
+
+    def get(self, key):
+        with self._lock:
+            self._cleanup_expired()
+            if key in self._cache and (key not in self._expiry or time.time() <= self._expiry[key]):
+                value = self._cache.pop(key)
+                self._cache[key] = value
+                return value
+            return None
+
+    def set(self, key, value, ttl=None):
+        with self._lock:
+            if key in self._cache:
+                del self._cache[key]
+                self._expiry.pop(key, None)
+            if len(self._cache) >= self.max_size:
+                oldest_key = next(iter(self._cache))
+                del self._cache[oldest_key]
+                self._expiry.pop(oldest_key, None)
+            self._cache[key] = value
+            if ttl is not None:
+                self._expiry[key] = time.time() + ttl
+            elif self.default_ttl > 0:
+                self._expiry[key] = time.time() + self.default_ttl
+            return True
+
+    def _cleanup_expired(self):
+        if not self._expiry:
+            return
+        now = time.time()
+        for key in [key for key, expiry in self._expiry.items() if now > expiry]:
+            self._cache.pop(key, None)
+            self._expiry.pop(key, None)
+
+
+def run(cache, keys, ops, seed=7):
+    """Time a 90/10 read/write mix and return operations per second"""
+    for key in keys:
+        cache.set(key, b'x' * 64)
+
+    rng = random.Random(seed)
+    picks = [rng.choice(keys) for _ in range(ops)]
+    start = time.perf_counter()
+    for i, key in enumerate(picks):
+        if i % 10 == 0:
+            cache.set(key, b'y' * 64)
+        else:
+            cache.get(key)
+    return ops / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the Redis fallback cache engines')
+    parser.add_argument('--sizes', default='1000,10000,100000', help='Comma separated key counts')
+    parser.add_argument('--ops', type=int, default=20000, help='Operations per run')
+    args = parser.parse_args()
+
+    print(f"{'keys':>8} {'legacy ops/s':>14} {'current ops/s':>15} {'speedup':>9}")
+    for size in [int(s) for s in args.sizes.split(',')]:
+        keys = [f'fallback:key:{i}' for i in range(size)]
+        # The legacy sweep is O(n) per read, so cap its run to keep large sizes quick
+        legacy_ops = max(200, min(args.ops, args.ops * 1000 // size))
+        legacy = run(LegacyFallbackCache(max_size=size), keys, legacy_ops)
+        current = run(InMemoryFallbackCache(max_size=size), keys, args.ops)
+        print(f"{size:>8} {legacy:>14,.0f} {current:>15,.0f} {current / legacy:>8.1f}x")
+
+
+if __name__ == '__main__':
+    main()
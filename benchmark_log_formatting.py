@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+"""
+Log Formatting Benchmark
+Compares the CPU cost per StructuredLogger.log() call against the previous path,
+which built a LogContext dataclass, read request fields and psutil process metrics
+on every call, flattened it with asdict() and serialized with json.dumps()
+
+Both loggers write in sync mode to os.devnull, so each measurement covers
+building, formatting and writing a record on one thread. Calls are made outside
+and inside a Flask request, and at DEBUG, which the INFO-level logger discards.
+
+Usage: python benchmark_log_formatting.py [--calls 20000]
+"""
+
+import os
+import sys
+import argparse
+import json
+import logging
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+# Add project root to path
+project_root = Path(__file__).parent
+sys.path.insert(0, str(project_root))
+
+import psutil
+from flask import Flask, g, request, has_request_context
+
+from utils.structured_logger import StructuredLogger, JsonFormatter, LogContext, LogLevel, BatchStreamHandler
+
+
+class LegacyJsonFormatter(logging.Formatter):
+    """The previous formatter: list membership per attribute and json.dumps() per record"""
+
+    def format(self, record):
+        log_entry = {
+            'timestamp': datetime.now(timezone.utc).isoformat(),
+            'level': record.levelname,
+            'message': record.getMessage(),
+            'logger': record.name,
+        }
+        for key, value in record.__dict__.items():
+            if key not in ['name', 'msg', 'args', 'levelname', 'levelno', 'pathname',
+                           'filename', 'module', 'lineno', 'funcName', 'created',
+                           'msecs', 'relativeCreated', 'thread', 'threadName',
+                           'processName', 'process', 'stack_info', 'exc_info', 'exc_text']:
+                log_entry[key] = value
+        return json.dumps(log_entry, default=str, ensure_ascii=False)
+
+
+class LegacyStructuredLogger(StructuredLogger):
+    """The previous log() path: full context capture on every call"""
+
+    def _get_request_context(self):
+        context = {}
+        if has_request_context():
+            context.update({
+                'request_id': getattr(g, 'request_id', None),
+                'ip_address': request.environ.get('HTTP_X_FORWARDED_FOR', request.remote_addr),
+                'user_agent': request.headers.get('User-Agent'),
+                'endpoint': request.endpoint,
+                'method': request.method,
+            })
+            if hasattr(g, 'jwt_claims'):
+                context['user_id'] = g.jwt_claims.get('user_id')
+        return context
+
+    def _get_performance_context(self):
+        process = psutil.Process()
+        return {
+            'memory_usage_mb': process.memory_info().rss / (1024 * 1024),
+            'cpu_usage_percent': process.cpu_percent(),
+        }
+
+    def log(self, level, message, **kwargs):
+        if not self._should_sample_log():
+            return
+        log_context = LogContext(level=level.value, message=message,
+                                 deployment_version=self.deployment_version, environment=self.environment)
+        for context in (self._get_request_context(), self._get_performance_context(), kwargs):
+            for key, value in context.items():
+                if hasattr(log_context, key):
+                    setattr(log_context, key, value)
+                elif context is kwargs:
+                    log_context.extra_fields[key] = value
+        log_data = log_context.to_dict()
+        log_data.pop('message', None)
+        record = self.logger.makeRecord(self.logger.name, getattr(logging, level.value, logging.WARNING),
+                                        '', 0, message, (), None, extra=log_data)
+        self.logger.handle(record)
+
+
+def devnull_sink(formatter):
+    handler = BatchStreamHandler(open(os.devnull, 'w'))
+    handler.setFormatter(formatter)
+    handler.setLevel(logging.INFO)
+    return handler
+
+
+def cpu_per_call(logger, calls, level):
+    """CPU microseconds per log call"""
+    start = time.process_time()
+    for i in range(calls):
+        logger.log(level, f"Cargo tally updated for hatch {i % 8}", vessel_id=i % 40, operation_id=str(i))
+    return (time.process_time() - start) / calls * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark StructuredLogger CPU cost per call')
+    parser.add_argument('--calls', type=int, default=20000, help='Log calls per scenario')
+    args = parser.parse_args()
+
+    legacy = LegacyStructuredLogger('benchmark.legacy', handlers=[devnull_sink(LegacyJsonFormatter())],
+                                    async_logging=False)
+    current = StructuredLogger('benchmark.current', handlers=[devnull_sink(JsonFormatter())], async_logging=False)
+    for logger in (legacy, current):
+        logger.deduplication = False
+        logger.logger.setLevel(logging.INFO)
+
+    app = Flask(__name__)
+    scenarios = [('no request', LogLevel.INFO, False), ('in request', LogLevel.INFO, True),
+                 ('debug', LogLevel.DEBUG, True)]
+
+    print(f"{'scenario':>11} {'legacy us':>10} {'current us':>11} {'speedup':>8}")
+    for name, level, in_request in scenarios:
+        results = []
+        for logger in (legacy, current):
+            if in_request:
+                with app.test_request_context('/api/vessels/4', headers={'User-Agent': 'benchmark'}):
+                    g.request_id = 'bench'
+                    g.jwt_claims = {'user_id': 7}
+                    results.append(cpu_per_call(logger, args.calls, level))
+            else:
+                results.append(cpu_per_call(logger, args.calls, level))
+        print(f"{name:>11} {results[0]:>10.1f} {results[1]:>11.1f} {results[0] / results[1]:>7.1f}x")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+Log Pattern Matcher Benchmark
+Compares MaritimePatternMatcher against the previous matching loop, which ran
+search() for every regex of every LogPattern on each log line
+
+Lines come from a recorded log sample (JSON lines with a "message" field, as
+written by the structured logger) or, without --sample, from a generated mix of
+routine request logs with a small share of lines that trigger maritime patterns.
+Both engines must agree on every line before timings are reported.
+
+Usage: python benchmark_log_matcher.py [--sample logs.jsonl] [--lines 50000] [--hit-rate 0.05]
+"""
+
+import sys
+import argparse
+import json
+import logging
+import random
+import time
+from pathlib import Path
+
+# Add project root to path
+project_root = Path(__file__).parent
+sys.path.insert(0, str(project_root))
+
+from utils.log_aggregator import MaritimeLogAggregator, MaritimePatternMatcher
+
+ROUTINE_LINES = [
+    'GET /api/vessels/{n} 200 in {n}ms',
+    'POST /api/vessels/{n}/cargo-tally 201 in {n}ms',
+    'Cache hit for vessel_details:{n}',
+    'User {n} logged in from 10.0.{n}.4',
+    'Sync batch of {n} transactions applied',
+    'Health check ok: database {n}ms, redis {n}ms',
+    'Rendered dashboard for berth B{n} with {n} widgets',
+    'Background flush wrote {n} log records',
+]
+
+PATTERN_LINES = [
+    'Vessel MV Aurora delayed by {n} minutes at anchorage',
+    'Cargo tally discrepancy of {n} containers on hatch 2',
+    'Failed authentication after {n} attempts for user ops{n}',
+    'Crane {n} malfunction reported at berth 4',
+    'Emission limit exceeded: {n}.5 ppm SOx',
+    'Response time {n} ms threshold exceeded on /api/vessels',
+    'Sync failed after {n} attempts, retrying',
+    'Memory usage {n} percent warning on worker 3',
+]
+
+
+class LegacyMatcher:
+    """The previous engine: every regex of every pattern searched in turn"""
+
+    def __init__(self, patterns):
+        self.patterns = patterns
+
+    def match(self, message):
+        return [
+            pattern_type for pattern_type, pattern in self.patterns.items()
+            if any(compiled.search(message) for compiled in pattern.compiled_patterns)
+        ]
+
+
+def generated_sample(lines, hit_rate, seed=11):
+    """Routine lines with `hit_rate` of lines carrying a maritime pattern"""
+    rng = random.Random(seed)
+    sample = []
+    for _ in range(lines):
+        templates = PATTERN_LINES if rng.random() < hit_rate else ROUTINE_LINES
+        sample.append(rng.choice(templates).replace('{n}', str(rng.randint(1, 999))))
+    return sample
+
+
+def recorded_sample(path):
+    """Messages from a JSON-lines log file"""
+    with open(path) as f:
+        return [json.loads(line).get('message', '') for line in f if line.strip()]
+
+
+def run(matcher, messages):
+    """Match every message once and return lines per second"""
+    start = time.perf_counter()
+    for message in messages:
+        matcher.match(message)
+    return len(messages) / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the log aggregator pattern matchers')
+    parser.add_argument('--sample', help='Recorded JSON-lines log file to replay')
+    parser.add_argument('--lines', type=int, default=50000, help='Generated lines when no sample is given')
+    parser.add_argument('--hit-rate', type=float, default=0.05, help='Share of generated lines that match')
+    args = parser.parse_args()
+
+    messages = recorded_sample(args.sample) if args.sample else generated_sample(args.lines, args.hit_rate)
+
+    logging.getLogger('stevedores').disabled = True
+    aggregator = MaritimeLogAggregator()
+    aggregator.stop_processing()
+    patterns = aggregator.patterns
+
+    legacy, current = LegacyMatcher(patterns), MaritimePatternMatcher(patterns)
+    mismatches = [m for m in messages if legacy.match(m) != current.match(m)]
+    if mismatches:
+        print(f"{len(mismatches)} lines matched differently, e.g. {mismatches[0]!r}")
+        return 1
+
+    current = MaritimePatternMatcher(patterns)
+    legacy_rate = run(legacy, messages)
+    current_rate = run(current, messages)
+    stats = current.stats
+
+    print(f"{'lines':>8} {'legacy lines/s':>15} {'current lines/s':>16} {'speedup':>9} {'prefiltered':>12}")
+    print(f"{len(messages):>8} {legacy_rate:>15,.0f} {current_rate:>16,.0f} "
+          f"{current_rate / legacy_rate:>8.1f}x {stats['prefilter_skips'] / max(1, stats['messages']):>11.1%}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
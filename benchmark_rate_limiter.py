@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+Rate Limiter Benchmark
+Compares InMemoryRateLimiter against the previous engine, which kept a deque
+of every request timestamp per key, for memory per key and throughput
+
+Each run sends a burst of requests per key to 1,000 keys with a limit high
+enough that every request is admitted (the worst case for the old engine),
+and measures the memory held afterwards with tracemalloc.
+
+Usage: python benchmark_rate_limiter.py [--keys 1000] [--bursts 10,100,1000]
+"""
+
+import sys
+import argparse
+import threading
+import time
+import tracemalloc
+from collections import defaultdict, deque
+from pathlib import Path
+
+# Add project root to path
+project_root = Path(__file__).parent
+sys.path.insert(0, str(project_root))
+
+from utils.rate_limiter import InMemoryRateLimiter
+
+
+class LegacyRateLimiter:
+    """The previous engine: one timestamp per admitted request, one lock per key"""
+
+    def __init__(self):
+        self.requests = defaultdict(deque)
+        self.locks = defaultdict(threading.Lock)
+
+    def is_allowed(self, key, limit, window):
+        now = time.time()
+        with self.locks[key]:
+            request_times = self.requests[key]
+            cutoff = now - window
+            while request_times and request_times[0] < cutoff:
+                request_times.popleft()
+            if len(request_times) < limit:
+                request_times.append(now)
+                return True
+            return False
+
+
+def burst_all(limiter, keys, burst):
+    for key in keys:
+        for _ in range(burst):
+            limiter.is_allowed(key, 1000000, 3600)
+
+
+def run(limiter_class, keys, burst):
+    """Return (bytes per key, requests per second) for a burst on every key"""
+    # Throughput is timed without tracemalloc, which slows every allocation
+    start = time.perf_counter()
+    burst_all(limiter_class(), keys, burst)
+    rate = len(keys) * burst / (time.perf_counter() - start)
+
+    tracemalloc.start()
+    baseline = tracemalloc.get_traced_memory()[0]
+    limiter = limiter_class()
+    burst_all(limiter, keys, burst)
+    held = tracemalloc.get_traced_memory()[0] - baseline
+    tracemalloc.stop()
+    return held / len(keys), rate
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the in-memory rate limiter engines')
+    parser.add_argument('--keys', type=int, default=1000, help='Distinct clients')
+    parser.add_argument('--bursts', default='10,100,1000', help='Comma separated requests per client')
+    args = parser.parse_args()
+
+    keys = [f'ip_10.0.{i // 256}.{i % 256}' for i in range(args.keys)]
+    print(f"{'req/key':>8} {'legacy B/key':>13} {'current B/key':>14} {'legacy req/s':>13} {'current req/s':>14}")
+    for burst in [int(b) for b in args.bursts.split(',')]:
+        legacy_bytes, legacy_rate = run(LegacyRateLimiter, keys, burst)
+        current_bytes, current_rate = run(InMemoryRateLimiter, keys, burst)
+        print(f"{burst:>8} {legacy_bytes:>13,.0f} {current_bytes:>14,.0f} {legacy_rate:>13,.0f} {current_rate:>14,.0f}")
+
+
+if __name__ == '__main__':
+    main()
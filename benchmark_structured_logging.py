@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+Structured Logging Benchmark
+Compares the per-call latency of StructuredLogger.log() when records are formatted
+and written on the calling thread (the previous behaviour) against the queue
+pipeline, where the caller only enqueues and a listener thread formats and
+writes batches
+
+Both modes write JSON lines to a temporary file. --sink-delay-ms adds a stall to
+every flush of that file, standing in for a blocked stdout pipe or a slow disk.
+Latency is measured around each call; the drain time after the last call and the
+pipeline counters are reported so that dropped records cannot hide in the numbers.
+
+Usage: python benchmark_structured_logging.py [--calls 20000] [--sink-delay-ms 0] [--capacity 10000]
+                                              [--overflow drop_newest]
+"""
+
+import os
+import sys
+import argparse
+import logging
+import statistics
+import tempfile
+import time
+from pathlib import Path
+
+# Add project root to path
+project_root = Path(__file__).parent
+sys.path.insert(0, str(project_root))
+
+from utils.structured_logger import StructuredLogger, JsonFormatter, BatchRotatingFileHandler
+
+
+class StallingStream:
+    """File stream whose flush() stalls for a fixed delay"""
+
+    def __init__(self, stream, delay):
+        self._stream = stream
+        self._delay = delay
+
+    def flush(self):
+        self._stream.flush()
+        time.sleep(self._delay)
+
+    def __getattr__(self, name):
+        return getattr(self._stream, name)
+
+
+def file_sink(path, delay=0.0):
+    """JSON file handler matching the logger's own file sink"""
+    handler = BatchRotatingFileHandler(path, maxBytes=0)
+    if delay:
+        handler.stream = StallingStream(handler.stream, delay)
+    handler.setFormatter(JsonFormatter())
+    handler.setLevel(logging.INFO)
+    return handler
+
+
+def run(async_logging, calls, directory, delay=0.0):
+    """Log `calls` records and return per-call latencies, drain time and pipeline stats"""
+    path = os.path.join(directory, f"{'async' if async_logging else 'sync'}.log")
+    logger = StructuredLogger(f"benchmark.{'async' if async_logging else 'sync'}", enable_render_streaming=False,
+                              handlers=[file_sink(path, delay)], async_logging=async_logging)
+    logger.deduplication = False
+
+    latencies = []
+    for i in range(calls):
+        start = time.perf_counter()
+        logger.info(f"Cargo tally updated for hatch {i % 8}", vessel_id=i % 40, operation_id=str(i))
+        latencies.append(time.perf_counter() - start)
+
+    drain_start = time.perf_counter()
+    logger.flush(timeout=60)
+    drain = time.perf_counter() - drain_start
+    stats = logger.get_pipeline_stats()
+    logger.close()
+
+    with open(path) as f:
+        written = sum(1 for _ in f) - 1  # minus the initialization record
+    return latencies, drain, written, stats
+
+
+def summarize(name, latencies, drain, written):
+    ordered = sorted(latencies)
+    p50 = ordered[len(ordered) // 2] * 1e6
+    p99 = ordered[int(len(ordered) * 0.99)] * 1e6
+    mean = statistics.fmean(latencies) * 1e6
+    print(f"{name:>6} {p50:>9.1f} {p99:>9.1f} {mean:>9.1f} {drain * 1000:>9.1f} {written:>9}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark StructuredLogger per-call latency')
+    parser.add_argument('--calls', type=int, default=20000, help='Log calls per mode')
+    parser.add_argument('--sink-delay-ms', type=float, default=0.0, help='Stall added to every sink flush')
+    parser.add_argument('--capacity', type=int, default=10000, help='LOG_QUEUE_CAPACITY for the async mode')
+    parser.add_argument('--overflow', default='drop_newest', help='LOG_QUEUE_OVERFLOW for the async mode')
+    args = parser.parse_args()
+
+    os.environ['LOG_QUEUE_CAPACITY'] = str(args.capacity)
+    os.environ['LOG_QUEUE_OVERFLOW'] = args.overflow
+
+    with tempfile.TemporaryDirectory() as directory:
+        delay = args.sink_delay_ms / 1000.0
+        sync_latencies, sync_drain, sync_written, _ = run(False, args.calls, directory, delay)
+        async_latencies, async_drain, async_written, stats = run(True, args.calls, directory, delay)
+
+    print(f"{'mode':>6} {'p50 us':>9} {'p99 us':>9} {'mean us':>9} {'drain ms':>9} {'written':>9}")
+    summarize('sync', sync_latencies, sync_drain, sync_written)
+    summarize('async', async_latencies, async_drain, async_written)
+    print(f"queue: enqueued={stats['enqueued']} dropped={stats['dropped']} evicted={stats['evicted']} "
+          f"blocked={stats['blocked']} high_watermark={stats['high_watermark']}/{stats['capacity']} "
+          f"batches={stats['batches']} largest_batch={stats['largest_batch']}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Sync Processing Benchmark
+Replays a queue of offline sync records and reports rows/s for different batch sizes
+
+Batch size 1 approximates the old per-record path (one claim and one commit per
+record); larger sizes use the set-based batch processor. Runs against the
+testing database unless DATABASE_URL is set.
+
+Usage: python benchmark_sync_process.py [--records 10000] [--batch-sizes 1,100,1000]
+"""
+
+import os
+import sys
+import argparse
+import time
+from pathlib import Path
+
+# Add project root to path
+project_root = Path(__file__).parent
+sys.path.insert(0, str(project_root))
+
+os.environ.setdefault('FLASK_CONFIG', 'testing')
+os.environ.setdefault('SECRET_KEY', 'benchmark')
+
+
+def queue_records(manager, vessel_ids, count):
+    """Queue a realistic mix: mostly tally creates, some vessel and tally updates"""
+    for i in range(count):
+        vessel_id = vessel_ids[i % len(vessel_ids)]
+        if i % 10 == 9:
+            manager.add_to_sync_queue('vessels', 'update', {'id': vessel_id, 'current_berth': f'B{i % 7}'})
+        elif i % 10 == 8 and i > 100:
+            manager.add_to_sync_queue('cargo_tallies', 'update', {'id': i // 2, 'cargo_count': 3})
+        else:
+            manager.add_to_sync_queue('cargo_tallies', 'create', {
+                'vessel_id': vessel_id, 'cargo_count': 2, 'tally_type': 'loaded', 'location': 'Deck 1'
+            })
+
+
+def run(records, batch_size):
+    from app import app, db, Vessel, CargoTally, CargoTallyTotal
+    from utils.sync_manager import SyncManager, DatabaseSyncQueueStore
+    from utils.sync_batch import SyncBatchProcessor
+
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+        vessels = [Vessel(name=f'MV Bench {i}', total_cargo_capacity=100000) for i in range(20)]
+        db.session.add_all(vessels)
+        db.session.commit()
+
+        manager = SyncManager(store=DatabaseSyncQueueStore(db))
+        queue_records(manager, [vessel.id for vessel in vessels], records)
+        processor = SyncBatchProcessor(manager, db, Vessel, CargoTally, CargoTallyTotal)
+
+        processed = 0
+        fallbacks = 0
+        started = time.perf_counter()
+        while True:
+            claimed, results, report = processor.process(batch_size)
+            if not claimed:
+                break
+            processed += sum(1 for result in results.values() if result.get('success'))
+            fallbacks += report['fallback']
+        elapsed = time.perf_counter() - started
+
+        stats = manager.get_sync_statistics()
+        db.session.remove()
+        db.drop_all()
+
+    return {
+        'batch_size': batch_size,
+        'processed': processed,
+        'pending': stats['pending'],
+        'seconds': elapsed,
+        'rows_per_second': processed / elapsed if elapsed else 0,
+        'fallbacks': fallbacks
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark /sync/process batch sizes')
+    parser.add_argument('--records', type=int, default=10000)
+    parser.add_argument('--batch-sizes', default='1,100,1000')
+    args = parser.parse_args()
+
+    print(f"Replaying {args.records} queued sync records")
+    print(f"{'batch':>8} {'processed':>10} {'seconds':>9} {'rows/s':>10} {'fallbacks':>10}")
+    for batch_size in [int(size) for size in args.batch_sizes.split(',')]:
+        result = run(args.records, batch_size)
+        print(f"{result['batch_size']:>8} {result['processed']:>10} {result['seconds']:>9.2f} "
+              f"{result['rows_per_second']:>10.0f} {result['fallbacks']:>10}")
+
+
+if __name__ == '__main__':
+    main()
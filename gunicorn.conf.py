@@ -38,7 +38,9 @@ calculated_workers = calculate_optimal_workers()
 workers = int(os.environ.get('WEB_WORKERS', calculated_workers))
 workers = max(1, min(workers, 6))  # Hard limit for 512MB containers
 
-worker_class = 'sync'  # Standard worker for Render deployment
+worker_class = 'gthread'  # Threaded so /live/stream SSE connections don't occupy a whole worker
+# At most LIVE_MAX_STREAMS threads per worker are held by live connections; raise both together
+threads = int(os.environ.get('WEB_THREADS', 16))
 worker_connections = 1000
 max_requests = 1000
 max_requests_jitter = 50
@@ -74,11 +76,16 @@ certfile = os.environ.get('SSL_CERTFILE')
 # Preload application for better performance
 preload_app = True
 
+# Log aggregation - LOG_AGGREGATION_MODE=process runs pattern matching in its own process,
+# fed by every worker over a Unix socket, instead of on threads inside each worker
+from utils.log_aggregator import start_aggregator_process, stop_aggregator_process
+
 # Worker lifecycle hooks
 def on_starting(server):
     """Called just before the master process is initialized."""
     server.log.info("🚢 Stevedores Dashboard 3.0 - Master process starting")
-    server.log.info(f"⚓ Workers: {workers}, Worker class: {worker_class}")
+    server.log.info(f"⚓ Workers: {workers}, Worker class: {worker_class}, Threads: {threads}")
+    start_aggregator_process(server.log)
 
 def on_reload(server):
     """Called to recycle workers during a reload via SIGHUP."""
@@ -156,6 +163,8 @@ def on_exit(server):
     except Exception as e:
         server.log.warning(f"Failed to get final memory stats: {e}")
     
+    stop_aggregator_process()
+    
     server.log.info("⚓ Maritime operations system offline")
 
 def worker_exit(server, worker):
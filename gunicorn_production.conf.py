@@ -6,13 +6,18 @@ Optimized for memory constraints and high availability.
 import os
 import multiprocessing
 from utils.memory_monitor_production import calculate_optimal_workers
+from utils.log_aggregator import start_aggregator_process, stop_aggregator_process
 
 # Memory-aware worker calculation
 MEMORY_LIMIT_MB = int(os.getenv('MEMORY_LIMIT_MB', 512))
 workers = calculate_optimal_workers(MEMORY_LIMIT_MB)
 
 # Worker configuration
-worker_class = "sync"
+# Threaded workers so long-lived /live/stream connections don't block request handling
+worker_class = "gthread"
+# Each worker keeps at most LIVE_MAX_STREAMS of these threads on live connections; raise both
+# together for more tablets per worker
+threads = int(os.getenv('WEB_THREADS', 16))
 worker_connections = 1000
 max_requests = 1000
 max_requests_jitter = 50
@@ -43,6 +48,11 @@ limit_request_fields = 100
 limit_request_field_size = 8190
 
 # Memory optimization
+def on_starting(server):
+    """Called before the master process is initialized."""
+    # Runs log pattern matching in its own process when LOG_AGGREGATION_MODE=process
+    start_aggregator_process(server.log)
+
 def when_ready(server):
     """Called when the server is started."""
     server.log.info("🚢 Stevedores Dashboard 3.0 production server started")
@@ -54,6 +64,7 @@ def worker_int(worker):
 
 def on_exit(server):
     """Called when the server is stopped."""
+    stop_aggregator_process()
     server.log.info("🚢 Stevedores Dashboard 3.0 production server stopped")
 
 # Production hooks
@@ -69,14 +69,10 @@ def create_cargo_tally_model(db):
         
         @classmethod
         def get_vessel_total(cls, vessel_id, tally_type='loaded'):
-            """Get total cargo count for vessel by type"""
-            result = db.session.query(
-                db.func.sum(cls.cargo_count)
-            ).filter_by(
-                vessel_id=vessel_id,
-                tally_type=tally_type
-            ).scalar()
-            return result or 0
+            """Get total cargo count for vessel by type from the running totals"""
+            from models.cargo_tally_total import create_cargo_tally_total_model
+            CargoTallyTotal = create_cargo_tally_total_model(db)
+            return CargoTallyTotal.get_total(vessel_id, tally_type)
         
         @classmethod
         def get_vessel_tallies(cls, vessel_id, limit=50):
@@ -93,34 +89,84 @@ def create_cargo_tally_model(db):
             return cls.query.filter_by(synced=False).all()
         
         @classmethod
-        def create_tally(cls, vessel_id, cargo_count, tally_type='loaded', **kwargs):
-            """Create a new cargo tally entry"""
+        def create_tally(cls, vessel_id, cargo_count, tally_type='loaded', vessel=None, **kwargs):
+            """Create a new cargo tally entry, updating totals and progress in one transaction"""
+            from models.cargo_tally_total import create_cargo_tally_total_model
+            CargoTallyTotal = create_cargo_tally_total_model(db)
+            
             tally = cls(
                 vessel_id=vessel_id,
                 cargo_count=cargo_count,
                 tally_type=tally_type,
                 **kwargs
             )
-            db.session.add(tally)
-            db.session.commit()
-            
-            # Update vessel progress
-            cls._update_vessel_progress(vessel_id)
+            try:
+                db.session.add(tally)
+                db.session.flush()
+                CargoTallyTotal.apply_delta(vessel_id, tally_type, cargo_count)
+                
+                # Update vessel progress
+                cls._update_vessel_progress(vessel_id, vessel=vessel, commit=False)
+                db.session.commit()
+            except Exception:
+                db.session.rollback()
+                raise
             
             return tally
         
         @classmethod
-        def _update_vessel_progress(cls, vessel_id):
+        def create_tallies_bulk(cls, entries, vessels, chunk_size=100, commit=True):
+            """
+            Insert many cargo tally entries in a single transaction.
+            
+            Rows are flushed in chunks of chunk_size, running totals are updated
+            once per vessel/type and progress is recomputed once per vessel.
+            vessels maps vessel_id to an already-loaded Vessel instance.
+            With commit=False the caller owns the transaction.
+            """
+            from models.cargo_tally_total import create_cargo_tally_total_model
+            CargoTallyTotal = create_cargo_tally_total_model(db)
+            
+            tallies = [cls(**entry) for entry in entries]
+            deltas = {}
+            for tally in tallies:
+                key = (tally.vessel_id, tally.tally_type)
+                total, count = deltas.get(key, (0, 0))
+                deltas[key] = (total + tally.cargo_count, count + 1)
+            
+            try:
+                for start in range(0, len(tallies), chunk_size):
+                    db.session.add_all(tallies[start:start + chunk_size])
+                    db.session.flush()
+                
+                for (vessel_id, tally_type), (total, count) in deltas.items():
+                    CargoTallyTotal.apply_delta(vessel_id, tally_type, total, entries=count)
+                
+                for vessel_id in {vessel_id for vessel_id, _ in deltas}:
+                    cls._update_vessel_progress(vessel_id, vessel=vessels.get(vessel_id), commit=False)
+                
+                if commit:
+                    db.session.commit()
+            except Exception:
+                if commit:
+                    db.session.rollback()
+                raise
+            
+            return tallies
+        
+        @classmethod
+        def _update_vessel_progress(cls, vessel_id, vessel=None, commit=True):
             """Update vessel progress based on cargo tallies"""
-            # Import here to avoid circular imports
-            from models.vessel import create_vessel_model
-            Vessel = create_vessel_model(db)
+            if vessel is None:
+                # Import here to avoid circular imports
+                from models.vessel import create_vessel_model
+                Vessel = create_vessel_model(db)
+                vessel = Vessel.query.get(vessel_id)
             
-            vessel = Vessel.query.get(vessel_id)
-            if vessel and vessel.total_cargo_capacity > 0:
+            if vessel and vessel.total_cargo_capacity and vessel.total_cargo_capacity > 0:
                 loaded_count = cls.get_vessel_total(vessel_id, 'loaded')
                 progress = (loaded_count / vessel.total_cargo_capacity) * 100
-                vessel.update_progress(progress)
+                vessel.update_progress(progress, commit=commit)
     
     # Cache the model to prevent redefinition
     _cargo_tally_model_cache = CargoTally
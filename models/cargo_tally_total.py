@@ -0,0 +1,221 @@
+"""
+Cargo Tally Total model for O(1) cargo progress tracking
+Maintains per-vessel, per-tally-type running totals alongside the raw tally rows
+"""
+
+from datetime import datetime
+from sqlalchemy.exc import IntegrityError
+
+# Global cache to prevent multiple CargoTallyTotal model creation
+_cargo_tally_total_model_cache = None
+
+def create_cargo_tally_total_model(db):
+    """Create CargoTallyTotal model with database instance to avoid circular imports and table redefinition"""
+    global _cargo_tally_total_model_cache
+
+    # Return cached model if already created to prevent redefinition
+    if _cargo_tally_total_model_cache is not None:
+        return _cargo_tally_total_model_cache
+
+    class CargoTallyTotal(db.Model):
+        """Running cargo total for one vessel and tally type"""
+
+        __tablename__ = 'cargo_tally_totals'
+        __table_args__ = (
+            db.UniqueConstraint('vessel_id', 'tally_type', name='uq_cargo_tally_totals_vessel_type'),
+            {'extend_existing': True}
+        )
+
+        id = db.Column(db.Integer, primary_key=True)
+        vessel_id = db.Column(db.Integer, nullable=False, index=True)
+        tally_type = db.Column(db.String(20), nullable=False, default='loaded')
+
+        # Aggregates maintained in the same transaction as the tally insert
+        total_count = db.Column(db.Integer, nullable=False, default=0)
+        entry_count = db.Column(db.Integer, nullable=False, default=0)
+
+        updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+        def __repr__(self):
+            return f'<CargoTallyTotal {self.total_count} {self.tally_type} for vessel {self.vessel_id}>'
+
+        def to_dict(self):
+            """Convert running total to dictionary for API responses"""
+            return {
+                'vessel_id': self.vessel_id,
+                'tally_type': self.tally_type,
+                'total_count': self.total_count,
+                'entry_count': self.entry_count,
+                'updated_at': self.updated_at.isoformat() if self.updated_at else None
+            }
+
+        @classmethod
+        def get_total(cls, vessel_id, tally_type='loaded'):
+            """
+            Get running cargo total for vessel by type.
+
+            Falls back to summing the raw rows when no total has been seeded yet,
+            e.g. for tallies recorded before backfill() ran on this database.
+            """
+            result = db.session.query(cls.total_count).filter_by(
+                vessel_id=vessel_id,
+                tally_type=tally_type
+            ).scalar()
+            if result is None:
+                result, _ = cls._sum_raw_rows(vessel_id, tally_type)
+            return result
+
+        @classmethod
+        def get_vessel_totals(cls, vessel_id):
+            """Get all running totals for a vessel keyed by tally type"""
+            rows = db.session.query(cls.tally_type, cls.total_count).filter_by(vessel_id=vessel_id).all()
+            return {tally_type: total for tally_type, total in rows}
+
+        @classmethod
+        def apply_delta(cls, vessel_id, tally_type, delta, entries=1):
+            """
+            Add delta to the running total without committing.
+
+            Callers must add and flush the tally rows first: when no total exists
+            yet for this vessel/type, it is seeded once from the raw rows (which
+            then already include the new entries) instead of applying the delta.
+            """
+            updated = cls.query.filter_by(
+                vessel_id=vessel_id,
+                tally_type=tally_type
+            ).update({
+                cls.total_count: cls.total_count + delta,
+                cls.entry_count: cls.entry_count + entries,
+                cls.updated_at: datetime.utcnow()
+            }, synchronize_session=False)
+
+            if updated:
+                return
+
+            total, count = cls._sum_raw_rows(vessel_id, tally_type)
+            if not cls._seed(vessel_id, tally_type, total, count):
+                # Another worker seeded the row first - its seed did not include our rows
+                cls.apply_delta(vessel_id, tally_type, delta, entries)
+
+        @classmethod
+        def backfill(cls):
+            """
+            Seed running totals for every vessel/type that has tally rows but no total.
+
+            Existing totals are left alone, so this is safe to run while workers
+            are recording tallies. Returns the number of totals seeded and commits.
+            """
+            from models.cargo_tally import create_cargo_tally_model
+            CargoTally = create_cargo_tally_model(db)
+
+            has_total = db.session.query(cls.id).filter(
+                cls.vessel_id == CargoTally.vessel_id,
+                cls.tally_type == CargoTally.tally_type
+            ).exists()
+            missing = db.session.query(
+                CargoTally.vessel_id,
+                CargoTally.tally_type,
+                db.func.coalesce(db.func.sum(CargoTally.cargo_count), 0),
+                db.func.count(CargoTally.id)
+            ).filter(
+                CargoTally.tally_type.isnot(None),
+                ~has_total
+            ).group_by(CargoTally.vessel_id, CargoTally.tally_type).all()
+
+            seeded = sum(
+                cls._seed(vessel_id, tally_type, int(total), int(count))
+                for vessel_id, tally_type, total, count in missing
+            )
+            db.session.commit()
+            return seeded
+
+        @classmethod
+        def rebuild(cls, vessel_id=None):
+            """
+            Reconcile running totals with the raw cargo tally rows.
+
+            Returns a list of the totals that were corrected, each with its old
+            and new value. Commits the rebuilt totals.
+            """
+            from models.cargo_tally import create_cargo_tally_model
+            CargoTally = create_cargo_tally_model(db)
+
+            query = db.session.query(
+                CargoTally.vessel_id,
+                CargoTally.tally_type,
+                db.func.coalesce(db.func.sum(CargoTally.cargo_count), 0),
+                db.func.count(CargoTally.id)
+            ).filter(CargoTally.tally_type.isnot(None))
+            if vessel_id is not None:
+                query = query.filter(CargoTally.vessel_id == vessel_id)
+            actual = {
+                (row_vessel_id, tally_type): (int(total), int(count))
+                for row_vessel_id, tally_type, total, count in query.group_by(
+                    CargoTally.vessel_id, CargoTally.tally_type
+                ).all()
+            }
+
+            existing_query = cls.query
+            if vessel_id is not None:
+                existing_query = existing_query.filter_by(vessel_id=vessel_id)
+            existing = {(row.vessel_id, row.tally_type): row for row in existing_query.all()}
+
+            corrections = []
+            for key in set(actual) | set(existing):
+                total, count = actual.get(key, (0, 0))
+                row = existing.get(key)
+                if row is None:
+                    row = cls(vessel_id=key[0], tally_type=key[1], total_count=0, entry_count=0)
+                    db.session.add(row)
+                elif row.total_count == total and row.entry_count == count:
+                    continue
+
+                corrections.append({
+                    'vessel_id': key[0],
+                    'tally_type': key[1],
+                    'old_total': row.total_count,
+                    'new_total': total,
+                    'old_entries': row.entry_count,
+                    'new_entries': count
+                })
+                row.total_count = total
+                row.entry_count = count
+                row.updated_at = datetime.utcnow()
+
+            db.session.commit()
+            return corrections
+
+        @classmethod
+        def _seed(cls, vessel_id, tally_type, total, count):
+            """Insert a total unless another worker already has; False if it lost the race"""
+            try:
+                # Savepoint so a concurrent seed of the same row doesn't abort the caller's transaction
+                with db.session.begin_nested():
+                    db.session.add(cls(
+                        vessel_id=vessel_id,
+                        tally_type=tally_type,
+                        total_count=total,
+                        entry_count=count
+                    ))
+                return True
+            except IntegrityError:
+                return False
+
+        @classmethod
+        def _sum_raw_rows(cls, vessel_id, tally_type):
+            """Aggregate the raw tally rows for one vessel/type"""
+            from models.cargo_tally import create_cargo_tally_model
+            CargoTally = create_cargo_tally_model(db)
+
+            total, count = db.session.query(
+                db.func.coalesce(db.func.sum(CargoTally.cargo_count), 0),
+                db.func.count(CargoTally.id)
+            ).filter_by(
+                vessel_id=vessel_id,
+                tally_type=tally_type
+            ).one()
+            return int(total), int(count)
+
+    # Cache the model to prevent redefinition
+    _cargo_tally_total_model_cache = CargoTallyTotal
+    return CargoTallyTotal
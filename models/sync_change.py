@@ -0,0 +1,166 @@
+"""
+Sync Change Log model for delta synchronization
+Records which vessel and cargo tally rows changed, in sequence order, including deletions
+"""
+
+import json
+from datetime import datetime, timedelta
+from sqlalchemy import event, inspect
+
+# Global cache to prevent multiple sync change model creation
+_sync_change_model_cache = None
+
+# Row tables tracked for delta sync: model table name -> attribute holding the owning vessel id
+TRACKED_TABLES = {
+    'vessels': 'id',
+    'cargo_tallies': 'vessel_id'
+}
+
+def create_sync_change_model(db):
+    """Create SyncChange model with database instance to avoid circular imports and table redefinition"""
+    global _sync_change_model_cache
+
+    # Return cached model if already created to prevent redefinition
+    if _sync_change_model_cache is not None:
+        return _sync_change_model_cache
+
+    class SyncChange(db.Model):
+        """One change to a tracked row - the id is the delta sync sequence number"""
+
+        __tablename__ = 'sync_changes'
+        __table_args__ = (
+            db.Index('ix_sync_changes_table_row', 'table_name', 'row_id'),
+            {'extend_existing': True}
+        )
+
+        # Changes newer than this may still have lower-numbered neighbours in flight
+        SETTLE_SECONDS = 10
+
+        id = db.Column(db.Integer, primary_key=True)
+        table_name = db.Column(db.String(50), nullable=False)
+        row_id = db.Column(db.Integer, nullable=False)
+        vessel_id = db.Column(db.Integer, nullable=True)
+        operation = db.Column(db.String(10), nullable=False)  # upsert, delete
+        changed_fields = db.Column(db.Text, nullable=True)  # JSON list, NULL means every field
+        created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False, index=True)
+
+        @classmethod
+        def record(cls, rows):
+            """
+            Insert change rows without committing.
+
+            Each row is a dict with table_name, row_id, vessel_id, operation and
+            changed_fields (a list of column names, or None for the whole row).
+            """
+            if not rows:
+                return
+            # Read after commit to invalidate caches holding these vessels
+            db.session.info.setdefault('changed_vessel_ids', set()).update(
+                row.get('vessel_id') for row in rows
+            )
+            now = datetime.utcnow()
+            db.session.execute(cls.__table__.insert(), [
+                {
+                    'table_name': row['table_name'],
+                    'row_id': row['row_id'],
+                    'vessel_id': row.get('vessel_id'),
+                    'operation': row['operation'],
+                    'changed_fields': json.dumps(sorted(row['changed_fields'])) if row.get('changed_fields') else None,
+                    'created_at': now
+                }
+                for row in rows
+            ])
+
+        @classmethod
+        def changes_since(cls, since, limit=500):
+            """
+            Changes after the since cursor, oldest first.
+
+            Returns (changes, cursor, has_more). A gap in the sequence followed by
+            a change younger than SETTLE_SECONDS may be a transaction that has not
+            committed yet, so reading stops before it and resumes on the next call.
+            """
+            rows = cls.query.filter(cls.id > since).order_by(cls.id).limit(limit + 1).all()
+            has_more = len(rows) > limit
+            settled_before = datetime.utcnow() - timedelta(seconds=cls.SETTLE_SECONDS)
+
+            changes = []
+            expected = since + 1
+            for row in rows[:limit]:
+                if row.id != expected and row.created_at > settled_before:
+                    has_more = True
+                    break
+                changes.append(row)
+                expected = row.id + 1
+
+            cursor = changes[-1].id if changes else since
+            return changes, cursor, has_more
+
+        @classmethod
+        def snapshot_cursor(cls):
+            """Cursor to hand out with a full snapshot - read it before reading the rows"""
+            settled_before = datetime.utcnow() - timedelta(seconds=cls.SETTLE_SECONDS)
+            cursor = db.session.query(db.func.max(cls.id)).filter(cls.created_at <= settled_before).scalar() or 0
+            recent = db.session.query(cls.id).filter(cls.id > cursor).order_by(cls.id).all()
+            for (change_id,) in recent:
+                if change_id != cursor + 1:
+                    break
+                cursor = change_id
+            return cursor
+
+        @classmethod
+        def is_cursor_valid(cls, since):
+            """False when changes after since were pruned or the cursor is from another database"""
+            low, high = db.session.query(db.func.min(cls.id), db.func.max(cls.id)).one()
+            if high is None:
+                return since == 0
+            return low - 1 <= since <= high
+
+        @classmethod
+        def prune(cls, older_than_days=7):
+            """Delete changes older than the retention window and commit - clients behind it resync fully"""
+            cutoff = datetime.utcnow() - timedelta(days=older_than_days)
+            deleted = cls.query.filter(cls.created_at < cutoff).delete(synchronize_session=False)
+            db.session.commit()
+            return deleted
+
+    # Cache the model to prevent redefinition
+    _sync_change_model_cache = SyncChange
+    return SyncChange
+
+def enable_change_tracking(db, *models):
+    """Log inserts, updates and deletes of the given models to sync_changes on every flush"""
+    SyncChange = create_sync_change_model(db)
+    tracked = {model: TRACKED_TABLES[model.__tablename__] for model in models}
+
+    if getattr(db, '_sync_change_tracking', None) is not None:
+        db._sync_change_tracking.update(tracked)
+        return
+    db._sync_change_tracking = tracked
+
+    @event.listens_for(db.session, 'after_flush')
+    def log_changes(session, flush_context):
+        rows = []
+
+        def add(obj, operation, changed_fields=None):
+            rows.append({
+                'table_name': obj.__tablename__,
+                'row_id': obj.id,
+                'vessel_id': getattr(obj, db._sync_change_tracking[type(obj)]),
+                'operation': operation,
+                'changed_fields': changed_fields
+            })
+
+        for obj in session.new:
+            if type(obj) in db._sync_change_tracking:
+                add(obj, 'upsert')
+        for obj in session.dirty:
+            if type(obj) in db._sync_change_tracking:
+                changed = [attr.key for attr in inspect(obj).attrs if attr.history.has_changes()]
+                if changed:
+                    add(obj, 'upsert', changed)
+        for obj in session.deleted:
+            if type(obj) in db._sync_change_tracking:
+                add(obj, 'delete')
+
+        SyncChange.record(rows)
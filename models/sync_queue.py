@@ -0,0 +1,133 @@
+"""
+Sync Queue models for durable offline/online synchronization
+Persists queued sync records and maintains per-table, per-status counters
+"""
+
+from datetime import datetime
+from sqlalchemy.exc import IntegrityError
+
+# Global caches to prevent multiple sync queue model creation
+_sync_queue_entry_model_cache = None
+_sync_queue_counter_model_cache = None
+
+def create_sync_queue_entry_model(db):
+    """Create SyncQueueEntry model with database instance to avoid circular imports and table redefinition"""
+    global _sync_queue_entry_model_cache
+
+    # Return cached model if already created to prevent redefinition
+    if _sync_queue_entry_model_cache is not None:
+        return _sync_queue_entry_model_cache
+
+    class SyncQueueEntry(db.Model):
+        """One queued sync record - survives worker restarts"""
+
+        __tablename__ = 'sync_queue_entries'
+        __table_args__ = (
+            # Pending batches are read highest priority first, oldest first
+            db.Index('ix_sync_queue_status_priority', 'status', 'priority', 'created_at'),
+            db.Index('ix_sync_queue_table_status', 'table_name', 'status'),
+            {'extend_existing': True}
+        )
+
+        id = db.Column(db.Integer, primary_key=True)
+        sync_id = db.Column(db.String(64), nullable=False, unique=True, index=True)
+        table_name = db.Column(db.String(50), nullable=False)
+        operation = db.Column(db.String(20), nullable=False)  # create, update, delete
+        priority = db.Column(db.Integer, nullable=False, default=0)
+
+        # Payload and conflict tracking (JSON text)
+        data = db.Column(db.Text, nullable=False)
+        client_hash = db.Column(db.String(64), nullable=False)
+        server_hash = db.Column(db.String(64), nullable=True)
+        conflict_data = db.Column(db.Text, nullable=True)
+
+        status = db.Column(db.String(20), nullable=False, default='pending')
+        retry_count = db.Column(db.Integer, nullable=False, default=0)
+        last_error = db.Column(db.Text, nullable=True)
+        last_sync_attempt = db.Column(db.DateTime, nullable=True)
+
+        created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+        updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+        def __repr__(self):
+            return f'<SyncQueueEntry {self.sync_id} {self.table_name} {self.operation} {self.status}>'
+
+    # Cache the model to prevent redefinition
+    _sync_queue_entry_model_cache = SyncQueueEntry
+    return SyncQueueEntry
+
+def create_sync_queue_counter_model(db):
+    """Create SyncQueueCounter model with database instance to avoid circular imports and table redefinition"""
+    global _sync_queue_counter_model_cache
+
+    # Return cached model if already created to prevent redefinition
+    if _sync_queue_counter_model_cache is not None:
+        return _sync_queue_counter_model_cache
+
+    class SyncQueueCounter(db.Model):
+        """Number of queued records for one table and status"""
+
+        __tablename__ = 'sync_queue_counters'
+        __table_args__ = (
+            db.UniqueConstraint('table_name', 'status', name='uq_sync_queue_counters_table_status'),
+            {'extend_existing': True}
+        )
+
+        id = db.Column(db.Integer, primary_key=True)
+        table_name = db.Column(db.String(50), nullable=False)
+        status = db.Column(db.String(20), nullable=False)
+        count = db.Column(db.Integer, nullable=False, default=0)
+
+        @classmethod
+        def get_counts(cls):
+            """All counters as {(table_name, status): count}"""
+            rows = db.session.query(cls.table_name, cls.status, cls.count).all()
+            return {(table_name, status): count for table_name, status, count in rows}
+
+        @classmethod
+        def apply_delta(cls, table_name, status, delta):
+            """
+            Adjust a counter without committing.
+
+            Callers must flush the entry change first: a missing counter is
+            seeded once from the queue rows, which then already include it.
+            """
+            updated = cls.query.filter_by(
+                table_name=table_name,
+                status=status
+            ).update({cls.count: cls.count + delta}, synchronize_session=False)
+
+            if updated:
+                return
+
+            SyncQueueEntry = create_sync_queue_entry_model(db)
+            count = SyncQueueEntry.query.filter_by(table_name=table_name, status=status).count()
+            try:
+                # Savepoint so a concurrent seed of the same row doesn't abort the caller's transaction
+                with db.session.begin_nested():
+                    db.session.add(cls(table_name=table_name, status=status, count=count))
+            except IntegrityError:
+                cls.apply_delta(table_name, status, delta)
+
+        @classmethod
+        def rebuild(cls):
+            """Recount every counter from the queue rows and commit"""
+            SyncQueueEntry = create_sync_queue_entry_model(db)
+            actual = {
+                (table_name, status): count
+                for table_name, status, count in db.session.query(
+                    SyncQueueEntry.table_name, SyncQueueEntry.status, db.func.count(SyncQueueEntry.id)
+                ).group_by(SyncQueueEntry.table_name, SyncQueueEntry.status).all()
+            }
+            existing = {(row.table_name, row.status): row for row in cls.query.all()}
+            for key in set(actual) | set(existing):
+                row = existing.get(key)
+                if row is None:
+                    row = cls(table_name=key[0], status=key[1], count=0)
+                    db.session.add(row)
+                row.count = actual.get(key, 0)
+            db.session.commit()
+
+    # Cache the model to prevent redefinition
+    _sync_queue_counter_model_cache = SyncQueueCounter
+    return SyncQueueCounter
@@ -9,6 +9,22 @@ from sqlalchemy import text
 # Global cache to prevent multiple Vessel model creation
 _vessel_model_cache = None
 
+# Columns returned by the lean vessel summary (dashboard list view)
+SUMMARY_FIELDS = (
+    'id', 'name', 'status', 'vessel_type', 'shipping_line', 'port_of_call',
+    'berth_assignment', 'operation_type', 'operation_start_date', 'operation_end_date',
+    'eta', 'etd', 'progress_percentage', 'total_cargo_capacity', 'updated_at'
+)
+
+# JSON text columns - only parsed when a client explicitly asks for them
+JSON_FIELDS = (
+    'team_assignments', 'cargo_configuration', 'van_details', 'wagon_details',
+    'step_1_data', 'step_2_data', 'step_3_data', 'step_4_data'
+)
+
+# Statuses counted as active operations
+ACTIVE_STATUSES = ('arrived', 'berthed', 'operations_active')
+
 def create_vessel_model(db):
     """Create Vessel model with database instance to avoid circular imports and table redefinition"""
     global _vessel_model_cache
@@ -112,7 +128,7 @@ def create_vessel_model(db):
         def __repr__(self):
             return f'<Vessel {self.name} ({self.status})>'
         
-        def update_progress(self, percentage):
+        def update_progress(self, percentage, commit=True):
             """Update vessel operation progress"""
             self.progress_percentage = max(0.0, min(100.0, percentage))
             self.updated_at = datetime.utcnow()
@@ -120,7 +136,8 @@ def create_vessel_model(db):
                 self.status = 'operations_complete'
             elif percentage > 0:
                 self.status = 'operations_active'
-            db.session.commit()
+            if commit:
+                db.session.commit()
         
         def set_status(self, new_status):
             """Update vessel status"""
@@ -263,11 +280,57 @@ def create_vessel_model(db):
             
             return data
         
+        @classmethod
+        def get_summary_dicts(cls, fields=None, expand=None):
+            """
+            Column-projected vessel list for dashboards and summary APIs.
+            
+            Selects only the requested columns (SUMMARY_FIELDS by default) and
+            builds plain dicts without loading model instances. JSON text columns
+            are only selected and parsed when named in fields or expand.
+            """
+            import json
+            
+            names = ['id', 'status']
+            for name in list(fields or SUMMARY_FIELDS) + list(expand or ()):
+                if name not in names:
+                    names.append(name)
+            
+            unknown = [name for name in names if name not in cls.__table__.columns]
+            if unknown:
+                raise ValueError(f"Unknown vessel fields: {', '.join(unknown)}")
+            
+            columns = [cls.__table__.columns[name] for name in names]
+            iso_fields = [
+                column.name for column in columns
+                if isinstance(column.type, (db.Date, db.DateTime, db.Time))
+            ]
+            json_fields = [name for name in names if name in JSON_FIELDS]
+            
+            vessels = []
+            for row in db.session.query(*columns).order_by(cls.id).all():
+                data = dict(zip(names, row))
+                for name in iso_fields:
+                    value = data[name]
+                    if value is not None:
+                        data[name] = value.isoformat()
+                for name in json_fields:
+                    value = data[name]
+                    if value:
+                        try:
+                            data[name] = json.loads(value)
+                        except (json.JSONDecodeError, TypeError):
+                            data[name] = None
+                    else:
+                        data[name] = None
+                vessels.append(data)
+            return vessels
+        
         @classmethod
         def get_active_vessels(cls):
             """Get all vessels with active operations"""
             return cls.query.filter(
-                cls.status.in_(['arrived', 'berthed', 'operations_active'])
+                cls.status.in_(ACTIVE_STATUSES)
             ).all()
         
         @classmethod
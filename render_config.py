@@ -29,6 +29,10 @@ class RenderConfig:
     
     # Upstash Redis connection
     REDIS_URL = os.environ.get('REDIS_URL')
+    CACHE_DEFAULT_TIMEOUT = 300
+    CACHE_STALE_TIMEOUT = 60  # Serve expired entries this long while one refresh runs
+    CACHE_UNSHARED_TIMEOUT = 30  # Cap on tagged entries while invalidations cannot reach other workers
+    CACHE_DISK_TIER = os.environ.get('CACHE_DISK_TIER', 'false').lower() == 'true'
     
     # Security settings
     WTF_CSRF_ENABLED = True
@@ -48,9 +52,26 @@ class RenderConfig:
     # Maritime-specific settings
     MAX_VESSELS_PER_USER = 50
     CARGO_TALLY_BATCH_SIZE = 100
+    CARGO_TALLY_BULK_MAX_ITEMS = 1000
     SYNC_RETRY_ATTEMPTS = 3
     DOCUMENT_PROCESSING_TIMEOUT = 30
     
+    # Live updates (server-sent events with long-poll fallback)
+    LIVE_STREAM_MAX_SECONDS = 300
+    LIVE_HEARTBEAT_SECONDS = 15
+    LIVE_POLL_TIMEOUT_SECONDS = 25
+    # Streams and waiting long-polls each hold a gthread thread. Keep this below WEB_THREADS so
+    # ordinary requests always have threads left; the rest of the clients get 503 + Retry-After.
+    # Live clients served = workers x LIVE_MAX_STREAMS (3 x 8 = 24 on a 512MB instance)
+    LIVE_MAX_STREAMS = int(os.environ.get('LIVE_MAX_STREAMS', 8))
+    LIVE_BUSY_RETRY_SECONDS = 15
+    
+    # Background sync worker: off, thread (inside each web worker) or external (`flask sync-worker`)
+    SYNC_WORKER_MODE = os.environ.get('SYNC_WORKER_MODE', 'off')
+    SYNC_WORKER_BATCH_SIZE = 100
+    SYNC_WORKER_MAX_BACKOFF = 300
+    SYNC_INTERVAL_SECONDS = 30
+    
     # Rate limiting - CRITICAL FIX: Use memory storage by default for reliability
     # Redis is optional - health checks must never depend on external services
     RATELIMIT_STORAGE_URL = 'memory://'  # Always use memory for production stability
@@ -231,12 +231,20 @@ def api_logout():
             # Revoke token
             jwt_manager.revoke_token(token)
             
+            # Revoke the session's refresh token too, or it keeps minting access tokens
+            refresh_token = request.json.get('refresh_token') if request.is_json else None
+            refresh_revoked = False
+            if refresh_token:
+                refresh_claims = jwt_manager.verify_token(refresh_token, 'refresh')
+                if refresh_claims and refresh_claims.get('user_id') == g.jwt_user_id:
+                    refresh_revoked = jwt_manager.revoke_token(refresh_token)
+            
             # Log logout event
             audit_logger.log_authentication_event(
                 AuditEventType.LOGOUT,
                 g.jwt_user_id,
                 True,
-                details={'token_revoked': True}
+                details={'token_revoked': True, 'refresh_token_revoked': refresh_revoked}
             )
         
         return maritime_api_response(
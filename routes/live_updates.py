@@ -0,0 +1,152 @@
+"""
+Live Update Routes
+Server-sent events stream and long-poll fallback for dashboard widgets
+"""
+
+import math
+import threading
+import time
+from flask import Blueprint, request, jsonify, current_app, Response, stream_with_context
+from routes.offline_dashboard import api_login_required
+from utils.live_events import get_live_event_broker, format_sse, EVENT_TYPES
+
+# Create blueprint
+live_updates_bp = Blueprint('live_updates', __name__)
+
+# Streams and waiting long-polls each pin a gthread thread; this worker holds at most LIVE_MAX_STREAMS
+_live_connections = 0
+_live_connections_lock = threading.Lock()
+
+
+def _acquire_live_connection():
+    """Reserve a live connection slot on this worker, or return None when all are taken"""
+    global _live_connections
+    with _live_connections_lock:
+        if _live_connections >= current_app.config.get('LIVE_MAX_STREAMS', 8):
+            return None
+        _live_connections += 1
+
+    released = []
+
+    def release():
+        global _live_connections
+        with _live_connections_lock:
+            if not released:
+                released.append(True)
+                _live_connections -= 1
+    return release
+
+
+def _live_busy():
+    """503 with a retry hint so clients back off instead of queueing behind held threads"""
+    retry_after = current_app.config.get('LIVE_BUSY_RETRY_SECONDS', 15)
+    response = jsonify({'error': 'Too many live connections on this worker', 'retry_after': retry_after})
+    response.status_code = 503
+    response.headers['Retry-After'] = str(retry_after)
+    return response
+
+
+def _parse_filters():
+    """Parse ?vessel_id= and ?types= filters shared by stream and poll"""
+    vessel_ids = [int(v) for v in request.args.get('vessel_id', '').split(',') if v.strip().isdigit()]
+    event_types = [t for t in request.args.get('types', '').split(',') if t in EVENT_TYPES]
+    return vessel_ids or None, event_types or None
+
+
+def _broker():
+    return get_live_event_broker(current_app.config.get('REDIS_URL'))
+
+
+@live_updates_bp.route('/stream', methods=['GET'])
+@api_login_required
+def event_stream():
+    """Server-sent events stream of vessel, tally and sync status changes"""
+    vessel_ids, event_types = _parse_filters()
+    release = _acquire_live_connection()
+    if release is None:
+        return _live_busy()
+    broker = _broker()
+    try:
+        subscription = broker.subscribe(vessel_ids, event_types)
+    except Exception:
+        release()
+        raise
+
+    heartbeat = current_app.config.get('LIVE_HEARTBEAT_SECONDS', 15)
+    # Bounded so a stream never pins a worker thread indefinitely - EventSource reconnects on its own
+    max_duration = current_app.config.get('LIVE_STREAM_MAX_SECONDS', 300)
+    retry_ms = current_app.config.get('LIVE_RETRY_MS', 3000)
+
+    def generate():
+        deadline = time.monotonic() + max_duration
+        try:
+            yield f"retry: {retry_ms}\n: connected\n\n"
+            while True:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                event = subscription.get(timeout=min(heartbeat, remaining))
+                yield format_sse(event) if event else ": keepalive\n\n"
+        finally:
+            broker.unsubscribe(subscription)
+            release()
+
+    response = Response(stream_with_context(generate()), mimetype='text/event-stream')
+    # Also covers a client that disconnects before the generator ever runs
+    response.call_on_close(release)
+    response.headers['Cache-Control'] = 'no-cache'
+    response.headers['X-Accel-Buffering'] = 'no'
+    return response
+
+
+@live_updates_bp.route('/poll', methods=['GET'])
+@api_login_required
+def long_poll():
+    """Long-poll fallback - returns as soon as an event newer than ?since= exists"""
+    max_timeout = current_app.config.get('LIVE_POLL_TIMEOUT_SECONDS', 25)
+    try:
+        since = float(request.args.get('since', 0))
+        timeout = float(request.args.get('timeout', max_timeout))
+        if not (math.isfinite(since) and math.isfinite(timeout)):
+            raise ValueError
+    except (TypeError, ValueError):
+        return jsonify({'error': 'since must be a timestamp and timeout a number of seconds'}), 400
+
+    vessel_ids, event_types = _parse_filters()
+    timeout = max(0.0, min(timeout, max_timeout))
+    broker = _broker()
+
+    # First request only establishes the cursor
+    if since <= 0:
+        return jsonify({'success': True, 'events': [], 'cursor': time.time()})
+
+    events = broker.events_since(since, vessel_ids, event_types)
+    if not events and timeout > 0:
+        release = _acquire_live_connection()
+        if release is None:
+            return _live_busy()
+        try:
+            subscription = broker.subscribe(vessel_ids, event_types)
+            try:
+                # Re-check history in case an event landed between the two calls
+                events = broker.events_since(since, vessel_ids, event_types)
+                if not events:
+                    event = subscription.get(timeout=timeout)
+                    events = [event] if event else []
+            finally:
+                broker.unsubscribe(subscription)
+        finally:
+            release()
+
+    cursor = max([since] + [event['ts'] for event in events])
+    return jsonify({'success': True, 'events': events, 'cursor': cursor})
+
+
+@live_updates_bp.route('/stats', methods=['GET'])
+@api_login_required
+def live_stats():
+    """Live event broker statistics"""
+    stats = _broker().get_stats()
+    stats['worker_connections'] = _live_connections
+    stats['worker_connection_limit'] = current_app.config.get('LIVE_MAX_STREAMS', 8)
+    return jsonify({'success': True, 'stats': stats})
@@ -13,7 +13,7 @@ import logging
 
 # Import logging components
 from ..utils.structured_logger import get_structured_logger, ComponentType
-from ..utils.log_aggregator import get_log_aggregator
+from ..utils.log_aggregator import get_log_aggregator, read_aggregator_process_stats
 from ..utils.monitoring_integrations import get_monitoring_manager
 from ..utils.maritime_alerts import get_maritime_alert_system
 from ..utils.log_retention import get_log_retention_manager
@@ -58,10 +58,25 @@ def logging_overview():
                 'logs_processed': aggregator.processing_stats['logs_processed'],
                 'processing_errors': aggregator.processing_stats['processing_errors'],
                 'buffer_size': len(aggregator.log_buffer),
-                'active_patterns': len(aggregator.active_patterns)
+                'active_patterns': aggregator.active_pattern_count()
             }
         else:
-            overview_data['components']['aggregator'] = {'status': 'not_initialized'}
+            # LOG_AGGREGATION_MODE=process: read the aggregator process's latest snapshot
+            snapshot = read_aggregator_process_stats()
+            if snapshot:
+                processing_stats = snapshot['processing_stats']
+                overview_data['components']['aggregator'] = {
+                    'status': snapshot['status'],
+                    'mode': 'process',
+                    'patterns_detected': processing_stats['patterns_detected'],
+                    'logs_processed': processing_stats['logs_processed'],
+                    'processing_errors': processing_stats['processing_errors'],
+                    'buffer_size': snapshot['buffer_size'],
+                    'active_patterns': snapshot['active_patterns'],
+                    'pattern_alerts': snapshot['alerts']
+                }
+            else:
+                overview_data['components']['aggregator'] = {'status': 'not_initialized'}
         
         # Monitoring integrations status
         monitoring = get_monitoring_manager()
@@ -130,11 +145,16 @@ def get_pattern_summary():
         hours = request.args.get('hours', 24, type=int)
         
         aggregator = get_log_aggregator()
-        if not aggregator:
-            return jsonify({'error': 'Log aggregator not initialized'}), 503
-        
-        pattern_summary = aggregator.get_pattern_summary(hours)
-        maritime_data = aggregator.get_maritime_dashboard_data()
+        if aggregator:
+            pattern_summary = aggregator.get_pattern_summary(hours)
+            maritime_data = aggregator.get_maritime_dashboard_data()
+        else:
+            # The aggregator process publishes a fixed 24 hour summary
+            snapshot = read_aggregator_process_stats()
+            if not snapshot:
+                return jsonify({'error': 'Log aggregator not initialized'}), 503
+            pattern_summary = snapshot['pattern_summary']
+            maritime_data = snapshot['maritime_dashboard']
         
         response_data = {
             'summary': pattern_summary,
@@ -542,8 +562,23 @@ def get_performance_metrics():
                     if aggregator.processing_stats['last_processing_time'] else None
                 ),
                 'buffer_utilization': len(aggregator.log_buffer) / aggregator.log_buffer.maxlen * 100,
-                'active_pattern_tracking': len(aggregator.active_patterns)
+                'active_pattern_tracking': aggregator.active_pattern_count()
             }
+        else:
+            snapshot = read_aggregator_process_stats()
+            if snapshot:
+                processing_stats = snapshot['processing_stats']
+                performance_data['components']['aggregator'] = {
+                    'mode': 'process',
+                    'logs_processed_total': processing_stats['logs_processed'],
+                    'patterns_detected_total': processing_stats['patterns_detected'],
+                    'alerts_generated_total': processing_stats['alerts_generated'],
+                    'processing_errors_total': processing_stats['processing_errors'],
+                    'last_processing_time': processing_stats['last_processing_time'],
+                    'buffer_utilization': snapshot['buffer_size'] / snapshot['buffer_capacity'] * 100,
+                    'active_pattern_tracking': snapshot['active_patterns'],
+                    'logs_dropped_total': processing_stats['logs_dropped']
+                }
         
         # Monitoring system performance
         monitoring = get_monitoring_manager()
@@ -9,6 +9,7 @@ from functools import wraps
 from flask import Blueprint, request, jsonify, render_template, current_app
 from flask_login import login_required, current_user
 from utils.offline_data_manager import OfflineDataManager, DataStatus
+from utils.live_events import publish_vessel_progress
 
 def api_login_required(f):
     """
@@ -33,16 +34,39 @@ offline_dashboard_bp = Blueprint('offline_dashboard', __name__)
 # Initialize offline data manager
 offline_data_manager = OfflineDataManager()
 
+# Delta sync: most change log rows returned per request
+DELTA_SYNC_PAGE_SIZE = 500
+
+# Vessel.to_dict(include_progress=True) keys computed from other columns
+DERIVED_VESSEL_FIELDS = {
+    'progress_percentage': ('cargo_loaded', 'cargo_remaining', 'is_complete'),
+    'total_cargo_capacity': ('cargo_loaded', 'cargo_remaining'),
+    'status': ('is_complete',)
+}
+
 @offline_dashboard_bp.route('/dashboard-data', methods=['GET'])
 @api_login_required
 def get_dashboard_data():
-    """Get dashboard data with offline support"""
+    """
+    Get dashboard data with offline support.
+    
+    Online clients that pass since=<cursor> from a previous response get only
+    the vessel and tally changes after it (mode "delta"); others get the full
+    snapshot, which also carries a cursor to start from.
+    """
     try:
-        from app import db, Vessel, CargoTally
+        from app import db, Vessel, CargoTally, SyncChange
         
         force_offline = request.args.get('offline', 'false').lower() == 'true'
         include_stale = request.args.get('include_stale', 'true').lower() == 'true'
         
+        since = request.args.get('since')
+        if since is not None:
+            try:
+                since = int(since)
+            except ValueError:
+                return jsonify({'success': False, 'error': 'since must be an integer cursor'}), 400
+        
         if force_offline or not _is_online():
             # Use cached data
             vessel_data = offline_data_manager.get_cached_vessels(include_stale)
@@ -61,6 +85,14 @@ def get_dashboard_data():
         else:
             # Try to get fresh data from server
             try:
+                full_resync = False
+                if since is not None:
+                    if SyncChange.is_cursor_valid(since):
+                        return jsonify(_build_delta_response(since, Vessel, CargoTally, SyncChange))
+                    full_resync = True  # Changes after the cursor were pruned
+                
+                # Read the cursor first - changes racing the snapshot are re-sent, never lost
+                cursor = SyncChange.snapshot_cursor()
                 vessels = Vessel.query.all()
                 vessel_list = []
                 for vessel in vessels:
@@ -86,6 +118,8 @@ def get_dashboard_data():
                     'vessels': merged_vessels,
                     'summary': dashboard_summary,
                     'data_status': 'fresh',
+                    'cursor': cursor,
+                    'full_resync': full_resync,
                     'last_updated': datetime.utcnow().isoformat(),
                     'timestamp': datetime.utcnow().isoformat()
                 })
@@ -281,6 +315,7 @@ def update_vessel_progress(vessel_id):
                 
                 # Update cache as well
                 offline_data_manager.update_vessel_progress(vessel_id, progress, is_offline_id=False)
+                publish_vessel_progress(vessel.id, vessel.progress_percentage)
                 
                 return jsonify({
                     'success': True,
@@ -427,6 +462,84 @@ def _is_online() -> bool:
     # For now, we'll assume online unless explicitly testing offline
     return True
 
+def _build_delta_response(since: int, Vessel, CargoTally, SyncChange) -> dict:
+    """Rows and fields changed after the since cursor, plus tombstones for deleted rows"""
+    changes, cursor, has_more = SyncChange.changes_since(since, DELTA_SYNC_PAGE_SIZE)
+    
+    # row id -> changed column names, or None when the whole row is needed
+    upserts = {'vessels': {}, 'cargo_tallies': {}}
+    deleted = {'vessels': set(), 'cargo_tallies': set()}
+    for change in changes:
+        table = change.table_name
+        if change.operation == 'delete':
+            upserts[table].pop(change.row_id, None)
+            deleted[table].add(change.row_id)
+            continue
+        deleted[table].discard(change.row_id)
+        fields = upserts[table].get(change.row_id, set())
+        if fields is None or change.changed_fields is None:
+            upserts[table][change.row_id] = None
+        else:
+            upserts[table][change.row_id] = fields | set(json.loads(change.changed_fields))
+    
+    vessels = []
+    if upserts['vessels']:
+        for vessel in Vessel.query.filter(Vessel.id.in_(upserts['vessels'])).all():
+            data = vessel.to_dict(include_progress=True)
+            fields = upserts['vessels'][vessel.id]
+            if fields is not None:
+                keys = {'id', 'updated_at'} | fields
+                for field in fields:
+                    keys.update(DERIVED_VESSEL_FIELDS.get(field, ()))
+                data = {key: data[key] for key in keys if key in data}
+            vessels.append(data)
+    
+    tallies = []
+    if upserts['cargo_tallies']:
+        tallies = [
+            tally.to_dict()
+            for tally in CargoTally.query.filter(CargoTally.id.in_(upserts['cargo_tallies'])).all()
+        ]
+    
+    _apply_delta_to_cache(vessels, upserts['vessels'], deleted['vessels'])
+    
+    summary_rows = Vessel.get_summary_dicts(fields=['status', 'progress_percentage', 'created_at'])
+    summary = _calculate_dashboard_summary(offline_data_manager.merge_offline_and_server_vessels(summary_rows))
+    
+    return {
+        'success': True,
+        'mode': 'delta',
+        'since': since,
+        'cursor': cursor,
+        'has_more': has_more,
+        'vessels': vessels,
+        'deleted_vessels': sorted(deleted['vessels']),
+        'cargo_tallies': tallies,
+        'deleted_cargo_tallies': sorted(deleted['cargo_tallies']),
+        'summary': summary,
+        'data_status': 'fresh',
+        'last_updated': datetime.utcnow().isoformat(),
+        'timestamp': datetime.utcnow().isoformat()
+    }
+
+def _apply_delta_to_cache(vessels: list, changed_fields: dict, deleted_ids: set):
+    """Keep the server-side offline vessel cache current without re-reading every vessel"""
+    if not vessels and not deleted_ids:
+        return
+    cached = offline_data_manager.get_cached_vessels()
+    if not cached['vessels']:
+        return
+    
+    by_id = {vessel.get('id'): vessel for vessel in cached['vessels']}
+    for vessel in vessels:
+        if vessel['id'] in by_id:
+            by_id[vessel['id']].update(vessel)
+        elif changed_fields.get(vessel['id']) is None:
+            by_id[vessel['id']] = vessel  # New vessel - the delta carries the whole row
+    for vessel_id in deleted_ids:
+        by_id.pop(vessel_id, None)
+    offline_data_manager.cache_vessel_data(list(by_id.values()), "server")
+
 def _calculate_dashboard_summary(vessels: list) -> dict:
     """Calculate dashboard summary from vessel list"""
     total_vessels = len(vessels)
@@ -7,18 +7,40 @@ import json
 from datetime import datetime
 from flask import Blueprint, request, jsonify, current_app, session
 from flask_login import login_required, current_user
-from utils.sync_manager import SyncManager, BackgroundSyncScheduler, SyncStatus, ConflictResolution
+from utils.sync_manager import SyncManager, DatabaseSyncQueueStore, BackgroundSyncScheduler, SyncStatus, ConflictResolution
 from models.user import create_user_model
 from models.vessel import create_vessel_model
 from models.cargo_tally import create_cargo_tally_model
+from models.cargo_tally_total import create_cargo_tally_total_model
+from utils.live_events import publish_cargo_tally, publish_vessel_progress, publish_sync_status
+from utils.sync_batch import SyncBatchProcessor
+from utils.sync_worker import SyncWorker
 
 # Create blueprint
 sync_bp = Blueprint('sync', __name__)
 
-# Global sync manager instance
-sync_manager = SyncManager()
+# Global sync manager instance - queue is persisted so it is shared by workers and survives restarts
+sync_manager = SyncManager(store=DatabaseSyncQueueStore())
 sync_scheduler = BackgroundSyncScheduler(sync_manager)
 
+# Drains the queue off the request thread - see SYNC_WORKER_MODE
+sync_worker = SyncWorker(sync_scheduler, process_batch=lambda batch_size: _run_sync_batch(batch_size))
+
+# Upper bound on records applied in one /sync/process transaction
+MAX_SYNC_BATCH_SIZE = 1000
+
+@sync_bp.before_app_request
+def _ensure_sync_worker():
+    """
+    Start the in-process sync worker on the first request each web worker handles
+    
+    Every gunicorn worker runs its own drainer, alongside inline /sync/process
+    and force-sync batches. They share one queue safely because a batch is
+    claimed with a conditional UPDATE, so each record goes to one drainer.
+    """
+    if current_app.config.get('SYNC_WORKER_MODE') == 'thread' and not sync_worker.is_running:
+        sync_worker.start(current_app._get_current_object())
+
 @sync_bp.route('/status', methods=['GET'])
 @login_required
 def sync_status():
@@ -26,6 +48,7 @@ def sync_status():
     try:
         status = sync_scheduler.get_sync_status()
         status['user_id'] = current_user.id
+        status['worker'] = sync_worker.get_metrics()
         
         return jsonify({
             'success': True,
@@ -53,16 +76,20 @@ def add_to_sync_queue():
         if not table or not operation:
             return jsonify({'error': 'Table and operation required'}), 400
         
+        try:
+            priority = int(data.get('priority', 0))
+        except (TypeError, ValueError):
+            return jsonify({'error': 'Priority must be an integer'}), 400
+        
         # Add user context
         record_data['user_id'] = current_user.id
         record_data['client_timestamp'] = datetime.utcnow().isoformat()
         
-        sync_id = sync_manager.add_to_sync_queue(table, operation, record_data, record_id)
+        sync_id = sync_manager.add_to_sync_queue(table, operation, record_data, record_id, priority=priority)
         
-        # Try immediate sync if online
-        if sync_scheduler.network_status.is_online and sync_scheduler.should_sync():
-            sync_scheduler.start_sync()
-            # Trigger background sync (would be handled by background task in production)
+        # Let the background worker pick it up now rather than at its next interval
+        if sync_scheduler.should_sync():
+            sync_worker.wake()
         
         return jsonify({
             'success': True,
@@ -79,73 +106,14 @@ def add_to_sync_queue():
 def process_sync_batch():
     """Process a batch of sync records"""
     try:
-        # Get database instances
-        from app import db
-        User = create_user_model(db)
-        Vessel = create_vessel_model(db)
-        CargoTally = create_cargo_tally_model(db)
-        
-        batch_size = request.get_json().get('batch_size', 10) if request.get_json() else 10
-        
-        # Get pending records
-        pending_records = sync_manager.get_pending_sync_records(batch_size)
+        payload = request.get_json(silent=True) or {}
+        try:
+            batch_size = int(payload.get('batch_size', 10))
+        except (TypeError, ValueError):
+            return jsonify({'error': 'batch_size must be an integer'}), 400
+        batch_size = max(1, min(batch_size, MAX_SYNC_BATCH_SIZE))
         
-        if not pending_records:
-            return jsonify({
-                'success': True,
-                'message': 'No records to sync',
-                'processed': 0
-            })
-        
-        processed_count = 0
-        conflicts = []
-        errors = []
-        
-        for record in pending_records:
-            try:
-                sync_manager.mark_as_syncing(record.id)
-                
-                # Process based on table type
-                if record.table == 'vessels':
-                    result = _process_vessel_sync(record, Vessel, db)
-                elif record.table == 'cargo_tallies':
-                    result = _process_cargo_tally_sync(record, CargoTally, db)
-                else:
-                    result = {'success': False, 'error': f'Unknown table: {record.table}'}
-                
-                if result['success']:
-                    sync_manager.mark_as_synced(record.id, result.get('server_hash', ''))
-                    processed_count += 1
-                elif result.get('conflict'):
-                    sync_manager.mark_as_conflict(record.id, result['server_data'])
-                    conflicts.append({
-                        'sync_id': record.id,
-                        'table': record.table,
-                        'client_data': record.data,
-                        'server_data': result['server_data']
-                    })
-                else:
-                    sync_manager.mark_as_error(record.id, result.get('error', 'Unknown error'))
-                    errors.append({
-                        'sync_id': record.id,
-                        'error': result.get('error', 'Unknown error')
-                    })
-                    
-            except Exception as e:
-                sync_manager.mark_as_error(record.id, str(e))
-                errors.append({
-                    'sync_id': record.id,
-                    'error': str(e)
-                })
-        
-        return jsonify({
-            'success': True,
-            'processed': processed_count,
-            'conflicts': len(conflicts),
-            'errors': len(errors),
-            'conflict_details': conflicts,
-            'error_details': errors
-        })
+        return jsonify(_run_sync_batch(batch_size))
         
     except Exception as e:
         current_app.logger.error(f"Process sync batch error: {e}")
@@ -232,6 +200,8 @@ def update_network_status():
         elif status == 'poor':
             sync_scheduler.network_status.mark_poor_connection()
         
+        publish_sync_status(sync_scheduler.get_sync_status())
+        
         return jsonify({
             'success': True,
             'network_status': sync_scheduler.network_status.get_status()
@@ -254,7 +224,7 @@ def cleanup_sync_records():
         return jsonify({
             'success': True,
             'cleaned_records': cleaned_count,
-            'remaining_records': len(sync_manager.sync_queue)
+            'remaining_records': sync_manager.get_sync_statistics()['total_records']
         })
         
     except Exception as e:
@@ -269,113 +239,122 @@ def force_sync():
         if sync_scheduler.sync_in_progress:
             return jsonify({'error': 'Sync already in progress'}), 400
         
-        sync_scheduler.start_sync()
+        # With a background worker the queue is drained off the request thread
+        mode = current_app.config.get('SYNC_WORKER_MODE', 'off')
+        if mode in ('thread', 'external'):
+            sync_worker.wake()
+            return jsonify({
+                'success': True,
+                'queued': True,
+                'message': 'Sync worker will process the queue',
+                'worker': sync_worker.get_metrics()
+            }), 202
+        
+        sync_scheduler.start_sync(force=True)
+        publish_sync_status(sync_scheduler.get_sync_status())
         
         # Process the sync batch
         response = process_sync_batch()
+        status_code = response[1] if isinstance(response, tuple) else response.status_code
         
-        sync_scheduler.complete_sync(response[1] < 400)  # Success if status < 400
+        sync_scheduler.complete_sync(status_code < 400)  # Success if status < 400
+        publish_sync_status(sync_scheduler.get_sync_status())
         
         return response
         
     except Exception as e:
         current_app.logger.error(f"Force sync error: {e}")
         sync_scheduler.complete_sync(False)
+        publish_sync_status(sync_scheduler.get_sync_status())
         return jsonify({'error': 'Failed to force sync'}), 500
 
-def _process_vessel_sync(record, Vessel, db):
-    """Process vessel sync record"""
+@sync_bp.route('/worker', methods=['GET'])
+@login_required
+def sync_worker_status():
+    """Background sync worker metrics: queue depth, lag and drain rate"""
     try:
-        if record.operation == 'create':
-            # Check if vessel already exists
-            existing = Vessel.query.filter_by(id=record.data.get('id')).first()
-            if existing:
-                # Compare data to detect conflict
-                server_hash = sync_manager._calculate_hash(existing.to_dict())
-                if server_hash != record.client_hash:
-                    return {
-                        'success': False,
-                        'conflict': True,
-                        'server_data': existing.to_dict()
-                    }
-            
-            # Create new vessel
-            vessel_data = record.data.copy()
-            vessel_data.pop('client_timestamp', None)
-            
-            vessel = Vessel(**vessel_data)
-            db.session.add(vessel)
-            db.session.commit()
-            
-            return {
-                'success': True,
-                'server_hash': sync_manager._calculate_hash(vessel.to_dict())
-            }
-            
-        elif record.operation == 'update':
-            vessel = Vessel.query.get(record.data.get('id'))
-            if not vessel:
-                return {'success': False, 'error': 'Vessel not found'}
-            
-            # Check for conflicts
-            server_hash = sync_manager._calculate_hash(vessel.to_dict())
-            if server_hash != record.client_hash:
-                return {
-                    'success': False,
-                    'conflict': True,
-                    'server_data': vessel.to_dict()
-                }
-            
-            # Update vessel
-            for key, value in record.data.items():
-                if hasattr(vessel, key) and key not in ['id', 'created_at']:
-                    setattr(vessel, key, value)
-            
-            vessel.updated_at = datetime.utcnow()
-            db.session.commit()
-            
-            return {
-                'success': True,
-                'server_hash': sync_manager._calculate_hash(vessel.to_dict())
-            }
-            
+        metrics = sync_worker.get_metrics()
+        metrics['mode'] = current_app.config.get('SYNC_WORKER_MODE', 'off')
+        return jsonify({'success': True, 'worker': metrics})
     except Exception as e:
-        return {'success': False, 'error': str(e)}
+        current_app.logger.error(f"Sync worker status error: {e}")
+        return jsonify({'error': 'Failed to get sync worker status'}), 500
 
-def _process_cargo_tally_sync(record, CargoTally, db):
-    """Process cargo tally sync record"""
-    try:
-        if record.operation == 'create':
-            # Create new cargo tally
-            tally_data = record.data.copy()
-            tally_data.pop('client_timestamp', None)
-            
-            tally = CargoTally(**tally_data)
-            db.session.add(tally)
-            db.session.commit()
-            
-            return {
-                'success': True,
-                'server_hash': sync_manager._calculate_hash(tally.to_dict())
-            }
-            
-        elif record.operation == 'update':
-            tally = CargoTally.query.get(record.data.get('id'))
-            if not tally:
-                return {'success': False, 'error': 'Cargo tally not found'}
-            
-            # For cargo tallies, usually append-only, so conflicts are rare
-            # Update tally
-            for key, value in record.data.items():
-                if hasattr(tally, key) and key not in ['id', 'timestamp']:
-                    setattr(tally, key, value)
-            
-            db.session.commit()
-            
-            return {
-                'success': True,
-                'server_hash': sync_manager._calculate_hash(tally.to_dict())
-            }
-            
-    except Exception as e:
-        return {'success': False, 'error': str(e)}
\ No newline at end of file
+def _run_sync_batch(batch_size):
+    """Apply one batch from the queue and publish the results - shared by /process and the worker"""
+    from app import db
+    Vessel = create_vessel_model(db)
+    CargoTally = create_cargo_tally_model(db)
+    CargoTallyTotal = create_cargo_tally_total_model(db)
+    
+    processor = SyncBatchProcessor(sync_manager, db, Vessel, CargoTally, CargoTallyTotal)
+    records, results, report = processor.process(batch_size)
+    
+    if not records:
+        return {
+            'success': True,
+            'message': 'No records to sync',
+            'processed': 0,
+            'metadata': report
+        }
+    
+    processed_count = 0
+    conflicts = []
+    errors = []
+    touched_vessels = {}
+    
+    for record in records:
+        result = results.get(record.id, {'success': False, 'error': 'Record was not processed'})
+        if result['success']:
+            processed_count += 1
+            if result.get('vessel_id') is not None:
+                touched_vessels.setdefault(result['vessel_id'], set()).add(record.table)
+        elif result.get('conflict'):
+            conflicts.append({
+                'sync_id': record.id,
+                'table': record.table,
+                'client_data': record.data,
+                'server_data': result['server_data']
+            })
+        else:
+            errors.append({
+                'sync_id': record.id,
+                'error': result.get('error', 'Unknown error')
+            })
+    
+    current_app.logger.info(
+        f"Sync batch: {len(records)} records in {report['duration_ms']}ms "
+        f"({report['rows_per_second']} rows/s, fallback={report['fallback']})"
+    )
+    _publish_sync_results(touched_vessels, Vessel)
+    
+    return {
+        'success': True,
+        'processed': processed_count,
+        'conflicts': len(conflicts),
+        'errors': len(errors),
+        'conflict_details': conflicts,
+        'error_details': errors,
+        'metadata': report
+    }
+
+def _publish_sync_results(touched_vessels, Vessel):
+    """Push one live event per vessel changed by a sync batch, then the new queue status"""
+    if touched_vessels:
+        progress = dict(
+            Vessel.query.with_entities(Vessel.id, Vessel.progress_percentage)
+            .filter(Vessel.id.in_(touched_vessels)).all()
+        )
+        from routes.offline_dashboard import offline_data_manager
+        # Synced vessel edits can touch any field - drop the snapshot instead of patching it
+        vessels_edited = any('vessels' in tables for tables in touched_vessels.values())
+        if vessels_edited:
+            offline_data_manager.clear_cache('vessels')
+        
+        for vessel_id, tables in touched_vessels.items():
+            if 'cargo_tallies' in tables:
+                publish_cargo_tally(vessel_id, None, source='sync')
+            if vessel_id in progress:
+                publish_vessel_progress(vessel_id, progress[vessel_id], source='sync')
+            offline_data_manager.invalidate_vessel(vessel_id, None if vessels_edited else progress.get(vessel_id))
+    publish_sync_status(sync_scheduler.get_sync_status())
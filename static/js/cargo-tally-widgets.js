@@ -21,6 +21,8 @@ class CargoTallyWidget {
         this.isLoading = false;
         this.lastUpdate = null;
         this.refreshTimer = null;
+        this.unsubscribeLive = null;
+        this.refreshPending = false;
         
         this.init();
     }
@@ -487,10 +489,33 @@ class CargoTallyWidget {
     }
     
     startAutoRefresh() {
-        if (this.refreshTimer) {
-            clearInterval(this.refreshTimer);
+        this.stopAutoRefresh();
+        
+        // Offline-only vessels never change server-side, so they keep the plain poller
+        if (this.isOfflineId || !window.liveEvents) {
+            this.startPolling();
+            return;
         }
         
+        // Re-fetch only when the server reports a change for this vessel
+        this.unsubscribeLive = window.liveEvents.subscribe(
+            ['cargo_tally', 'vessel_progress'],
+            () => this.onLiveEvent(),
+            { vesselId: this.vesselId, onUnavailable: () => this.startPolling() }
+        );
+        
+        this.visibilityHandler = () => {
+            if (!document.hidden && this.refreshPending) {
+                this.refreshPending = false;
+                this.loadTallies();
+            }
+        };
+        document.addEventListener('visibilitychange', this.visibilityHandler);
+    }
+    
+    startPolling() {
+        if (this.refreshTimer) return;
+        
         this.refreshTimer = setInterval(() => {
             if (navigator.onLine && !document.hidden) {
                 this.loadTallies();
@@ -498,11 +523,27 @@ class CargoTallyWidget {
         }, this.options.refreshInterval);
     }
     
+    onLiveEvent() {
+        if (document.hidden) {
+            this.refreshPending = true;
+            return;
+        }
+        this.loadTallies();
+    }
+    
     stopAutoRefresh() {
         if (this.refreshTimer) {
             clearInterval(this.refreshTimer);
             this.refreshTimer = null;
         }
+        if (this.unsubscribeLive) {
+            this.unsubscribeLive();
+            this.unsubscribeLive = null;
+        }
+        if (this.visibilityHandler) {
+            document.removeEventListener('visibilitychange', this.visibilityHandler);
+            this.visibilityHandler = null;
+        }
     }
     
     destroy() {
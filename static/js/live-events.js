@@ -0,0 +1,128 @@
+/**
+ * Live Events Client
+ * One shared server-push connection per page for vessel, tally and sync status updates
+ *
+ * Uses server-sent events (/live/stream) with a long-poll fallback (/live/poll).
+ * Subscribers that get an `unavailable` callback should fall back to their own polling.
+ */
+
+class LiveEventClient {
+    constructor() {
+        this.subscribers = new Set();
+        this.eventSource = null;
+        this.longPollActive = false;
+        this.unavailable = false;
+    }
+
+    subscribe(types, handler, options = {}) {
+        const subscriber = {
+            types: new Set(types),
+            vesselId: options.vesselId != null ? Number(options.vesselId) : null,
+            handler: handler,
+            onUnavailable: options.onUnavailable || null
+        };
+        this.subscribers.add(subscriber);
+
+        if (this.unavailable) {
+            this.notifyUnavailable(subscriber);
+        } else {
+            this.connect();
+        }
+
+        return () => {
+            this.subscribers.delete(subscriber);
+            if (this.subscribers.size === 0) {
+                this.disconnect();
+            }
+        };
+    }
+
+    connect() {
+        if (this.eventSource || this.longPollActive) return;
+
+        if (window.EventSource) {
+            this.startEventStream();
+        } else {
+            this.startLongPoll();
+        }
+    }
+
+    disconnect() {
+        if (this.eventSource) {
+            this.eventSource.close();
+            this.eventSource = null;
+        }
+        this.longPollActive = false;
+    }
+
+    startEventStream() {
+        this.eventSource = new EventSource('/live/stream');
+
+        ['vessel_progress', 'cargo_tally', 'sync_status'].forEach(type => {
+            this.eventSource.addEventListener(type, (message) => {
+                try {
+                    this.dispatch(JSON.parse(message.data));
+                } catch (error) {
+                    console.error('Invalid live event:', error);
+                }
+            });
+        });
+
+        this.eventSource.onerror = () => {
+            // Transient drops reconnect automatically; a closed stream means SSE is unusable here
+            if (this.eventSource && this.eventSource.readyState === EventSource.CLOSED) {
+                this.eventSource = null;
+                console.warn('Live event stream closed - switching to long-poll');
+                this.startLongPoll();
+            }
+        };
+    }
+
+    async startLongPoll() {
+        this.longPollActive = true;
+        let cursor = 0;
+
+        while (this.longPollActive) {
+            try {
+                const response = await fetch(`/live/poll?since=${cursor}`, { redirect: 'follow' });
+                if (response.status === 503) {
+                    // Worker is at its live connection limit - back off and try again
+                    const retryAfter = Number(response.headers.get('Retry-After')) || 15;
+                    await new Promise(resolve => setTimeout(resolve, retryAfter * 1000));
+                    continue;
+                }
+                if (!response.ok) {
+                    throw new Error(`HTTP ${response.status}: ${response.statusText}`);
+                }
+
+                const data = await response.json();
+                data.events.forEach(event => this.dispatch(event));
+                cursor = data.cursor;
+            } catch (error) {
+                if (this.longPollActive) {
+                    console.warn('Live updates unavailable:', error);
+                    this.longPollActive = false;
+                    this.unavailable = true;
+                    this.subscribers.forEach(subscriber => this.notifyUnavailable(subscriber));
+                }
+                return;
+            }
+        }
+    }
+
+    dispatch(event) {
+        this.subscribers.forEach(subscriber => {
+            if (!subscriber.types.has(event.type)) return;
+            if (subscriber.vesselId !== null && event.vessel_id !== null && event.vessel_id !== subscriber.vesselId) return;
+            subscriber.handler(event);
+        });
+    }
+
+    notifyUnavailable(subscriber) {
+        if (subscriber.onUnavailable) {
+            subscriber.onUnavailable();
+        }
+    }
+}
+
+window.liveEvents = window.liveEvents || new LiveEventClient();
@@ -18,6 +18,15 @@ class ClientSyncManager {
         // Start background sync scheduler
         this.startSyncScheduler();
         
+        // Server-side sync status transitions are pushed rather than polled
+        this.serverStatus = null;
+        if (window.liveEvents) {
+            window.liveEvents.subscribe(['sync_status'], (event) => {
+                this.serverStatus = event.data;
+                this.dispatchSyncEvent('sync-state-changed', event.data);
+            });
+        }
+        
         console.log('Client Sync Manager initialized');
     }
     
@@ -90,6 +99,7 @@ class ClientSyncManager {
         console.log(`Starting sync of ${pendingRecords.length} records`);
         this.syncInProgress = true;
         this.lastSyncAttempt = new Date();
+        this.dispatchSyncEvent('sync-state-changed', {});
         
         try {
             // Process records in batches
@@ -108,6 +118,7 @@ class ClientSyncManager {
             this.dispatchSyncEvent('sync-failed', { error: error.message });
         } finally {
             this.syncInProgress = false;
+            this.dispatchSyncEvent('sync-state-changed', {});
         }
     }
     
@@ -340,6 +351,7 @@ class ClientSyncManager {
         } catch (error) {
             console.warn('Failed to save sync queue:', error);
         }
+        this.dispatchSyncEvent('sync-state-changed', {});
     }
     
     dispatchSyncEvent(eventType, data) {
@@ -361,8 +373,9 @@ class ClientSyncManager {
         return {
             ...stats,
             isOnline: this.isOnline,
-            syncInProgress: this.syncInProgress,
-            lastSyncAttempt: this.lastSyncAttempt
+            syncInProgress: this.syncInProgress || Boolean(this.serverStatus && this.serverStatus.sync_in_progress),
+            lastSyncAttempt: this.lastSyncAttempt,
+            serverStatus: this.serverStatus
         };
     }
     
@@ -461,8 +474,11 @@ function setupSyncStatusDisplay() {
         showConflictNotification(event.detail);
     });
     
-    // Update indicator every few seconds
-    setInterval(updateSyncStatusIndicator, 5000);
+    // Update indicator whenever the local queue or the server-side sync status changes
+    window.addEventListener('sync-state-changed', updateSyncStatusIndicator);
+    window.addEventListener('online', updateSyncStatusIndicator);
+    window.addEventListener('offline', updateSyncStatusIndicator);
+    updateSyncStatusIndicator();
 }
 
 function updateSyncStatusIndicator() {
@@ -0,0 +1,228 @@
+"""
+Cache Invalidation Test Suite for Stevedores Dashboard 3.0
+Tests vessel tag invalidation from model events and its fan-out to other workers
+"""
+
+import unittest
+import sys
+import os
+import queue
+import time
+from sqlalchemy import event
+
+# Add the parent directory to the Python path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import app, db, User, Vessel, CargoTally, CargoTallyTotal
+from utils.cache_manager import CacheManager, vessel_tag, enable_cache_invalidation
+from utils.redis_client import AdvancedCircuitBreaker, CircuitBreakerState
+from utils.sync_manager import SyncManager, DatabaseSyncQueueStore
+from utils.sync_batch import SyncBatchProcessor
+from tests.test_offline_cache import DictRedis
+
+
+class PubSubRedis(DictRedis):
+    """DictRedis with in-process pub/sub shared by every subscriber"""
+
+    def __init__(self):
+        super().__init__()
+        self.subscribers = []
+
+    def publish(self, channel, message):
+        for subscriber in self.subscribers:
+            subscriber.messages.put({'type': 'message', 'channel': channel, 'data': message.encode()})
+        return len(self.subscribers)
+
+    def pubsub(self):
+        return FakePubSub(self)
+
+
+class FakePubSub:
+    def __init__(self, redis):
+        self.redis = redis
+        self.messages = queue.Queue()
+
+    def subscribe(self, channel):
+        self.redis.subscribers.append(self)
+
+    def get_message(self, timeout=0):
+        try:
+            return self.messages.get(timeout=min(timeout, 0.05))
+        except queue.Empty:
+            return None
+
+    def close(self):
+        self.redis.subscribers.remove(self)
+
+
+class CacheInvalidationTestSuite(unittest.TestCase):
+    """Test suite for event-driven cache invalidation"""
+
+    def setUp(self):
+        """Set up test environment"""
+        self.app = app
+        self.app.config['TESTING'] = True
+        self.client = self.app.test_client()
+        self.ctx = self.app.app_context()
+        self.ctx.push()
+        db.create_all()
+
+        user = User(username='tag_user', email='tag@test.com')
+        user.set_password('password')
+        self.vessels = [Vessel(name=f'MV Tagged {i}', total_cargo_capacity=100) for i in range(2)]
+        db.session.add_all([user] + self.vessels)
+        db.session.commit()
+
+        with self.client.session_transaction() as sess:
+            sess['_user_id'] = str(user.id)
+            sess['_fresh'] = True
+
+        self.cache = self.app.cache_manager
+        self.cache.clear()
+
+    def tearDown(self):
+        """Clean up after tests"""
+        db.session.remove()
+        db.drop_all()
+        self.ctx.pop()
+
+    def _version(self, tag):
+        return self.cache._tag_version(tag)
+
+    def test_01_tally_insert_invalidates_only_that_vessel(self):
+        """Test 1: A tally POST refreshes its vessel's details while other vessels stay cached"""
+        first, second = (v.id for v in self.vessels)
+        for vessel_id in (first, second):
+            self.client.get(f'/api/vessels/{vessel_id}')
+        other_version = self._version(vessel_tag(second))
+
+        self.client.post(f'/api/vessels/{first}/cargo-tally', json={'cargo_count': 40})
+
+        self.assertEqual(self.client.get(f'/api/vessels/{first}').get_json()['progress_percentage'], 40.0)
+        self.assertEqual(self._version(vessel_tag(second)), other_version)
+
+        queries = []
+
+        def count(conn, cursor, statement, *args):
+            queries.append(statement)
+
+        event.listen(db.engine, 'before_cursor_execute', count)
+        try:
+            self.client.get(f'/api/vessels/{second}')
+        finally:
+            event.remove(db.engine, 'before_cursor_execute', count)
+        self.assertEqual([q for q in queries if 'FROM vessels' in q], [])
+
+    def test_02_vessel_update_invalidates_summary(self):
+        """Test 2: An ORM status change invalidates the vessel list and the vessel's own entries"""
+        self.assertEqual(self.client.get('/api/vessels/summary').get_json()['active_vessels'], 0)
+        vessels_version = self._version('vessels')
+
+        self.vessels[0].set_status('operations_active')
+
+        self.assertGreater(self._version('vessels'), vessels_version)
+        self.assertEqual(self.client.get('/api/vessels/summary').get_json()['active_vessels'], 1)
+
+    def test_03_bulk_sync_updates_invalidate(self):
+        """Test 3: Vessel updates applied through bulk_update_mappings still invalidate the vessel tag"""
+        vessel_id = self.vessels[1].id
+        self.client.get(f'/api/vessels/{vessel_id}')
+        version = self._version(vessel_tag(vessel_id))
+
+        manager = SyncManager(store=DatabaseSyncQueueStore(db))
+        manager.add_to_sync_queue('vessels', 'update', {'id': vessel_id, 'current_berth': 'B9'})
+        SyncBatchProcessor(manager, db, Vessel, CargoTally, CargoTallyTotal).process(10)
+
+        self.assertGreater(self._version(vessel_tag(vessel_id)), version)
+        self.assertEqual(self.client.get(f'/api/vessels/{vessel_id}').get_json()['current_berth'], 'B9')
+
+    def test_04_rollback_does_not_invalidate(self):
+        """Test 4: Rolled-back changes leave cached entries valid and re-enabling adds no listeners"""
+        vessel = self.vessels[0]
+        version = self._version(vessel_tag(vessel.id))
+
+        vessel.current_berth = 'B1'
+        db.session.flush()
+        db.session.rollback()
+        self.assertEqual(self._version(vessel_tag(vessel.id)), version)
+        self.assertNotIn('changed_vessel_ids', db.session.info)
+
+        # Every create_app calls this again; the mapper listeners must not pile up
+        listeners = len(list(Vessel.__mapper__.dispatch.after_update))
+        enable_cache_invalidation(db, Vessel, CargoTally)
+        self.assertEqual(len(list(Vessel.__mapper__.dispatch.after_update)), listeners)
+
+    def test_05_invalidations_reach_other_workers(self):
+        """Test 5: A worker trusting its tag versions drops them when another worker publishes"""
+        redis = PubSubRedis()
+        worker_a = CacheManager(redis)
+        worker_b = CacheManager(redis)
+        try:
+            worker_a.set('vessel_details:7', {'progress': 10}, tags=[vessel_tag(7)])
+            self.assertEqual(worker_b.get('vessel_details:7'), {'progress': 10})
+
+            deadline = time.time() + 2
+            while not worker_b.get_stats()['invalidation_listener'] and time.time() < deadline:
+                time.sleep(0.01)
+            # Re-read once subscribed so worker B trusts the version for subscribed_tag_ttl
+            worker_b._tag_cache.clear()
+            self.assertEqual(worker_b.get('vessel_details:7'), {'progress': 10})
+
+            worker_a.invalidate_tags(vessel_tag(7))
+            deadline = time.time() + 2
+            while worker_b.cache_stats['remote_invalidations'] == 0 and time.time() < deadline:
+                time.sleep(0.01)
+            self.assertIsNone(worker_b.get('vessel_details:7'))
+            self.assertEqual(worker_a.cache_stats['remote_invalidations'], 0)
+        finally:
+            worker_a.close()
+            worker_b.close()
+
+
+    def test_06_ttls_are_capped_while_invalidation_is_local(self):
+        """Test 6: Tagged entries keep long TTLs only while invalidations reach every worker"""
+        def lifetime(cache, key, tags):
+            cache.set(key, {'progress': 10}, timeout=6 * 3600, tags=tags, stale_timeout=60)
+            entry = cache.l1.get(cache._full_key(key))
+            return entry['fresh_until'] - time.time(), entry['stale_until'] - entry['fresh_until']
+
+        # Without Redis each worker only invalidates its own copy
+        local = CacheManager(None, unshared_timeout=30)
+        fresh, stale = lifetime(local, 'vessel_details:1', [vessel_tag(1)])
+        self.assertLessEqual(fresh, 30)
+        self.assertLessEqual(stale, 30)
+        # Untagged entries never relied on invalidation and keep their TTL
+        self.assertGreater(lifetime(local, 'static', [])[0], 3600)
+
+        # Redis answers but the invalidation listener cannot subscribe
+        class NoPubSubRedis(PubSubRedis):
+            def pubsub(self):
+                return None
+
+        unsubscribed = CacheManager(NoPubSubRedis(), unshared_timeout=30)
+        try:
+            self.assertLessEqual(lifetime(unsubscribed, 'vessel_details:2', [vessel_tag(2)])[0], 30)
+        finally:
+            unsubscribed.close()
+
+        redis = PubSubRedis()
+        shared = CacheManager(redis, unshared_timeout=30)
+        try:
+            shared._ensure_listener()
+            deadline = time.time() + 2
+            while not shared.invalidation_shared() and time.time() < deadline:
+                time.sleep(0.01)
+            self.assertGreater(lifetime(shared, 'vessel_details:2', [vessel_tag(2)])[0], 3600)
+            self.assertTrue(shared.get_stats()['invalidation_shared'])
+
+            # An open circuit breaker sends publishes to the local fallback
+            redis._circuit_breaker = AdvancedCircuitBreaker()
+            redis._circuit_breaker.state = CircuitBreakerState.OPEN
+            self.assertFalse(shared.invalidation_shared())
+            self.assertLessEqual(lifetime(shared, 'vessel_details:2', [vessel_tag(2)])[0], 30)
+        finally:
+            shared.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
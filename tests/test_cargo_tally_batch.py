@@ -0,0 +1,98 @@
+"""
+Bulk Cargo Tally Ingestion Test Suite for Stevedores Dashboard 3.0
+Tests that replayed tally batches are validated and committed in one transaction
+"""
+
+import unittest
+import sys
+import os
+from unittest.mock import patch
+
+# Add the parent directory to the Python path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import app, db, Vessel, CargoTally, CargoTallyTotal
+
+
+class CargoTallyBatchTestSuite(unittest.TestCase):
+    """Test suite for the bulk cargo tally endpoint"""
+
+    def setUp(self):
+        """Set up test environment"""
+        self.app = app
+        self.app.config['TESTING'] = True
+        self.client = self.app.test_client()
+
+        with self.app.app_context():
+            db.create_all()
+            first = Vessel(name='MV Batch One', total_cargo_capacity=100)
+            second = Vessel(name='MV Batch Two', total_cargo_capacity=400)
+            db.session.add_all([first, second])
+            db.session.commit()
+            self.first_id, self.second_id = first.id, second.id
+
+    def tearDown(self):
+        """Clean up after tests"""
+        with self.app.app_context():
+            db.session.remove()
+            db.drop_all()
+
+    def test_01_batch_across_vessels_with_per_item_results(self):
+        """Test 1: Valid entries are stored, invalid ones reported per item"""
+        tallies = [
+            {'vessel_id': self.first_id, 'cargo_count': 10, 'client_id': 'a1'},
+            {'vessel_id': self.first_id, 'cargo_count': 15, 'timestamp': '2025-01-01T08:00:00+00:00'},
+            {'vessel_id': self.second_id, 'cargo_count': 40, 'tally_type': 'loaded'},
+            {'vessel_id': self.second_id, 'cargo_count': 3, 'tally_type': 'discharged'},
+            {'vessel_id': self.first_id, 'cargo_count': -5},
+            {'vessel_id': 9999, 'cargo_count': 1},
+        ]
+
+        response = self.client.post('/api/cargo-tally/batch', json={'tallies': tallies})
+        self.assertEqual(response.status_code, 201)
+        result = response.get_json()
+
+        self.assertEqual(result['metadata']['received'], 6)
+        self.assertEqual(result['metadata']['inserted'], 4)
+        self.assertEqual(result['metadata']['rejected'], 2)
+        self.assertEqual(result['metadata']['vessels_updated'], 2)
+        self.assertIn('rows_per_second', result['metadata'])
+
+        items = result['results']
+        self.assertTrue(all(item['success'] for item in items[:4]))
+        self.assertEqual(items[0]['client_id'], 'a1')
+        self.assertIn('cargo_count', items[4]['errors'])
+        self.assertIn('vessel_id', items[5]['errors'])
+
+        self.assertEqual(result['vessels'][str(self.first_id)]['total_loaded'], 25)
+        self.assertAlmostEqual(result['vessels'][str(self.first_id)]['new_progress'], 25.0)
+        self.assertAlmostEqual(result['vessels'][str(self.second_id)]['new_progress'], 10.0)
+
+        with self.app.app_context():
+            self.assertEqual(CargoTally.query.count(), 4)
+            self.assertEqual(CargoTallyTotal.get_vessel_totals(self.second_id), {'loaded': 40, 'discharged': 3})
+
+    def test_02_batch_commits_once(self):
+        """Test 2: A batch is written with a single commit"""
+        tallies = [{'vessel_id': self.first_id, 'cargo_count': 1} for _ in range(25)]
+
+        with patch.object(db.session, 'commit', wraps=db.session.commit) as commit:
+            response = self.client.post('/api/cargo-tally/batch', json={'tallies': tallies})
+
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(commit.call_count, 1)
+        with self.app.app_context():
+            self.assertEqual(CargoTallyTotal.get_total(self.first_id), 25)
+
+    def test_03_rejects_empty_and_fully_invalid_batches(self):
+        """Test 3: Empty batches and batches with no valid entries are rejected"""
+        response = self.client.post('/api/cargo-tally/batch', json={'tallies': []})
+        self.assertEqual(response.status_code, 400)
+
+        response = self.client.post('/api/cargo-tally/batch', json={'tallies': [{'cargo_count': 2}]})
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(response.get_json()['results'][0]['success'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,132 @@
+"""
+Cargo Tally Running Totals Test Suite for Stevedores Dashboard 3.0
+Tests that cargo totals are maintained incrementally and can be reconciled
+"""
+
+import unittest
+import sys
+import os
+
+# Add the parent directory to the Python path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import app, db, Vessel, CargoTally, CargoTallyTotal
+
+
+class CargoTallyTotalsTestSuite(unittest.TestCase):
+    """Test suite for incremental cargo tally totals"""
+
+    def setUp(self):
+        """Set up test environment"""
+        self.app = app
+        self.app.config['TESTING'] = True
+        self.client = self.app.test_client()
+
+        with self.app.app_context():
+            db.create_all()
+            vessel = Vessel(name='MV Tally Test', total_cargo_capacity=200)
+            db.session.add(vessel)
+            db.session.commit()
+            self.vessel_id = vessel.id
+
+    def tearDown(self):
+        """Clean up after tests"""
+        with self.app.app_context():
+            db.session.remove()
+            db.drop_all()
+
+    def test_01_post_updates_running_total_and_progress(self):
+        """Test 1: Tally POST maintains the running total and vessel progress"""
+        for count in (10, 15, 25):
+            response = self.client.post(f'/api/vessels/{self.vessel_id}/cargo-tally',
+                                        json={'cargo_count': count, 'tally_type': 'loaded'})
+            self.assertEqual(response.status_code, 201)
+
+        self.client.post(f'/api/vessels/{self.vessel_id}/cargo-tally',
+                         json={'cargo_count': 7, 'tally_type': 'discharged'})
+
+        result = response.get_json()
+        self.assertEqual(result['total_loaded'], 50)
+        self.assertAlmostEqual(result['new_progress'], 25.0)
+
+        with self.app.app_context():
+            self.assertEqual(CargoTallyTotal.get_vessel_totals(self.vessel_id), {'loaded': 50, 'discharged': 7})
+            total = CargoTallyTotal.query.filter_by(vessel_id=self.vessel_id, tally_type='loaded').one()
+            self.assertEqual(total.entry_count, 3)
+
+        response = self.client.get(f'/api/vessels/{self.vessel_id}/cargo-tally')
+        self.assertEqual(response.get_json()['total_loaded'], 50)
+
+    def test_02_total_seeded_from_existing_rows(self):
+        """Test 2: Vessels with tallies recorded before the totals table are seeded once"""
+        with self.app.app_context():
+            db.session.add(CargoTally(vessel_id=self.vessel_id, cargo_count=30, tally_type='loaded'))
+            db.session.add(CargoTally(vessel_id=self.vessel_id, cargo_count=20, tally_type='loaded'))
+            db.session.commit()
+
+            CargoTally.create_tally(self.vessel_id, 5)
+            self.assertEqual(CargoTally.get_vessel_total(self.vessel_id), 55)
+            self.assertAlmostEqual(Vessel.query.get(self.vessel_id).progress_percentage, 27.5)
+
+    def test_03_rebuild_reconciles_drifted_totals(self):
+        """Test 3: Reconciliation rebuilds totals from the raw rows"""
+        with self.app.app_context():
+            CargoTally.create_tally(self.vessel_id, 12)
+            CargoTally.create_tally(self.vessel_id, 8)
+
+            total = CargoTallyTotal.query.filter_by(vessel_id=self.vessel_id, tally_type='loaded').one()
+            total.total_count = 999
+            db.session.commit()
+
+            corrections = CargoTallyTotal.rebuild()
+            self.assertEqual(len(corrections), 1)
+            self.assertEqual(corrections[0]['old_total'], 999)
+            self.assertEqual(corrections[0]['new_total'], 20)
+            self.assertEqual(CargoTallyTotal.get_total(self.vessel_id), 20)
+
+            # Nothing left to correct on a second pass
+            self.assertEqual(CargoTallyTotal.rebuild(vessel_id=self.vessel_id), [])
+
+    def test_04_reconcile_cli_command(self):
+        """Test 4: reconcile-tally-totals CLI command reports corrections"""
+        with self.app.app_context():
+            db.session.add(CargoTally(vessel_id=self.vessel_id, cargo_count=40, tally_type='loaded'))
+            db.session.commit()
+
+        runner = self.app.test_cli_runner()
+        result = runner.invoke(args=['reconcile-tally-totals', '--vessel-id', str(self.vessel_id)])
+        self.assertEqual(result.exit_code, 0, result.output)
+        self.assertIn('0 -> 40', result.output)
+        self.assertIn('1 corrected', result.output)
+
+
+    def test_05_unseeded_totals_read_raw_rows_until_backfilled(self):
+        """Test 5: Vessels with tallies but no total read the raw rows, and init_database backfills them"""
+        with self.app.app_context():
+            other = Vessel(name='MV Tally Backfill', total_cargo_capacity=100)
+            db.session.add(other)
+            db.session.flush()
+            other_id = other.id
+            db.session.add(CargoTally(vessel_id=self.vessel_id, cargo_count=30, tally_type='loaded'))
+            db.session.add(CargoTally(vessel_id=self.vessel_id, cargo_count=4, tally_type='discharged'))
+            db.session.add(CargoTally(vessel_id=other_id, cargo_count=9, tally_type='loaded'))
+            db.session.commit()
+            db.session.add(CargoTallyTotal(vessel_id=other_id, tally_type='loaded', total_count=9, entry_count=1))
+            db.session.commit()
+
+        response = self.client.get(f'/api/vessels/{self.vessel_id}/cargo-tally')
+        self.assertEqual(response.get_json()['total_loaded'], 30)
+
+        with self.app.app_context():
+            self.assertEqual(CargoTallyTotal.get_vessel_totals(self.vessel_id), {})
+            self.assertEqual(CargoTallyTotal.backfill(), 2)
+            self.assertEqual(CargoTallyTotal.get_vessel_totals(self.vessel_id), {'loaded': 30, 'discharged': 4})
+            self.assertEqual(CargoTallyTotal.query.filter_by(vessel_id=other_id).count(), 1)
+            self.assertEqual(CargoTallyTotal.backfill(), 0)
+
+            CargoTally.create_tally(self.vessel_id, 5)
+            self.assertEqual(CargoTallyTotal.get_total(self.vessel_id), 35)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,107 @@
+"""
+Dashboard Query Budget Test Suite for Stevedores Dashboard 3.0
+Integration tests asserting the number of database round trips per dashboard render
+"""
+
+import unittest
+import sys
+import os
+from unittest.mock import patch
+from sqlalchemy import event
+
+# Add the parent directory to the Python path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import app as app_module
+from app import app, db, User, Vessel
+
+
+class DashboardQueryBudgetTestSuite(unittest.TestCase):
+    """Test suite for the dashboard hot path"""
+
+    def setUp(self):
+        """Set up test environment"""
+        self.app = app
+        self.app.config['TESTING'] = True
+        self.client = self.app.test_client()
+
+        with self.app.app_context():
+            db.create_all()
+            user = User(username='dashboard_user', email='dashboard@test.com')
+            user.set_password('password')
+            db.session.add(user)
+            db.session.add_all([
+                Vessel(name=f'MV Dashboard {i}', status='operations_active', progress_percentage=10.0 * i)
+                for i in range(5)
+            ])
+            db.session.commit()
+            self.user_id = user.id
+
+            # Startup-time schema gate (normally run by init_database)
+            app_module.ensure_schema_ready(force=True)
+
+        with self.client.session_transaction() as sess:
+            sess['_user_id'] = str(self.user_id)
+            sess['_fresh'] = True
+
+    def tearDown(self):
+        """Clean up after tests"""
+        with self.app.app_context():
+            db.session.remove()
+            db.drop_all()
+
+    def _capture_statements(self):
+        statements = []
+        with self.app.app_context():
+            engine = db.engine
+
+        def before_execute(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement)
+
+        event.listen(engine, 'before_cursor_execute', before_execute)
+        self.addCleanup(event.remove, engine, 'before_cursor_execute', before_execute)
+        return statements
+
+    def test_01_dashboard_uses_one_vessel_query(self):
+        """Test 1: Dashboard render is one vessel query plus the session user lookup"""
+        statements = self._capture_statements()
+
+        with patch('production_db_migration.run_migration_if_needed') as migration:
+            response = self.client.get('/dashboard')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertIn(b'MV Dashboard 4', response.data)
+        migration.assert_not_called()
+
+        vessel_queries = [s for s in statements if 'vessels' in s]
+        user_queries = [s for s in statements if 'users' in s]
+        self.assertEqual(len(vessel_queries), 1, vessel_queries)
+        self.assertEqual(len(statements), len(vessel_queries) + len(user_queries), statements)
+        self.assertLessEqual(len(user_queries), 1)
+
+    def test_02_undefined_column_triggers_emergency_migration(self):
+        """Test 2: Emergency migration only runs when the query fails on a missing column"""
+        calls = {'count': 0}
+        real_summary = Vessel.get_summary_dicts.__func__
+
+        def flaky_summary(cls, *args, **kwargs):
+            calls['count'] += 1
+            if calls['count'] == 1:
+                raise Exception('column vessels.shipping_line does not exist')
+            return real_summary(cls, *args, **kwargs)
+
+        with patch.object(Vessel, 'get_summary_dicts', classmethod(flaky_summary)), \
+                patch.object(app_module, '_emergency_vessel_column_fix') as column_fix:
+            response = self.client.get('/dashboard')
+
+        self.assertEqual(response.status_code, 200)
+        column_fix.assert_called_once()
+        self.assertEqual(calls['count'], 2)
+
+        with patch.object(app_module, '_emergency_vessel_column_fix') as column_fix:
+            self.client.get('/dashboard')
+        column_fix.assert_not_called()
+
+
+if __name__ == '__main__':
+    unittest.main()
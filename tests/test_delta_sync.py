@@ -0,0 +1,144 @@
+"""
+Delta Sync Test Suite for Stevedores Dashboard 3.0
+Tests the change log sequence, delta dashboard responses and tombstones
+"""
+
+import unittest
+import sys
+import os
+from datetime import datetime, timedelta
+
+# Add the parent directory to the Python path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import app, db, User, Vessel, CargoTally, CargoTallyTotal, SyncChange
+from utils.sync_manager import SyncManager, DatabaseSyncQueueStore
+from utils.sync_batch import SyncBatchProcessor
+
+
+class DeltaSyncTestSuite(unittest.TestCase):
+    """Test suite for delta sync of the offline dashboard"""
+
+    def setUp(self):
+        """Set up test environment"""
+        self.app = app
+        self.app.config['TESTING'] = True
+        self.client = self.app.test_client()
+        self.ctx = self.app.app_context()
+        self.ctx.push()
+        db.create_all()
+
+        user = User(username='delta_user', email='delta@test.com')
+        user.set_password('password')
+        self.vessels = [Vessel(name=f'MV Delta {i}', total_cargo_capacity=200) for i in range(3)]
+        db.session.add_all([user] + self.vessels)
+        db.session.commit()
+
+        with self.client.session_transaction() as sess:
+            sess['_user_id'] = str(user.id)
+            sess['_fresh'] = True
+
+    def tearDown(self):
+        """Clean up after tests"""
+        db.session.remove()
+        db.drop_all()
+        self.ctx.pop()
+
+    def _get(self, since=None):
+        url = '/offline-dashboard/dashboard-data' + (f'?since={since}' if since is not None else '')
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return response.get_json()
+
+    def test_01_delta_returns_only_changed_fields(self):
+        """Test 1: A status change is sent as the changed fields of one vessel"""
+        snapshot = self._get()
+        self.assertEqual(snapshot['mode'], 'online')
+        self.assertEqual(len(snapshot['vessels']), 3)
+        cursor = snapshot['cursor']
+        self.assertGreater(cursor, 0)
+
+        self.assertEqual(self._get(cursor)['vessels'], [])
+
+        self.vessels[1].set_status('berthed')
+        delta = self._get(cursor)
+        self.assertEqual(delta['mode'], 'delta')
+        self.assertEqual(len(delta['vessels']), 1)
+        self.assertEqual(set(delta['vessels'][0]), {'id', 'status', 'updated_at', 'is_complete'})
+        self.assertEqual(delta['vessels'][0]['status'], 'berthed')
+        self.assertEqual(delta['summary']['total_vessels'], 3)
+        self.assertGreater(delta['cursor'], cursor)
+        self.assertEqual(self._get(delta['cursor'])['vessels'], [])
+
+    def test_02_tallies_and_tombstones(self):
+        """Test 2: New tallies arrive whole with derived vessel progress; deletions arrive as tombstones"""
+        cursor = self._get()['cursor']
+        vessel_id = self.vessels[0].id
+
+        self.client.post(f'/api/vessels/{vessel_id}/cargo-tally', json={'cargo_count': 50})
+        delta = self._get(cursor)
+        self.assertEqual([t['cargo_count'] for t in delta['cargo_tallies']], [50])
+        self.assertEqual(delta['vessels'][0]['id'], vessel_id)
+        self.assertAlmostEqual(delta['vessels'][0]['progress_percentage'], 25.0)
+        self.assertIn('cargo_remaining', delta['vessels'][0])
+
+        tally = CargoTally.query.one()
+        tally_id = tally.id
+        db.session.delete(tally)
+        db.session.commit()
+        delta = self._get(delta['cursor'])
+        self.assertEqual(delta['deleted_cargo_tallies'], [tally_id])
+        self.assertEqual(delta['cargo_tallies'], [])
+
+        # Created and deleted inside one window only leaves the tombstone
+        self.assertEqual(self._get(cursor)['deleted_cargo_tallies'], [tally_id])
+        self.assertEqual(self._get(cursor)['cargo_tallies'], [])
+
+    def test_03_bulk_sync_updates_are_logged(self):
+        """Test 3: Vessel updates applied by the set-based sync batch appear in the delta"""
+        cursor = self._get()['cursor']
+        manager = SyncManager(store=DatabaseSyncQueueStore(db))
+        manager.add_to_sync_queue('vessels', 'update', {'id': self.vessels[2].id, 'current_berth': 'B7'})
+        SyncBatchProcessor(manager, db, Vessel, CargoTally, CargoTallyTotal).process(10)
+
+        delta = self._get(cursor)
+        self.assertEqual(delta['vessels'], [{
+            'id': self.vessels[2].id, 'current_berth': 'B7', 'updated_at': delta['vessels'][0]['updated_at']
+        }])
+
+    def test_04_unknown_cursor_gets_full_snapshot(self):
+        """Test 4: Cursors past the log or before pruned changes fall back to a full resync"""
+        data = self._get(10 ** 6)
+        self.assertEqual(data['mode'], 'online')
+        self.assertTrue(data['full_resync'])
+        self.assertEqual(len(data['vessels']), 3)
+
+        SyncChange.query.update({SyncChange.created_at: datetime.utcnow() - timedelta(days=30)})
+        db.session.commit()
+        self.assertGreater(SyncChange.prune(older_than_days=7), 0)
+        self.assertTrue(self._get(1)['full_resync'])
+
+        response = self.client.get('/offline-dashboard/dashboard-data?since=latest')
+        self.assertEqual(response.status_code, 400)
+
+    def test_05_cursor_stops_before_unsettled_gap(self):
+        """Test 5: A sequence gap next to a fresh change is not skipped until it settles"""
+        last = SyncChange.snapshot_cursor()
+        db.session.add(SyncChange(id=last + 3, table_name='vessels', row_id=self.vessels[0].id,
+                                  vessel_id=self.vessels[0].id, operation='upsert'))
+        db.session.commit()
+
+        changes, cursor, has_more = SyncChange.changes_since(last)
+        self.assertEqual((changes, cursor, has_more), ([], last, True))
+        self.assertEqual(SyncChange.snapshot_cursor(), last)
+
+        SyncChange.query.filter_by(id=last + 3).update(
+            {SyncChange.created_at: datetime.utcnow() - timedelta(minutes=5)}
+        )
+        db.session.commit()
+        changes, cursor, has_more = SyncChange.changes_since(last)
+        self.assertEqual(([c.id for c in changes], cursor, has_more), ([last + 3], last + 3, False))
+
+
+if __name__ == '__main__':
+    unittest.main()
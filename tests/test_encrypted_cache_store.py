@@ -0,0 +1,164 @@
+"""
+Encrypted Cache Store Test Suite for Stevedores Dashboard 3.0
+Tests the indexed single-file store behind EncryptedCacheManager
+"""
+
+import unittest
+import sys
+import os
+import json
+import base64
+import hashlib
+import shutil
+import sqlite3
+import tempfile
+import time
+from unittest import mock
+
+# Add the parent directory to the Python path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.encrypted_cache import EncryptedCacheManager, CacheClassification
+
+MASTER_KEY = 'test-master-key'
+
+
+class EncryptedCacheStoreTestSuite(unittest.TestCase):
+    """Test suite for the encrypted cache storage engine"""
+
+    def setUp(self):
+        """Set up test environment"""
+        self.cache_dir = tempfile.mkdtemp()
+        self.cache = EncryptedCacheManager(cache_dir=self.cache_dir, master_key=MASTER_KEY)
+
+    def tearDown(self):
+        """Clean up after tests"""
+        shutil.rmtree(self.cache_dir, ignore_errors=True)
+
+    def _raw_rows(self):
+        with sqlite3.connect(self.cache.db_path) as conn:
+            return conn.execute('SELECT key, ciphertext FROM cache_entries').fetchall()
+
+    def test_01_round_trip_stores_raw_ciphertext(self):
+        """Test 1: Entries round-trip and are stored as raw Fernet tokens in one file"""
+        manifest = {'vessel': 'MV Store', 'containers': list(range(50))}
+        self.assertTrue(self.cache.store('manifest_1', manifest, ttl=60, vessel_id=1))
+        self.assertTrue(self.cache.store('note', 'berth B4', ttl=60))
+
+        self.assertEqual(self.cache.retrieve('manifest_1'), manifest)
+        self.assertEqual(self.cache.retrieve('note'), 'berth B4')
+        self.assertTrue(self.cache.exists('note'))
+
+        rows = dict(self._raw_rows())
+        self.assertTrue(bytes(rows['note']).startswith(b'gAAAAA'))
+        self.assertNotIn(b'berth', bytes(rows['note']))
+        self.assertEqual(sorted(f for f in os.listdir(self.cache_dir) if os.path.isfile(os.path.join(self.cache_dir, f))),
+                         ['cache.db', 'cache.db-shm', 'cache.db-wal'])
+
+    def test_02_expiry_sweep_never_decrypts(self):
+        """Test 2: clear_expired removes expired entries from the index without decrypting"""
+        for i in range(20):
+            self.cache.store(f'short_{i}', {'i': i}, ttl=1)
+        self.cache.store('long', {'i': -1}, ttl=60)
+
+        with mock.patch.object(self.cache.cipher_suite, 'decrypt', side_effect=AssertionError('decrypted')):
+            with mock.patch('time.time', return_value=time.time() + 2):
+                self.assertFalse(self.cache.exists('short_0'))
+                self.assertEqual(self.cache.clear_expired(), 20)
+
+        self.assertEqual([key for key, _ in self._raw_rows()], ['long'])
+        self.assertEqual(self.cache.get_cache_stats()['total_entries'], 1)
+
+    def test_03_vessel_purge_uses_index(self):
+        """Test 3: Clearing a vessel removes only that vessel's entries"""
+        for vessel_id in (1, 2):
+            for i in range(3):
+                self.cache.store(f'tally_{vessel_id}_{i}', {'count': i}, ttl=60, vessel_id=vessel_id)
+
+        self.assertEqual(self.cache.clear_vessel(1), 3)
+        self.assertIsNone(self.cache.retrieve('tally_1_0'))
+        self.assertEqual(self.cache.retrieve('tally_2_0'), {'count': 0})
+        self.assertEqual(self.cache.get_cache_stats()['by_vessel'], {'vessel_2': 3})
+
+    def test_04_classification_and_integrity(self):
+        """Test 4: Lookups honour the requested classification and reject tampered entries"""
+        self.cache.store('crew_list', ['A', 'B'], classification=CacheClassification.RESTRICTED)
+        self.assertIsNone(self.cache.retrieve('crew_list', CacheClassification.PUBLIC))
+        self.assertFalse(self.cache.delete('crew_list', CacheClassification.PUBLIC))
+        self.assertEqual(self.cache.retrieve('crew_list', CacheClassification.RESTRICTED), ['A', 'B'])
+
+        with sqlite3.connect(self.cache.db_path) as conn:
+            conn.execute('UPDATE cache_entries SET data_hash = ? WHERE key = ?', ('0' * 64, 'crew_list'))
+        self.assertIsNone(self.cache.retrieve('crew_list'))
+        self.assertFalse(self.cache.exists('crew_list'))
+
+    def test_05_workers_share_the_store_and_legacy_files_migrate(self):
+        """Test 5: A second manager sees writes and deletes; legacy per-key files are imported"""
+        other = EncryptedCacheManager(cache_dir=self.cache_dir, master_key=MASTER_KEY)
+        self.cache.store('shared', {'berth': 'B1'}, ttl=60)
+        self.assertEqual(other.retrieve('shared'), {'berth': 'B1'})
+        other.delete('shared')
+        self.assertFalse(self.cache.exists('shared'))
+
+        legacy_dir = tempfile.mkdtemp()
+        try:
+            os.makedirs(os.path.join(legacy_dir, 'internal'))
+            data = json.dumps({'legacy': True}).encode()
+            entry = {
+                'key': 'old_entry', 'encrypted_data': base64.b64encode(self.cache.cipher_suite.encrypt(data)).decode(),
+                'classification': 'internal', 'created_at': '2026-01-01T00:00:00+00:00', 'expires_at': None,
+                'vessel_id': 4, 'operation_type': None, 'user_id': None, 'access_count': 0,
+                'last_accessed': '2026-01-01T00:00:00+00:00', 'data_hash': hashlib.sha256(data).hexdigest(),
+                'compression_used': False, 'metadata': {'data_type': 'dict', 'original_size': len(data)}
+            }
+            legacy_file = os.path.join(legacy_dir, 'internal', 'old.cache')
+            with open(legacy_file, 'w') as f:
+                json.dump(entry, f)
+
+            migrated = EncryptedCacheManager(cache_dir=legacy_dir, master_key=MASTER_KEY)
+            self.assertEqual(migrated.retrieve('old_entry'), {'legacy': True})
+            self.assertEqual(migrated.clear_vessel(4), 1)
+            self.assertFalse(os.path.exists(legacy_file))
+        finally:
+            shutil.rmtree(legacy_dir, ignore_errors=True)
+
+
+    def test_06_other_process_commits_reread_only_changed_keys(self):
+        """Test 6: Another worker's commits cost a change-log read, not a full index reload"""
+        other = EncryptedCacheManager(cache_dir=self.cache_dir, master_key=MASTER_KEY)
+        for i in range(200):
+            self.cache.store(f'tally_{i}', {'count': i}, ttl=60, vessel_id=i % 5)
+        self.assertTrue(other.exists('tally_199'))
+
+        statements = []
+        other._conn.set_trace_callback(statements.append)
+        self.cache.store('tally_200', {'count': 200}, ttl=60)
+        self.cache.delete('tally_0')
+        self.assertEqual(other.retrieve('tally_200'), {'count': 200})
+        self.assertFalse(other.exists('tally_0'))
+        self.assertTrue(other.exists('tally_1'))
+        other._conn.set_trace_callback(None)
+        scans = [sql for sql in statements if 'FROM cache_entries' in sql and 'WHERE' not in sql]
+        self.assertEqual(scans, [])
+
+        # Reads by other workers only bump access counts, which are not logged
+        statements.clear()
+        other._conn.set_trace_callback(statements.append)
+        self.cache.retrieve('tally_5')
+        self.assertTrue(other.exists('tally_5'))
+        other._conn.set_trace_callback(None)
+        self.assertFalse([sql for sql in statements if 'FROM cache_entries' in sql])
+
+        # A worker left behind a pruned change log falls back to a full reload
+        other.CHANGE_LOG_RETENTION = 0
+        self.cache.CHANGE_LOG_RETENTION = 0
+        self.cache.store('tally_201', {'count': 201}, ttl=60)
+        self.cache.store('tally_202', {'count': 202}, ttl=60)
+        self.cache.clear_expired()
+        self.cache.store('tally_203', {'count': 203}, ttl=60)
+        self.assertTrue(other.exists('tally_201'))
+        self.assertEqual(other.get_cache_stats()['total_entries'], 203)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,99 @@
+"""
+Fallback Cache Test Suite for Stevedores Dashboard 3.0
+Tests lazy expiry, heap eviction and byte accounting of the Redis fallback cache
+"""
+
+import unittest
+import sys
+import os
+import time
+
+# Add the parent directory to the Python path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.redis_client import InMemoryFallbackCache
+
+
+class FallbackCacheTestSuite(unittest.TestCase):
+    """Test suite for InMemoryFallbackCache"""
+
+    def test_01_lazy_expiry_on_access(self):
+        """Test 1: An expired key misses on get and exists without sweeping other keys"""
+        cache = InMemoryFallbackCache(max_size=10, default_ttl=0)
+        cache.set('short', b'1', ttl=0.01)
+        cache.set('forever', b'2')
+        time.sleep(0.02)
+
+        self.assertFalse(cache.exists('short'))
+        self.assertIsNone(cache.get('short'))
+        self.assertEqual(cache.get('forever'), b'2')
+        self.assertEqual((cache.ttl('forever'), cache.ttl('short')), (-1, -2))
+
+        stats = cache.get_stats()
+        self.assertEqual((stats['size'], stats['expirations'], stats['entries_with_ttl']), (1, 1, 0))
+
+    def test_02_writes_evict_expired_from_heap(self):
+        """Test 2: Writes reclaim already-expired entries in bounded batches"""
+        cache = InMemoryFallbackCache(max_size=1000)
+        for i in range(40):
+            cache.set(f'old{i}', b'x', ttl=0.01)
+        time.sleep(0.02)
+
+        cache.set('new', b'y', ttl=60)
+        self.assertEqual(len(cache._cache), 41 - cache.EVICTION_BATCH)
+        self.assertEqual(cache._cleanup_expired(), 40 - cache.EVICTION_BATCH)
+        self.assertEqual(list(cache._cache), ['new'])
+        self.assertLessEqual(cache.ttl('new'), 60)
+
+    def test_03_rewrites_keep_heap_bounded(self):
+        """Test 3: Rewriting a key leaves no live stale expiry and the heap is compacted"""
+        cache = InMemoryFallbackCache(max_size=10)
+        for i in range(500):
+            cache.set('hot', str(i).encode(), ttl=60)
+        self.assertLessEqual(len(cache._expiry_heap), 2 * len(cache._cache) + 64)
+
+        cache.set('hot', b'short', ttl=0.01)
+        time.sleep(0.02)
+        self.assertEqual(cache._cleanup_expired(), 1)
+        self.assertIsNone(cache.get('hot'))
+
+    def test_04_lru_and_byte_limits(self):
+        """Test 4: Least recently used entries are evicted by count and by byte budget"""
+        cache = InMemoryFallbackCache(max_size=3)
+        for key in ('a', 'b', 'c'):
+            cache.set(key, b'v')
+        cache.get('a')
+        cache.set('d', b'v')
+        self.assertEqual(sorted(cache._cache), ['a', 'c', 'd'])
+
+        cache = InMemoryFallbackCache(max_size=100, max_bytes=1000)
+        for i in range(10):
+            cache.set(f'k{i}', b'x' * 200)
+        stats = cache.get_stats()
+        self.assertLessEqual(stats['bytes'], 1000)
+        self.assertEqual(stats['size'], 3)
+        self.assertEqual(stats['evictions'], 7)
+        self.assertIsNotNone(cache.get('k9'))
+
+        cache.delete('k9')
+        cache.clear()
+        self.assertEqual(cache.get_stats()['bytes'], 0)
+
+    def test_05_get_cost_is_independent_of_size(self):
+        """Test 5: Reads at 100k keys cost about the same as at 1k keys"""
+        def time_reads(size):
+            cache = InMemoryFallbackCache(max_size=size)
+            for i in range(size):
+                cache.set(f'key{i}', b'x')
+            start = time.perf_counter()
+            for i in range(2000):
+                cache.get(f'key{i % size}')
+            return time.perf_counter() - start
+
+        small = min(time_reads(1000) for _ in range(3))
+        large = min(time_reads(100000) for _ in range(3))
+        self.assertLess(large, small * 5)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,203 @@
+"""
+JWT Token Cache Test Suite for Stevedores Dashboard 3.0
+Tests the verified-token LRU and the shared jti revocation list
+"""
+
+import unittest
+import sys
+import os
+import time
+from unittest import mock
+
+import jwt
+import redis
+
+# Add the parent directory to the Python path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import app, db, User
+from utils.jwt_auth import JWTAuthManager, TokenRevocationList, BloomFilter, create_api_key, get_jwt_manager
+from tests.test_cache_invalidation import PubSubRedis
+
+
+class HashPubSubRedis(PubSubRedis):
+    """PubSubRedis with the hash commands the revocation list uses"""
+
+    def __init__(self):
+        super().__init__()
+        self.hashes = {}
+        self.hgets = []
+
+    def hset(self, name, key, value):
+        self.hashes.setdefault(name, {})[key] = str(value).encode()
+        return 1
+
+    def hget(self, name, key):
+        self.hgets.append(key)
+        return self.hashes.get(name, {}).get(key)
+
+    def hgetall(self, name):
+        return {key.encode(): value for key, value in self.hashes.get(name, {}).items()}
+
+    def hdel(self, name, *keys):
+        return sum(1 for key in keys if self.hashes.get(name, {}).pop(key, None) is not None)
+
+
+class UnreachableRedis:
+    def __getattr__(self, name):
+        def fail(*args, **kwargs):
+            raise redis.ConnectionError('Redis is down')
+        return fail
+
+    def pubsub(self):
+        return None
+
+
+class JWTTokenCacheTestSuite(unittest.TestCase):
+    """Test suite for JWT verification caching and revocation"""
+
+    def setUp(self):
+        """Set up test environment"""
+        self.managers = []
+
+    def tearDown(self):
+        """Clean up after tests"""
+        for manager in self.managers:
+            manager.revocations.close()
+
+    def _manager(self, redis_client=None):
+        manager = JWTAuthManager(app)
+        manager.revocations = TokenRevocationList(redis_client)
+        self.managers.append(manager)
+        return manager
+
+    def _wait_for(self, condition, timeout=2.0):
+        deadline = time.time() + timeout
+        while not condition() and time.time() < deadline:
+            time.sleep(0.01)
+        self.assertTrue(condition())
+
+    def test_01_repeat_verifications_skip_decoding(self):
+        """Test 1: The same access token is decoded once however often it is verified"""
+        manager = self._manager()
+        token = manager.generate_tokens(7)['access_token']
+
+        with mock.patch('utils.jwt_auth.jwt.decode', wraps=jwt.decode) as decode:
+            for _ in range(100):
+                self.assertEqual(manager.verify_token(token)['user_id'], 7)
+            self.assertIsNone(manager.verify_token(token, 'refresh'))
+        self.assertEqual(decode.call_count, 1)
+        self.assertEqual(manager.verified_stats['hits'], 100)
+
+        # Callers get their own copy of the claims
+        manager.verify_token(token)['user_id'] = 99
+        self.assertEqual(manager.verify_token(token)['user_id'], 7)
+
+    def test_02_cache_is_bounded_and_expires_with_the_token(self):
+        """Test 2: The LRU holds at most verified_cache_size tokens, each until its exp"""
+        manager = self._manager()
+        manager.verified_cache_size = 3
+        tokens = [manager.generate_tokens(user_id)['access_token'] for user_id in range(5)]
+        for token in tokens:
+            manager.verify_token(token)
+        self.assertEqual(len(manager._verified), 3)
+
+        claims, expires_at = next(reversed(manager._verified.values()))
+        self.assertEqual(expires_at, claims['exp'])
+
+        with mock.patch('utils.jwt_auth.time.time', return_value=expires_at + 1):
+            self.assertIsNone(manager._cached_claims(next(reversed(manager._verified))))
+        self.assertEqual(len(manager._verified), 2)
+
+    def test_03_revoked_tokens_are_rejected(self):
+        """Test 3: Revoking any token type blocks it, including cached ones, and leaves other tokens valid"""
+        manager = self._manager()
+        tokens = manager.generate_tokens(3)
+        other = manager.generate_tokens(3)['access_token']
+        manager.verify_token(tokens['access_token'])
+
+        self.assertTrue(manager.revoke_token(tokens['access_token']))
+        self.assertIsNone(manager.verify_token(tokens['access_token']))
+        self.assertIsNotNone(manager.verify_token(other))
+
+        # Refreshed tokens get fresh IDs rather than the refresh token's
+        refreshed = manager.refresh_access_token(tokens['refresh_token'])
+        self.assertIsNotNone(manager.verify_token(refreshed['access_token']))
+
+        # Refresh tokens and API keys are revocable too, and stay revoked for their own type
+        self.assertTrue(manager.revoke_token(tokens['refresh_token']))
+        self.assertIsNone(manager.verify_token(tokens['refresh_token'], 'refresh'))
+        self.assertIsNone(manager.refresh_access_token(tokens['refresh_token']))
+        with mock.patch('utils.jwt_auth.jwt_manager', manager):
+            api_key = create_api_key(3, 'crane telemetry')['api_key']
+        self.assertIsNotNone(manager.verify_token(api_key, 'api_key'))
+        self.assertTrue(manager.revoke_token(api_key))
+        self.assertIsNone(manager.verify_token(api_key, 'api_key'))
+
+        bloom = BloomFilter(capacity=1000, error_rate=0.01)
+        for i in range(1000):
+            bloom.add(f'jti-{i}')
+        self.assertTrue(all(f'jti-{i}' in bloom for i in range(1000)))
+        self.assertLess(sum(f'other-{i}' in bloom for i in range(10000)), 300)
+
+    def test_04_revocations_reach_other_workers(self):
+        """Test 4: A revocation in one worker is honoured by another, which skips Redis for clean tokens"""
+        shared = HashPubSubRedis()
+        worker_a, worker_b = self._manager(shared), self._manager(shared)
+        token = worker_a.generate_tokens(5)['access_token']
+        clean = worker_a.generate_tokens(6)['access_token']
+
+        self.assertIsNotNone(worker_b.verify_token(token))
+        self._wait_for(worker_b.revocations._listener_ready.is_set)
+
+        checks = len(shared.hgets)
+        for _ in range(50):
+            self.assertIsNotNone(worker_b.verify_token(clean))
+        self.assertEqual(len(shared.hgets), checks)
+
+        worker_a.revoke_token(token)
+        self._wait_for(lambda: worker_b.verify_token(token) is None)
+
+        # A worker that subscribes later loads existing revocations
+        worker_c = self._manager(shared)
+        self.assertIsNone(worker_c.verify_token(token))
+        self._wait_for(worker_c.revocations._listener_ready.is_set)
+        self.assertIsNone(worker_c.verify_token(token))
+
+    def test_05_revocation_falls_back_to_memory(self):
+        """Test 5: Without a reachable Redis, revocations still apply in the worker that made them"""
+        manager = self._manager(UnreachableRedis())
+        token = manager.generate_tokens(8)['access_token']
+        other = manager.generate_tokens(8)['access_token']
+
+        self.assertTrue(manager.revoke_token(token))
+        self.assertIsNone(manager.verify_token(token))
+        self.assertIsNotNone(manager.verify_token(other))
+
+    def test_06_logout_revokes_the_refresh_token(self):
+        """Test 6: After API logout neither the access token nor the refresh token works"""
+        # Bearer-token API calls carry no CSRF token; other suites may leave CSRF enabled on the shared app
+        with mock.patch.dict(app.config, {'WTF_CSRF_ENABLED': False}), app.app_context():
+            db.create_all()
+            user = User(username='logout_user', email='logout@test.com')
+            user.set_password('password')
+            db.session.add(user)
+            db.session.commit()
+            try:
+                tokens = get_jwt_manager().generate_tokens(user.id, {'maritime_context': True})
+                client = app.test_client()
+                response = client.post('/auth/api/logout', json={'refresh_token': tokens['refresh_token']},
+                                       headers={'Authorization': f"Bearer {tokens['access_token']}"})
+                self.assertEqual(response.status_code, 200)
+
+                self.assertIsNone(get_jwt_manager().verify_token(tokens['access_token']))
+                self.assertIsNone(get_jwt_manager().verify_token(tokens['refresh_token'], 'refresh'))
+                response = client.post('/auth/api/refresh', json={'refresh_token': tokens['refresh_token']})
+                self.assertEqual(response.status_code, 401)
+            finally:
+                db.session.remove()
+                db.drop_all()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,172 @@
+"""
+Live Events Test Suite for Stevedores Dashboard 3.0
+Tests the push channel for vessel progress, cargo tallies and sync status
+"""
+
+import unittest
+import sys
+import os
+import json
+
+# Add the parent directory to the Python path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import app, db, User, Vessel
+from utils.live_events import (
+    LiveEventBroker, get_live_event_broker, reset_live_event_broker,
+    CARGO_TALLY, VESSEL_PROGRESS, SYNC_STATUS
+)
+
+
+class LiveEventsTestSuite(unittest.TestCase):
+    """Test suite for the live event broker and endpoints"""
+
+    def setUp(self):
+        """Set up test environment"""
+        self.app = app
+        self.app.config['TESTING'] = True
+        self.client = self.app.test_client()
+        reset_live_event_broker()
+
+        with self.app.app_context():
+            db.create_all()
+            user = User(username='live_user', email='live@test.com')
+            user.set_password('password')
+            vessel = Vessel(name='MV Live', total_cargo_capacity=100)
+            db.session.add_all([user, vessel])
+            db.session.commit()
+            self.user_id, self.vessel_id = user.id, vessel.id
+
+        with self.client.session_transaction() as sess:
+            sess['_user_id'] = str(self.user_id)
+            sess['_fresh'] = True
+
+    def tearDown(self):
+        """Clean up after tests"""
+        reset_live_event_broker()
+        with self.app.app_context():
+            db.session.remove()
+            db.drop_all()
+
+    def test_01_broker_fans_out_with_filters(self):
+        """Test 1: Subscribers only receive events matching their vessel and type filters"""
+        broker = LiveEventBroker()
+        vessel_sub = broker.subscribe(vessel_ids=[1], event_types=[CARGO_TALLY])
+        sync_sub = broker.subscribe(event_types=[SYNC_STATUS])
+
+        broker.publish(CARGO_TALLY, {'count': 5}, vessel_id=2)
+        broker.publish(CARGO_TALLY, {'count': 7}, vessel_id=1)
+        broker.publish(SYNC_STATUS, {'sync_in_progress': True})
+
+        self.assertEqual(vessel_sub.get(timeout=0.1)['data'], {'count': 7})
+        self.assertIsNone(vessel_sub.get(timeout=0.01))
+        self.assertEqual(sync_sub.get(timeout=0.1)['type'], SYNC_STATUS)
+
+        broker.unsubscribe(vessel_sub)
+        broker.publish(CARGO_TALLY, {'count': 1}, vessel_id=1)
+        self.assertIsNone(vessel_sub.get(timeout=0.01))
+        self.assertEqual(broker.get_stats()['subscribers'], 1)
+
+    def test_02_slow_subscriber_queue_is_bounded(self):
+        """Test 2: A slow client keeps only the newest events"""
+        broker = LiveEventBroker(max_queue=3)
+        subscription = broker.subscribe()
+        for i in range(10):
+            broker.publish(VESSEL_PROGRESS, {'progress': i}, vessel_id=1)
+
+        received = [subscription.get(timeout=0.01)['data']['progress'] for _ in range(3)]
+        self.assertEqual(received, [7, 8, 9])
+        self.assertEqual(subscription.dropped, 7)
+
+    def test_03_long_poll_returns_tally_events(self):
+        """Test 3: Tally POST publishes events picked up by the long-poll endpoint"""
+        response = self.client.get('/live/poll?since=0')
+        cursor = response.get_json()['cursor']
+
+        self.client.post(f'/api/vessels/{self.vessel_id}/cargo-tally', json={'cargo_count': 25})
+
+        response = self.client.get(f'/live/poll?since={cursor}&vessel_id={self.vessel_id}&timeout=0')
+        self.assertEqual(response.status_code, 200)
+        events = response.get_json()['events']
+        self.assertEqual([e['type'] for e in events], [CARGO_TALLY, VESSEL_PROGRESS])
+        self.assertEqual(events[0]['data']['total_loaded'], 25)
+        self.assertAlmostEqual(events[1]['data']['progress'], 25.0)
+
+        # Nothing newer than the returned cursor
+        next_cursor = response.get_json()['cursor']
+        response = self.client.get(f'/live/poll?since={next_cursor}&timeout=0')
+        self.assertEqual(response.get_json()['events'], [])
+
+        # Malformed or non-finite parameters are a client error, not a 500
+        for query in ('since=abc', f'since={next_cursor}&timeout=abc', f'since={next_cursor}&timeout=nan'):
+            self.assertEqual(self.client.get(f'/live/poll?{query}').status_code, 400, query)
+        response = self.client.get(f'/live/poll?since={next_cursor}&timeout=-5')
+        self.assertEqual(response.status_code, 200)
+
+    def test_04_sse_stream_delivers_events(self):
+        """Test 4: The SSE stream emits frames for published events and ends at its time budget"""
+        self.app.config['LIVE_STREAM_MAX_SECONDS'] = 0.5
+        self.app.config['LIVE_HEARTBEAT_SECONDS'] = 0.1
+        try:
+            response = self.client.get('/live/stream?types=vessel_progress')
+            self.assertEqual(response.mimetype, 'text/event-stream')
+            self.assertEqual(response.headers['X-Accel-Buffering'], 'no')
+
+            chunks = response.response
+            self.assertIn('retry:', next(chunks).decode())
+
+            with self.app.app_context():
+                get_live_event_broker().publish(VESSEL_PROGRESS, {'progress': 40.0}, vessel_id=self.vessel_id)
+                get_live_event_broker().publish(CARGO_TALLY, {'tally': None}, vessel_id=self.vessel_id)
+
+            body = b''.join(chunks).decode()
+            response.close()
+        finally:
+            self.app.config.pop('LIVE_STREAM_MAX_SECONDS')
+            self.app.config.pop('LIVE_HEARTBEAT_SECONDS')
+
+        frames = [f for f in body.split('\n\n') if f.startswith('id:')]
+        self.assertEqual(len(frames), 1)
+        self.assertIn('event: vessel_progress', frames[0])
+        payload = json.loads(frames[0].split('data: ', 1)[1])
+        self.assertEqual(payload['data']['progress'], 40.0)
+        self.assertEqual(get_live_event_broker().get_stats()['subscribers'], 0)
+
+    def test_05_stream_requires_login(self):
+        """Test 5: Live endpoints return JSON 401 for anonymous clients"""
+        anonymous = self.app.test_client()
+        self.assertEqual(anonymous.get('/live/stream').status_code, 401)
+        self.assertEqual(anonymous.get('/live/poll').status_code, 401)
+
+
+    def test_06_live_connections_are_capped_per_worker(self):
+        """Test 6: Past LIVE_MAX_STREAMS, streams and waiting polls get 503 with a retry hint"""
+        self.app.config['LIVE_MAX_STREAMS'] = 1
+        self.app.config['LIVE_HEARTBEAT_SECONDS'] = 0.1
+        try:
+            stream = self.client.get('/live/stream')
+            self.assertIn('retry:', next(stream.response).decode())
+
+            busy = self.client.get('/live/stream')
+            self.assertEqual(busy.status_code, 503)
+            self.assertEqual(busy.headers['Retry-After'], '15')
+            self.assertEqual(busy.get_json()['retry_after'], 15)
+
+            cursor = self.client.get('/live/poll?since=0').get_json()['cursor']
+            self.assertEqual(self.client.get(f'/live/poll?since={cursor}&timeout=0.1').status_code, 503)
+            self.assertEqual(self.client.get(f'/live/poll?since={cursor}&timeout=0').status_code, 200)
+
+            stats = self.client.get('/live/stats').get_json()['stats']
+            self.assertEqual((stats['worker_connections'], stats['worker_connection_limit']), (1, 1))
+
+            stream.close()
+            self.assertEqual(self.client.get('/live/stats').get_json()['stats']['worker_connections'], 0)
+            self.assertEqual(self.client.get(f'/live/poll?since={cursor}&timeout=0.1').status_code, 200)
+            self.assertEqual(self.client.get('/live/stats').get_json()['stats']['worker_connections'], 0)
+        finally:
+            self.app.config.pop('LIVE_MAX_STREAMS')
+            self.app.config.pop('LIVE_HEARTBEAT_SECONDS')
+
+
+if __name__ == '__main__':
+    unittest.main()
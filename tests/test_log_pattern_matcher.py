@@ -0,0 +1,127 @@
+"""
+Log Pattern Matcher Test Suite for Stevedores Dashboard 3.0
+Tests the keyword prefilter and combined regex used by the maritime log aggregator
+"""
+
+import unittest
+import sys
+import os
+import logging
+
+# Add the parent directory to the Python path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.log_aggregator import (
+    MaritimeLogAggregator, MaritimePatternMatcher, MaritimePatternType, LogPattern, PatternSeverity,
+    _required_literal
+)
+
+MESSAGES = [
+    'Vessel MV Aurora delayed by 45 minutes',
+    'VESSEL MV Aurora DELAYED 12 MINUTES',
+    'crane 3 malfunction; vessel delayed 20 minutes waiting',
+    'GET /api/vessels/4 200 in 12ms',
+    'status report\nfuel spillage of 3.5 liters near berth 2',
+    'Sync failed after 3 attempts and sync timeout 30 seconds',
+    'oom killer activated on worker 2',
+    'memory usage 91 percent warning, memory usage 95 percent critical',
+    '',
+]
+
+
+class LogPatternMatcherTestSuite(unittest.TestCase):
+    """Test suite for MaritimePatternMatcher"""
+
+    @classmethod
+    def setUpClass(cls):
+        """Load the maritime patterns from one stopped aggregator"""
+        logging.getLogger('stevedores').disabled = True
+        cls.aggregator = MaritimeLogAggregator()
+        cls.aggregator.stop_processing()
+
+    @classmethod
+    def tearDownClass(cls):
+        """Re-enable structured logging"""
+        logging.getLogger('stevedores').disabled = False
+
+    def setUp(self):
+        """Fresh matcher over the aggregator's patterns"""
+        self.matcher = MaritimePatternMatcher(self.aggregator.patterns)
+
+    def _legacy_match(self, message):
+        return [
+            pattern_type for pattern_type, pattern in self.aggregator.patterns.items()
+            if any(compiled.search(message) for compiled in pattern.compiled_patterns)
+        ]
+
+    def test_01_required_literals(self):
+        """Test 1: Only mandatory top-level literals are used as prefilter keywords"""
+        self.assertEqual(_required_literal(r'cargo.*tally.*discrepancy.*(\d+)'), 'discrepancy')
+        self.assertEqual(_required_literal(r'Emission.*Limit'), 'emission')
+        self.assertIsNone(_required_literal(r'vessel|crane'))
+        self.assertIsNone(_required_literal(r'(\d+)\s*ms'))
+        self.assertIsNone(_required_literal(r'[unclosed'))
+
+    def test_02_agrees_with_per_pattern_search(self):
+        """Test 2: Every message matches the same pattern types as searching each regex"""
+        for message in MESSAGES:
+            self.assertEqual(self.matcher.match(message), self._legacy_match(message), message)
+
+        self.assertEqual(
+            self.matcher.match(MESSAGES[2]),
+            [MaritimePatternType.VESSEL_DELAY, MaritimePatternType.EQUIPMENT_FAILURE]
+        )
+
+    def test_03_lines_without_keywords_skip_the_regex(self):
+        """Test 3: Routine lines are rejected by the prefilter and compile nothing"""
+        for _ in range(100):
+            self.assertEqual(self.matcher.match('GET /api/vessels/4 200 in 12ms'), [])
+        self.assertEqual(self.matcher.stats['prefilter_skips'], 100)
+        self.assertEqual(self.matcher.stats['regex_calls'], 0)
+        self.assertEqual(self.matcher._combined, {})
+
+        for _ in range(10):
+            self.matcher.match('Vessel MV Aurora delayed by 45 minutes')
+        self.assertEqual(len(self.matcher._combined), 1)
+        self.assertEqual(self.matcher.stats['regex_calls'], 10)
+
+    def test_04_patterns_without_keywords_and_clashing_groups(self):
+        """Test 4: Unanchored regexes always run and uncombinable sources fall back to search()"""
+        patterns = {
+            MaritimePatternType.RATE_LIMIT_BREACH: LogPattern(
+                MaritimePatternType.RATE_LIMIT_BREACH, [r'(?P<n>\d+)\s+x\s+4\d\d'], PatternSeverity.WARNING,
+                5, 1, 'Rate limit', 'Throttled clients'
+            ),
+            MaritimePatternType.AUTHENTICATION_ANOMALY: LogPattern(
+                MaritimePatternType.AUTHENTICATION_ANOMALY, [r'(?P<n>\d+) logins? refused'],
+                PatternSeverity.WARNING, 5, 1, 'Auth', 'Locked accounts'
+            ),
+        }
+        matcher = MaritimePatternMatcher(patterns)
+        self.assertEqual(matcher.match('12 x 429 and 3 logins refused'), list(patterns))
+        self.assertEqual(matcher.match('3 LOGIN REFUSED'), [MaritimePatternType.AUTHENTICATION_ANOMALY])
+        self.assertEqual(matcher.match('all quiet'), [])
+        self.assertEqual(matcher.stats['prefilter_skips'], 0)
+
+    def test_05_aggregator_handles_every_fired_type(self):
+        """Test 5: A log entry is matched once and handled for each type, including the level rule"""
+        handled = []
+        self.aggregator._handle_pattern_match = lambda pattern_type, *args: handled.append(pattern_type)
+        try:
+            self.aggregator._process_log_entry({'message': MESSAGES[2], 'level': 'INFO'})
+            self.assertEqual(handled, [MaritimePatternType.VESSEL_DELAY, MaritimePatternType.EQUIPMENT_FAILURE])
+
+            handled.clear()
+            self.aggregator._process_log_entry({
+                'message': 'Security camera feed lost; vessel delayed 5 minutes', 'level': 'CRITICAL'
+            })
+            self.assertEqual(handled, [MaritimePatternType.VESSEL_DELAY, MaritimePatternType.SECURITY_BREACH])
+        finally:
+            del self.aggregator._handle_pattern_match
+
+        summary = self.aggregator.get_pattern_summary()
+        self.assertEqual(summary['matcher_stats']['messages'], 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,120 @@
+"""
+Offline Authentication Index Test Suite for Stevedores Dashboard 3.0
+Tests the salted username index used to find offline tokens
+"""
+
+import unittest
+import sys
+import os
+import hashlib
+import shutil
+import tempfile
+import time
+from unittest import mock
+
+# Add the parent directory to the Python path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.encrypted_cache import EncryptedCacheManager
+from utils.offline_auth import OfflineAuthenticationManager, OfflineAuthStatus
+
+
+def fast_hash_password(password, salt=None):
+    """Cheap stand-in for PBKDF2 so populating many users stays quick"""
+    salt = salt or 'test-salt'
+    return hashlib.sha256(f'{salt}:{password}'.encode()).hexdigest(), salt
+
+
+class OfflineAuthIndexTestSuite(unittest.TestCase):
+    """Test suite for offline token lookup by username"""
+
+    def setUp(self):
+        """Set up test environment"""
+        self.cache_dir = tempfile.mkdtemp()
+        self.cache = EncryptedCacheManager(cache_dir=self.cache_dir, master_key='test-master-key')
+        self.manager = self._manager()
+
+    def tearDown(self):
+        """Clean up after tests"""
+        shutil.rmtree(self.cache_dir, ignore_errors=True)
+
+    def _manager(self):
+        manager = OfflineAuthenticationManager(cache=self.cache)
+        manager._hash_password = fast_hash_password
+        return manager
+
+    def _add_users(self, user_ids):
+        for user_id in user_ids:
+            self.manager.create_offline_token(
+                user_id, f'stevedore{user_id}', f'user{user_id}@test.com', f'password{user_id}'
+            )
+
+    def test_01_users_above_999_can_log_in(self):
+        """Test 1: Offline login works for user IDs the old 1..999 scan never reached"""
+        self._add_users([5, 1500])
+
+        status, token = self.manager.authenticate_offline('stevedore1500', 'password1500')
+        self.assertEqual(status, OfflineAuthStatus.AUTHENTICATED)
+        self.assertEqual(token.user_id, 1500)
+
+        status, _ = self.manager.authenticate_offline('stevedore1500', 'wrong')
+        self.assertEqual(status, OfflineAuthStatus.INVALID)
+        status, _ = self.manager.authenticate_offline('nobody', 'password5')
+        self.assertEqual(status, OfflineAuthStatus.INVALID)
+
+    def test_02_lookup_is_a_single_index_read(self):
+        """Test 2: Finding a token reads the index entry and the token, nothing else"""
+        self._add_users(range(1, 50))
+
+        with mock.patch.object(self.cache, 'retrieve', wraps=self.cache.retrieve) as retrieve:
+            token = self.manager._find_user_token('stevedore42')
+        self.assertEqual(token.user_id, 42)
+        self.assertEqual(retrieve.call_count, 2)
+
+        with mock.patch.object(self.cache, 'retrieve', wraps=self.cache.retrieve) as retrieve:
+            self.assertIsNone(self.manager._find_user_token('stevedore999'))
+        self.assertEqual(retrieve.call_count, 1)
+
+    def test_03_index_keys_are_salted_hashes(self):
+        """Test 3: Index keys do not contain the username and change with the auth key"""
+        key = self.manager._username_index_key('stevedore7')
+        self.assertNotIn('stevedore7', key)
+        self.assertEqual(key, self.manager._username_index_key('stevedore7'))
+        self.assertNotEqual(key, self.manager._username_index_key('Stevedore7'))
+
+        with mock.patch.dict(os.environ, {'STEVEDORES_AUTH_KEY': 'another-site'}):
+            self.assertNotEqual(key, self._manager()._username_index_key('stevedore7'))
+
+    def test_04_reissue_and_revoke_update_the_index(self):
+        """Test 4: A reissued token replaces the old one and revoking it removes the index entry"""
+        first = self.manager.create_offline_token(7, 'stevedore7', 'a@test.com', 'old-password')
+        time.sleep(0.001)
+        second = self.manager.create_offline_token(7, 'stevedore7', 'a@test.com', 'new-password')
+
+        self.assertEqual(self.manager._find_user_token('stevedore7').token_id, second.token_id)
+        self.assertTrue(self.manager.revoke_offline_token(first.token_id))
+        self.assertTrue(self.cache.exists(self.manager._username_index_key('stevedore7')))
+
+        self.assertTrue(self.manager.revoke_offline_token(second.token_id))
+        self.assertFalse(self.cache.exists(self.manager._username_index_key('stevedore7')))
+        self.assertIsNone(self.manager._find_user_token('stevedore7'))
+
+    def test_05_login_latency_is_flat_in_user_count(self):
+        """Test 5: Offline login with 1000 users costs about the same as with 10"""
+        def time_logins(user_count):
+            self.cache.purge_all()
+            self._add_users(range(1, user_count + 1))
+            username = f'stevedore{user_count}'
+            start = time.perf_counter()
+            for _ in range(20):
+                status, _ = self.manager.authenticate_offline(username, f'password{user_count}')
+                self.assertEqual(status, OfflineAuthStatus.AUTHENTICATED)
+            return time.perf_counter() - start
+
+        small = min(time_logins(10) for _ in range(2))
+        large = min(time_logins(1000) for _ in range(2))
+        self.assertLess(large, small * 3)
+
+
+if __name__ == '__main__':
+    unittest.main()
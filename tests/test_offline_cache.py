@@ -0,0 +1,154 @@
+"""
+Offline Cache Test Suite for Stevedores Dashboard 3.0
+Tests the shared OfflineDataManager stores, TTLs and write-through invalidation
+"""
+
+import unittest
+import sys
+import os
+import time
+
+# Add the parent directory to the Python path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import app, db, User, Vessel
+from utils.offline_cache import LocalCacheStore, RedisCacheStore, LayeredCacheStore
+from utils.offline_data_manager import OfflineDataManager, DataStatus
+
+
+class DictRedis:
+    """The slice of EnterpriseRedisClient the cache store uses, kept in a dict"""
+
+    def __init__(self):
+        self.data = {}
+        self.ttls = {}
+        self.gets = []
+
+    def get(self, key):
+        self.gets.append(key)
+        return self.data.get(key)
+
+    def set(self, key, value, ex=None):
+        self.data[key] = value.encode() if isinstance(value, str) else value
+        self.ttls[key] = ex
+        return True
+
+    def incr(self, key, amount=1):
+        self.data[key] = str(int(self.data.get(key, b'0')) + amount).encode()
+        return int(self.data[key])
+
+    def expire(self, key, ttl):
+        self.ttls[key] = ttl
+        return True
+
+    def delete(self, *keys):
+        return sum(1 for key in keys if self.data.pop(key, None) is not None)
+
+    def publish(self, channel, message):
+        return 0
+
+    def pubsub(self):
+        return None  # No subscriptions - listeners keep backing off
+
+
+class OfflineCacheTestSuite(unittest.TestCase):
+    """Test suite for the offline cache stores"""
+
+    def setUp(self):
+        """Set up test environment"""
+        self.redis = DictRedis()
+        self.shared = RedisCacheStore(self.redis)
+        # Two gunicorn workers: separate local LRUs over the same Redis
+        self.worker_a = OfflineDataManager(store=LayeredCacheStore(self.shared, local_ttl=0))
+        self.worker_b = OfflineDataManager(store=LayeredCacheStore(self.shared, local_ttl=0))
+
+    def test_01_local_store_is_bounded_and_expires(self):
+        """Test 1: The in-process LRU evicts least recently used entries and honours TTLs"""
+        store = LocalCacheStore(max_entries=2)
+        store.set('a', 1)
+        store.set('b', 2)
+        store.get('a')
+        store.set('c', 3)
+        self.assertEqual((store.get('a'), store.get('b'), store.get('c')), (1, None, 3))
+
+        store.set('short', 'x', ttl=0.01)
+        time.sleep(0.02)
+        self.assertIsNone(store.get('short'))
+
+    def test_02_workers_share_snapshot_and_see_writes(self):
+        """Test 2: A progress update in one worker is served by every other worker"""
+        self.worker_a.cache_vessel_data([{'id': 1, 'name': 'MV Shared', 'progress_percentage': 10.0}])
+        self.assertEqual(self.worker_b.get_cached_vessels()['vessels'][0]['name'], 'MV Shared')
+
+        self.worker_a.update_vessel_progress('1', 55.0)
+        vessel = self.worker_b.get_cached_vessels()['vessels'][0]
+        self.assertEqual((vessel['progress_percentage'], vessel['status']), (55.0, 'operations_active'))
+        self.assertEqual(self.worker_b.get_cached_vessels()['status'], DataStatus.FRESH)
+
+    def test_03_unchanged_entries_revalidate_by_version_only(self):
+        """Test 3: A local copy is revalidated with the version key, not a payload re-read"""
+        self.worker_a.cache_vessel_data([{'id': i} for i in range(50)])
+        self.worker_b.get_cached_vessels()
+        self.redis.gets.clear()
+
+        for _ in range(5):
+            self.assertEqual(self.worker_b.get_cached_vessels()['count'], 50)
+        self.assertEqual(set(self.redis.gets), {'offline_cache:vessels:version'})
+
+        # With a local TTL the hot path doesn't touch Redis at all
+        worker_c = OfflineDataManager(store=LayeredCacheStore(self.shared, local_ttl=60))
+        worker_c.get_cached_vessels()
+        self.redis.gets.clear()
+        worker_c.get_cached_vessels()
+        self.assertEqual(self.redis.gets, [])
+
+    def test_04_ttls_follow_cache_duration(self):
+        """Test 4: Server snapshots expire with cache_duration; offline-created vessels never do"""
+        self.worker_a.cache_vessel_data([{'id': 1}])
+        self.worker_a.cache_cargo_tallies(1, [{'id': 9}])
+        self.worker_a.add_offline_vessel({'name': 'MV Offline'})
+
+        retention = self.worker_a.retention_multiplier
+        self.assertEqual(self.redis.ttls['offline_cache:vessels'], 300 * retention)
+        self.assertEqual(self.redis.ttls['offline_cache:cargo_tallies_1'], 60 * retention)
+        self.assertIsNone(self.redis.ttls['offline_cache:offline_vessels'])
+
+    def test_05_tally_insert_writes_through(self):
+        """Test 5: A tally POST drops the vessel's cached tallies and updates its cached progress"""
+        from routes.offline_dashboard import offline_data_manager
+
+        with app.app_context():
+            db.create_all()
+            user = User(username='cache_user', email='cache@test.com')
+            user.set_password('password')
+            vessel = Vessel(name='MV Cached', total_cargo_capacity=100)
+            db.session.add_all([user, vessel])
+            db.session.commit()
+            user_id, vessel_id = user.id, vessel.id
+
+        try:
+            client = app.test_client()
+            with client.session_transaction() as sess:
+                sess['_user_id'] = str(user_id)
+                sess['_fresh'] = True
+
+            with app.app_context():
+                offline_data_manager.cache_vessel_data([{'id': vessel_id, 'progress_percentage': 0.0}])
+                offline_data_manager.cache_cargo_tallies(vessel_id, [])
+
+            client.post(f'/api/vessels/{vessel_id}/cargo-tally', json={'cargo_count': 40})
+
+            with app.app_context():
+                cached = offline_data_manager.get_cached_vessels()['vessels'][0]
+                self.assertEqual(cached['progress_percentage'], 40.0)
+                self.assertEqual(offline_data_manager.get_cached_cargo_tallies(vessel_id)['count'], 0)
+                self.assertEqual(offline_data_manager.get_cached_cargo_tallies(vessel_id)['status'], DataStatus.EXPIRED)
+        finally:
+            with app.app_context():
+                offline_data_manager.clear_cache()
+                db.session.remove()
+                db.drop_all()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,114 @@
+"""
+Pattern Window Test Suite for Stevedores Dashboard 3.0
+Tests bucketed sliding-window thresholds and bounded exemplars in the log aggregator
+"""
+
+import unittest
+import sys
+import os
+import logging
+from datetime import datetime, timezone, timedelta
+
+# Add the parent directory to the Python path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.log_aggregator import MaritimeLogAggregator, MaritimePatternType, PatternWindow
+
+BASE = 1_700_000_040.0  # start of a minute
+
+
+class PatternWindowTestSuite(unittest.TestCase):
+    """Test suite for PatternWindow and aggregator thresholds"""
+
+    @classmethod
+    def setUpClass(cls):
+        """Silence structured logging for alert generation"""
+        logging.getLogger('stevedores').disabled = True
+
+    @classmethod
+    def tearDownClass(cls):
+        """Re-enable structured logging"""
+        logging.getLogger('stevedores').disabled = False
+
+    def setUp(self):
+        """Stopped aggregator so entries are processed synchronously"""
+        self.aggregator = MaritimeLogAggregator()
+        self.aggregator.stop_processing()
+
+    def _process(self, message, when, **fields):
+        self.aggregator._process_log_entry({
+            'message': message,
+            'timestamp': when.isoformat(),
+            **fields
+        })
+
+    def test_01_counts_slide_with_time(self):
+        """Test 1: Matches leave the count once their bucket falls out of the window"""
+        window = PatternWindow(window_minutes=5)
+        self.assertEqual(window.add(BASE, {'n': 1}), 1)
+        self.assertEqual(window.add(BASE + 90, {'n': 2}), 2)
+        self.assertEqual(window.add(BASE + 240, {'n': 3}), 3)
+
+        self.assertEqual(window.count(BASE + 299), 3)
+        self.assertEqual(window.count(BASE + 300), 2)
+        self.assertEqual(window.add(BASE + 400, {'n': 4}), 2)
+        self.assertAlmostEqual(window.span_minutes(BASE + 400), (400 - 240) / 60.0)
+        self.assertEqual([e['n'] for _, e in window.recent_exemplars(BASE + 400)], [3, 4])
+        self.assertEqual(window.count(BASE + 3600), 0)
+
+    def test_02_memory_is_fixed_per_pattern(self):
+        """Test 2: 100k matches use the same slots and at most max_exemplars entries"""
+        window = PatternWindow(window_minutes=60, max_exemplars=10)
+        for i in range(100000):
+            window.add(BASE + i * 0.5, {'i': i})
+
+        self.assertEqual(window.size, 60)
+        self.assertEqual((len(window._buckets), len(window._counts)), (60, 60))
+        self.assertEqual(len(window.exemplars), 10)
+        self.assertEqual(window.total, 100000)
+        # 59 full minutes of 120 matches plus the 40 so far in the current minute
+        self.assertEqual(window.count(BASE + 99999 * 0.5), 59 * 120 + 40)
+
+    def test_03_late_entries_outside_the_ring(self):
+        """Test 3: An entry older than the ring is counted in total but not in the window"""
+        window = PatternWindow(window_minutes=2)
+        window.add(BASE + 600, {'n': 'new'})
+        self.assertEqual(window.add(BASE, {'n': 'late'}), 1)
+        self.assertEqual(window.count(BASE + 600), 1)
+        self.assertEqual(window.total, 2)
+        self.assertEqual([e['n'] for _, e in window.exemplars], ['new'])
+
+    def test_04_threshold_uses_the_pattern_window(self):
+        """Test 4: Vessel delays alert on the second match within 60 minutes, not across hours"""
+        start = datetime(2026, 3, 1, 8, 0, tzinfo=timezone.utc)
+        self._process('Vessel MV Aurora delayed by 40 minutes', start, vessel_id=7)
+        self.assertEqual(len(self.aggregator.pattern_matches), 0)
+
+        self._process('Vessel MV Aurora delayed by 55 minutes', start + timedelta(minutes=30), vessel_id=7)
+        alert = self.aggregator.pattern_matches[-1]
+        self.assertEqual(alert.pattern_type, MaritimePatternType.VESSEL_DELAY)
+        self.assertEqual(alert.occurrence_count, 2)
+        self.assertAlmostEqual(alert.time_span_minutes, 30.0)
+        self.assertEqual(alert.maritime_context, {'vessel_id': 7})
+
+        self._process('Vessel MV Borealis delayed by 20 minutes', start + timedelta(hours=3))
+        self.assertEqual(len(self.aggregator.pattern_matches), 1)
+
+    def test_05_alerts_carry_bounded_exemplars(self):
+        """Test 5: Thousands of matches keep per-type state and alert samples bounded"""
+        now = datetime.now(timezone.utc)
+        for i in range(3000):
+            self._process(f'Cargo tally discrepancy of {i} containers', now)
+
+        window = self.aggregator.pattern_windows[MaritimePatternType.CARGO_DISCREPANCY]
+        self.assertEqual(window.count(now.timestamp()), 3000)
+        self.assertEqual(len(window.exemplars), 10)
+        alert = self.aggregator.pattern_matches[-1]
+        self.assertEqual(alert.occurrence_count, 3000)
+        self.assertEqual(len(alert.log_entries), 10)
+        self.assertEqual(self.aggregator.active_pattern_count(), 1)
+        self.assertEqual(list(self.aggregator.pattern_windows), [MaritimePatternType.CARGO_DISCREPANCY])
+
+
+if __name__ == '__main__':
+    unittest.main()
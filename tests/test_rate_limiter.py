@@ -0,0 +1,138 @@
+"""
+Rate Limiter Test Suite for Stevedores Dashboard 3.0
+Tests the sliding-window counter limiter and its Redis script path
+"""
+
+import unittest
+import sys
+import os
+import threading
+from unittest import mock
+
+# Add the parent directory to the Python path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from flask import Flask
+from utils.rate_limiter import InMemoryRateLimiter, ResilientRateLimiter, SLIDING_WINDOW_SCRIPT
+from tests.test_offline_cache import DictRedis
+
+
+class ScriptRedis(DictRedis):
+    """DictRedis that runs the sliding-window script in Python"""
+
+    def __init__(self):
+        super().__init__()
+        self.calls = []
+        self.available = True
+
+    def ping(self):
+        return self.available
+
+    def eval_script(self, script, keys, args):
+        if not self.available:
+            return None
+        self.calls.append((script, keys, args))
+        limit, window, elapsed = args
+        current, previous = (int(self.data.get(key, b'0')) for key in keys)
+        if previous * (window - elapsed) / window + current >= limit:
+            return 0
+        self.incr(keys[0])
+        self.expire(keys[0], window * 2)
+        return 1
+
+
+class RateLimiterTestSuite(unittest.TestCase):
+    """Test suite for rate limiting"""
+
+    def _at(self, timestamp):
+        return mock.patch('utils.rate_limiter.time.time', return_value=timestamp)
+
+    def test_01_previous_bucket_is_weighted_by_overlap(self):
+        """Test 1: A full previous bucket blocks in proportion to how much of it is still in the window"""
+        limiter = InMemoryRateLimiter()
+        with self._at(1000.0):
+            self.assertEqual(sum(limiter.is_allowed('ip_1', 10, 60) for _ in range(15)), 10)
+
+        # Halfway through the next bucket half of the previous ten still count
+        with self._at(1050.0):
+            self.assertEqual(sum(limiter.is_allowed('ip_1', 10, 60) for _ in range(10)), 5)
+
+        # After a full idle bucket the key starts over
+        with self._at(1200.0):
+            self.assertEqual(sum(limiter.is_allowed('ip_1', 10, 60) for _ in range(15)), 10)
+
+        self.assertEqual(len(limiter), 1)
+
+    def test_02_memory_is_constant_per_key_and_keys_are_bounded(self):
+        """Test 2: A burst on one key keeps one fixed-size entry, and cardinality is capped by LRU"""
+        limiter = InMemoryRateLimiter(max_keys=64, shards=4)
+        for _ in range(20000):
+            limiter.is_allowed('scanner', 100, 60)
+        entries = [entry for shard in limiter._shards for entry in shard.entries.values()]
+        self.assertEqual(len(entries), 1)
+        self.assertEqual(len(entries[0]), 3)
+
+        for i in range(1000):
+            limiter.is_allowed(f'ip_{i}', 100, 60)
+        self.assertLessEqual(len(limiter), 64)
+        self.assertGreater(limiter.evictions, 900)
+
+        # Recently seen keys survive eviction
+        limiter.is_allowed('ip_999', 1, 60)
+        self.assertFalse(limiter.is_allowed('ip_999', 1, 60))
+
+    def test_03_concurrent_requests_never_exceed_the_limit(self):
+        """Test 3: Threads racing on one key are admitted exactly up to the limit"""
+        limiter = InMemoryRateLimiter()
+        allowed = []
+        barrier = threading.Barrier(8)
+
+        def hammer():
+            barrier.wait()
+            allowed.append(sum(limiter.is_allowed('burst', 500, 3600) for _ in range(200)))
+
+        threads = [threading.Thread(target=hammer) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(sum(allowed), 500)
+
+    def test_04_redis_path_uses_the_script(self):
+        """Test 4: With Redis available checks run as one script call on the two bucket keys"""
+        redis = ScriptRedis()
+        limiter = ResilientRateLimiter()
+        limiter.redis_client = redis
+
+        with self._at(1000.0):
+            results = [limiter.manual_rate_limit_check('user_1', limit=5, window=60) for _ in range(6)]
+        self.assertEqual(results, [True] * 5 + [False])
+        self.assertEqual(len(limiter.fallback_limiter), 0)
+
+        script, keys, args = redis.calls[0]
+        self.assertEqual(script, SLIDING_WINDOW_SCRIPT)
+        self.assertEqual(keys, ['ratelimit:{user_1}:60:960', 'ratelimit:{user_1}:60:900'])
+        self.assertEqual(args, [5, 60, 40.0])
+        self.assertEqual(redis.ttls[keys[0]], 120)
+
+    def test_05_falls_back_to_memory_without_redis(self):
+        """Test 5: Checks use the in-memory limiter when Redis stops answering, and init works offline"""
+        redis = ScriptRedis()
+        limiter = ResilientRateLimiter()
+        limiter.redis_client = redis
+        redis.available = False
+
+        results = [limiter.manual_rate_limit_check('ip_9', limit=3, window=60) for _ in range(4)]
+        self.assertEqual(results, [True, True, True, False])
+        self.assertEqual(limiter.get_rate_limit_info()['fallback_entries'], 1)
+
+        app = Flask(__name__)
+        app.config.update({'SECRET_KEY': 'test-key', 'REDIS_URL': 'memory://'})
+        offline = ResilientRateLimiter()
+        offline.init_app(app)
+        self.assertIsNotNone(offline.limiter)
+        self.assertIsNone(offline.redis_client)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,188 @@
+"""
+Redis Batching Test Suite for Stevedores Dashboard 3.0
+Tests multi-key commands, pipelines and round-trip metrics of EnterpriseRedisClient
+"""
+
+import unittest
+import sys
+import os
+
+import redis
+
+# Add the parent directory to the Python path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.redis_client import EnterpriseRedisClient, RetryStrategy, CircuitBreakerState
+
+
+class FakeRedis:
+    """In-memory stand-in for redis.Redis that counts round trips"""
+
+    def __init__(self):
+        self.data = {}
+        self.ttls = {}
+        self.round_trips = 0
+        self.pipelines = []
+        self.down = False
+
+    def _trip(self):
+        if self.down:
+            raise redis.ConnectionError('Redis is down')
+        self.round_trips += 1
+
+    def _get(self, key):
+        return self.data.get(key)
+
+    def _set(self, key, value, ex=None):
+        self.data[key] = str(value).encode()
+        self.ttls[key] = ex
+        return True
+
+    def get(self, key):
+        self._trip()
+        return self._get(key)
+
+    def set(self, key, value, ex=None):
+        self._trip()
+        return self._set(key, value, ex)
+
+    def mget(self, keys):
+        self._trip()
+        return [self._get(key) for key in keys]
+
+    def mset(self, mapping):
+        self._trip()
+        for key, value in mapping.items():
+            self._set(key, value)
+        return True
+
+    def delete(self, *keys):
+        self._trip()
+        return sum(1 for key in keys if self.data.pop(key, None) is not None)
+
+    def exists(self, *keys):
+        self._trip()
+        return sum(1 for key in keys if key in self.data)
+
+    def pipeline(self, transaction=True):
+        pipe = FakePipeline(self, transaction)
+        self.pipelines.append(pipe)
+        return pipe
+
+
+class FakePipeline:
+    def __init__(self, redis, transaction):
+        self.redis = redis
+        self.transaction = transaction
+        self.commands = []
+
+    def get(self, key):
+        self.commands.append(lambda: self.redis._get(key))
+
+    def set(self, key, value, ex=None):
+        self.commands.append(lambda: self.redis._set(key, value, ex))
+
+    def incr(self, key, amount=1):
+        def incr():
+            value = int(self.redis.data.get(key, b'0')) + amount
+            self.redis.data[key] = str(value).encode()
+            return value
+        self.commands.append(incr)
+
+    def execute(self):
+        self.redis._trip()
+        return [command() for command in self.commands]
+
+
+class RedisBatchingTestSuite(unittest.TestCase):
+    """Test suite for batched Redis operations"""
+
+    def setUp(self):
+        """Set up test environment"""
+        self.fake = FakeRedis()
+        self.client = EnterpriseRedisClient(None, retry_strategy=RetryStrategy(max_attempts=1))
+        self.client._client = self.fake
+        self.client._initialized = True
+
+    def test_01_mget_and_mset_take_one_round_trip(self):
+        """Test 1: mget and mset move many keys in a single round trip"""
+        self.assertTrue(self.client.mset({f'vessel:{i}': i for i in range(20)}))
+        self.assertEqual(self.fake.round_trips, 1)
+
+        values = self.client.mget(*[f'vessel:{i}' for i in range(20)], 'missing')
+        self.assertEqual(values[:3], [b'0', b'1', b'2'])
+        self.assertIsNone(values[-1])
+        self.assertEqual(self.fake.round_trips, 2)
+
+        # With an expiry the SETs are pipelined, still one round trip
+        self.assertTrue(self.client.mset({'a': 1, 'b': 2}, ex=30))
+        self.assertEqual(self.fake.round_trips, 3)
+        self.assertEqual((self.fake.ttls['a'], self.fake.pipelines[-1].transaction), (30, False))
+        self.assertEqual(self.client.mget(), [])
+
+    def test_02_pipeline_context_manager_fills_results(self):
+        """Test 2: Commands queued in a pipeline block run on exit and fill their results"""
+        self.fake.data['vessel_summary'] = b'{"total": 3}'
+
+        with self.client.pipeline() as pipe:
+            summary = pipe.get('vessel_summary')
+            views = pipe.incr('dashboard_views')
+            pipe.set('last_build', 'now', ex=60)
+            self.assertFalse(summary.ready)
+
+        self.assertEqual(summary.value, b'{"total": 3}')
+        self.assertEqual(views.value, 1)
+        self.assertEqual(self.fake.round_trips, 1)
+        self.assertEqual(self.fake.ttls['last_build'], 60)
+
+        metrics = self.client.get_comprehensive_metrics()
+        self.assertEqual((metrics['round_trips'], metrics['commands_sent'], metrics['pipelines_executed']), (1, 3, 1))
+        self.assertEqual(metrics['commands_per_round_trip'], 3.0)
+
+    def test_03_transactions_and_aborted_blocks(self):
+        """Test 3: transaction() uses MULTI/EXEC and an exception inside the block sends nothing"""
+        with self.client.transaction() as tx:
+            tx.incr('berth_moves')
+            tx.incr('berth_moves')
+        self.assertTrue(self.fake.pipelines[-1].transaction)
+        self.assertEqual(self.fake.data['berth_moves'], b'2')
+
+        with self.assertRaises(ValueError):
+            with self.client.pipeline() as pipe:
+                pipe.set('half_done', 1)
+                raise ValueError('abort')
+        self.assertNotIn('half_done', self.fake.data)
+        self.assertEqual(self.fake.round_trips, 1)
+
+    def test_04_multi_key_commands_are_single_calls(self):
+        """Test 4: delete and exists with several keys are one command, and fall back per key locally"""
+        self.client.mset({'x': 1, 'y': 2})
+        self.assertEqual(self.client.exists('x', 'y', 'z'), 2)
+        self.assertEqual(self.client.delete('x', 'y', 'z'), 2)
+        self.assertEqual(self.fake.round_trips, 3)
+
+        self.fake.down = True
+        self.assertTrue(self.client.mset({'p': b'1', 'q': b'2'}))
+        self.assertEqual(self.client.exists('p', 'q', 'r'), 2)
+        self.assertEqual(self.client.mget('p', 'r'), [b'1', None])
+        self.assertEqual(self.client.delete('p', 'q'), 2)
+
+    def test_05_pipeline_falls_back_as_one_unit(self):
+        """Test 5: An unreachable Redis or open circuit applies the whole pipeline to the fallback cache"""
+        self.fake.down = True
+        with self.client.pipeline() as pipe:
+            pipe.set('offline_key', b'v', ex=60)
+            value = pipe.get('offline_key')
+        self.assertEqual(value.value, b'v')
+        self.assertEqual(self.client._metrics.failed_requests, 1)
+
+        self.fake.down = False
+        self.client._circuit_breaker.state = CircuitBreakerState.FORCE_OPEN
+        with self.client.pipeline() as pipe:
+            pipe.incr('counter')
+        self.assertEqual(self.fake.round_trips, 0)
+        self.assertEqual(self.client._metrics.fallback_hits, 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,193 @@
+"""
+Redis Deadline Test Suite for Stevedores Dashboard 3.0
+Tests per-request Redis time budgets, shrinking socket timeouts and timeout metrics
+"""
+
+import unittest
+import sys
+import os
+import socket
+import threading
+import time
+
+import redis
+from flask import Flask
+
+# Add the parent directory to the Python path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.redis_client import (
+    EnterpriseRedisClient, RetryStrategy, RedisDeadlineExceeded, DeadlineConnection,
+    redis_deadline, redis_operation_timeout, set_request_deadline, remaining_redis_budget,
+    init_redis_deadlines
+)
+
+
+class RedisDeadlineTestSuite(unittest.TestCase):
+    """Test suite for deadline propagation in EnterpriseRedisClient"""
+
+    def setUp(self):
+        """Listen on a socket that accepts connections but never answers"""
+        self.server = socket.socket()
+        self.server.bind(('127.0.0.1', 0))
+        self.server.listen(16)
+        self.port = self.server.getsockname()[1]
+
+        self.client = EnterpriseRedisClient(None, socket_timeout=5,
+                                            retry_strategy=RetryStrategy(max_attempts=1))
+        self.client._connection_pool = redis.ConnectionPool(
+            host='127.0.0.1', port=self.port, socket_timeout=5, connection_class=DeadlineConnection
+        )
+        self.client._client = redis.Redis(connection_pool=self.client._connection_pool)
+        self.client._initialized = True
+        self.app = Flask(__name__)
+
+    def tearDown(self):
+        """Close the silent server"""
+        self.client._connection_pool.disconnect()
+        self.server.close()
+
+    def test_01_late_calls_get_shrinking_timeout(self):
+        """Test 1: A stalled read waits only for the request budget, then later calls skip Redis"""
+        self.client._fallback_cache.set('berth', b'B4')
+        with self.app.test_request_context():
+            set_request_deadline(0.3)
+            start = time.monotonic()
+            self.assertEqual(self.client.get('berth'), b'B4')
+            self.assertLess(time.monotonic() - start, 1.0)
+
+            start = time.monotonic()
+            self.assertEqual(self.client.get('berth'), b'B4')
+            self.assertLess(time.monotonic() - start, 0.05)
+
+        metrics = self.client._metrics
+        self.assertEqual((metrics.timeouts, metrics.deadline_exceeded, metrics.fallback_hits), (1, 1, 2))
+
+    def test_02_decorator_spawns_no_threads(self):
+        """Test 2: redis_operation_timeout bounds calls on the caller's thread"""
+        threads_seen = []
+
+        @redis_operation_timeout(0.05)
+        def read_berth():
+            threads_seen.append(threading.active_count())
+            return self.client.get('berth')
+
+        before = threading.active_count()
+        start = time.monotonic()
+        for _ in range(10):
+            self.assertIsNone(read_berth())
+        self.assertLess(time.monotonic() - start, 3.0)
+        self.assertEqual(set(threads_seen), {before})
+        self.assertEqual(threading.active_count(), before)
+        # Five stalled reads trip the circuit breaker; the rest never reach the socket
+        self.assertEqual(self.client._metrics.timeouts, 5)
+        self.assertEqual(self.client._metrics.fallback_hits, 10)
+
+    def test_03_nested_deadlines_take_the_earliest(self):
+        """Test 3: The request budget and redis_deadline scopes combine to the nearest deadline"""
+        self.assertIsNone(remaining_redis_budget())
+        with self.app.test_request_context():
+            set_request_deadline(0.5)
+            with redis_deadline(10):
+                self.assertLessEqual(remaining_redis_budget(), 0.5)
+                with redis_deadline(0.1):
+                    self.assertLessEqual(remaining_redis_budget(), 0.1)
+                self.assertGreater(remaining_redis_budget(), 0.1)
+        self.assertIsNone(remaining_redis_budget())
+
+    def test_04_each_request_gets_a_fresh_budget(self):
+        """Test 4: init_redis_deadlines starts REDIS_REQUEST_BUDGET per request; 0 disables it"""
+        self.app.config['REDIS_REQUEST_BUDGET'] = 1.5
+        init_redis_deadlines(self.app)
+        self.app.add_url_rule('/budget', 'budget', lambda: {'remaining': remaining_redis_budget()})
+
+        with self.app.test_client() as client:
+            for _ in range(2):
+                remaining = client.get('/budget').get_json()['remaining']
+                self.assertTrue(1.0 < remaining <= 1.5)
+
+        disabled = Flask('disabled')
+        disabled.config['REDIS_REQUEST_BUDGET'] = 0
+        init_redis_deadlines(disabled)
+        disabled.add_url_rule('/budget', 'budget', lambda: {'remaining': remaining_redis_budget()})
+        self.assertIsNone(disabled.test_client().get('/budget').get_json()['remaining'])
+
+    def test_05_metrics_and_retries(self):
+        """Test 5: Timeout counters are exported, spent budgets are not retried, pools use deadline sockets"""
+        attempts = []
+
+        def spent():
+            attempts.append(1)
+            raise RedisDeadlineExceeded('spent')
+
+        with self.assertRaises(RedisDeadlineExceeded):
+            RetryStrategy(max_attempts=3, base_delay=0).execute(spent)
+        self.assertEqual(len(attempts), 1)
+
+        with redis_deadline(0.1):
+            self.client.get('berth')
+        metrics = self.client.get_comprehensive_metrics()
+        self.assertEqual((metrics['timeouts'], metrics['deadline_exceeded']), (1, 0))
+
+        client = EnterpriseRedisClient(f'redis://127.0.0.1:{self.port}/0', connection_timeout=1,
+                                       socket_timeout=0.1)
+        self.assertIs(client._connection_pool.connection_class, DeadlineConnection)
+        client._connection_pool.disconnect()
+
+
+    def test_06_writes_reach_redis_after_the_budget_is_spent(self):
+        """Test 6: Tag bumps, invalidation messages and rate limit scripts still go to Redis once a long request spent its budget"""
+        class RecordingRedis:
+            def __init__(self):
+                self.calls = []
+
+            def incr(self, key, amount=1):
+                self.calls.append(('incr', key))
+                return 7
+
+            def publish(self, channel, message):
+                self.calls.append(('publish', channel))
+                return 3
+
+            def get(self, key):
+                self.calls.append(('get', key))
+                return b'remote'
+
+            def register_script(self, script):
+                def run(keys, args):
+                    self.calls.append(('eval', keys[0]))
+                    return [1, 0]
+                run.registered_client = self
+                return run
+
+            def pipeline(self, transaction=False):
+                raise AssertionError('read-only pipelines should use the fallback')
+
+        recording = RecordingRedis()
+        self.client._client = recording
+        self.client._fallback_cache.set('berth', b'B4')
+        with self.app.test_request_context():
+            set_request_deadline(0)
+            self.assertEqual(self.client.incr('cache:tag:vessel:1'), 7)
+            self.assertEqual(self.client.publish('cache:invalidate', 'vessel:1'), 3)
+            self.assertEqual(self.client.eval_script('return 1', ['rate:user:1'], [60]), [1, 0])
+            self.assertEqual(self.client.get('berth'), b'B4')
+            with self.client.pipeline() as pipe:
+                berth = pipe.get('berth')
+            self.assertEqual(berth.value, b'B4')
+        self.assertEqual(recording.calls, [('incr', 'cache:tag:vessel:1'), ('publish', 'cache:invalidate'),
+                                           ('eval', 'rate:user:1')])
+        self.assertEqual(self.client._metrics.deadline_exceeded, 2)
+
+        # A stalled write is still bounded - by write_min_timeout rather than the socket timeout
+        self.client._client = redis.Redis(connection_pool=self.client._connection_pool)
+        self.client.write_min_timeout = 0.2
+        with self.app.test_request_context():
+            set_request_deadline(0)
+            start = time.monotonic()
+            self.assertEqual(self.client.publish('cache:invalidate', 'vessel:1'), 0)
+            self.assertLess(time.monotonic() - start, 1.0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,201 @@
+"""
+Secure Sync Queue Test Suite for Stevedores Dashboard 3.0
+Tests the durable priority queue and transaction leasing behind SecureSyncManager
+"""
+
+import unittest
+import sys
+import os
+import json
+import shutil
+import tempfile
+import threading
+import time
+from datetime import datetime, timezone, timedelta
+from unittest import mock
+
+# Add the parent directory to the Python path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.encrypted_cache import EncryptedCacheManager
+from utils.secure_sync import SecureSyncManager, SyncOperation, SyncStatus
+
+
+class SecureSyncQueueTestSuite(unittest.TestCase):
+    """Test suite for the secure sync transaction queue"""
+
+    def setUp(self):
+        """Set up test environment"""
+        self.sync_dir = tempfile.mkdtemp()
+        self.cache = EncryptedCacheManager(cache_dir=os.path.join(self.sync_dir, 'cache'),
+                                           master_key='test-master-key')
+        self.manager = self._manager()
+
+    def tearDown(self):
+        """Clean up after tests"""
+        shutil.rmtree(self.sync_dir, ignore_errors=True)
+
+    def _manager(self):
+        return SecureSyncManager(sync_dir=self.sync_dir, cache=self.cache)
+
+    def _queue(self, table_name, record_id, manager=None, **kwargs):
+        return (manager or self.manager).queue_sync_operation(
+            SyncOperation.CREATE, table_name, str(record_id), {'record': record_id}, **kwargs
+        )
+
+    def test_01_pending_is_ordered_by_priority_then_age(self):
+        """Test 1: Pending transactions come back highest priority first, oldest first within a priority"""
+        settings = self._queue('settings', 1)
+        manifest = self._queue('manifests', 2)
+        emergency = self._queue('emergency_reports', 3)
+        later_manifest = self._queue('manifests', 4)
+
+        pending = self.manager.get_pending_transactions(limit=3)
+        self.assertEqual([t.transaction_id for t in pending], [emergency, manifest, later_manifest])
+        self.assertEqual(self.manager.get_pending_transactions()[-1].transaction_id, settings)
+        self.assertEqual(os.listdir(self.manager.sync_queue_dir), [])
+
+        plan = self.manager.queue._conn.execute(
+            "EXPLAIN QUERY PLAN SELECT payload FROM sync_transactions WHERE status = 'pending' "
+            "AND expires_at > 0 ORDER BY priority DESC, timestamp LIMIT 3"
+        ).fetchall()
+        self.assertNotIn('TEMP B-TREE', ' '.join(row[-1] for row in plan))
+
+    def test_02_concurrent_workers_never_share_a_transaction(self):
+        """Test 2: Two workers leasing at the same time receive disjoint batches"""
+        ids = {self._queue('cargo_tallies', i) for i in range(40)}
+        workers = [self.manager, self._manager()]
+        leased = [[] for _ in workers]
+        barrier = threading.Barrier(len(workers))
+
+        def lease(index):
+            barrier.wait()
+            while True:
+                batch = workers[index].lease_pending_transactions(limit=3)
+                if not batch:
+                    return
+                leased[index].extend(t.transaction_id for t in batch)
+
+        threads = [threading.Thread(target=lease, args=(i,)) for i in range(len(workers))]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertFalse(set(leased[0]) & set(leased[1]))
+        self.assertEqual(set(leased[0]) | set(leased[1]), ids)
+        self.assertEqual(self.manager.get_pending_transactions(), [])
+
+    def test_03_expired_leases_return_to_the_queue(self):
+        """Test 3: Transactions leased by a worker that stopped are handed out again"""
+        transaction_id = self._queue('vessels', 1)
+        crashed = self._manager()
+        crashed.lease_seconds = 0.05
+        self.assertEqual(len(crashed.lease_pending_transactions()), 1)
+        self.assertEqual(self.manager.lease_pending_transactions(), [])
+
+        time.sleep(0.1)
+        recovered = self.manager.lease_pending_transactions()
+        self.assertEqual([t.transaction_id for t in recovered], [transaction_id])
+        self.assertEqual(recovered[0].status, SyncStatus.IN_PROGRESS)
+
+    def test_04_batch_processing_uses_only_the_queue(self):
+        """Test 4: A processed batch empties the queue without writing to the encrypted cache"""
+        with mock.patch.object(self.cache, 'store') as store, \
+                mock.patch.object(SecureSyncManager, '_execute_sync_operation', return_value=True):
+            for i in range(3):
+                self._queue('cargo_tallies', i)
+            results = self.manager.process_sync_batch(batch_size=10)
+
+        self.assertEqual((results['processed'], results['succeeded']), (3, 3))
+        self.assertEqual(store.call_count, 0)
+        self.assertEqual(self.manager.get_sync_status()['pending_transactions'], 0)
+
+        with mock.patch.object(SecureSyncManager, '_execute_sync_operation', return_value=False):
+            self._queue('vessels', 9)
+            self.manager.process_sync_batch()
+        retried = self.manager.get_pending_transactions()
+        self.assertEqual([t.retry_count for t in retried], [1])
+
+    def test_05_expiry_status_and_legacy_files(self):
+        """Test 5: Legacy queue files are imported, expired transactions are skipped and cleaned up"""
+        transaction = self.manager.queue.get(self._queue('users', 1))
+        stale = transaction.to_dict()
+        stale['transaction_id'] = 'legacy-stale'
+        stale['timestamp'] = (datetime.now(timezone.utc) - timedelta(days=2)).isoformat()
+        with open(os.path.join(self.manager.sync_queue_dir, 'legacy-stale.sync'), 'w') as f:
+            json.dump(stale, f)
+
+        manager = self._manager()
+        self.assertEqual(os.listdir(manager.sync_queue_dir), [])
+        self.assertEqual(len(manager.get_pending_transactions()), 1)
+
+        status = manager.get_sync_status()
+        self.assertEqual(status['pending_transactions'], 2)
+        self.assertEqual(status['by_table'], {'users': 2})
+        self.assertEqual(status['oldest_pending'], stale['timestamp'])
+
+        self.assertEqual(manager.cleanup_expired_transactions(), 1)
+        self.assertEqual(manager.get_sync_status()['pending_transactions'], 1)
+
+
+    def test_06_readers_share_the_connection_under_the_lock(self):
+        """Test 6: Status readers take the queue lock like writers do, so threads never interleave on the connection"""
+        queue = self.manager.queue
+        transaction_id = self._queue('cargo_tallies', 1)
+
+        class RecordingLock:
+            def __init__(self, lock):
+                self.lock = lock
+                self.held = False
+
+            def __enter__(self):
+                self.lock.acquire()
+                self.held = True
+
+            def __exit__(self, *exc):
+                self.held = False
+                self.lock.release()
+
+        recording = RecordingLock(queue._lock)
+        connection = queue._conn
+        unlocked = []
+
+        class CheckedConnection:
+            def execute(self, *args):
+                if not recording.held:
+                    unlocked.append(args[0])
+                return connection.execute(*args)
+
+        with mock.patch.object(queue, '_lock', recording), \
+                mock.patch.object(queue, '_conn', CheckedConnection()):
+            self.assertIsNotNone(queue.get(transaction_id))
+            self.assertEqual(len(queue.pending(10)), 1)
+            self.assertEqual(len(queue.counts()), 1)
+            self.assertIsNotNone(queue.oldest_pending())
+            self.assertEqual(self.manager.get_sync_status()['pending_transactions'], 1)
+        self.assertEqual(unlocked, [])
+
+        errors = []
+
+        def read():
+            try:
+                for _ in range(50):
+                    queue.pending(10)
+                    queue.counts()
+            except Exception as exc:
+                errors.append(exc)
+
+        readers = [threading.Thread(target=read) for _ in range(4)]
+        for thread in readers:
+            thread.start()
+        for i in range(2, 40):
+            self._queue('cargo_tallies', i)
+        for thread in readers:
+            thread.join()
+        self.assertEqual(errors, [])
+        self.assertEqual(len(queue.pending(100)), 39)
+
+
+if __name__ == '__main__':
+    unittest.main()
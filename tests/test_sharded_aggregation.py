@@ -0,0 +1,213 @@
+"""
+Sharded Log Aggregation Test Suite for Stevedores Dashboard 3.0
+Tests shard routing, per-shard statistics and the Unix socket aggregator process transport
+"""
+
+import unittest
+import sys
+import os
+import socket
+import tempfile
+import time
+import logging
+from datetime import datetime, timezone
+from unittest import mock
+
+# Add the parent directory to the Python path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.log_aggregator import (
+    MaritimeLogAggregator, MaritimePatternType, LogShipper, LogAggregatorServer, MAX_SHIPPED_ENTRY_BYTES,
+    start_aggregator_process, stop_aggregator_process, aggregator_stats_path, read_aggregator_process_stats
+)
+
+
+class ShardedAggregationTestSuite(unittest.TestCase):
+    """Test suite for sharded and out-of-process log aggregation"""
+
+    @classmethod
+    def setUpClass(cls):
+        """Silence structured logging for alert generation"""
+        logging.getLogger('stevedores').disabled = True
+
+    @classmethod
+    def tearDownClass(cls):
+        """Re-enable structured logging"""
+        logging.getLogger('stevedores').disabled = False
+
+    def setUp(self):
+        """Temporary directory for aggregator sockets"""
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.socket_path = os.path.join(self.tmpdir.name, 'aggregator.sock')
+
+    def tearDown(self):
+        """Remove the socket directory"""
+        self.tmpdir.cleanup()
+
+    def _wait_for(self, condition, timeout=5.0):
+        deadline = time.time() + timeout
+        while not condition() and time.time() < deadline:
+            time.sleep(0.01)
+        self.assertTrue(condition())
+
+    def _entry(self, i, **fields):
+        return {
+            'message': f'Cargo tally discrepancy of {i} containers',
+            'timestamp': datetime.now(timezone.utc).isoformat(),
+            **fields
+        }
+
+    def test_01_vessel_entries_stay_on_one_shard(self):
+        """Test 1: Entries for a vessel share a shard and the rest are spread round-robin"""
+        aggregator = MaritimeLogAggregator(shards=4)
+        aggregator.stop_processing()
+
+        for i in range(10):
+            aggregator.add_log_entry(self._entry(i, vessel_id=42))
+        depths = [shard['queue_depth'] for shard in aggregator.get_processing_stats()['shards']]
+        self.assertEqual(sorted(depths), [0, 0, 0, 10])
+
+        for i in range(8):
+            aggregator.add_log_entry(self._entry(i))
+        depths = [shard.queue.qsize() for shard in aggregator.shards]
+        self.assertEqual(sum(depths), 18)
+        self.assertEqual(sorted(depths)[:3], [2, 2, 2])
+
+    def test_02_full_shards_drop_oldest_and_count(self):
+        """Test 2: A full shard queue keeps the newest entries and counts every drop"""
+        aggregator = MaritimeLogAggregator(shards=2, queue_size=2)
+        aggregator.stop_processing()
+
+        for i in range(5):
+            aggregator.add_log_entry(self._entry(i, vessel_id=7))
+
+        shard = aggregator._shard_for({'vessel_id': 7})
+        self.assertEqual([entry['message'][-14:-11] for entry in list(shard.queue.queue)], ['f 3', 'f 4'])
+        stats = aggregator.get_processing_stats()
+        self.assertEqual(stats['logs_dropped'], 3)
+        self.assertEqual(stats['shards'][shard.index]['dropped'], 3)
+        self.assertEqual(stats['queue_depth'], 2)
+
+    def test_03_shards_process_in_parallel_with_latency(self):
+        """Test 3: Entries spread over shards all reach the shared pattern windows"""
+        aggregator = MaritimeLogAggregator(shards=3)
+        try:
+            for i in range(300):
+                aggregator.add_log_entry(self._entry(i, vessel_id=i % 5))
+            self._wait_for(lambda: aggregator.get_processing_stats()['logs_processed'] == 300)
+        finally:
+            aggregator.stop_processing()
+
+        stats = aggregator.get_processing_stats()
+        self.assertEqual(sum(shard['processed'] for shard in stats['shards']), 300)
+        self.assertTrue(all(shard['p99_latency_ms'] > 0 for shard in stats['shards'] if shard['processed']))
+        self.assertEqual(stats['queue_depth'], 0)
+        window = aggregator.pattern_windows[MaritimePatternType.CARGO_DISCREPANCY]
+        self.assertEqual(window.count(time.time()), 300)
+        self.assertEqual(stats['alerts_generated'], 300)
+
+    def test_04_entries_reach_the_aggregator_process(self):
+        """Test 4: A worker's shipper feeds the aggregator server over the Unix socket"""
+        server = LogAggregatorServer(self.socket_path, shards=2)
+        server.start()
+        shipper = LogShipper(self.socket_path)
+        try:
+            for i in range(50):
+                shipper.add_log_entry(self._entry(i, vessel_id=i))
+            self._wait_for(lambda: server.get_stats()['logs_processed'] == 50)
+            self.assertEqual(shipper.stats, {'sent': 50, 'dropped': 0, 'oversized': 0, 'connects': 1})
+            self.assertEqual(server.get_stats()['server']['received'], 50)
+
+            shipper.sock.send(b'not json\n')
+            self._wait_for(lambda: server.stats['malformed'] == 1)
+        finally:
+            server.stop()
+
+        shipper.add_log_entry(self._entry(99))
+        self.assertEqual(shipper.stats['dropped'], 1)
+        shipper.close()
+
+    def test_05_shipping_never_blocks(self):
+        """Test 5: A stalled aggregator or oversized entry costs a counted drop, not a wait"""
+        stalled = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        stalled.bind(self.socket_path)
+        stalled.listen(1)
+        shipper = LogShipper(self.socket_path, max_pending_bytes=4096)
+        try:
+            start = time.monotonic()
+            for i in range(2000):
+                shipper.add_log_entry(self._entry(i))
+            self.assertLess(time.monotonic() - start, 2.0)
+            self.assertGreater(shipper.stats['dropped'], 0)
+            self.assertEqual(shipper.stats['sent'] + shipper.stats['dropped'], 2000)
+            self.assertLessEqual(shipper.get_stats()['pending_bytes'], 4096)
+
+            shipper.add_log_entry({'message': 'x' * (MAX_SHIPPED_ENTRY_BYTES + 1)})
+            self.assertEqual(shipper.stats['oversized'], 1)
+        finally:
+            shipper.close()
+            stalled.close()
+
+    def test_06_gunicorn_configs_start_the_aggregator_process(self):
+        """Test 6: Both gunicorn configs run the shared hooks, which spawn an aggregator the shippers reach"""
+        root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        for config in ('gunicorn.conf.py', 'gunicorn_production.conf.py'):
+            with open(os.path.join(root, config)) as f:
+                source = f.read()
+            self.assertIn('start_aggregator_process(server.log)', source, config)
+            self.assertIn('stop_aggregator_process()', source, config)
+
+        with mock.patch.dict(os.environ, {'LOG_AGGREGATION_MODE': 'thread'}):
+            self.assertIsNone(start_aggregator_process())
+
+        environment = {'LOG_AGGREGATION_MODE': 'process', 'LOG_AGGREGATOR_SOCKET': self.socket_path,
+                       'LOG_AGGREGATION_SHARDS': '1'}
+        with mock.patch.dict(os.environ, environment):
+            process = start_aggregator_process()
+        self.assertIsNotNone(process)
+        shipper = LogShipper(self.socket_path)
+        try:
+            self._wait_for(lambda: os.path.exists(self.socket_path), timeout=15.0)
+            shipper.add_log_entry(self._entry(1))
+            self.assertEqual(shipper.stats['sent'], 1)
+            stats_path = aggregator_stats_path(self.socket_path)
+            self._wait_for(lambda: read_aggregator_process_stats(stats_path) is not None, timeout=15.0)
+            self.assertIsNotNone(read_aggregator_process_stats(stats_path)['alerts'])
+        finally:
+            shipper.close()
+            stop_aggregator_process()
+        self.assertIsNotNone(process.poll())
+
+
+    def test_07_aggregator_process_escalates_alerts_and_publishes_stats(self):
+        """Test 7: The aggregator process feeds its own alert system and publishes a dashboard snapshot"""
+        stats_path = aggregator_stats_path(self.socket_path)
+        server = LogAggregatorServer(self.socket_path, shards=1, stats_interval=0.05)
+        server.enable_alerts()
+        server.start()
+        shipper = LogShipper(self.socket_path)
+        try:
+            with mock.patch.object(server.alert_system, 'evaluate_event') as evaluate_event:
+                for i in range(3):
+                    shipper.add_log_entry(self._entry(i, vessel_id=12))
+                self._wait_for(lambda: server.get_stats()['logs_processed'] == 3)
+            self.assertEqual(evaluate_event.call_count, 3)
+            self.assertEqual(evaluate_event.call_args[0][0]['maritime_context'], {'vessel_id': 12})
+
+            def published():
+                snapshot = read_aggregator_process_stats(stats_path)
+                return snapshot is not None and snapshot['processing_stats']['logs_processed'] == 3
+            self._wait_for(published)
+            snapshot = read_aggregator_process_stats(stats_path)
+            self.assertEqual(snapshot['pid'], os.getpid())
+            self.assertEqual(snapshot['pattern_summary']['pattern_counts'], {'cargo_discrepancy': 3})
+            self.assertIn('total_alerts', snapshot['alerts'])
+            self.assertIsNone(read_aggregator_process_stats(stats_path, max_age=-1))
+        finally:
+            shipper.close()
+            server.stop()
+        self.assertIsNone(read_aggregator_process_stats(stats_path))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,177 @@
+"""
+Structured Logging Fast Path Test Suite for Stevedores Dashboard 3.0
+Tests level gating, per-request context capture, interval-sampled performance context and the JSON serializer
+"""
+
+import unittest
+import sys
+import os
+import io
+import json
+import logging
+from datetime import datetime, timezone
+from unittest import mock
+
+# Add the parent directory to the Python path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from flask import Flask, g
+
+from utils.structured_logger import (
+    StructuredLogger, JsonFormatter, BatchStreamHandler, LogContext, MaritimeOperationType
+)
+
+
+class StructuredLoggingFastPathTestSuite(unittest.TestCase):
+    """Test suite for the StructuredLogger.log() fast path"""
+
+    def setUp(self):
+        """Sync logger writing JSON lines to a buffer"""
+        self.stream = io.StringIO()
+        handler = BatchStreamHandler(self.stream)
+        handler.setFormatter(JsonFormatter())
+        handler.setLevel(logging.INFO)
+        self.logger = StructuredLogger('fast_path', handlers=[handler], async_logging=False)
+        self.logger.deduplication = False
+        self.stream.truncate(0)
+        self.stream.seek(0)
+        self.app = Flask(__name__)
+
+    def _entries(self):
+        return [json.loads(line) for line in self.stream.getvalue().splitlines()]
+
+    def test_01_calls_below_level_skip_all_work(self):
+        """Test 1: A DEBUG call on an INFO logger returns before any context is gathered"""
+        with mock.patch.object(self.logger, '_get_performance_context') as performance, \
+                mock.patch.object(self.logger, '_get_request_context') as request_context:
+            self.logger.debug('Request started', path='/api/vessels')
+            performance.assert_not_called()
+            request_context.assert_not_called()
+        self.assertEqual(self._entries(), [])
+
+        self.logger.logger.disabled = True
+        try:
+            self.logger.error('Crane 4 offline')
+        finally:
+            self.logger.logger.disabled = False
+        self.assertEqual(self._entries(), [])
+
+    def test_02_request_context_is_captured_once(self):
+        """Test 2: Request fields are read once per request while request_id and user_id stay live"""
+        capture = mock.Mock(wraps=self.logger._capture_request_context)
+        with mock.patch.object(self.logger, '_capture_request_context', capture):
+            with self.app.test_request_context('/api/vessels/4', headers={'User-Agent': 'tablet'}):
+                self.logger.info('before hooks')
+                self.logger.info('still before hooks')
+                g.request_id = 'req-42'
+                g.jwt_claims = {'user_id': 7}
+                self.logger.info('after login')
+            with self.app.test_request_context('/api/berths', method='POST'):
+                self.logger.info('next request')
+
+        self.assertEqual(capture.call_count, 2)
+        first, second, third, fourth = self._entries()
+        self.assertEqual(first['request_id'], second['request_id'])
+        self.assertEqual((first['user_agent'], first['method']), ('tablet', 'GET'))
+        self.assertNotIn('user_id', first)
+        self.assertEqual((third['request_id'], third['user_id']), ('req-42', 7))
+        self.assertEqual(fourth['method'], 'POST')
+        self.assertNotEqual(fourth['request_id'], first['request_id'])
+
+    def test_03_performance_context_is_sampled_on_an_interval(self):
+        """Test 3: Process metrics are read once per interval and shared by the calls in between"""
+        sample = mock.Mock(wraps=self.logger._sample_performance_context)
+        with mock.patch.object(self.logger, '_sample_performance_context', sample):
+            self.logger.performance_sample_interval = 3600
+            for i in range(20):
+                self.logger.info(f'tally {i}')
+            self.assertEqual(sample.call_count, 1)
+
+            self.logger.performance_sample_interval = 0
+            for i in range(3):
+                self.logger.info(f'tally {i}')
+            self.assertEqual(sample.call_count, 4)
+
+        entries = self._entries()
+        self.assertTrue(all(entry['memory_usage_mb'] > 0 for entry in entries))
+        self.assertIn('cpu_usage_percent', entries[0])
+
+        self.logger.performance_logging = False
+        self.logger.info('no metrics')
+        self.assertNotIn('memory_usage_mb', self._entries()[-1])
+
+    def test_04_fields_match_log_context(self):
+        """Test 4: Records carry the same fields LogContext.to_dict() produced"""
+        self.logger.performance_logging = False
+        kwargs = {
+            'maritime_operation': MaritimeOperationType.CARGO_TALLY, 'vessel_id': 12, 'berth_id': None,
+            'compliance_flags': ['maritime_compliance'], 'error_details': {}, 'hatch': 3, 'note': None,
+        }
+        self.logger.maritime_alert('Tally closed', **kwargs)
+
+        expected = LogContext(level='MARITIME_ALERT', message='Tally closed',
+                              deployment_version=self.logger.deployment_version,
+                              environment=self.logger.environment)
+        for key, value in kwargs.items():
+            if hasattr(expected, key):
+                setattr(expected, key, value)
+            else:
+                expected.extra_fields[key] = value
+        expected.business_impact = 'maritime_operations'
+        expected = expected.to_dict()
+        del expected['timestamp']
+        expected['logger'] = 'fast_path'
+
+        entry = self._entries()[0]
+        self.assertEqual(datetime.fromisoformat(entry.pop('timestamp')).tzinfo, timezone.utc)
+        self.assertEqual(entry, expected)
+
+    def test_05_serializer_matches_json_dumps(self):
+        """Test 5: The precompiled serializer writes what json.dumps(default=str) would"""
+        formatter = JsonFormatter()
+        record = logging.LogRecord('fast_path', logging.ERROR, '', 0, 'Vessel %s délai', ('Ålesund',), None)
+        record.__dict__.update({
+            'eta': datetime(2026, 3, 1, 8, 30, tzinfo=timezone.utc),
+            'operation': MaritimeOperationType.CREW_CHANGE,
+            'draft_m': float('nan'),
+            'extra_fields': {'cranes': [1, 2], 'remarks': '✓ cleared'},
+        })
+        try:
+            raise ValueError('berth occupied')
+        except ValueError:
+            record.exc_info = sys.exc_info()
+
+        output = formatter.format(record)
+        entry = {
+            'timestamp': datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+            'level': 'ERROR', 'message': 'Vessel Ålesund délai', 'logger': 'fast_path',
+            'eta': record.eta, 'operation': record.operation, 'draft_m': record.draft_m,
+            'extra_fields': record.extra_fields, 'exception': formatter.formatException(record.exc_info),
+        }
+        self.assertEqual(output, json.dumps(entry, default=str, ensure_ascii=False))
+        self.assertNotIn('taskName', json.loads(output))
+
+
+    def test_06_reused_app_context_does_not_leak_request_fields(self):
+        """Test 6: Requests served inside one long-lived app context each capture their own fields"""
+        @self.app.route('/a')
+        def a():
+            self.logger.info('served a')
+            return 'a'
+
+        @self.app.route('/b')
+        def b():
+            self.logger.info('served b')
+            return 'b'
+
+        client = self.app.test_client()
+        with self.app.app_context():
+            client.get('/a')
+            client.get('/b')
+
+        first, second = self._entries()
+        self.assertEqual((first['endpoint'], second['endpoint']), ('a', 'b'))
+        self.assertNotEqual(first['request_id'], second['request_id'])
+
+if __name__ == '__main__':
+    unittest.main()
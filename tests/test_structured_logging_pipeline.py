@@ -0,0 +1,194 @@
+"""
+Structured Logging Pipeline Test Suite for Stevedores Dashboard 3.0
+Tests the bounded queue handler, overflow policies and the batching listener behind StructuredLogger
+"""
+
+import unittest
+import gc
+import sys
+import os
+import io
+import json
+import queue
+import tempfile
+import threading
+import time
+import weakref
+import logging
+from unittest import mock
+
+# Add the parent directory to the Python path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.structured_logger import (
+    StructuredLogger, JsonFormatter, BoundedQueueHandler, BatchingQueueListener,
+    BatchStreamHandler, BatchRotatingFileHandler
+)
+
+
+class CountingStream(io.StringIO):
+    """StringIO that records how many writes it received and from which threads"""
+
+    def __init__(self):
+        super().__init__()
+        self.writes = 0
+        self.threads = set()
+
+    def write(self, text):
+        self.writes += 1
+        self.threads.add(threading.current_thread().name)
+        return super().write(text)
+
+
+def make_record(message, level=logging.INFO):
+    return logging.LogRecord('pipeline', level, '', 0, message, (), None)
+
+
+class StructuredLoggingPipelineTestSuite(unittest.TestCase):
+    """Test suite for the asynchronous StructuredLogger pipeline"""
+
+    def _sink(self, stream):
+        handler = BatchStreamHandler(stream)
+        handler.setFormatter(JsonFormatter())
+        handler.setLevel(logging.INFO)
+        return handler
+
+    def test_01_records_are_written_off_the_calling_thread(self):
+        """Test 1: log() only enqueues; the listener formats and writes, and flush() drains"""
+        stream = CountingStream()
+        logger = StructuredLogger('pipeline.async', handlers=[self._sink(stream)], async_logging=True)
+        logger.deduplication = False
+        try:
+            for i in range(200):
+                logger.info(f'Container {i} discharged', vessel_id=3)
+            self.assertTrue(logger.flush(timeout=5))
+
+            lines = stream.getvalue().splitlines()
+            self.assertEqual(len(lines), 201)
+            self.assertEqual(json.loads(lines[-1])['message'], 'Container 199 discharged')
+            self.assertNotIn(threading.current_thread().name, stream.threads)
+
+            stats = logger.get_pipeline_stats()
+            self.assertEqual((stats['enqueued'], stats['written'], stats['dropped']), (201, 201, 0))
+            self.assertEqual(stats['queue_depth'], 0)
+            self.assertLessEqual(stream.writes, stats['batches'])
+        finally:
+            logger.close()
+        self.assertIsNone(logger.listener)
+
+    def test_02_drop_newest_keeps_errors(self):
+        """Test 2: A full queue drops new INFO records but an ERROR evicts the oldest record"""
+        handler = BoundedQueueHandler(queue.Queue(maxsize=3))
+        for i in range(5):
+            handler.handle(make_record(f'info {i}'))
+        handler.handle(make_record('crane failure', logging.ERROR))
+
+        queued = [record.msg for record in list(handler.queue.queue)]
+        self.assertEqual(queued, ['info 1', 'info 2', 'crane failure'])
+        self.assertEqual(handler.get_stats(), {
+            'enqueued': 4, 'dropped': 2, 'evicted': 1, 'blocked': 0, 'high_watermark': 3
+        })
+
+    def test_03_drop_oldest_and_block_policies(self):
+        """Test 3: drop_oldest keeps the newest records and block waits a bounded time"""
+        handler = BoundedQueueHandler(queue.Queue(maxsize=2), overflow='drop_oldest')
+        for i in range(5):
+            handler.handle(make_record(f'info {i}'))
+        self.assertEqual([record.msg for record in list(handler.queue.queue)], ['info 3', 'info 4'])
+        self.assertEqual(handler.get_stats()['evicted'], 3)
+
+        handler = BoundedQueueHandler(queue.Queue(maxsize=1), overflow='block', block_timeout=0.05)
+        handler.handle(make_record('first'))
+        start = time.monotonic()
+        handler.handle(make_record('second'))
+        self.assertGreaterEqual(time.monotonic() - start, 0.04)
+        self.assertEqual((handler.get_stats()['blocked'], handler.get_stats()['dropped']), (1, 1))
+
+        with self.assertRaises(ValueError):
+            BoundedQueueHandler(queue.Queue(), overflow='spill')
+
+    def test_04_listener_drains_in_batches(self):
+        """Test 4: A backlog is written in batch_size chunks with one write per batch"""
+        log_queue = queue.Queue()
+        for i in range(10):
+            log_queue.put(make_record(f'tally {i}'))
+        stream = CountingStream()
+        listener = BatchingQueueListener(log_queue, self._sink(stream), batch_size=4)
+        listener.start()
+        self.assertTrue(listener.wait_until_drained(5))
+        listener.stop()
+
+        self.assertEqual(listener.get_stats(), {'batches': 3, 'written': 10, 'largest_batch': 4})
+        self.assertEqual(stream.writes, 3)
+        self.assertEqual([json.loads(line)['message'] for line in stream.getvalue().splitlines()],
+                         [f'tally {i}' for i in range(10)])
+
+    def test_05_sync_mode_timestamps_and_rollover(self):
+        """Test 5: Sync mode writes in place, timestamps are event time and batches roll files over"""
+        stream = CountingStream()
+        logger = StructuredLogger('pipeline.sync', handlers=[self._sink(stream)], async_logging=False)
+        logger.info('Berth 4 assigned')
+        self.assertEqual(logger.get_pipeline_stats(), {'async': False})
+        self.assertEqual(stream.threads, {threading.current_thread().name})
+
+        record = make_record('late format')
+        record.created = 1_700_000_000.0
+        self.assertEqual(json.loads(JsonFormatter().format(record))['timestamp'], '2023-11-14T22:13:20+00:00')
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'pipeline.log')
+            handler = BatchRotatingFileHandler(path, maxBytes=600, backupCount=2)
+            handler.setFormatter(JsonFormatter())
+            for batch in range(3):
+                handler.emit_batch([make_record(f'batch {batch} record {i}') for i in range(3)])
+            handler.close()
+            self.assertTrue(os.path.exists(path + '.1'))
+            with open(path) as f:
+                self.assertEqual(json.loads(f.readline())['message'], 'batch 2 record 0')
+
+
+    def test_06_fork_restarts_only_open_async_loggers(self):
+        """Test 6: One module-level fork hook restarts open async loggers; closed and collected ones stay down"""
+        from utils import structured_logger as module
+
+        with mock.patch.object(module.os, 'register_at_fork') as register_at_fork, \
+                mock.patch.object(module.atexit, 'register') as atexit_register:
+            live = StructuredLogger('pipeline.fork.live', handlers=[self._sink(CountingStream())], async_logging=True)
+            closed = StructuredLogger('pipeline.fork.closed', handlers=[self._sink(CountingStream())],
+                                      async_logging=True)
+            dropped = StructuredLogger('pipeline.fork.dropped', handlers=[self._sink(CountingStream())],
+                                       async_logging=True)
+            sync = StructuredLogger('pipeline.fork.sync', handlers=[self._sink(CountingStream())],
+                                    async_logging=False)
+        register_at_fork.assert_not_called()
+        atexit_register.assert_not_called()
+
+        closed.close()
+        dropped.close()
+        del dropped
+        gc.collect()
+        open_loggers = set(module._open_async_loggers)
+        self.assertIn(live, open_loggers)
+        self.assertNotIn(closed, open_loggers)
+        self.assertNotIn(sync, open_loggers)
+        self.assertFalse([name for name in (l.logger.name for l in open_loggers) if name == 'pipeline.fork.dropped'])
+
+        # Restart only this test's loggers, not the ones other suites left open
+        parent_listener = live.listener
+        ours = weakref.WeakSet(l for l in open_loggers if l.logger.name.startswith('pipeline.fork'))
+        try:
+            with mock.patch.object(module, '_open_async_loggers', ours):
+                module._restart_pipelines_after_fork()
+            self.assertIsNot(live.listener, parent_listener)
+            self.assertIsNone(closed.listener)
+            self.assertIsNone(sync.listener)
+            live.info('Crane 2 online')
+            self.assertTrue(live.flush(5))
+        finally:
+            parent_listener.stop()
+            live.close()
+        self.assertNotIn(live, module._open_async_loggers)
+
+
+if __name__ == '__main__':
+    unittest.main()
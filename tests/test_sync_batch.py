@@ -0,0 +1,184 @@
+"""
+Sync Batch Processing Test Suite for Stevedores Dashboard 3.0
+Tests set-based /sync/process batches, conflict hashes and per-record fallback
+"""
+
+import unittest
+import sys
+import os
+from sqlalchemy import event
+
+# Add the parent directory to the Python path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import app, db, User, Vessel, CargoTally, CargoTallyTotal
+from utils.sync_manager import SyncManager, DatabaseSyncQueueStore, SyncStatus
+from utils.sync_batch import SyncBatchProcessor, canonical_sync_hash, VESSEL_SYNC_FIELDS
+
+
+class SyncBatchTestSuite(unittest.TestCase):
+    """Test suite for the set-based sync batch processor"""
+
+    def setUp(self):
+        """Set up test environment"""
+        self.app = app
+        self.app.config['TESTING'] = True
+        self.client = self.app.test_client()
+        self.ctx = self.app.app_context()
+        self.ctx.push()
+        db.create_all()
+
+        self.vessels = [Vessel(name=f'MV Batch {i}', total_cargo_capacity=1000) for i in range(3)]
+        db.session.add_all(self.vessels)
+        db.session.commit()
+        self.manager = SyncManager(store=DatabaseSyncQueueStore(db))
+        self.processor = SyncBatchProcessor(self.manager, db, Vessel, CargoTally, CargoTallyTotal)
+
+    def tearDown(self):
+        """Clean up after tests"""
+        db.session.remove()
+        db.drop_all()
+        self.ctx.pop()
+
+    def _count_statements(self, func):
+        statements = []
+
+        def before_execute(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement)
+
+        event.listen(db.engine, 'before_cursor_execute', before_execute)
+        try:
+            result = func()
+        finally:
+            event.remove(db.engine, 'before_cursor_execute', before_execute)
+        return result, statements
+
+    def test_01_batch_commits_once_and_maintains_totals(self):
+        """Test 1: Creates for several vessels are applied in one commit with running totals"""
+        for i in range(30):
+            vessel = self.vessels[i % 3]
+            self.manager.add_to_sync_queue('cargo_tallies', 'create', {
+                'vessel_id': vessel.id, 'cargo_count': 10, 'tally_type': 'loaded', 'user_id': None
+            }, f'tally-{i}')
+
+        commits = []
+
+        def on_commit(conn):
+            commits.append(conn)
+
+        event.listen(db.engine, 'commit', on_commit)
+        try:
+            records, results, report = self.processor.process(100)
+        finally:
+            event.remove(db.engine, 'commit', on_commit)
+
+        # One commit claims the batch, one applies every record with its queue status
+        self.assertEqual(len(commits), 2)
+        self.assertEqual(len(records), 30)
+        self.assertTrue(all(result['success'] for result in results.values()))
+        self.assertFalse(report['fallback'])
+        self.assertIn('cargo_tallies:create', report['groups'])
+        self.assertIsNotNone(report['rows_per_second'])
+
+        for vessel in self.vessels:
+            self.assertEqual(CargoTallyTotal.get_total(vessel.id), 100)
+            self.assertAlmostEqual(db.session.get(Vessel, vessel.id).progress_percentage, 10.0)
+        stats = self.manager.get_sync_statistics()
+        self.assertEqual((stats['pending'], stats['syncing'], stats['synced']), (0, 0, 30))
+
+    def test_02_update_queries_do_not_scale_with_batch(self):
+        """Test 2: Vessel updates prefetch with one IN query instead of one query per record"""
+        def queue_updates(count, offset):
+            for i in range(count):
+                vessel = self.vessels[i % 3]
+                self.manager.add_to_sync_queue('vessels', 'update', {
+                    'id': vessel.id, 'current_berth': f'B{offset + i}'
+                }, f'update-{offset + i}')
+
+        # Warm the queue counters so both runs only issue steady-state statements
+        queue_updates(3, 0)
+        self.processor.process(100)
+
+        queue_updates(6, 100)
+        _, small = self._count_statements(lambda: self.processor.process(100))
+        queue_updates(60, 200)
+        (records, results, _), large = self._count_statements(lambda: self.processor.process(100))
+
+        self.assertEqual(len(records), 60)
+        self.assertTrue(all(result['success'] for result in results.values()))
+        selects = [s for s in large if s.lstrip().upper().startswith('SELECT') and 'FROM vessels' in s]
+        self.assertEqual(len(selects), 1)
+        self.assertLessEqual(len(large) - len(small), 10)
+
+        # Later updates for the same vessel in the batch win
+        self.assertEqual(db.session.get(Vessel, self.vessels[0].id).current_berth, 'B257')
+
+    def test_03_base_hash_detects_conflicts(self):
+        """Test 3: An update based on a stale projection is reported as a conflict"""
+        vessel = self.vessels[0]
+        projection = {field: getattr(vessel, field) for field in VESSEL_SYNC_FIELDS}
+        fresh = canonical_sync_hash(VESSEL_SYNC_FIELDS, projection)
+
+        self.manager.add_to_sync_queue('vessels', 'update', {
+            'id': vessel.id, 'status': 'berthed', 'base_hash': fresh
+        }, 'fresh')
+        self.manager.add_to_sync_queue('vessels', 'update', {
+            'id': vessel.id, 'status': 'departed', 'base_hash': fresh
+        }, 'stale')
+        _, results, _ = self.processor.process(10)
+
+        self.assertTrue(results['fresh']['success'])
+        self.assertTrue(results['stale']['conflict'])
+        self.assertEqual(results['stale']['server_data']['status'], 'berthed')
+        self.assertEqual(self.manager.store.get('stale').status, SyncStatus.CONFLICT)
+        self.assertEqual(db.session.get(Vessel, vessel.id).status, 'berthed')
+
+    def test_04_bad_record_falls_back_without_blocking_batch(self):
+        """Test 4: A record that breaks the batch write is isolated and the rest are applied"""
+        self.manager.add_to_sync_queue('cargo_tallies', 'create', {
+            'vessel_id': self.vessels[0].id, 'cargo_count': 5
+        }, 'good')
+        # Duplicate explicit ids in one batch violate the primary key on flush
+        self.manager.add_to_sync_queue('vessels', 'create', {'id': 999, 'name': 'MV One'}, 'dup-a')
+        self.manager.add_to_sync_queue('vessels', 'create', {'id': 999, 'name': 'MV Two'}, 'dup-b')
+        self.manager.add_to_sync_queue('vessels', 'create', {'name': 'MV Bad', 'hull': 'steel'}, 'unknown')
+
+        _, results, report = self.processor.process(10)
+
+        self.assertTrue(report['fallback'])
+        self.assertTrue(results['good']['success'])
+        self.assertTrue(results['dup-a']['success'])
+        self.assertTrue(results['dup-b']['conflict'])
+        self.assertIn('hull', results['unknown']['error'])
+        self.assertEqual(CargoTallyTotal.get_total(self.vessels[0].id), 5)
+        self.assertEqual(self.manager.store.get('unknown').status, SyncStatus.PENDING)
+        self.assertEqual(self.manager.store.get('unknown').retry_count, 1)
+
+    def test_05_process_endpoint_reports_metadata(self):
+        """Test 5: /sync/process returns the existing summary plus batch timing"""
+        user = User(username='batch_user', email='batch@test.com')
+        user.set_password('password')
+        db.session.add(user)
+        db.session.commit()
+        with self.client.session_transaction() as sess:
+            sess['_user_id'] = str(user.id)
+            sess['_fresh'] = True
+
+        for i in range(3):
+            self.client.post('/sync/queue', json={
+                'table': 'cargo_tallies', 'operation': 'create',
+                'data': {'vessel_id': self.vessels[1].id, 'cargo_count': 4}
+            })
+
+        data = self.client.post('/sync/process', json={'batch_size': 50}).get_json()
+        self.assertEqual((data['processed'], data['conflicts'], data['errors']), (3, 0, 0))
+        self.assertEqual(data['metadata']['claimed'], 3)
+        self.assertIn('duration_ms', data['metadata'])
+        self.assertEqual(CargoTally.query.filter_by(vessel_id=self.vessels[1].id).first().recorded_by_id, user.id)
+
+        response = self.client.post('/sync/process', json={'batch_size': 'many'})
+        self.assertEqual(response.status_code, 400)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,205 @@
+"""
+Persistent Sync Queue Test Suite for Stevedores Dashboard 3.0
+Tests the indexed sync queue stores, incremental statistics and durability across workers
+"""
+
+import unittest
+import sys
+import os
+from datetime import datetime, timedelta
+from unittest import mock
+from sqlalchemy import event
+
+# Add the parent directory to the Python path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import app, db, User, Vessel, CargoTallyTotal, SyncQueueEntry, SyncQueueCounter
+from utils.sync_manager import (
+    SyncManager, MemorySyncQueueStore, DatabaseSyncQueueStore, SyncStatus, ConflictResolution
+)
+
+
+class SyncQueueTestSuite(unittest.TestCase):
+    """Test suite for the sync queue stores"""
+
+    def setUp(self):
+        """Set up test environment"""
+        self.app = app
+        self.app.config['TESTING'] = True
+        self.client = self.app.test_client()
+        self.ctx = self.app.app_context()
+        self.ctx.push()
+        db.create_all()
+
+    def tearDown(self):
+        """Clean up after tests"""
+        db.session.remove()
+        db.drop_all()
+        self.ctx.pop()
+
+    def _exercise(self, manager):
+        """Drive a manager through every status transition"""
+        low = manager.add_to_sync_queue('vessels', 'update', {'id': 1, 'status': 'berthed'}, 'low')
+        high = manager.add_to_sync_queue('cargo_tallies', 'create', {'vessel_id': 1, 'cargo_count': 5}, 'high', priority=5)
+        other = manager.add_to_sync_queue('cargo_tallies', 'create', {'vessel_id': 1, 'cargo_count': 2}, 'other')
+
+        self.assertEqual([r.id for r in manager.get_pending_sync_records()], [high, low, other])
+        self.assertEqual([r.id for r in manager.get_pending_sync_records(limit=1)], [high])
+
+        self.assertTrue(manager.mark_as_syncing(high))
+        self.assertTrue(manager.mark_as_synced(high, 'abc'))
+        self.assertTrue(manager.mark_as_conflict(low, {'id': 1, 'status': 'expected'}))
+        for _ in range(manager.max_retry_count):
+            manager.mark_as_error(other, 'boom')
+        self.assertFalse(manager.mark_as_synced('missing', 'x'))
+
+        stats = manager.get_sync_statistics()
+        self.assertEqual(stats['total_records'], 3)
+        self.assertEqual((stats['pending'], stats['synced'], stats['conflicts'], stats['errors']), (0, 1, 1, 1))
+        self.assertEqual(stats['by_table']['cargo_tallies'], {
+            'total': 2, 'pending': 0, 'syncing': 0, 'synced': 1, 'conflicts': 0, 'errors': 1
+        })
+
+        self.assertEqual([r.id for r in manager.get_conflicts()], [low])
+        resolved = manager.resolve_conflict(low, ConflictResolution.CLIENT_WINS)
+        self.assertEqual(resolved['status'], 'berthed')
+        self.assertEqual(manager.get_sync_statistics()['pending'], 1)
+
+        # Re-queueing an id replaces the record instead of duplicating it
+        manager.add_to_sync_queue('vessels', 'update', {'id': 1, 'status': 'departed'}, low)
+        self.assertEqual(manager.get_sync_statistics()['total_records'], 3)
+        return high
+
+    def test_01_memory_store_transitions_and_statistics(self):
+        """Test 1: In-process store keeps priority order and incremental statistics"""
+        manager = SyncManager(store=MemorySyncQueueStore())
+        self._exercise(manager)
+        self.assertEqual(manager.cleanup_synced_records(older_than_hours=-1), 1)
+        self.assertEqual(manager.get_sync_statistics()['synced'], 0)
+
+    def test_02_database_store_survives_worker_restart(self):
+        """Test 2: Database store behaves the same and is visible to a fresh manager"""
+        manager = SyncManager(store=DatabaseSyncQueueStore(db))
+        high = self._exercise(manager)
+
+        recycled = SyncManager(store=DatabaseSyncQueueStore(db))
+        self.assertEqual(recycled.get_sync_statistics(), manager.get_sync_statistics())
+        self.assertEqual(recycled.store.get(high).server_hash, 'abc')
+
+        # Counters agree with a full recount of the queue rows
+        before = SyncQueueCounter.get_counts()
+        SyncQueueCounter.rebuild()
+        self.assertEqual({k: v for k, v in SyncQueueCounter.get_counts().items() if v},
+                         {k: v for k, v in before.items() if v})
+
+        self.assertEqual(recycled.cleanup_synced_records(older_than_hours=-1), 1)
+        self.assertEqual(SyncQueueEntry.query.count(), 2)
+        self.assertEqual(recycled.get_sync_statistics()['synced'], 0)
+
+    def test_03_transition_cost_independent_of_queue_size(self):
+        """Test 3: Status transitions and statistics issue a fixed number of queries"""
+        manager = SyncManager(store=DatabaseSyncQueueStore(db))
+        for i in range(200):
+            manager.add_to_sync_queue('cargo_tallies', 'create', {'vessel_id': 1, 'cargo_count': i}, f'rec-{i}')
+
+        statements = []
+
+        def before_execute(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement)
+
+        # First transitions into each status seed their counters
+        manager.mark_as_syncing('rec-0')
+        manager.mark_as_synced('rec-0', 'hash')
+
+        event.listen(db.engine, 'before_cursor_execute', before_execute)
+        try:
+            manager.mark_as_syncing('rec-150')
+            manager.mark_as_synced('rec-150', 'hash')
+            transition_queries = len(statements)
+            statements.clear()
+            stats = manager.get_sync_statistics()
+        finally:
+            event.remove(db.engine, 'before_cursor_execute', before_execute)
+
+        self.assertLessEqual(transition_queries, 8)
+        self.assertEqual(len(statements), 1)
+        self.assertNotIn('sync_queue_entries', statements[0])
+        self.assertEqual((stats['pending'], stats['synced']), (198, 2))
+
+    def test_04_stalled_records_are_requeued(self):
+        """Test 4: Records left syncing by a recycled worker return to pending"""
+        manager = SyncManager(store=DatabaseSyncQueueStore(db))
+        manager.add_to_sync_queue('vessels', 'update', {'id': 1}, 'stuck')
+        manager.mark_as_syncing('stuck')
+        SyncQueueEntry.query.filter_by(sync_id='stuck').update(
+            {SyncQueueEntry.last_sync_attempt: datetime.utcnow() - timedelta(hours=1)}
+        )
+        db.session.commit()
+
+        self.assertEqual([r.id for r in manager.get_pending_sync_records()], ['stuck'])
+        self.assertEqual(manager.store.get('stuck').status, SyncStatus.PENDING)
+
+    def test_05_queue_and_process_endpoints_use_persistent_queue(self):
+        """Test 5: Records queued over HTTP are processed from the database queue"""
+        user = User(username='sync_user', email='sync@test.com')
+        user.set_password('password')
+        vessel = Vessel(name='MV Sync', total_cargo_capacity=100)
+        db.session.add_all([user, vessel])
+        db.session.commit()
+        user_id, vessel_id = user.id, vessel.id
+
+        with self.client.session_transaction() as sess:
+            sess['_user_id'] = str(user_id)
+            sess['_fresh'] = True
+
+        response = self.client.post('/sync/queue', json={
+            'table': 'cargo_tallies', 'operation': 'create', 'priority': 2,
+            'data': {'vessel_id': vessel_id, 'cargo_count': 12, 'tally_type': 'loaded'}
+        })
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(SyncQueueEntry.query.one().priority, 2)
+
+        response = self.client.post('/sync/process', json={'batch_size': 10})
+        self.assertEqual(response.get_json()['processed'], 1, response.get_json())
+        self.assertEqual(CargoTallyTotal.get_total(vessel_id), 12)
+
+        status = self.client.get('/sync/status').get_json()['status']['sync_statistics']
+        self.assertEqual((status['pending'], status['synced']), (0, 1))
+
+
+    def test_06_concurrent_claimers_never_share_records(self):
+        """Test 6: Two drainers that read the same pending set each win disjoint records"""
+        no_returning = mock.patch.object(DatabaseSyncQueueStore, '_supports_update_returning', return_value=False)
+        for store, patch in ((MemorySyncQueueStore(), None), (DatabaseSyncQueueStore(db), None),
+                             (DatabaseSyncQueueStore(db), no_returning)):
+            SyncQueueEntry.query.delete()
+            SyncQueueCounter.query.delete()
+            db.session.commit()
+            if patch:
+                # Per-row conditional UPDATE path for databases without UPDATE ... RETURNING
+                patch.start()
+                self.addCleanup(patch.stop)
+            first, second = SyncManager(store=store), SyncManager(store=store)
+            ids = [first.add_to_sync_queue('cargo_tallies', 'create', {'vessel_id': 1, 'cargo_count': i}, f'race-{i}')
+                   for i in range(6)]
+
+            # Both read the full pending set before either claims it
+            snapshot = second.get_pending_sync_records()
+            won_first = [r.id for r in first.claim_pending_records(limit=4)]
+            with mock.patch.object(second, 'get_pending_sync_records', return_value=snapshot):
+                won_second = [r.id for r in second.claim_pending_records()]
+
+            self.assertEqual(won_first, ids[:4])
+            self.assertEqual(won_second, ids[4:])
+            self.assertTrue(all(store.get(sync_id).status == SyncStatus.SYNCING for sync_id in ids))
+            stats = first.get_sync_statistics()
+            self.assertEqual((stats['pending'], stats['syncing']), (0, 6))
+
+            # A third drainer holding the stale snapshot gets nothing
+            third = SyncManager(store=store)
+            with mock.patch.object(third, 'get_pending_sync_records', return_value=snapshot):
+                self.assertEqual(third.claim_pending_records(), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,224 @@
+"""
+Background Sync Worker Test Suite for Stevedores Dashboard 3.0
+Tests queue draining off the request thread, adaptive backoff and worker metrics
+"""
+
+import unittest
+import sys
+import os
+import time
+from unittest import mock
+
+# Add the parent directory to the Python path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import app, db, User, Vessel, CargoTally, CargoTallyTotal
+from utils.sync_manager import SyncManager, MemorySyncQueueStore, DatabaseSyncQueueStore, BackgroundSyncScheduler
+from utils.sync_batch import SyncBatchProcessor
+from utils.sync_worker import SyncWorker
+
+
+class SyncWorkerTestSuite(unittest.TestCase):
+    """Test suite for the background sync worker"""
+
+    def setUp(self):
+        """Set up test environment"""
+        self.app = app
+        self.app.config['TESTING'] = True
+        self.manager = SyncManager(store=MemorySyncQueueStore())
+        self.scheduler = BackgroundSyncScheduler(self.manager)
+        self.batches = []
+        self.fail = False
+        self.worker = SyncWorker(self.scheduler, self._process, batch_size=4, max_backoff=100,
+                                 poor_connection_pause=2)
+        self.worker.configure(self.app)
+        self.worker.batch_size = 4
+        self.worker.max_backoff = 100
+        self.scheduler.sync_interval = 10
+
+    def tearDown(self):
+        """Clean up after tests"""
+        self.worker.stop()
+
+    def _process(self, batch_size):
+        """Stand-in for the /sync/process batch: mark claimed records synced"""
+        self.batches.append(batch_size)
+        if self.fail:
+            raise ConnectionError('upstream unavailable')
+        records = self.manager.claim_pending_records(batch_size)
+        self.manager.apply_results({r.id: {'success': True, 'server_hash': 'h'} for r in records})
+        return {'success': True, 'processed': len(records), 'errors': 0, 'metadata': {'claimed': len(records)}}
+
+    def _queue(self, count):
+        for i in range(count):
+            self.manager.add_to_sync_queue('cargo_tallies', 'create', {'vessel_id': 1, 'cargo_count': i})
+
+    def test_01_drains_backlog_then_waits_for_interval(self):
+        """Test 1: Full batches run back to back, a drained queue waits sync_interval"""
+        self._queue(10)
+        self.assertEqual(self.worker.get_metrics()['queue_depth'], 10)
+
+        delays = [self.worker.run_once() for _ in range(4)]
+        self.assertEqual(delays[:2], [0.0, 0.0])
+        self.assertEqual(delays[2:], [10, 10])
+        self.assertEqual(self.batches, [4, 4, 4])
+        self.assertFalse(self.scheduler.sync_in_progress)
+
+        metrics = self.worker.get_metrics()
+        self.assertEqual((metrics['queue_depth'], metrics['records_processed'], metrics['state']), (0, 10, 'idle'))
+        self.assertEqual(metrics['lag_seconds'], 0)
+        self.assertGreater(metrics['drain_rate_per_second'], 0)
+
+    def test_02_connection_quality_shapes_batches(self):
+        """Test 2: Poor connections get smaller batches with pauses; offline processes nothing"""
+        self._queue(3)
+        self.scheduler.network_status.mark_poor_connection()
+        self.assertEqual(self.worker.run_once(), 2)
+        self.assertEqual(self.batches, [1])
+
+        self.scheduler.network_status.mark_offline()
+        self.assertEqual(self.worker.run_once(), 10)
+        self.assertEqual(self.batches, [1])
+        self.assertEqual(self.worker.state, 'offline')
+        self.assertEqual(self.worker.get_metrics()['queue_depth'], 2)
+
+    def test_03_failures_back_off_exponentially(self):
+        """Test 3: Consecutive failures double the delay up to the cap and a success resets it"""
+        self._queue(2)
+        self.fail = True
+        delays = [self.worker.run_once() for _ in range(5)]
+        for delay, expected in zip(delays, [10, 20, 40, 80, 100]):
+            self.assertGreaterEqual(delay, expected)
+            self.assertLessEqual(delay, expected * 1.1)
+        self.assertEqual(self.scheduler.network_status.connection_quality, 'poor')
+        self.assertEqual(self.worker.get_metrics()['last_error'], 'upstream unavailable')
+
+        # The recovering batch is still shrunk; once the connection is good again it drains at full size
+        self.fail = False
+        self.assertEqual(self.worker.run_once(), 0.0)
+        self.assertEqual(self.worker.consecutive_failures, 0)
+        self.assertEqual(self.scheduler.network_status.connection_quality, 'good')
+        self.assertEqual(self.worker.run_once(), 10)
+        self.assertEqual(self.batches[-2:], [1, 4])
+
+    def test_04_thread_drains_on_wake(self):
+        """Test 4: The worker thread sleeps out the interval but a wake runs it at once"""
+        self.scheduler.sync_interval = 60
+        self.assertTrue(self.worker.start(self.app))
+        self.assertFalse(self.worker.start(self.app))
+
+        deadline = time.time() + 2
+        while self.worker.state != 'idle' and time.time() < deadline:
+            time.sleep(0.01)
+        self._queue(5)
+        self.worker.wake()
+
+        deadline = time.time() + 2
+        while self.worker.records_processed < 5 and time.time() < deadline:
+            time.sleep(0.01)
+        self.assertEqual(self.worker.records_processed, 5)
+        self.worker.stop()
+        self.assertFalse(self.worker.is_running)
+
+    def test_05_routes_use_worker(self):
+        """Test 5: Queueing no longer wedges the scheduler and force-sync hands off to the worker"""
+        from routes.sync_routes import sync_scheduler, sync_worker
+
+        client = self.app.test_client()
+        with self.app.app_context():
+            db.create_all()
+            user = User(username='worker_user', email='worker@test.com')
+            user.set_password('password')
+            vessel = Vessel(name='MV Worker', total_cargo_capacity=100)
+            db.session.add_all([user, vessel])
+            db.session.commit()
+            user_id, vessel_id = user.id, vessel.id
+        try:
+            with client.session_transaction() as sess:
+                sess['_user_id'] = str(user_id)
+                sess['_fresh'] = True
+
+            client.post('/sync/queue', json={
+                'table': 'cargo_tallies', 'operation': 'create',
+                'data': {'vessel_id': vessel_id, 'cargo_count': 7}
+            })
+            self.assertFalse(sync_scheduler.sync_in_progress)
+
+            metrics = client.get('/sync/worker').get_json()['worker']
+            self.assertEqual((metrics['queue_depth'], metrics['mode']), (1, 'off'))
+
+            self.app.config['SYNC_WORKER_MODE'] = 'external'
+            response = client.post('/sync/force-sync')
+            self.assertEqual(response.status_code, 202)
+
+            # What `flask sync-worker --once` runs in the worker process
+            sync_worker.configure(self.app)
+            sync_worker.run_once()
+            with self.app.app_context():
+                self.assertEqual(CargoTallyTotal.get_total(vessel_id), 7)
+                self.assertEqual(sync_worker.get_metrics()['queue_depth'], 0)
+        finally:
+            self.app.config.pop('SYNC_WORKER_MODE', None)
+            sync_scheduler.sync_interval = 30
+            with self.app.app_context():
+                db.session.remove()
+                db.drop_all()
+
+
+    def test_06_competing_drainers_apply_each_record_once(self):
+        """Test 6: Two web workers draining the same database queue never apply a record twice"""
+        def drainer():
+            manager = SyncManager(store=DatabaseSyncQueueStore(db))
+            processor = SyncBatchProcessor(manager, db, Vessel, CargoTally, CargoTallyTotal)
+
+            def process(batch_size):
+                records, results, report = processor.process(batch_size)
+                processed = sum(1 for result in results.values() if result['success'])
+                return {'processed': processed, 'errors': len(records) - processed, 'metadata': report}
+
+            worker = SyncWorker(BackgroundSyncScheduler(manager), process, batch_size=4)
+            worker.configure(self.app)
+            worker.batch_size = 4
+            return manager, worker
+
+        with self.app.app_context():
+            db.create_all()
+            try:
+                vessel = Vessel(name='MV Race', total_cargo_capacity=100)
+                db.session.add(vessel)
+                db.session.commit()
+                vessel_id = vessel.id
+                first_manager, first = drainer()
+                second_manager, second = drainer()
+                for i in range(1, 7):
+                    first_manager.add_to_sync_queue('cargo_tallies', 'create',
+                                                    {'vessel_id': vessel_id, 'cargo_count': i, 'tally_type': 'loaded'})
+
+                # The second worker drains a batch between the first worker's read and its claim
+                read_pending = first_manager.get_pending_sync_records
+
+                def read_then_lose_race(limit=None):
+                    snapshot = read_pending(limit)
+                    second.run_once()
+                    return snapshot
+
+                with mock.patch.object(first_manager, 'get_pending_sync_records', side_effect=read_then_lose_race):
+                    first.run_once()
+                self.assertEqual((first.records_processed, second.records_processed), (0, 4))
+
+                while first_manager.has_pending_records():
+                    first.run_once()
+                    second.run_once()
+
+                self.assertEqual(first.records_processed + second.records_processed, 6)
+                self.assertEqual(CargoTally.query.count(), 6)
+                self.assertEqual(CargoTallyTotal.get_total(vessel_id), 21)
+                stats = second_manager.get_sync_statistics()
+                self.assertEqual((stats['synced'], stats['syncing']), (6, 0))
+            finally:
+                db.session.remove()
+                db.drop_all()
+
+
+if __name__ == '__main__':
+    unittest.main()
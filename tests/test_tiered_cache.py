@@ -0,0 +1,167 @@
+"""
+Tiered Cache Test Suite for Stevedores Dashboard 3.0
+Tests request coalescing, stale-while-revalidate, shared tiers and route invalidation
+"""
+
+import unittest
+import sys
+import os
+import threading
+import time
+from sqlalchemy import event
+
+# Add the parent directory to the Python path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import app, db, User, Vessel
+from utils.cache_manager import CacheManager, cache_vessel_data
+from tests.test_offline_cache import DictRedis
+
+
+class TieredCacheTestSuite(unittest.TestCase):
+    """Test suite for the tiered cache manager"""
+
+    def setUp(self):
+        """Set up test environment"""
+        self.cache = CacheManager(default_timeout=60, stale_timeout=60)
+
+    def _wait_for(self, condition, timeout=2.0):
+        deadline = time.time() + timeout
+        while not condition() and time.time() < deadline:
+            time.sleep(0.005)
+        self.assertTrue(condition())
+
+    def test_01_concurrent_misses_run_one_load(self):
+        """Test 1: 20 concurrent misses on vessel_summary share a single loader call"""
+        calls = []
+
+        def load_summary():
+            calls.append(1)
+            time.sleep(0.1)
+            return {'total_vessels': 3}
+
+        barrier = threading.Barrier(20)
+        results = []
+
+        def request_summary():
+            barrier.wait()
+            results.append(self.cache.get_or_set('vessel_summary', load_summary))
+
+        threads = [threading.Thread(target=request_summary) for _ in range(20)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(results, [{'total_vessels': 3}] * 20)
+        self.assertEqual(self.cache.get_stats()['coalesced'], 19)
+        self.assertEqual(self.cache.get_stats()['in_flight'], 0)
+
+    def test_02_stale_entries_are_served_while_refreshing(self):
+        """Test 2: An expired entry inside its stale window is returned while one refresh runs"""
+        self.cache.set('berths', ['B1'], timeout=0, stale_timeout=60)
+        self.assertIsNone(self.cache.get('berths'))
+
+        refreshed = threading.Event()
+
+        def load_berths():
+            refreshed.wait(1.0)
+            return ['B1', 'B2']
+
+        self.assertEqual(self.cache.get_or_set('berths', load_berths), ['B1'])
+        self.assertEqual(self.cache.get_or_set('berths', load_berths), ['B1'])
+        self.assertEqual(self.cache.cache_stats['refreshes'], 1)
+
+        refreshed.set()
+        self._wait_for(lambda: self.cache.get('berths') == ['B1', 'B2'])
+
+        # Past the stale window the caller waits for the load
+        self.cache.set('berths', ['old'], timeout=0, stale_timeout=0)
+        self.assertEqual(self.cache.get_or_set('berths', lambda: ['new']), ['new'])
+
+    def test_03_workers_share_l2_and_tag_invalidation(self):
+        """Test 3: Entries and tag invalidations reach other workers through Redis"""
+        redis = DictRedis()
+        worker_a = CacheManager(redis, tag_ttl=0)
+        worker_b = CacheManager(redis, tag_ttl=0)
+
+        worker_a.set('vessel:1', {'name': 'MV Tiered'}, tags=['vessels'])
+        self.assertEqual(worker_b.get('vessel:1'), {'name': 'MV Tiered'})
+        self.assertEqual(worker_b.cache_stats['l2_hits'], 1)
+        self.assertEqual(worker_b.get('vessel:1'), {'name': 'MV Tiered'})
+        self.assertEqual(worker_b.cache_stats['l1_hits'], 1)
+
+        worker_a.invalidate_tags('vessels')
+        self.assertIsNone(worker_b.get('vessel:1'))
+
+        # Values Redis can't hold stay in the local tier only
+        worker_a.set('handle', object())
+        self.assertIsNotNone(worker_a.get('handle'))
+        self.assertIsNone(worker_b.get('handle'))
+
+    def test_04_cached_functions_share_the_vessels_tag(self):
+        """Test 4: cache_vessel_data results are reused until the vessel list tag is invalidated"""
+        calls = []
+
+        @cache_vessel_data(timeout=60)
+        def vessel_names(prefix):
+            calls.append(prefix)
+            return [f'{prefix} Aurora']
+
+        with app.app_context():
+            self.assertEqual(vessel_names('MV'), ['MV Aurora'])
+            self.assertEqual(vessel_names('MV'), ['MV Aurora'])
+            self.assertEqual(calls, ['MV'])
+
+            app.cache_manager.invalidate_tags('vessels')
+            vessel_names('MV')
+            self.assertEqual(calls, ['MV', 'MV'])
+
+    def test_05_vessel_summary_route_is_cached_and_invalidated(self):
+        """Test 5: Repeat summary requests skip the database until a tally changes a vessel"""
+        with app.app_context():
+            db.create_all()
+            user = User(username='tiered_user', email='tiered@test.com')
+            user.set_password('password')
+            vessel = Vessel(name='MV Tiered', total_cargo_capacity=100)
+            db.session.add_all([user, vessel])
+            db.session.commit()
+            user_id, vessel_id = user.id, vessel.id
+
+        queries = []
+
+        def count(conn, cursor, statement, *args):
+            queries.append(statement)
+
+        try:
+            client = app.test_client()
+            with client.session_transaction() as sess:
+                sess['_user_id'] = str(user_id)
+                sess['_fresh'] = True
+
+            with app.app_context():
+                app.cache_manager.invalidate_tags('vessels')
+                first = client.get('/api/vessels/summary').get_json()
+                event.listen(db.engine, 'before_cursor_execute', count)
+                second = client.get('/api/vessels/summary')
+                event.remove(db.engine, 'before_cursor_execute', count)
+
+            self.assertEqual(second.status_code, 200)
+            self.assertEqual(second.get_json(), first)
+            self.assertEqual([q for q in queries if 'FROM vessels' in q], [])
+
+            client.post(f'/api/vessels/{vessel_id}/cargo-tally', json={'cargo_count': 25})
+            third = client.get('/api/vessels/summary').get_json()
+            self.assertEqual(third['vessels'][0]['progress_percentage'], 25.0)
+
+            self.assertEqual(client.get('/api/vessels/summary?fields=nope').status_code, 400)
+            self.assertEqual(client.get('/api/vessels/summary?fields=nope').status_code, 400)
+        finally:
+            with app.app_context():
+                db.session.remove()
+                db.drop_all()
+
+
+if __name__ == '__main__':
+    unittest.main()
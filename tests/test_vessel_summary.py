@@ -0,0 +1,94 @@
+"""
+Vessel Summary API Test Suite for Stevedores Dashboard 3.0
+Tests the column-projected /api/vessels/summary endpoint
+"""
+
+import unittest
+import sys
+import os
+import json
+from sqlalchemy import event
+
+# Add the parent directory to the Python path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import app, db, Vessel
+
+
+class VesselSummaryTestSuite(unittest.TestCase):
+    """Test suite for the lean vessel summary endpoint"""
+
+    def setUp(self):
+        """Set up test environment"""
+        self.app = app
+        self.app.config['TESTING'] = True
+        self.client = self.app.test_client()
+
+        with self.app.app_context():
+            db.create_all()
+            db.session.add_all([
+                Vessel(name='MV Summary One', status='operations_active', total_cargo_capacity=500,
+                       team_assignments=json.dumps({'auto_operations': ['Jonathan']})),
+                Vessel(name='MV Summary Two', status='expected', cargo_configuration='not json'),
+            ])
+            db.session.commit()
+
+    def tearDown(self):
+        """Clean up after tests"""
+        with self.app.app_context():
+            db.session.remove()
+            db.drop_all()
+
+    def _capture_statements(self):
+        statements = []
+        with self.app.app_context():
+            engine = db.engine
+
+        def before_execute(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement)
+
+        event.listen(engine, 'before_cursor_execute', before_execute)
+        self.addCleanup(event.remove, engine, 'before_cursor_execute', before_execute)
+        return statements
+
+    def test_01_default_summary_skips_json_columns(self):
+        """Test 1: Default summary selects only the summary columns"""
+        statements = self._capture_statements()
+        response = self.client.get('/api/vessels/summary')
+        self.assertEqual(response.status_code, 200)
+
+        data = response.get_json()
+        self.assertEqual(data['total_vessels'], 2)
+        self.assertEqual(data['active_vessels'], 1)
+        vessel = data['vessels'][0]
+        self.assertEqual(vessel['name'], 'MV Summary One')
+        self.assertIn('progress_percentage', vessel)
+        self.assertNotIn('team_assignments', vessel)
+
+        selects = [s for s in statements if s.lstrip().upper().startswith('SELECT')]
+        self.assertEqual(len(selects), 1)
+        self.assertNotIn('team_assignments', selects[0])
+        self.assertNotIn('step_1_data', selects[0])
+
+    def test_02_expand_parses_requested_json(self):
+        """Test 2: expand pulls and parses only the requested JSON columns"""
+        response = self.client.get('/api/vessels/summary?expand=team_assignments,cargo_configuration')
+        self.assertEqual(response.status_code, 200)
+        vessels = response.get_json()['vessels']
+        self.assertEqual(vessels[0]['team_assignments'], {'auto_operations': ['Jonathan']})
+        self.assertIsNone(vessels[1]['cargo_configuration'])
+        self.assertNotIn('van_details', vessels[0])
+
+    def test_03_fields_projection_and_validation(self):
+        """Test 3: fields narrows the projection and rejects unknown columns"""
+        response = self.client.get('/api/vessels/summary?fields=name,updated_at')
+        self.assertEqual(response.status_code, 200)
+        vessel = response.get_json()['vessels'][0]
+        self.assertEqual(set(vessel), {'id', 'status', 'name', 'updated_at'})
+
+        self.assertEqual(self.client.get('/api/vessels/summary?fields=password').status_code, 400)
+        self.assertEqual(self.client.get('/api/vessels/summary?expand=name').status_code, 400)
+
+
+if __name__ == '__main__':
+    unittest.main()
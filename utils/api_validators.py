@@ -8,7 +8,7 @@ from typing import Dict, Any, Optional, List, Union
 from functools import wraps
 from datetime import datetime, date
 from flask import request, jsonify, g
-from marshmallow import Schema, fields, validate, ValidationError, pre_load, post_load
+from marshmallow import Schema, fields, validate, ValidationError, pre_load, post_load, EXCLUDE
 from marshmallow.decorators import validates_schema
 
 logger = logging.getLogger(__name__)
@@ -150,6 +150,30 @@ class CargoTallySchema(MaritimeBaseSchema):
     # Timestamps
     timestamp = fields.DateTime(allow_none=True)
 
+class BulkCargoTallyItemSchema(CargoTallySchema):
+    """Validation schema for a single entry of a bulk cargo tally upload"""
+    
+    class Meta:
+        # Replayed offline records carry client bookkeeping fields we don't store
+        unknown = EXCLUDE
+    
+    # Same defaults as the single-entry tally endpoint
+    tally_type = fields.String(
+        load_default='loaded',
+        validate=validate.OneOf(['loaded', 'discharged', 'damaged', 'rejected'])
+    )
+    shift_period = fields.String(
+        load_default='morning',
+        allow_none=True,
+        validate=validate.OneOf(['morning', 'afternoon', 'night'])
+    )
+    
+    # Matches the cargo_tallies.location column width
+    location = fields.String(allow_none=True, validate=validate.Length(max=50))
+    
+    # Client-side identifier echoed back in the per-item results
+    client_id = fields.String(allow_none=True, validate=validate.Length(max=100))
+
 class DocumentUploadSchema(MaritimeBaseSchema):
     """Validation schema for maritime document uploads"""
     
@@ -432,6 +456,7 @@ def maritime_api_response(data=None, message=None, errors=None, status_code=200)
 # Schema instances for common use
 vessel_schema = VesselSchema()
 cargo_tally_schema = CargoTallySchema()
+bulk_cargo_tally_item_schema = BulkCargoTallyItemSchema()
 document_upload_schema = DocumentUploadSchema()
 sync_operation_schema = SyncOperationSchema()
 user_auth_schema = UserAuthSchema()
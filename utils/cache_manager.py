@@ -1,335 +1,634 @@
 """
 Multi-Layer Cache Manager for Stevedores Dashboard 3.0
-Implements Redis-backed caching with in-memory fallback and performance optimization
+Implements a tiered cache with request coalescing and stale-while-revalidate
+
+Tiers, checked in order:
+- L1: per-process LRU (InMemoryFallbackCache) bounded by entries and bytes
+- L2: Redis through EnterpriseRedisClient, so the circuit breaker applies
+- L3: optional encrypted disk cache (EncryptedCacheManager) for offline restarts
+
+Every entry is stored with a fresh-until and a stale-until time. get_or_set()
+returns fresh entries directly, returns stale entries immediately while one
+background refresh runs, and coalesces concurrent misses for a key so only one
+caller runs the loader.
+
+Entries can carry tags such as vessel:<id>. Each tag has a version counter in
+Redis and an entry stores the versions it was loaded under, so bumping a tag
+invalidates every entry carrying it without scanning keys. Invalidations are
+also published on a Redis channel so other workers drop their local copy of
+the tag version at once instead of waiting for it to expire. While that is not
+possible - no Redis, the listener is not subscribed or the circuit breaker is
+open - tagged entries are stored for at most unshared_timeout seconds, since
+an invalidation would only reach the current worker.
 """
 
 import json
 import hashlib
+import math
 import time
 import logging
+import threading
+import inspect
+import uuid
 from functools import wraps
-from typing import Any, Dict, Optional, Union, Callable
-from flask import request, current_app, g
+from typing import Any, Callable, Dict, Iterable, Optional, Union
+from flask import request, current_app, copy_current_request_context, has_request_context
+
+from utils.redis_client import InMemoryFallbackCache, CircuitBreakerState
 
 logger = logging.getLogger(__name__)
 
+# Tag carried by responses built from the whole vessel list
+VESSELS_TAG = 'vessels'
+
+INVALIDATION_CHANNEL = 'stevedores:cache-invalidate'
+
+def vessel_tag(vessel_id) -> str:
+    """Tag for cache entries built from one vessel or its cargo tallies"""
+    return f'vessel:{vessel_id}'
+
+class _Flight:
+    """One in-progress load that concurrent callers for the same key wait on"""
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.value = None
+        self.error = None
+
 class CacheManager:
-    """Multi-layer caching system with Redis primary and in-memory fallback"""
-    
-    def __init__(self, redis_manager=None, default_timeout=300):
-        self.redis_manager = redis_manager
+    """Tiered cache: per-process LRU, Redis and optional encrypted disk"""
+
+    KEY_PREFIX = 'cache:'
+
+    def __init__(self, redis_client=None, default_timeout=300, stale_timeout=60,
+                 l1_max_size=1024, l1_max_bytes=32 * 1024 * 1024, disk_cache=None,
+                 tag_ttl=1.0, subscribed_tag_ttl=60.0, flight_timeout=30.0, unshared_timeout=30):
+        self.redis = redis_client
+        self.disk = disk_cache
         self.default_timeout = default_timeout
-        self.fallback_cache = {}  # In-memory fallback cache
+        self.stale_timeout = stale_timeout
+        # How long a worker trusts its copy of a tag version before re-reading Redis -
+        # longer while the invalidation listener is connected and pushes changes
+        self.tag_ttl = tag_ttl
+        self.subscribed_tag_ttl = subscribed_tag_ttl
+        # Upper bound on fresh and stale time of tagged entries while invalidations stay local
+        self.unshared_timeout = unshared_timeout
+        self.flight_timeout = flight_timeout
+        self.instance_id = uuid.uuid4().hex
+
+        self.l1 = InMemoryFallbackCache(max_size=l1_max_size, default_ttl=0, max_bytes=l1_max_bytes)
+        self._flights: Dict[str, _Flight] = {}
+        self._flights_lock = threading.Lock()
+        # tag -> (version, trusted until or None) - kept out of the LRU so eviction never
+        # resets a version that is only held locally
+        self._tag_cache: Dict[str, tuple] = {}
+
         self.cache_stats = {
             'hits': 0,
             'misses': 0,
-            'redis_hits': 0,
-            'fallback_hits': 0,
+            'l1_hits': 0,
+            'l2_hits': 0,
+            'l3_hits': 0,
+            'stale_hits': 0,
+            'coalesced': 0,
+            'loads': 0,
+            'refreshes': 0,
+            'tag_invalidations': 0,
+            'remote_invalidations': 0,
             'errors': 0
         }
-        
-        # Cache size limits to prevent memory issues
-        self.max_fallback_size = 1000
-        self.fallback_cleanup_threshold = 0.8
-    
+
+        self._listener = None
+        self._listener_ready = threading.Event()
+        self._stopping = threading.Event()
+        self._listener_lock = threading.Lock()
+
     def _generate_cache_key(self, prefix: str, *args, **kwargs) -> str:
         """Generate a unique cache key from arguments"""
         # Create a deterministic string from all arguments
         key_parts = [str(prefix)]
         key_parts.extend([str(arg) for arg in args])
-        
+
         # Add sorted kwargs
         if kwargs:
             sorted_kwargs = sorted(kwargs.items())
             key_parts.extend([f"{k}:{v}" for k, v in sorted_kwargs])
-        
+
         # Create hash to ensure key is within limits
         key_string = ":".join(key_parts)
         if len(key_string) > 200:  # Redis key limit precaution
             key_hash = hashlib.md5(key_string.encode()).hexdigest()
             return f"{prefix}:{key_hash}"
-        
+
         return key_string.replace(' ', '_')  # Replace spaces for compatibility
-    
-    def _cleanup_fallback_cache(self):
-        """Clean up fallback cache when it gets too large"""
-        if len(self.fallback_cache) > self.max_fallback_size * self.fallback_cleanup_threshold:
-            # Remove oldest 20% of entries (simple LRU-like behavior)
-            items = list(self.fallback_cache.items())
-            items_to_remove = items[:len(items) // 5]
-            
-            for key, _ in items_to_remove:
-                del self.fallback_cache[key]
-            
-            logger.debug(f"Cleaned up fallback cache: removed {len(items_to_remove)} entries")
-    
+
+    # Tags
+
+    def _tag_version(self, tag: str) -> int:
+        """Current version of a tag"""
+        cached = self._tag_cache.get(tag)
+        if cached is not None and (cached[1] is None or cached[1] > time.monotonic()):
+            return cached[0]
+
+        version = 0
+        if self.redis is not None:
+            self._ensure_listener()
+            try:
+                version = int(self.redis.get(f'{self.KEY_PREFIX}tag:{tag}') or 0)
+            except Exception as e:
+                logger.debug(f"Cache tag read failed for '{tag}': {e}")
+                self.cache_stats['errors'] += 1
+            ttl = self.subscribed_tag_ttl if self._listener_ready.is_set() else self.tag_ttl
+            self._tag_cache[tag] = (version, time.monotonic() + ttl)
+        else:
+            # Without Redis the local version is authoritative
+            self._tag_cache[tag] = (version, None)
+        return version
+
+    def _tag_versions(self, tags: Iterable[str]) -> Dict[str, int]:
+        return {tag: self._tag_version(tag) for tag in tags}
+
+    def _tags_current(self, entry: Dict[str, Any]) -> bool:
+        return all(self._tag_version(tag) == version for tag, version in entry.get('tags', {}).items())
+
+    def invalidate_tags(self, *tags: str) -> int:
+        """Invalidate every entry carrying any of the tags, in every worker"""
+        tags = sorted(set(tags))
+        for tag in tags:
+            version = None
+            if self.redis is not None:
+                try:
+                    version = self.redis.incr(f'{self.KEY_PREFIX}tag:{tag}')
+                except Exception as e:
+                    logger.warning(f"Cache tag invalidation failed for '{tag}': {e}")
+                    self.cache_stats['errors'] += 1
+            if version is None:
+                version = self._tag_cache.get(tag, (0, None))[0] + 1
+            self._tag_cache[tag] = (version, time.monotonic() + self.tag_ttl if self.redis is not None else None)
+        self.cache_stats['tag_invalidations'] += len(tags)
+
+        if self.redis is not None and tags:
+            try:
+                self.redis.publish(INVALIDATION_CHANNEL, json.dumps({'origin': self.instance_id, 'tags': tags}))
+            except Exception as e:
+                logger.debug(f"Cache invalidation publish failed: {e}")
+        return len(tags)
+
+    def invalidation_shared(self) -> bool:
+        """Whether invalidate_tags() reaches the other workers right now"""
+        if self.redis is None or not self._listener_ready.is_set():
+            return False
+        breaker = getattr(self.redis, '_circuit_breaker', None)
+        return breaker is None or breaker.state not in (CircuitBreakerState.OPEN, CircuitBreakerState.FORCE_OPEN)
+
+    def _drop_tag_versions(self, tags: Iterable[str]):
+        """Forget local tag versions so the next read fetches them from Redis"""
+        for tag in tags:
+            self._tag_cache.pop(tag, None)
+        self.cache_stats['remote_invalidations'] += 1
+
+    def _full_key(self, key: str) -> str:
+        return f'{self.KEY_PREFIX}{key}'
+
+    # Tier access
+
+    def _read(self, full_key: str) -> Optional[Dict[str, Any]]:
+        """Entry envelope from the first tier holding it, or None if a tag was invalidated"""
+        entry = self._read_tiers(full_key)
+        if entry is not None and not self._tags_current(entry):
+            self.l1.delete(full_key)
+            return None
+        return entry
+
+    def _read_tiers(self, full_key: str) -> Optional[Dict[str, Any]]:
+        entry = self.l1.get(full_key)
+        if entry is not None:
+            self.cache_stats['l1_hits'] += 1
+            return entry
+
+        if self.redis is not None:
+            try:
+                raw = self.redis.get(full_key)
+                if raw is not None:
+                    entry = json.loads(raw)
+                    self.cache_stats['l2_hits'] += 1
+                    self._write_l1(full_key, entry)
+                    return entry
+            except Exception as e:
+                logger.debug(f"Cache L2 read failed for '{full_key}': {e}")
+                self.cache_stats['errors'] += 1
+
+        if self.disk is not None:
+            entry = self.disk.retrieve(full_key)
+            if entry is not None:
+                self.cache_stats['l3_hits'] += 1
+                self._write(full_key, entry, disk=False)
+                return entry
+
+        return None
+
+    def _write_l1(self, full_key: str, entry: Dict[str, Any]):
+        remaining = entry['stale_until'] - time.time()
+        if remaining > 0:
+            self.l1.set(full_key, entry, remaining)
+        else:
+            self.l1.delete(full_key)
+
+    def _write(self, full_key: str, entry: Dict[str, Any], disk: bool = True):
+        """Write an entry envelope to every tier; values that aren't JSON stay in L1"""
+        self._write_l1(full_key, entry)
+        ttl = math.ceil(entry['stale_until'] - time.time())
+        if self.redis is None and self.disk is None:
+            return
+        if ttl <= 0:
+            self._delete_shared(full_key)
+            return
+
+        try:
+            payload = json.dumps(entry)
+        except (TypeError, ValueError):
+            return
+
+        if self.redis is not None:
+            try:
+                self.redis.set(full_key, payload, ex=ttl)
+            except Exception as e:
+                logger.debug(f"Cache L2 write failed for '{full_key}': {e}")
+                self.cache_stats['errors'] += 1
+        if disk and self.disk is not None:
+            self.disk.store(full_key, entry, ttl=ttl)
+
+    def _delete_shared(self, *full_keys: str) -> int:
+        """Remove keys from the Redis and disk tiers"""
+        deleted_count = 0
+        if self.disk is not None:
+            for full_key in full_keys:
+                self.disk.delete(full_key)
+        if self.redis is not None:
+            deleted_count = self.redis.delete(*full_keys) or 0
+        return deleted_count
+
+    def _envelope(self, value: Any, timeout: Optional[int], stale_timeout: Optional[int],
+                  tag_versions: Optional[Dict[str, int]] = None) -> Dict[str, Any]:
+        now = time.time()
+        timeout = self.default_timeout if timeout is None else timeout
+        stale = self.stale_timeout if stale_timeout is None else stale_timeout
+        if tag_versions and not self.invalidation_shared():
+            timeout = min(timeout, self.unshared_timeout)
+            stale = min(stale, self.unshared_timeout)
+        fresh_until = now + timeout
+        return {'value': value, 'fresh_until': fresh_until, 'stale_until': fresh_until + stale,
+                'tags': tag_versions or {}}
+
+    # Public API
+
     def get(self, key: str, default=None) -> Any:
-        """Get value from cache (Redis first, then fallback)"""
+        """Get a fresh value from the first tier that has it"""
         try:
-            # Try Redis first
-            if self.redis_manager:
-                redis_client = self.redis_manager.get_client()
-                if redis_client:
-                    value = redis_client.get(key)
-                    if value is not None:
-                        try:
-                            result = json.loads(value)
-                            self.cache_stats['hits'] += 1
-                            self.cache_stats['redis_hits'] += 1
-                            return result
-                        except json.JSONDecodeError:
-                            # Handle non-JSON values
-                            self.cache_stats['hits'] += 1
-                            self.cache_stats['redis_hits'] += 1
-                            return value
-            
-            # Try fallback cache
-            if key in self.fallback_cache:
-                cached_item = self.fallback_cache[key]
-                
-                # Check if expired
-                if cached_item['expires_at'] > time.time():
-                    self.cache_stats['hits'] += 1
-                    self.cache_stats['fallback_hits'] += 1
-                    return cached_item['value']
-                else:
-                    # Remove expired item
-                    del self.fallback_cache[key]
-            
+            entry = self._read(self._full_key(key))
+            if entry is not None and entry['fresh_until'] > time.time():
+                self.cache_stats['hits'] += 1
+                return entry['value']
+
             # Cache miss
             self.cache_stats['misses'] += 1
             return default
-            
+
         except Exception as e:
             logger.warning(f"Cache get error for key '{key}': {e}")
             self.cache_stats['errors'] += 1
             return default
-    
-    def set(self, key: str, value: Any, timeout: Optional[int] = None) -> bool:
-        """Set value in cache (Redis primary, fallback secondary)"""
-        if timeout is None:
-            timeout = self.default_timeout
-        
-        success = False
-        
+
+    def set(self, key: str, value: Any, timeout: Optional[int] = None,
+            tags: Iterable[str] = (), stale_timeout: Optional[int] = None) -> bool:
+        """Set value in every tier, tagged for invalidation"""
         try:
-            # Set in Redis first
-            if self.redis_manager:
-                redis_client = self.redis_manager.get_client()
-                if redis_client:
-                    # Serialize value for Redis
-                    if isinstance(value, (dict, list, tuple)):
-                        serialized_value = json.dumps(value, default=str)
-                    else:
-                        serialized_value = json.dumps(value)
-                    
-                    redis_success = redis_client.setex(key, timeout, serialized_value)
-                    if redis_success:
-                        success = True
-            
-            # Always set in fallback cache as backup
-            expires_at = time.time() + timeout
-            self.fallback_cache[key] = {
-                'value': value,
-                'expires_at': expires_at,
-                'created_at': time.time()
-            }
-            
-            # Cleanup if needed
-            self._cleanup_fallback_cache()
-            
-            return True  # Success if either Redis or fallback worked
-            
+            envelope = self._envelope(value, timeout, stale_timeout, self._tag_versions(tags))
+            self._write(self._full_key(key), envelope)
+            return True
         except Exception as e:
             logger.warning(f"Cache set error for key '{key}': {e}")
             self.cache_stats['errors'] += 1
             return False
-    
+
     def delete(self, *keys: str) -> int:
-        """Delete keys from cache"""
+        """Delete keys from every tier"""
         deleted_count = 0
-        
+
         try:
-            # Delete from Redis
-            if self.redis_manager and keys:
-                redis_client = self.redis_manager.get_client()
-                if redis_client:
-                    redis_deleted = redis_client.delete(*keys)
-                    deleted_count += redis_deleted
-            
-            # Delete from fallback cache
-            for key in keys:
-                if key in self.fallback_cache:
-                    del self.fallback_cache[key]
+            full_keys = [self._full_key(key) for key in keys]
+            for full_key in full_keys:
+                if self.l1.delete(full_key):
                     deleted_count += 1
-            
+            if full_keys:
+                deleted_count += self._delete_shared(*full_keys)
+
         except Exception as e:
             logger.warning(f"Cache delete error for keys {keys}: {e}")
             self.cache_stats['errors'] += 1
-        
+
         return deleted_count
-    
+
     def exists(self, key: str) -> bool:
-        """Check if key exists in cache"""
+        """Check if a fresh value exists for key"""
         try:
-            # Check Redis first
-            if self.redis_manager:
-                redis_client = self.redis_manager.get_client()
-                if redis_client and redis_client.exists(key):
-                    return True
-            
-            # Check fallback cache
-            if key in self.fallback_cache:
-                cached_item = self.fallback_cache[key]
-                if cached_item['expires_at'] > time.time():
-                    return True
-                else:
-                    # Remove expired item
-                    del self.fallback_cache[key]
-            
-            return False
-            
+            entry = self._read(self._full_key(key))
+            return entry is not None and entry['fresh_until'] > time.time()
         except Exception as e:
             logger.warning(f"Cache exists check error for key '{key}': {e}")
             return False
-    
-    def clear(self, pattern: Optional[str] = None) -> int:
-        """Clear cache entries, optionally by pattern"""
-        cleared_count = 0
-        
+
+    def clear(self, tag: Optional[str] = None) -> int:
+        """Invalidate a tag everywhere, or drop this worker's L1 when none is given"""
+        if tag:
+            return self.invalidate_tags(tag)
+        cleared_count = len(self.l1._cache)
+        self.l1.clear()
+        return cleared_count
+
+    def get_or_set(self, key: str, loader: Callable[[], Any], timeout: Optional[int] = None,
+                   tags: Iterable[str] = (), stale_timeout: Optional[int] = None,
+                   cache_if: Optional[Callable[[Any], bool]] = None,
+                   refresh_wrapper: Optional[Callable[[Callable], Callable]] = None) -> Any:
+        """
+        Cached value for key, calling loader() at most once per key at a time.
+
+        A fresh entry is returned as is. A stale entry is returned immediately
+        and refreshed in a background thread (wrapped with refresh_wrapper, e.g.
+        to carry a request context). On a miss concurrent callers wait for a
+        single loader call and share its result. Results failing cache_if are
+        shared with waiting callers but not stored. Entries whose tags were
+        invalidated are never served stale.
+        """
+        full_key = self._full_key(key)
         try:
-            # Clear Redis
-            if self.redis_manager:
-                redis_client = self.redis_manager.get_client()
-                if redis_client:
-                    if pattern:
-                        # Delete keys matching pattern
-                        keys = redis_client.keys(pattern)
-                        if keys:
-                            cleared_count += redis_client.delete(*keys)
-                    else:
-                        # Clear all keys (dangerous - use with caution)
-                        redis_client.flushdb()
-                        cleared_count += len(self.fallback_cache)
-            
-            # Clear fallback cache
-            if pattern:
-                import fnmatch
-                keys_to_delete = [
-                    key for key in self.fallback_cache.keys()
-                    if fnmatch.fnmatch(key, pattern)
-                ]
-                for key in keys_to_delete:
-                    del self.fallback_cache[key]
-                    cleared_count += 1
-            else:
-                cleared_count += len(self.fallback_cache)
-                self.fallback_cache.clear()
-            
+            entry = self._read(full_key)
         except Exception as e:
-            logger.warning(f"Cache clear error: {e}")
-        
-        return cleared_count
-    
+            logger.warning(f"Cache get error for key '{key}': {e}")
+            self.cache_stats['errors'] += 1
+            entry = None
+
+        now = time.time()
+        if entry is not None and entry['fresh_until'] > now:
+            self.cache_stats['hits'] += 1
+            return entry['value']
+
+        def load():
+            return self._load(full_key, loader, timeout, stale_timeout, cache_if, tags)
+
+        if entry is not None and entry['stale_until'] > now:
+            self.cache_stats['stale_hits'] += 1
+            self._refresh_in_background(full_key, refresh_wrapper(load) if refresh_wrapper else load)
+            return entry['value']
+
+        self.cache_stats['misses'] += 1
+        return load()
+
+    def _load(self, full_key, loader, timeout, stale_timeout, cache_if, tags=()):
+        """Run loader once for full_key, or wait for the caller already running it"""
+        with self._flights_lock:
+            flight = self._flights.get(full_key)
+            leader = flight is None
+            if leader:
+                flight = self._flights[full_key] = _Flight()
+
+        if not leader:
+            self.cache_stats['coalesced'] += 1
+            if flight.event.wait(self.flight_timeout):
+                if flight.error is not None:
+                    raise flight.error
+                return flight.value
+            logger.warning(f"Cache load for '{full_key}' exceeded {self.flight_timeout}s - loading directly")
+            return loader()
+
+        try:
+            self.cache_stats['loads'] += 1
+            # Versions read before loading, so an invalidation during the load wins
+            tag_versions = self._tag_versions(tags)
+            value = loader()
+            flight.value = value
+            if cache_if is None or cache_if(value):
+                self._write(full_key, self._envelope(value, timeout, stale_timeout, tag_versions))
+            return value
+        except Exception as e:
+            flight.error = e
+            raise
+        finally:
+            with self._flights_lock:
+                self._flights.pop(full_key, None)
+            flight.event.set()
+
+    def _refresh_in_background(self, full_key: str, load: Callable[[], Any]):
+        """Start one refresh for full_key unless a load is already running"""
+        if full_key in self._flights:
+            return
+
+        def refresh():
+            try:
+                load()
+            except Exception as e:
+                logger.warning(f"Background cache refresh failed for '{full_key}': {e}")
+
+        self.cache_stats['refreshes'] += 1
+        threading.Thread(target=refresh, name='cache-refresh', daemon=True).start()
+
     def get_stats(self) -> Dict[str, Any]:
         """Get cache statistics"""
-        total_requests = self.cache_stats['hits'] + self.cache_stats['misses']
-        hit_rate = (self.cache_stats['hits'] / total_requests * 100) if total_requests > 0 else 0
-        
+        total_requests = self.cache_stats['hits'] + self.cache_stats['stale_hits'] + self.cache_stats['misses']
+        hit_rate = ((total_requests - self.cache_stats['misses']) / total_requests * 100) if total_requests > 0 else 0
+
         return {
             'total_requests': total_requests,
             'hit_rate': round(hit_rate, 2),
-            'hits': self.cache_stats['hits'],
-            'misses': self.cache_stats['misses'],
-            'redis_hits': self.cache_stats['redis_hits'],
-            'fallback_hits': self.cache_stats['fallback_hits'],
-            'errors': self.cache_stats['errors'],
-            'fallback_cache_size': len(self.fallback_cache),
-            'redis_available': self.redis_manager.is_healthy if self.redis_manager else False
+            **self.cache_stats,
+            'in_flight': len(self._flights),
+            'invalidation_listener': self._listener_ready.is_set(),
+            'invalidation_shared': self.invalidation_shared(),
+            'l1': self.l1.get_stats(),
+            'redis_available': self.redis is not None and bool(getattr(self.redis, '_initialized', True)),
+            'disk_tier': self.disk is not None
         }
 
+    def _ensure_listener(self):
+        """Start the invalidation listener lazily (after gunicorn forks the worker)"""
+        if self.redis is None or self._stopping.is_set():
+            return
+        if self._listener is not None and self._listener.is_alive():
+            return
+        with self._listener_lock:
+            if self._listener is not None and self._listener.is_alive():
+                return
+            self._listener = threading.Thread(target=self._listen, name='cache-invalidation-listener', daemon=True)
+            self._listener.start()
+
+    def _listen(self):
+        """Apply tag invalidations published by other workers, reconnecting with backoff"""
+        backoff = 1.0
+        while not self._stopping.is_set():
+            pubsub = self.redis.pubsub()
+            if pubsub is None:
+                self._stopping.wait(backoff)
+                backoff = min(backoff * 2, 30.0)
+                continue
+            try:
+                pubsub.subscribe(INVALIDATION_CHANNEL)
+                # Versions cached while disconnected may have missed messages
+                self._drop_all_tag_versions()
+                self._listener_ready.set()
+                backoff = 1.0
+                while not self._stopping.is_set():
+                    message = pubsub.get_message(timeout=1.0)
+                    if not message or message.get('type') != 'message':
+                        continue
+                    payload = message['data']
+                    if isinstance(payload, bytes):
+                        payload = payload.decode('utf-8')
+                    payload = json.loads(payload)
+                    if payload.get('origin') != self.instance_id:
+                        self._drop_tag_versions(payload.get('tags', []))
+            except Exception as e:
+                logger.warning(f"Cache invalidation listener lost Redis connection: {e}")
+            finally:
+                self._listener_ready.clear()
+                try:
+                    pubsub.close()
+                except Exception:
+                    pass
+            self._stopping.wait(backoff)
+            backoff = min(backoff * 2, 30.0)
+
+    def _drop_all_tag_versions(self):
+        self._tag_cache.clear()
+
+    def close(self):
+        """Stop the invalidation listener thread"""
+        self._stopping.set()
+        if self._listener and self._listener.is_alive():
+            self._listener.join(timeout=2)
+
+def _freeze_response(response) -> Dict[str, Any]:
+    """Cacheable form of a Flask response"""
+    return {
+        'body': response.get_data(as_text=True),
+        'status': response.status_code,
+        'mimetype': response.mimetype
+    }
+
+def _thaw_response(frozen: Dict[str, Any]):
+    return current_app.response_class(frozen['body'], status=frozen['status'], mimetype=frozen['mimetype'])
+
+TagSpec = Union[Iterable[str], Callable[..., Iterable[str]]]
+
+def _resolve_tags(tags: TagSpec, arguments: Dict[str, Any]):
+    """Tags for one call: a callable gets the arguments, strings are formatted with them"""
+    if callable(tags):
+        return list(tags(**arguments))
+    return [tag.format(**arguments) for tag in tags]
+
 # Caching decorators
-def cached_route(timeout: int = 300, key_prefix: str = 'route', 
-                vary_on_user: bool = False, vary_on_args: bool = True):
-    """Decorator for caching Flask route responses"""
+def cached_route(timeout: int = 300, key_prefix: str = 'route',
+                vary_on_user: bool = False, vary_on_args: bool = True,
+                tags: TagSpec = (), stale_timeout: Optional[int] = None):
+    """
+    Decorator for caching Flask route responses - only 200 responses are stored
+
+    Tags are formatted with the view arguments, e.g. tags=('vessel:{vessel_id}',).
+    """
     def decorator(f: Callable) -> Callable:
         @wraps(f)
         def decorated_function(*args, **kwargs):
             # Get cache manager from current app
             if not hasattr(current_app, 'cache_manager'):
                 return f(*args, **kwargs)
-            
+
             cache_manager = current_app.cache_manager
-            
+
             # Generate cache key
             key_parts = [key_prefix, request.endpoint or f.__name__]
-            
+            key_parts.extend(f"{k}={v}" for k, v in sorted(kwargs.items()))
+
             if vary_on_user:
                 from flask_login import current_user
                 user_id = getattr(current_user, 'id', 'anonymous')
                 key_parts.append(str(user_id))
-            
+
             if vary_on_args and request.args:
-                args_str = "&".join([f"{k}={v}" for k, v in sorted(request.args.items())])
+                args_str = "&".join([f"{k}={v}" for k, v in sorted(request.args.items(multi=True))])
                 key_parts.append(hashlib.md5(args_str.encode()).hexdigest()[:8])
-            
+
             cache_key = ":".join(key_parts)
-            
-            # Try to get cached result
-            cached_result = cache_manager.get(cache_key)
-            if cached_result is not None:
-                return cached_result
-            
-            # Execute function and cache result
-            result = f(*args, **kwargs)
-            
-            # Only cache successful responses
-            if hasattr(result, 'status_code'):
-                if result.status_code == 200:
-                    cache_manager.set(cache_key, result, timeout)
-            else:
-                cache_manager.set(cache_key, result, timeout)
-            
-            return result
+
+            def render():
+                return _freeze_response(current_app.make_response(f(*args, **kwargs)))
+
+            frozen = cache_manager.get_or_set(
+                cache_key, render, timeout, tags=_resolve_tags(tags, kwargs), stale_timeout=stale_timeout,
+                cache_if=lambda frozen: frozen['status'] == 200,
+                refresh_wrapper=copy_current_request_context
+            )
+            return _thaw_response(frozen)
         return decorated_function
     return decorator
 
-def cached_function(timeout: int = 300, key_prefix: str = 'func'):
-    """Decorator for caching function results"""
+def _app_context_wrapper(load: Callable) -> Callable:
+    """Run a background refresh inside the calling request or app context"""
+    if has_request_context():
+        return copy_current_request_context(load)
+    app = current_app._get_current_object()
+
+    def run():
+        with app.app_context():
+            return load()
+    return run
+
+def cached_function(timeout: int = 300, key_prefix: str = 'func',
+                    tags: TagSpec = (), stale_timeout: Optional[int] = None):
+    """Decorator for caching function results - tags are formatted with the bound arguments"""
     def decorator(f: Callable) -> Callable:
+        signature = inspect.signature(f)
+
         @wraps(f)
         def decorated_function(*args, **kwargs):
             # Get cache manager from current app context
             if not hasattr(current_app, 'cache_manager'):
                 return f(*args, **kwargs)
-            
+
             cache_manager = current_app.cache_manager
-            
+
             # Generate cache key from function name and arguments
             cache_key = cache_manager._generate_cache_key(
                 f"{key_prefix}:{f.__name__}", *args, **kwargs
             )
-            
-            # Try to get cached result
-            cached_result = cache_manager.get(cache_key)
-            if cached_result is not None:
-                return cached_result
-            
-            # Execute function and cache result
-            result = f(*args, **kwargs)
-            cache_manager.set(cache_key, result, timeout)
-            
-            return result
+            bound = signature.bind(*args, **kwargs)
+            bound.apply_defaults()
+
+            return cache_manager.get_or_set(
+                cache_key, lambda: f(*args, **kwargs), timeout, tags=_resolve_tags(tags, bound.arguments),
+                stale_timeout=stale_timeout, refresh_wrapper=_app_context_wrapper
+            )
         return decorated_function
     return decorator
 
-def cache_vessel_data(timeout: int = 600):  # 10 minutes for vessel data
+def _vessel_tags(f: Callable):
+    """vessel:<id> for functions taking a vessel_id, otherwise the vessel list tag"""
+    if 'vessel_id' in inspect.signature(f).parameters:
+        return ('vessel:{vessel_id}',)
+    return (VESSELS_TAG,)
+
+# Vessel and tally writes invalidate these through their tags, so the TTLs only
+# bound how long an unused entry occupies the cache - CacheManager caps them at
+# unshared_timeout while invalidations cannot reach other workers
+def cache_vessel_data(timeout: int = 6 * 3600):
     """Specialized caching for vessel-related data"""
-    return cached_function(timeout=timeout, key_prefix='vessel')
+    def decorator(f: Callable) -> Callable:
+        return cached_function(timeout=timeout, key_prefix='vessel', tags=_vessel_tags(f))(f)
+    return decorator
 
-def cache_tally_data(timeout: int = 300):  # 5 minutes for tally data
+def cache_tally_data(timeout: int = 6 * 3600):
     """Specialized caching for cargo tally data"""
-    return cached_function(timeout=timeout, key_prefix='tally')
+    def decorator(f: Callable) -> Callable:
+        return cached_function(timeout=timeout, key_prefix='tally', tags=_vessel_tags(f))(f)
+    return decorator
 
 # Global cache manager instance
 cache_manager = None
@@ -338,18 +637,80 @@ def get_cache_manager() -> Optional[CacheManager]:
     """Get global cache manager instance"""
     return cache_manager
 
-def init_cache_manager(app, redis_manager) -> CacheManager:
-    """Initialize global cache manager"""
+def init_cache_manager(app, redis_client=None, disk_cache=None) -> CacheManager:
+    """
+    Initialize global cache manager
+
+    L2 uses the shared EnterpriseRedisClient unless REDIS_URL is unset or
+    memory://. Setting CACHE_DISK_TIER adds the encrypted disk cache as L3.
+    """
     global cache_manager
-    cache_manager = CacheManager(redis_manager)
+
+    if redis_client is None:
+        redis_url = app.config.get('REDIS_URL')
+        if redis_url and not redis_url.startswith('memory://'):
+            from utils.redis_client import get_redis_client
+            redis_client = get_redis_client(redis_url)
+
+    if disk_cache is None and app.config.get('CACHE_DISK_TIER'):
+        from utils.encrypted_cache import get_encrypted_cache
+        disk_cache = get_encrypted_cache()
+
+    cache_manager = CacheManager(
+        redis_client,
+        default_timeout=app.config.get('CACHE_DEFAULT_TIMEOUT', 300),
+        stale_timeout=app.config.get('CACHE_STALE_TIMEOUT', 60),
+        unshared_timeout=app.config.get('CACHE_UNSHARED_TIMEOUT', 30),
+        disk_cache=disk_cache
+    )
     app.cache_manager = cache_manager
-    
+
     # Add cache stats route for monitoring
-    @app.route('/api/cache-stats')
-    def cache_stats():
-        from flask import jsonify
-        if hasattr(current_app, 'cache_manager'):
-            return jsonify(current_app.cache_manager.get_stats())
-        return jsonify({'error': 'Cache manager not available'}), 503
-    
-    return cache_manager
\ No newline at end of file
+    if 'cache_stats' not in app.view_functions:
+        @app.route('/api/cache-stats')
+        def cache_stats():
+            from flask import jsonify
+            if hasattr(current_app, 'cache_manager'):
+                return jsonify(current_app.cache_manager.get_stats())
+            return jsonify({'error': 'Cache manager not available'}), 503
+
+    return cache_manager
+
+def enable_cache_invalidation(db, *models):
+    """
+    Invalidate vessel:<id> and the vessel list tag after commits that change vessels or tallies.
+
+    Mapper after_insert/after_update/after_delete events on the models collect
+    the affected vessel ids on the session. Bulk paths that bypass mapper
+    events (bulk_update_mappings, set-based sync) are covered by
+    SyncChange.record, which adds to the same set. Tags are only invalidated
+    once the commit succeeds, so no worker can re-cache pre-commit data.
+    """
+    from sqlalchemy import event
+    from sqlalchemy.orm import object_session
+    from models.sync_change import TRACKED_TABLES
+
+    # create_app may run many times per process (tests); listeners must be registered once
+    if getattr(db, '_cache_invalidation_enabled', False):
+        return
+    db._cache_invalidation_enabled = True
+
+    def collect(mapper, connection, target):
+        session = object_session(target)
+        vessel_id = getattr(target, TRACKED_TABLES[target.__tablename__])
+        if session is not None and vessel_id is not None:
+            session.info.setdefault('changed_vessel_ids', set()).add(vessel_id)
+
+    for model in models:
+        for event_name in ('after_insert', 'after_update', 'after_delete'):
+            event.listen(model, event_name, collect)
+
+    @event.listens_for(db.session, 'after_commit')
+    def invalidate(session):
+        vessel_ids = session.info.pop('changed_vessel_ids', None)
+        if vessel_ids and cache_manager is not None:
+            cache_manager.invalidate_tags(VESSELS_TAG, *(vessel_tag(v) for v in vessel_ids if v is not None))
+
+    @event.listens_for(db.session, 'after_rollback')
+    def forget(session):
+        session.info.pop('changed_vessel_ids', None)
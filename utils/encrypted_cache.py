@@ -8,6 +8,9 @@ import json
 import base64
 import hashlib
 import logging
+import sqlite3
+import threading
+import time
 from typing import Dict, Any, Optional, List, Union
 from datetime import datetime, timezone, timedelta
 from dataclasses import dataclass, asdict
@@ -37,7 +40,7 @@ class CacheOperation(Enum):
 
 @dataclass
 class EncryptedCacheEntry:
-    """Encrypted cache entry with maritime metadata"""
+    """Encrypted cache entry in the legacy one-file-per-key format (read when migrating)"""
     
     key: str
     encrypted_data: str
@@ -75,8 +78,33 @@ class EncryptedCacheEntry:
         expiry = datetime.fromisoformat(self.expires_at.replace('Z', '+00:00'))
         return datetime.now(timezone.utc) > expiry
 
+@dataclass
+class _IndexEntry:
+    """In-memory index record - enough to expire, purge and count entries without reading them"""
+    
+    classification: CacheClassification
+    expires_at: Optional[float]
+    vessel_id: Optional[int]
+    size: int
+    
+    def is_expired(self, now: float) -> bool:
+        return self.expires_at is not None and now > self.expires_at
+
 class EncryptedCacheManager:
-    """Secure encrypted cache manager for maritime data"""
+    """
+    Secure encrypted cache manager for maritime data
+    
+    Entries live in one SQLite file in WAL mode holding the raw Fernet token
+    and its metadata. An in-memory index of key -> (classification,
+    expires_at, vessel_id, size) answers lookups, expiry sweeps, vessel purges
+    and stats without touching ciphertext. Triggers append every insert,
+    metadata update and delete to cache_changes, so when another process
+    commits (PRAGMA data_version) only the keys changed since the last sync are
+    re-read; access-count updates are not logged and cost one indexed lookup.
+    """
+    
+    # Change log rows kept for lagging processes; one that falls further behind reloads the index
+    CHANGE_LOG_RETENTION = 10000
     
     def __init__(self, cache_dir: str = None, master_key: str = None):
         self.cache_dir = cache_dir or os.path.join('cache', 'encrypted')
@@ -161,32 +189,158 @@ class EncryptedCacheManager:
             raise
     
     def _setup_cache_directory(self):
-        """Set up secure cache directory structure"""
+        """Set up the cache directory and its single-file store"""
         try:
-            # Create main cache directory
             os.makedirs(self.cache_dir, exist_ok=True)
+            try:
+                os.chmod(self.cache_dir, 0o700)
+            except OSError:
+                pass  # May not work on all systems
             
-            # Create classification-based subdirectories
-            for classification in CacheClassification:
-                class_dir = os.path.join(self.cache_dir, classification.value)
-                os.makedirs(class_dir, exist_ok=True)
-                
-                # Set restrictive permissions for sensitive data
-                if classification in [CacheClassification.CONFIDENTIAL, CacheClassification.RESTRICTED]:
-                    try:
-                        os.chmod(class_dir, 0o700)
-                    except OSError:
-                        pass  # May not work on all systems
+            self.db_path = os.path.join(self.cache_dir, 'cache.db')
+            self._lock = threading.RLock()
+            self._conn = sqlite3.connect(self.db_path, check_same_thread=False, isolation_level=None)
+            try:
+                os.chmod(self.db_path, 0o600)
+            except OSError:
+                pass
+            
+            # WAL lets other workers read while one writes; secure_delete zeroes freed pages
+            self._conn.execute('PRAGMA journal_mode=WAL')
+            self._conn.execute('PRAGMA synchronous=NORMAL')
+            self._conn.execute('PRAGMA secure_delete=ON')
+            self._conn.execute('PRAGMA busy_timeout=5000')
+            self._conn.execute('''
+                CREATE TABLE IF NOT EXISTS cache_entries (
+                    key TEXT PRIMARY KEY,
+                    classification TEXT NOT NULL,
+                    ciphertext BLOB NOT NULL,
+                    expires_at REAL,
+                    vessel_id INTEGER,
+                    operation_type TEXT,
+                    user_id INTEGER,
+                    data_type TEXT,
+                    data_hash TEXT,
+                    compressed INTEGER NOT NULL DEFAULT 0,
+                    original_size INTEGER,
+                    created_at REAL NOT NULL,
+                    access_count INTEGER NOT NULL DEFAULT 0,
+                    last_accessed REAL
+                )
+            ''')
+            self._conn.execute('CREATE INDEX IF NOT EXISTS ix_cache_entries_expires_at ON cache_entries (expires_at)')
+            self._conn.execute('CREATE INDEX IF NOT EXISTS ix_cache_entries_vessel_id ON cache_entries (vessel_id)')
+            self._conn.execute('''
+                CREATE TABLE IF NOT EXISTS cache_changes (
+                    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+                    key TEXT NOT NULL
+                )
+            ''')
+            self._conn.execute(
+                'CREATE TRIGGER IF NOT EXISTS cache_entries_logged_insert AFTER INSERT ON cache_entries '
+                'BEGIN INSERT INTO cache_changes (key) VALUES (NEW.key); END'
+            )
+            self._conn.execute(
+                'CREATE TRIGGER IF NOT EXISTS cache_entries_logged_update '
+                'AFTER UPDATE OF classification, ciphertext, expires_at, vessel_id ON cache_entries '
+                'BEGIN INSERT INTO cache_changes (key) VALUES (NEW.key); END'
+            )
+            self._conn.execute(
+                'CREATE TRIGGER IF NOT EXISTS cache_entries_logged_delete AFTER DELETE ON cache_entries '
+                'BEGIN INSERT INTO cache_changes (key) VALUES (OLD.key); END'
+            )
             
-            # Create metadata index directory
-            os.makedirs(os.path.join(self.cache_dir, 'index'), exist_ok=True)
+            self._migrate_legacy_files()
+            self._load_index()
             
-            logger.info(f"Cache directory structure created: {self.cache_dir}")
+            logger.info(f"Cache store ready: {self.db_path} ({len(self._index)} entries)")
             
         except Exception as e:
             logger.error(f"Failed to setup cache directory: {e}")
             raise
     
+    def _load_index(self):
+        """Rebuild the in-memory index from entry metadata - ciphertext is never read"""
+        self._data_version = self._conn.execute('PRAGMA data_version').fetchone()[0]
+        # Read the log position first: changes racing the load are replayed by the next sync
+        self._change_seq = self._conn.execute('SELECT COALESCE(MAX(seq), 0) FROM cache_changes').fetchone()[0]
+        self._index = {
+            key: _IndexEntry(CacheClassification(classification), expires_at, vessel_id, size)
+            for key, classification, expires_at, vessel_id, size in self._conn.execute(
+                'SELECT key, classification, expires_at, vessel_id, length(ciphertext) FROM cache_entries'
+            )
+        }
+    
+    def _sync_index(self):
+        """Apply entries other processes changed since the last sync (caller holds the lock)"""
+        data_version = self._conn.execute('PRAGMA data_version').fetchone()[0]
+        if data_version == self._data_version:
+            return
+        self._data_version = data_version
+        
+        changes = self._conn.execute(
+            'SELECT seq, key FROM cache_changes WHERE seq > ? ORDER BY seq', (self._change_seq,)
+        ).fetchall()
+        if not changes:
+            return
+        if changes[0][0] > self._change_seq + 1:
+            # The log was pruned past our position - changes may be missing
+            self._load_index()
+            return
+        self._change_seq = changes[-1][0]
+        
+        keys = list({key for _, key in changes})
+        for start in range(0, len(keys), 500):
+            chunk = keys[start:start + 500]
+            placeholders = ','.join('?' * len(chunk))
+            current = {
+                key: _IndexEntry(CacheClassification(classification), expires_at, vessel_id, size)
+                for key, classification, expires_at, vessel_id, size in self._conn.execute(
+                    'SELECT key, classification, expires_at, vessel_id, length(ciphertext) '
+                    f'FROM cache_entries WHERE key IN ({placeholders})', chunk
+                )
+            }
+            for key in chunk:
+                if key in current:
+                    self._index[key] = current[key]
+                else:
+                    self._index.pop(key, None)
+    
+    def _migrate_legacy_files(self):
+        """Import entries from the previous one-JSON-file-per-key layout, then remove the files"""
+        imported = 0
+        for classification in CacheClassification:
+            class_dir = os.path.join(self.cache_dir, classification.value)
+            if not os.path.isdir(class_dir):
+                continue
+            for filename in os.listdir(class_dir):
+                if not filename.endswith('.cache'):
+                    continue
+                file_path = os.path.join(class_dir, filename)
+                try:
+                    with open(file_path, 'r') as f:
+                        entry = EncryptedCacheEntry.from_dict(json.load(f))
+                    if not entry.is_expired():
+                        expires_at = (datetime.fromisoformat(entry.expires_at.replace('Z', '+00:00')).timestamp()
+                                      if entry.expires_at else None)
+                        self._conn.execute(
+                            'INSERT OR REPLACE INTO cache_entries (key, classification, ciphertext, expires_at, '
+                            'vessel_id, operation_type, user_id, data_type, data_hash, compressed, original_size, '
+                            'created_at, access_count, last_accessed) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                            (entry.key, entry.classification.value, base64.b64decode(entry.encrypted_data),
+                             expires_at, entry.vessel_id, entry.operation_type, entry.user_id,
+                             entry.metadata.get('data_type'), entry.data_hash, int(entry.compression_used),
+                             entry.metadata.get('original_size'),
+                             datetime.fromisoformat(entry.created_at).timestamp(), entry.access_count,
+                             datetime.fromisoformat(entry.last_accessed).timestamp())
+                        )
+                        imported += 1
+                    os.unlink(file_path)
+                except Exception as e:
+                    logger.warning(f"Skipping unreadable legacy cache file {file_path}: {e}")
+        if imported:
+            logger.info(f"Imported {imported} legacy encrypted cache files")
+    
     def _get_audit_logger(self):
         """Get audit logger for cache operations"""
         try:
@@ -267,13 +421,6 @@ class EncryptedCacheManager:
         # Default to internal for authenticated data
         return CacheClassification.INTERNAL
     
-    def _get_cache_file_path(self, key: str, classification: CacheClassification) -> str:
-        """Get file path for cache entry"""
-        # Hash the key to create safe filename
-        key_hash = hashlib.sha256(key.encode()).hexdigest()
-        filename = f"{key_hash}.cache"
-        return os.path.join(self.cache_dir, classification.value, filename)
-    
     def _compress_data(self, data: bytes) -> bytes:
         """Compress data if beneficial"""
         try:
@@ -339,18 +486,14 @@ class EncryptedCacheManager:
             compressed_data = self._compress_data(data_bytes)
             compression_used = len(compressed_data) < len(data_bytes)
             
-            # Encrypt data
+            # Encrypt data - the raw Fernet token is stored as a blob
             encrypted_data = self.cipher_suite.encrypt(compressed_data)
-            encrypted_b64 = base64.b64encode(encrypted_data).decode('utf-8')
             
             # Calculate data hash for integrity
             data_hash = hashlib.sha256(data_bytes).hexdigest()
             
-            # Create cache entry
-            now = datetime.now(timezone.utc)
-            expires_at = None
-            if ttl:
-                expires_at = now + timedelta(seconds=ttl)
+            now = time.time()
+            expires_at = now + ttl if ttl else None
             
             # Get user ID from Flask context
             user_id = None
@@ -362,38 +505,15 @@ class EncryptedCacheManager:
             except RuntimeError:
                 pass  # Outside request context
             
-            cache_entry = EncryptedCacheEntry(
-                key=key,
-                encrypted_data=encrypted_b64,
-                metadata={
-                    'original_size': len(data_bytes),
-                    'compressed_size': len(compressed_data),
-                    'encrypted_size': len(encrypted_data),
-                    'data_type': type(data).__name__
-                },
-                classification=classification,
-                created_at=now.isoformat(),
-                expires_at=expires_at.isoformat() if expires_at else None,
-                access_count=0,
-                last_accessed=now.isoformat(),
-                vessel_id=vessel_id,
-                operation_type=operation_type,
-                user_id=user_id,
-                data_hash=data_hash,
-                compression_used=compression_used
-            )
-            
-            # Save to file
-            cache_file_path = self._get_cache_file_path(key, classification)
-            with open(cache_file_path, 'w') as f:
-                json.dump(cache_entry.to_dict(), f)
-            
-            # Set restrictive permissions for sensitive files
-            if classification in [CacheClassification.CONFIDENTIAL, CacheClassification.RESTRICTED]:
-                try:
-                    os.chmod(cache_file_path, 0o600)
-                except OSError:
-                    pass
+            with self._lock:
+                self._conn.execute(
+                    'INSERT OR REPLACE INTO cache_entries (key, classification, ciphertext, expires_at, vessel_id, '
+                    'operation_type, user_id, data_type, data_hash, compressed, original_size, created_at, '
+                    'access_count, last_accessed) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, 0, ?)',
+                    (key, classification.value, encrypted_data, expires_at, vessel_id, operation_type, user_id,
+                     type(data).__name__, data_hash, int(compression_used), len(data_bytes), now, now)
+                )
+                self._index[key] = _IndexEntry(classification, expires_at, vessel_id, len(encrypted_data))
             
             # Log cache operation
             self._log_cache_operation(
@@ -436,76 +556,68 @@ class EncryptedCacheManager:
             Cached data or None if not found/expired
         """
         try:
-            # If classification not provided, try all classifications
-            classifications_to_try = [classification] if classification else list(CacheClassification)
-            
-            for class_level in classifications_to_try:
-                cache_file_path = self._get_cache_file_path(key, class_level)
-                
-                if not os.path.exists(cache_file_path):
-                    continue
-                
-                # Load cache entry
-                with open(cache_file_path, 'r') as f:
-                    entry_data = json.load(f)
-                
-                cache_entry = EncryptedCacheEntry.from_dict(entry_data)
-                
-                # Check if expired
-                if cache_entry.is_expired():
-                    self._delete_cache_file(cache_file_path, cache_entry.classification)
-                    continue
-                
-                # Decrypt data
-                encrypted_data = base64.b64decode(cache_entry.encrypted_data.encode('utf-8'))
-                decrypted_data = self.cipher_suite.decrypt(encrypted_data)
+            with self._lock:
+                self._sync_index()
+                indexed = self._index.get(key)
+                if indexed is None or (classification and indexed.classification != classification):
+                    logger.debug(f"Cache entry not found: {key}")
+                    return None
                 
-                # Decompress if needed
-                final_data = self._decompress_data(decrypted_data, cache_entry.compression_used)
+                if indexed.is_expired(time.time()):
+                    self._delete_keys([key])
+                    return None
                 
-                # Verify data integrity
-                data_hash = hashlib.sha256(final_data).hexdigest()
-                if data_hash != cache_entry.data_hash:
-                    logger.warning(f"Cache integrity check failed for key: {key}")
-                    self._delete_cache_file(cache_file_path, cache_entry.classification)
-                    continue
-                
-                # Deserialize data based on original type
-                try:
-                    if cache_entry.metadata.get('data_type') in ['dict', 'list']:
-                        result = json.loads(final_data.decode('utf-8'))
-                    else:
-                        result = final_data.decode('utf-8')
-                except json.JSONDecodeError:
+                row = self._conn.execute(
+                    'SELECT ciphertext, compressed, data_hash, data_type, vessel_id, operation_type, access_count '
+                    'FROM cache_entries WHERE key = ?', (key,)
+                ).fetchone()
+                if row is None:
+                    self._index.pop(key, None)
+                    return None
+                ciphertext, compressed, expected_hash, data_type, vessel_id, operation_type, access_count = row
+            
+            # Decrypt and decompress outside the lock
+            decrypted_data = self.cipher_suite.decrypt(bytes(ciphertext))
+            final_data = self._decompress_data(decrypted_data, bool(compressed))
+            
+            # Verify data integrity
+            if hashlib.sha256(final_data).hexdigest() != expected_hash:
+                logger.warning(f"Cache integrity check failed for key: {key}")
+                with self._lock:
+                    self._delete_keys([key])
+                return None
+            
+            # Deserialize data based on original type
+            try:
+                if data_type in ['dict', 'list']:
+                    result = json.loads(final_data.decode('utf-8'))
+                else:
                     result = final_data.decode('utf-8')
-                
-                # Update access statistics
-                cache_entry.access_count += 1
-                cache_entry.last_accessed = datetime.now(timezone.utc).isoformat()
-                
-                # Save updated entry
-                with open(cache_file_path, 'w') as f:
-                    json.dump(cache_entry.to_dict(), f)
-                
-                # Log cache operation
-                self._log_cache_operation(
-                    CacheOperation.RETRIEVE,
-                    key,
-                    cache_entry.classification,
-                    success=True,
-                    details={
-                        'access_count': cache_entry.access_count,
-                        'vessel_id': cache_entry.vessel_id,
-                        'operation_type': cache_entry.operation_type
-                    }
+            except json.JSONDecodeError:
+                result = final_data.decode('utf-8')
+            
+            # Update access statistics
+            with self._lock:
+                self._conn.execute(
+                    'UPDATE cache_entries SET access_count = access_count + 1, last_accessed = ? WHERE key = ?',
+                    (time.time(), key)
                 )
-                
-                logger.debug(f"Retrieved encrypted cache entry: {key} ({cache_entry.classification.value})")
-                return result
             
-            # Not found in any classification
-            logger.debug(f"Cache entry not found: {key}")
-            return None
+            # Log cache operation
+            self._log_cache_operation(
+                CacheOperation.RETRIEVE,
+                key,
+                indexed.classification,
+                success=True,
+                details={
+                    'access_count': access_count + 1,
+                    'vessel_id': vessel_id,
+                    'operation_type': operation_type
+                }
+            )
+            
+            logger.debug(f"Retrieved encrypted cache entry: {key} ({indexed.classification.value})")
+            return result
             
         except Exception as e:
             logger.error(f"Failed to retrieve cache entry {key}: {e}")
@@ -530,100 +642,57 @@ class EncryptedCacheManager:
             bool: Success status
         """
         try:
-            deleted = False
-            
-            # If classification not provided, try all classifications
-            classifications_to_try = [classification] if classification else list(CacheClassification)
-            
-            for class_level in classifications_to_try:
-                cache_file_path = self._get_cache_file_path(key, class_level)
-                
-                if os.path.exists(cache_file_path):
-                    deleted = self._delete_cache_file(cache_file_path, class_level)
-                    
-                    # Log cache operation
-                    self._log_cache_operation(
-                        CacheOperation.DELETE,
-                        key,
-                        class_level,
-                        success=deleted
-                    )
-                    
-                    if deleted:
-                        logger.debug(f"Deleted encrypted cache entry: {key} ({class_level.value})")
-                        break
+            with self._lock:
+                self._sync_index()
+                indexed = self._index.get(key)
+                if indexed is None or (classification and indexed.classification != classification):
+                    return False
+                deleted = self._delete_keys([key]) > 0
             
+            # Log cache operation
+            self._log_cache_operation(CacheOperation.DELETE, key, indexed.classification, success=deleted)
+            if deleted:
+                logger.debug(f"Deleted encrypted cache entry: {key} ({indexed.classification.value})")
             return deleted
             
         except Exception as e:
             logger.error(f"Failed to delete cache entry {key}: {e}")
             return False
     
-    def _delete_cache_file(self, file_path: str, classification: CacheClassification) -> bool:
-        """Securely delete cache file"""
-        try:
-            # For sensitive data, overwrite before deletion
-            if classification in [CacheClassification.CONFIDENTIAL, CacheClassification.RESTRICTED]:
-                try:
-                    with open(file_path, 'r+b') as f:
-                        length = f.seek(0, 2)
-                        f.seek(0)
-                        f.write(os.urandom(length))
-                        f.flush()
-                        os.fsync(f.fileno())
-                except Exception:
-                    pass  # Fallback to simple deletion
-            
-            os.unlink(file_path)
-            return True
-            
-        except Exception as e:
-            logger.error(f"Failed to delete cache file {file_path}: {e}")
-            return False
+    def _delete_keys(self, keys: List[str]) -> int:
+        """Delete entries by key (caller holds the lock); secure_delete overwrites their pages"""
+        deleted = 0
+        for start in range(0, len(keys), 500):
+            chunk = keys[start:start + 500]
+            placeholders = ','.join('?' * len(chunk))
+            deleted += self._conn.execute(
+                f'DELETE FROM cache_entries WHERE key IN ({placeholders})', chunk
+            ).rowcount
+            for key in chunk:
+                self._index.pop(key, None)
+        return deleted
     
     def exists(self, key: str, classification: Optional[CacheClassification] = None) -> bool:
-        """Check if cache entry exists and is not expired"""
-        try:
-            result = self.retrieve(key, classification)
-            return result is not None
-        except Exception:
+        """Check if cache entry exists and is not expired - answered from the index"""
+        with self._lock:
+            self._sync_index()
+            indexed = self._index.get(key)
+        if indexed is None or (classification and indexed.classification != classification):
             return False
+        return not indexed.is_expired(time.time())
     
     def clear_expired(self) -> int:
         """Clear all expired cache entries"""
-        cleared_count = 0
-        
         try:
-            for classification in CacheClassification:
-                class_dir = os.path.join(self.cache_dir, classification.value)
-                
-                if not os.path.exists(class_dir):
-                    continue
-                
-                for filename in os.listdir(class_dir):
-                    if not filename.endswith('.cache'):
-                        continue
-                    
-                    file_path = os.path.join(class_dir, filename)
-                    
-                    try:
-                        with open(file_path, 'r') as f:
-                            entry_data = json.load(f)
-                        
-                        cache_entry = EncryptedCacheEntry.from_dict(entry_data)
-                        
-                        if cache_entry.is_expired():
-                            if self._delete_cache_file(file_path, classification):
-                                cleared_count += 1
-                    
-                    except Exception as e:
-                        logger.warning(f"Failed to check expiry for {file_path}: {e}")
-                        # Delete corrupted cache files
-                        try:
-                            os.unlink(file_path)
-                            cleared_count += 1
-                        except Exception:
-                            pass
+            now = time.time()
+            with self._lock:
+                self._sync_index()
+                expired_keys = [key for key, indexed in self._index.items() if indexed.is_expired(now)]
+                cleared_count = self._delete_keys(expired_keys)
+                self._conn.execute(
+                    'DELETE FROM cache_changes WHERE seq <= (SELECT MAX(seq) FROM cache_changes) - ?',
+                    (self.CHANGE_LOG_RETENTION,)
+                )
             
             if cleared_count > 0:
                 logger.info(f"Cleared {cleared_count} expired cache entries")
@@ -634,6 +703,13 @@ class EncryptedCacheManager:
             logger.error(f"Failed to clear expired cache entries: {e}")
             return 0
     
+    def clear_vessel(self, vessel_id: int) -> int:
+        """Delete every entry stored for a vessel"""
+        with self._lock:
+            self._sync_index()
+            vessel_keys = [key for key, indexed in self._index.items() if indexed.vessel_id == vessel_id]
+            return self._delete_keys(vessel_keys)
+    
     def get_cache_stats(self) -> Dict[str, Any]:
         """Get cache statistics"""
         stats = {
@@ -647,58 +723,34 @@ class EncryptedCacheManager:
         }
         
         try:
-            all_entries = []
+            now = time.time()
+            with self._lock:
+                self._sync_index()
+                entries = list(self._index.values())
+                most_accessed = self._conn.execute(
+                    'SELECT key, access_count FROM cache_entries ORDER BY access_count DESC LIMIT 10'
+                ).fetchall()
             
             for classification in CacheClassification:
-                class_dir = os.path.join(self.cache_dir, classification.value)
-                class_stats = {'count': 0, 'size': 0, 'expired': 0}
+                stats['by_classification'][classification.value] = {'count': 0, 'size': 0, 'expired': 0}
+            
+            for indexed in entries:
+                class_stats = stats['by_classification'][indexed.classification.value]
+                class_stats['count'] += 1
+                class_stats['size'] += indexed.size
+                if indexed.is_expired(now):
+                    class_stats['expired'] += 1
+                    stats['expired_entries'] += 1
                 
-                if not os.path.exists(class_dir):
-                    stats['by_classification'][classification.value] = class_stats
-                    continue
-                
-                for filename in os.listdir(class_dir):
-                    if not filename.endswith('.cache'):
-                        continue
-                    
-                    file_path = os.path.join(class_dir, filename)
-                    
-                    try:
-                        file_size = os.path.getsize(file_path)
-                        
-                        with open(file_path, 'r') as f:
-                            entry_data = json.load(f)
-                        
-                        cache_entry = EncryptedCacheEntry.from_dict(entry_data)
-                        
-                        class_stats['count'] += 1
-                        class_stats['size'] += file_size
-                        
-                        if cache_entry.is_expired():
-                            class_stats['expired'] += 1
-                            stats['expired_entries'] += 1
-                        
-                        all_entries.append(cache_entry)
-                        
-                        # Track by vessel
-                        if cache_entry.vessel_id:
-                            vessel_key = f"vessel_{cache_entry.vessel_id}"
-                            if vessel_key not in stats['by_vessel']:
-                                stats['by_vessel'][vessel_key] = 0
-                            stats['by_vessel'][vessel_key] += 1
-                    
-                    except Exception:
-                        continue
-                
-                stats['by_classification'][classification.value] = class_stats
-                stats['total_entries'] += class_stats['count']
-                stats['total_size'] += class_stats['size']
+                # Track by vessel
+                if indexed.vessel_id:
+                    vessel_key = f"vessel_{indexed.vessel_id}"
+                    stats['by_vessel'][vessel_key] = stats['by_vessel'].get(vessel_key, 0) + 1
             
-            # Calculate most accessed keys
-            all_entries.sort(key=lambda x: x.access_count, reverse=True)
+            stats['total_entries'] = len(entries)
+            stats['total_size'] = sum(indexed.size for indexed in entries)
             stats['most_accessed_keys'] = [
-                {'key': entry.key, 'access_count': entry.access_count}
-                for entry in all_entries[:10]
+                {'key': key, 'access_count': access_count} for key, access_count in most_accessed
             ]
             
             return stats
@@ -714,26 +766,20 @@ class EncryptedCacheManager:
         try:
             classifications_to_purge = [classification] if classification else list(CacheClassification)
             
-            for class_level in classifications_to_purge:
-                class_dir = os.path.join(self.cache_dir, class_level.value)
-                
-                if not os.path.exists(class_dir):
-                    continue
-                
-                for filename in os.listdir(class_dir):
-                    if filename.endswith('.cache'):
-                        file_path = os.path.join(class_dir, filename)
-                        if self._delete_cache_file(file_path, class_level):
-                            purged_count += 1
-                
-                # Log purge operation
-                self._log_cache_operation(
-                    CacheOperation.PURGE,
-                    f"all_{class_level.value}",
-                    class_level,
-                    success=True,
-                    details={'purged_count': purged_count}
-                )
+            with self._lock:
+                self._sync_index()
+                for class_level in classifications_to_purge:
+                    class_keys = [key for key, indexed in self._index.items() if indexed.classification == class_level]
+                    purged_count += self._delete_keys(class_keys)
+                    
+                    # Log purge operation
+                    self._log_cache_operation(
+                        CacheOperation.PURGE,
+                        f"all_{class_level.value}",
+                        class_level,
+                        success=True,
+                        details={'purged_count': purged_count}
+                    )
             
             logger.info(f"Purged {purged_count} cache entries")
             return purged_count
@@ -799,39 +845,12 @@ def clear_vessel_cache(vessel_id: int) -> int:
     Returns:
         Number of entries cleared
     """
-    cleared_count = 0
-    
     try:
-        for classification in CacheClassification:
-            class_dir = os.path.join(encrypted_cache.cache_dir, classification.value)
-            
-            if not os.path.exists(class_dir):
-                continue
-            
-            for filename in os.listdir(class_dir):
-                if not filename.endswith('.cache'):
-                    continue
-                
-                file_path = os.path.join(class_dir, filename)
-                
-                try:
-                    with open(file_path, 'r') as f:
-                        entry_data = json.load(f)
-                    
-                    cache_entry = EncryptedCacheEntry.from_dict(entry_data)
-                    
-                    if cache_entry.vessel_id == vessel_id:
-                        if encrypted_cache._delete_cache_file(file_path, classification):
-                            cleared_count += 1
-                
-                except Exception:
-                    continue
-        
+        cleared_count = encrypted_cache.clear_vessel(vessel_id)
         if cleared_count > 0:
             logger.info(f"Cleared {cleared_count} cache entries for vessel {vessel_id}")
-        
         return cleared_count
         
     except Exception as e:
         logger.error(f"Failed to clear vessel cache for {vessel_id}: {e}")
-        return 0
\ No newline at end of file
+        return 0
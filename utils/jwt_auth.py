@@ -5,7 +5,13 @@ Secure API authentication for maritime operations
 
 import os
 import jwt
+import math
+import time
+import uuid
+import hashlib
 import logging
+import threading
+from collections import OrderedDict
 from datetime import datetime, timedelta, timezone
 from typing import Dict, Optional, Any, Union
 from functools import wraps
@@ -14,6 +20,184 @@ from flask_login import current_user
 
 logger = logging.getLogger(__name__)
 
+REVOCATION_KEY = 'jwt:revoked'
+REVOCATION_CHANNEL = 'stevedores:jwt-revoked'
+
+class BloomFilter:
+    """Fixed-size bloom filter over strings - no false negatives, about error_rate false positives at capacity"""
+    
+    def __init__(self, capacity: int = 100000, error_rate: float = 0.001):
+        self.capacity = capacity
+        self.size = max(64, int(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hash_count = max(1, round(self.size / capacity * math.log(2)))
+        self.count = 0
+        self._bits = bytearray((self.size + 7) // 8)
+    
+    def _positions(self, item: str):
+        # Double hashing: k positions from two 64-bit halves of one digest
+        digest = hashlib.blake2b(item.encode('utf-8'), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], 'little')
+        h2 = int.from_bytes(digest[8:], 'little') | 1
+        return [(h1 + i * h2) % self.size for i in range(self.hash_count)]
+    
+    def add(self, item: str):
+        for position in self._positions(item):
+            self._bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+    
+    def __contains__(self, item: str) -> bool:
+        return all(self._bits[position >> 3] & (1 << (position & 7)) for position in self._positions(item))
+
+class TokenRevocationList:
+    """
+    Revoked token IDs (jti) shared by every worker through Redis
+    
+    Revocations are kept in the jwt:revoked hash (jti -> exp) and published
+    on REVOCATION_CHANNEL. Each worker mirrors them into a bloom filter, so
+    while its listener is subscribed a token that was never revoked is
+    cleared without a round trip and only bloom hits are confirmed in
+    Redis. Revocations made by this worker are also held in memory, which
+    is all there is without Redis or while it is unreachable.
+    """
+    
+    def __init__(self, redis_client=None, capacity: int = 100000, error_rate: float = 0.001):
+        self.redis = redis_client
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self._bloom = BloomFilter(capacity, error_rate)
+        self._local = {}  # jti -> exp
+        self._lock = threading.Lock()
+        
+        self._listener = None
+        self._listener_lock = threading.Lock()
+        self._listener_ready = threading.Event()
+        self._stopping = threading.Event()
+        
+        self.stats = {'checks': 0, 'bloom_negatives': 0, 'redis_checks': 0, 'revoked': 0}
+    
+    def revoke(self, jti: str, expires_at: float) -> bool:
+        """Revoke a token ID until its expiry"""
+        with self._lock:
+            if len(self._local) >= self.capacity:
+                now = time.time()
+                self._local = {key: exp for key, exp in self._local.items() if exp > now}
+            self._local[jti] = expires_at
+            self._bloom.add(jti)
+        
+        if self.redis is not None:
+            try:
+                self.redis.hset(REVOCATION_KEY, jti, int(expires_at))
+                self.redis.publish(REVOCATION_CHANNEL, jti)
+            except Exception as e:
+                logger.warning(f"Token revocation for {jti} kept in memory only: {e}")
+        return True
+    
+    def is_revoked(self, jti: str) -> bool:
+        """Check a token ID - a round trip is only needed for bloom hits or while unsubscribed"""
+        self.stats['checks'] += 1
+        self._ensure_listener()
+        
+        with self._lock:
+            if jti in self._local:
+                self.stats['revoked'] += 1
+                return True
+            maybe_revoked = jti in self._bloom
+        
+        if self.redis is None or (self._listener_ready.is_set() and not maybe_revoked):
+            self.stats['bloom_negatives'] += 1
+            return False
+        
+        self.stats['redis_checks'] += 1
+        try:
+            expires_at = self.redis.hget(REVOCATION_KEY, jti)
+        except Exception as e:
+            logger.warning(f"Token revocation check for {jti} fell back to memory: {e}")
+            return False
+        
+        if expires_at is None:
+            return False
+        with self._lock:
+            self._local[jti] = float(expires_at)
+        self.stats['revoked'] += 1
+        return True
+    
+    def _reload(self):
+        """Rebuild the bloom filter from the shared hash, dropping expired revocations"""
+        revoked = self.redis.hgetall(REVOCATION_KEY) or {}
+        now = time.time()
+        live, expired = {}, []
+        for jti, expires_at in revoked.items():
+            jti = jti.decode('utf-8') if isinstance(jti, bytes) else jti
+            if float(expires_at) > now:
+                live[jti] = float(expires_at)
+            else:
+                expired.append(jti)
+        if expired:
+            self.redis.hdel(REVOCATION_KEY, *expired)
+        
+        bloom = BloomFilter(max(self.capacity, 2 * len(live)), self.error_rate)
+        with self._lock:
+            self._local = {jti: exp for jti, exp in self._local.items() if exp > now}
+            for jti in list(live) + list(self._local):
+                bloom.add(jti)
+            self._bloom = bloom
+    
+    def _ensure_listener(self):
+        """Start the revocation listener lazily (after gunicorn forks the worker)"""
+        if self.redis is None or self._stopping.is_set():
+            return
+        if self._listener is not None and self._listener.is_alive():
+            return
+        with self._listener_lock:
+            if self._listener is not None and self._listener.is_alive():
+                return
+            self._listener = threading.Thread(target=self._listen, name='jwt-revocation-listener', daemon=True)
+            self._listener.start()
+    
+    def _listen(self):
+        """Mirror revocations published by other workers, reconnecting with backoff"""
+        backoff = 1.0
+        while not self._stopping.is_set():
+            pubsub = self.redis.pubsub()
+            if pubsub is None:
+                self._stopping.wait(backoff)
+                backoff = min(backoff * 2, 30.0)
+                continue
+            try:
+                pubsub.subscribe(REVOCATION_CHANNEL)
+                # Revocations published while unsubscribed were missed - load them all
+                self._reload()
+                self._listener_ready.set()
+                backoff = 1.0
+                while not self._stopping.is_set():
+                    message = pubsub.get_message(timeout=1.0)
+                    if not message or message.get('type') != 'message':
+                        continue
+                    jti = message['data']
+                    if isinstance(jti, bytes):
+                        jti = jti.decode('utf-8')
+                    with self._lock:
+                        self._bloom.add(jti)
+                        saturated = self._bloom.count > self._bloom.capacity
+                    if saturated:
+                        self._reload()
+            except Exception as e:
+                logger.warning(f"Token revocation listener lost Redis connection: {e}")
+            finally:
+                self._listener_ready.clear()
+                try:
+                    pubsub.close()
+                except Exception:
+                    pass
+            self._stopping.wait(backoff)
+            backoff = min(backoff * 2, 30.0)
+    
+    def close(self):
+        """Stop the revocation listener thread"""
+        self._stopping.set()
+        if self._listener and self._listener.is_alive():
+            self._listener.join(timeout=2)
+
 class JWTAuthManager:
     """JWT Authentication manager for maritime API security"""
     
@@ -24,6 +208,13 @@ class JWTAuthManager:
         self.token_expiry = timedelta(hours=24)  # Maritime shift duration
         self.refresh_token_expiry = timedelta(days=30)  # Extended operations
         
+        # Recently verified tokens: sha256(token) -> (claims, exp)
+        self.verified_cache_size = 10000
+        self._verified = OrderedDict()
+        self._verified_lock = threading.Lock()
+        self.verified_stats = {'hits': 0, 'misses': 0}
+        self.revocations = TokenRevocationList()
+        
         if app:
             self.init_app(app)
     
@@ -43,6 +234,18 @@ class JWTAuthManager:
         self.refresh_token_expiry = timedelta(
             days=app.config.get('JWT_REFRESH_TOKEN_EXPIRES', 30)
         )
+        self.verified_cache_size = app.config.get('JWT_VERIFIED_CACHE_SIZE', 10000)
+        with self._verified_lock:
+            self._verified.clear()
+        
+        # Share revocations through Redis unless REDIS_URL is unset or memory://
+        redis_client = None
+        redis_url = app.config.get('REDIS_URL')
+        if redis_url and not redis_url.startswith('memory://'):
+            from utils.redis_client import get_redis_client
+            redis_client = get_redis_client(redis_url)
+        self.revocations.close()
+        self.revocations = TokenRevocationList(redis_client)
         
         logger.info("JWT Authentication manager initialized for maritime operations")
     
@@ -76,6 +279,7 @@ class JWTAuthManager:
             # Generate access token
             access_claims = base_claims.copy()
             access_claims.update({
+                'jti': uuid.uuid4().hex,
                 'exp': now + self.token_expiry,
                 'type': 'access',
                 'scope': 'maritime-operations'
@@ -90,6 +294,7 @@ class JWTAuthManager:
             # Generate refresh token
             refresh_claims = base_claims.copy()
             refresh_claims.update({
+                'jti': uuid.uuid4().hex,
                 'exp': now + self.refresh_token_expiry,
                 'type': 'refresh',
                 'scope': 'token-refresh'
@@ -115,38 +320,49 @@ class JWTAuthManager:
             logger.error(f"Failed to generate JWT tokens: {e}")
             raise
     
-    def verify_token(self, token: str, token_type: str = 'access') -> Optional[Dict]:
+    def verify_token(self, token: str, token_type: Optional[str] = 'access') -> Optional[Dict]:
         """
         Verify and decode JWT token
         
         Args:
             token: JWT token string
-            token_type: Expected token type ('access' or 'refresh')
+            token_type: Expected token type ('access', 'refresh' or 'api_key'); None accepts any type
             
         Returns:
             dict: Decoded token claims or None if invalid
         """
         try:
-            # Decode and verify token
-            claims = jwt.decode(
-                token,
-                self.secret_key,
-                algorithms=[self.algorithm],
-                audience='maritime-api',
-                issuer='stevedores-dashboard'
-            )
+            digest = hashlib.sha256(token.encode('utf-8')).hexdigest()
+            claims = self._cached_claims(digest)
+            
+            if claims is None:
+                # Decode and verify token
+                claims = jwt.decode(
+                    token,
+                    self.secret_key,
+                    algorithms=[self.algorithm],
+                    audience='maritime-api',
+                    issuer='stevedores-dashboard'
+                )
+                
+                # Verify maritime context
+                if not claims.get('maritime_context'):
+                    logger.warning("Token missing maritime context")
+                    return None
+                
+                self._remember_claims(digest, claims)
             
             # Verify token type
-            if claims.get('type') != token_type:
+            if token_type is not None and claims.get('type') != token_type:
                 logger.warning(f"Invalid token type: expected {token_type}, got {claims.get('type')}")
                 return None
             
-            # Verify maritime context
-            if not claims.get('maritime_context'):
-                logger.warning("Token missing maritime context")
+            # Tokens issued before jti was added are revoked by digest
+            if self.revocations.is_revoked(claims.get('jti') or digest):
+                logger.warning("JWT token has been revoked")
                 return None
             
-            return claims
+            return dict(claims)
             
         except jwt.ExpiredSignatureError:
             logger.warning("JWT token has expired")
@@ -158,6 +374,28 @@ class JWTAuthManager:
             logger.error(f"JWT token verification failed: {e}")
             return None
     
+    def _cached_claims(self, digest: str) -> Optional[Dict]:
+        """Claims of a recently verified token, until the token's own exp"""
+        with self._verified_lock:
+            entry = self._verified.get(digest)
+            if entry is not None and time.time() < entry[1]:
+                self._verified.move_to_end(digest)
+                self.verified_stats['hits'] += 1
+                return entry[0]
+            if entry is not None:
+                del self._verified[digest]
+            self.verified_stats['misses'] += 1
+            return None
+    
+    def _remember_claims(self, digest: str, claims: Dict):
+        if 'exp' not in claims or self.verified_cache_size <= 0:
+            return
+        with self._verified_lock:
+            self._verified[digest] = (claims, claims['exp'])
+            self._verified.move_to_end(digest)
+            while len(self._verified) > self.verified_cache_size:
+                self._verified.popitem(last=False)
+    
     def refresh_access_token(self, refresh_token: str) -> Optional[Dict[str, str]]:
         """
         Generate new access token using refresh token
@@ -178,7 +416,7 @@ class JWTAuthManager:
             user_id = claims.get('user_id')
             additional_claims = {
                 k: v for k, v in claims.items() 
-                if k not in ['exp', 'iat', 'type', 'scope']
+                if k not in ['exp', 'iat', 'type', 'scope', 'jti']
             }
             
             return self.generate_tokens(user_id, additional_claims)
@@ -189,20 +427,22 @@ class JWTAuthManager:
     
     def revoke_token(self, token: str) -> bool:
         """
-        Revoke a JWT token (add to blacklist)
+        Revoke a JWT token (add its jti to the revocation list)
         
         Args:
-            token: Token to revoke
+            token: Access, refresh or API key token to revoke
             
         Returns:
             bool: True if successfully revoked
         """
         try:
-            # In a production system, you would add this to a Redis blacklist
-            # For now, we'll log the revocation
-            claims = self.verify_token(token)
+            claims = self.verify_token(token, token_type=None)
             if claims:
-                logger.info(f"JWT token revoked for user {claims.get('user_id')}")
+                digest = hashlib.sha256(token.encode('utf-8')).hexdigest()
+                self.revocations.revoke(claims.get('jti') or digest, claims['exp'])
+                with self._verified_lock:
+                    self._verified.pop(digest, None)
+                logger.info(f"JWT {claims.get('type')} token revoked for user {claims.get('user_id')}")
                 return True
             return False
             
@@ -393,6 +633,7 @@ def create_api_key(user_id: int, description: str, expires_days: int = 365) -> D
             'iss': 'stevedores-dashboard',
             'aud': 'maritime-api',
             'type': 'api_key',
+            'jti': uuid.uuid4().hex,
             'description': description,
             'maritime_context': True,
             'scopes': ['maritime-operations', 'api-access'],
@@ -0,0 +1,287 @@
+"""
+Live Event Broker for Server-Push Dashboard Updates
+Fans out vessel progress, cargo tally and sync status events to connected clients
+
+Events are published through Redis pub/sub when available so every gunicorn
+worker sees them, with an in-process fallback for single-worker and offline
+deployments. Subscribers are bounded queues consumed by the SSE and
+long-poll endpoints in routes/live_updates.py.
+"""
+
+import json
+import logging
+import queue
+import threading
+import time
+from collections import deque
+from typing import Any, Dict, Iterable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Event types pushed to clients
+VESSEL_PROGRESS = 'vessel_progress'
+CARGO_TALLY = 'cargo_tally'
+SYNC_STATUS = 'sync_status'
+
+EVENT_TYPES = (VESSEL_PROGRESS, CARGO_TALLY, SYNC_STATUS)
+
+DEFAULT_CHANNEL = 'stevedores:live-events'
+
+
+class LiveSubscription:
+    """Bounded event queue for one connected client"""
+
+    def __init__(self, vessel_ids: Optional[Iterable[int]] = None,
+                 event_types: Optional[Iterable[str]] = None, max_queue: int = 100):
+        self.vessel_ids = {int(v) for v in vessel_ids} if vessel_ids else None
+        self.event_types = set(event_types) if event_types else None
+        self.queue: queue.Queue = queue.Queue(maxsize=max_queue)
+        self.dropped = 0
+
+    def matches(self, event: Dict[str, Any]) -> bool:
+        """Check whether the event passes this subscription's filters"""
+        if self.event_types is not None and event['type'] not in self.event_types:
+            return False
+        vessel_id = event.get('vessel_id')
+        if self.vessel_ids is not None and vessel_id is not None:
+            return vessel_id in self.vessel_ids
+        return True
+
+    def offer(self, event: Dict[str, Any]):
+        """Queue event, discarding the oldest one if the client is not keeping up"""
+        try:
+            self.queue.put_nowait(event)
+        except queue.Full:
+            try:
+                self.queue.get_nowait()
+                self.dropped += 1
+            except queue.Empty:
+                pass
+            try:
+                self.queue.put_nowait(event)
+            except queue.Full:
+                self.dropped += 1
+
+    def get(self, timeout: float) -> Optional[Dict[str, Any]]:
+        """Wait up to timeout seconds for the next event"""
+        try:
+            return self.queue.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+
+class LiveEventBroker:
+    """Publishes dashboard events and fans them out to local subscribers"""
+
+    def __init__(self, redis_client=None, channel: str = DEFAULT_CHANNEL,
+                 history_size: int = 200, max_queue: int = 100):
+        self.redis_client = redis_client
+        self.channel = channel
+        self.max_queue = max_queue
+
+        self._subscribers: List[LiveSubscription] = []
+        self._history: deque = deque(maxlen=history_size)
+        self._lock = threading.Lock()
+
+        # Redis listener state
+        self._listener: Optional[threading.Thread] = None
+        self._listener_ready = threading.Event()
+        self._stopping = threading.Event()
+
+        self.stats = {'published': 0, 'published_remote': 0, 'delivered': 0, 'received_remote': 0}
+
+    def publish(self, event_type: str, data: Dict[str, Any], vessel_id: Optional[int] = None) -> Dict[str, Any]:
+        """Publish an event to every worker (via Redis) or to this worker only"""
+        event = {
+            'type': event_type,
+            'vessel_id': int(vessel_id) if vessel_id is not None else None,
+            'data': data,
+            'ts': time.time()
+        }
+        self.stats['published'] += 1
+
+        self._ensure_listener()
+        if self._listener_ready.is_set():
+            # Our own listener is subscribed, so it dispatches locally once Redis echoes it back
+            delivered = self.redis_client.publish(self.channel, json.dumps(event, default=str))
+            if delivered:
+                self.stats['published_remote'] += 1
+                return event
+
+        self._dispatch(event)
+        return event
+
+    def subscribe(self, vessel_ids: Optional[Iterable[int]] = None,
+                  event_types: Optional[Iterable[str]] = None) -> LiveSubscription:
+        """Register a client subscription"""
+        self._ensure_listener()
+        subscription = LiveSubscription(vessel_ids, event_types, self.max_queue)
+        with self._lock:
+            self._subscribers.append(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: LiveSubscription):
+        """Remove a client subscription"""
+        with self._lock:
+            try:
+                self._subscribers.remove(subscription)
+            except ValueError:
+                pass
+
+    def events_since(self, since: float, vessel_ids: Optional[Iterable[int]] = None,
+                     event_types: Optional[Iterable[str]] = None) -> List[Dict[str, Any]]:
+        """Recent events newer than the since timestamp, for long-poll catch-up"""
+        probe = LiveSubscription(vessel_ids, event_types, max_queue=1)
+        with self._lock:
+            return [event for event in self._history if event['ts'] > since and probe.matches(event)]
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Broker statistics for monitoring"""
+        with self._lock:
+            subscribers = len(self._subscribers)
+            dropped = sum(s.dropped for s in self._subscribers)
+        return {
+            **self.stats,
+            'subscribers': subscribers,
+            'dropped': dropped,
+            'redis_connected': self._listener_ready.is_set(),
+            'history_size': len(self._history)
+        }
+
+    def close(self):
+        """Stop the Redis listener thread"""
+        self._stopping.set()
+        if self._listener and self._listener.is_alive():
+            self._listener.join(timeout=2)
+
+    def _dispatch(self, event: Dict[str, Any]):
+        """Deliver an event to matching local subscribers"""
+        with self._lock:
+            self._history.append(event)
+            targets = [s for s in self._subscribers if s.matches(event)]
+        for subscription in targets:
+            subscription.offer(event)
+        self.stats['delivered'] += len(targets)
+
+    def _ensure_listener(self):
+        """Start the Redis listener thread lazily (after gunicorn forks the worker)"""
+        if self.redis_client is None or self._stopping.is_set():
+            return
+        if self._listener is not None and self._listener.is_alive():
+            return
+        with self._lock:
+            if self._listener is not None and self._listener.is_alive():
+                return
+            self._listener = threading.Thread(target=self._listen, name='live-event-listener', daemon=True)
+            self._listener.start()
+
+    def _listen(self):
+        """Relay Redis channel messages to local subscribers, reconnecting with backoff"""
+        backoff = 1.0
+        while not self._stopping.is_set():
+            pubsub = self.redis_client.pubsub()
+            if pubsub is None:
+                self._stopping.wait(backoff)
+                backoff = min(backoff * 2, 30.0)
+                continue
+            try:
+                pubsub.subscribe(self.channel)
+                self._listener_ready.set()
+                backoff = 1.0
+                while not self._stopping.is_set():
+                    message = pubsub.get_message(timeout=1.0)
+                    if not message or message.get('type') != 'message':
+                        continue
+                    payload = message['data']
+                    if isinstance(payload, bytes):
+                        payload = payload.decode('utf-8')
+                    self.stats['received_remote'] += 1
+                    self._dispatch(json.loads(payload))
+            except Exception as e:
+                logger.warning(f"Live event listener lost Redis connection: {e}")
+            finally:
+                self._listener_ready.clear()
+                try:
+                    pubsub.close()
+                except Exception:
+                    pass
+            self._stopping.wait(backoff)
+            backoff = min(backoff * 2, 30.0)
+
+
+def format_sse(event: Dict[str, Any]) -> str:
+    """Encode an event as a server-sent events frame"""
+    return f"id: {event['ts']:.6f}\nevent: {event['type']}\ndata: {json.dumps(event, default=str)}\n\n"
+
+
+# Global broker instance
+_broker: Optional[LiveEventBroker] = None
+_broker_lock = threading.Lock()
+
+def get_live_event_broker(redis_url: Optional[str] = None) -> LiveEventBroker:
+    """Get global live event broker, using Redis pub/sub when a Redis URL is configured"""
+    global _broker
+
+    if _broker is None:
+        with _broker_lock:
+            if _broker is None:
+                redis_client = None
+                if redis_url and not redis_url.startswith('memory://'):
+                    try:
+                        from utils.redis_client import get_redis_client
+                        redis_client = get_redis_client(redis_url)
+                    except Exception as e:
+                        logger.warning(f"Live events using in-process fan-out only: {e}")
+                _broker = LiveEventBroker(redis_client)
+    return _broker
+
+def reset_live_event_broker():
+    """Reset global broker (for testing or reconfiguration)"""
+    global _broker
+
+    with _broker_lock:
+        if _broker:
+            _broker.close()
+        _broker = None
+
+def publish_event(event_type: str, data: Dict[str, Any], vessel_id: Optional[int] = None):
+    """Publish a live event from request code without ever failing the request"""
+    try:
+        from flask import current_app
+        redis_url = current_app.config.get('REDIS_URL')
+    except RuntimeError:
+        redis_url = None
+    try:
+        return get_live_event_broker(redis_url).publish(event_type, data, vessel_id)
+    except Exception as e:
+        logger.warning(f"Failed to publish live {event_type} event: {e}")
+        return None
+
+def publish_vessel_progress(vessel_id: int, progress: float, **extra):
+    """Publish a vessel progress change"""
+    return publish_event(VESSEL_PROGRESS, {'vessel_id': vessel_id, 'progress': progress, **extra}, vessel_id)
+
+def publish_cargo_tally(vessel_id: int, tally: Optional[Dict[str, Any]] = None, **extra):
+    """Publish new cargo tallies for a vessel"""
+    return publish_event(CARGO_TALLY, {'vessel_id': vessel_id, 'tally': tally, **extra}, vessel_id)
+
+def publish_sync_status(status: Dict[str, Any]):
+    """Publish a sync status transition"""
+    return publish_event(SYNC_STATUS, status)
+
+
+__all__ = [
+    'LiveEventBroker',
+    'LiveSubscription',
+    'EVENT_TYPES',
+    'VESSEL_PROGRESS',
+    'CARGO_TALLY',
+    'SYNC_STATUS',
+    'format_sse',
+    'get_live_event_broker',
+    'reset_live_event_broker',
+    'publish_event',
+    'publish_vessel_progress',
+    'publish_cargo_tally',
+    'publish_sync_status'
+]
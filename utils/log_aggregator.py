@@ -4,18 +4,27 @@ Real-time log processing and maritime-specific pattern recognition
 """
 
 import os
+import sys
 import json
+import math
 import re
+import socket
 import time
+import itertools
 from datetime import datetime, timezone, timedelta
 from typing import Dict, List, Any, Optional, Set, Tuple, Pattern
 from collections import defaultdict, deque, Counter
 from dataclasses import dataclass, field
 import threading
-from queue import Queue, Empty
+from queue import Queue, Empty, Full
 import logging
 from enum import Enum
 
+try:
+    from re import _parser as sre_parse
+except ImportError:  # Python < 3.11
+    import sre_parse
+
 # Import structured logger components
 from .structured_logger import LogLevel, MaritimeOperationType, ComponentType, get_structured_logger
 
@@ -64,6 +73,170 @@ class LogPattern:
         ]
 
 
+def _required_literal(regex: str, min_length: int = 3) -> Optional[str]:
+    """Longest literal run every match of `regex` must contain, casefolded, or None
+
+    Only top-level literals count: they are concatenated, so each one is mandatory.
+    """
+    try:
+        parsed = sre_parse.parse(regex, re.IGNORECASE)
+    except re.error:
+        return None
+
+    runs, current = [], []
+    for op, av in parsed.data:
+        if op is sre_parse.LITERAL:
+            current.append(chr(av))
+            continue
+        runs.append(''.join(current))
+        current = []
+    runs.append(''.join(current))
+
+    literal = max(runs, key=len).casefold()
+    if len(literal) < min_length or not literal.isascii():
+        return None
+    return literal
+
+
+class MaritimePatternMatcher:
+    """Finds every pattern type a message matches in one regex call
+
+    A casefolded keyword prefilter keeps only the regexes whose required literal occurs
+    in the message; those run as one compiled regex with a named lookahead group per
+    pattern type, so a group that participates means that type fired.
+    """
+
+    MAX_COMBINED = 1024
+
+    def __init__(self, patterns: Dict[MaritimePatternType, LogPattern]):
+        # (pattern type, regex source, compiled regex, required literal or None)
+        self._regexes: List[Tuple[MaritimePatternType, str, Pattern, Optional[str]]] = []
+        for pattern_type, pattern in patterns.items():
+            for source, compiled in zip(pattern.regex_patterns, pattern.compiled_patterns):
+                self._regexes.append((pattern_type, source, compiled, _required_literal(source)))
+
+        self._unanchored = tuple(i for i, entry in enumerate(self._regexes) if entry[3] is None)
+        self._anchors: Dict[str, List[int]] = defaultdict(list)
+        for i, entry in enumerate(self._regexes):
+            if entry[3] is not None:
+                self._anchors[entry[3]].append(i)
+
+        self._combined: Dict[Tuple[int, ...], Any] = {}
+        self.stats = {'messages': 0, 'prefilter_skips': 0, 'regex_calls': 0}
+
+    def _candidates(self, message: str) -> Tuple[int, ...]:
+        folded = message.casefold()
+        hits = [i for anchor, indexes in self._anchors.items() if anchor in folded for i in indexes]
+        if self._unanchored:
+            hits.extend(self._unanchored)
+        return tuple(sorted(hits))
+
+    def _compile(self, candidates: Tuple[int, ...]):
+        """Combined regex and its (pattern type, group name) list for a candidate set"""
+        by_type: Dict[MaritimePatternType, List[str]] = {}
+        for i in candidates:
+            pattern_type, source = self._regexes[i][:2]
+            by_type.setdefault(pattern_type, []).append(f'(?:{source})')
+
+        groups, parts = [], []
+        for n, (pattern_type, sources) in enumerate(by_type.items()):
+            name = f'p{n}_{pattern_type.value}'
+            groups.append((pattern_type, name))
+            parts.append(rf"(?=(?:[\s\S]*?(?P<{name}>{'|'.join(sources)}))?)")
+        try:
+            return re.compile(''.join(parts), re.IGNORECASE), groups
+        except re.error:
+            # Sources that cannot be combined (clashing group names, inline flags)
+            return None, groups
+
+    def match(self, message: str) -> List[MaritimePatternType]:
+        """Pattern types whose regexes match `message`, in pattern definition order"""
+        self.stats['messages'] += 1
+        candidates = self._candidates(message)
+        if not candidates:
+            self.stats['prefilter_skips'] += 1
+            return []
+
+        combined = self._combined.get(candidates)
+        if combined is None:
+            if len(self._combined) >= self.MAX_COMBINED:
+                self._combined.clear()
+            combined = self._combined[candidates] = self._compile(candidates)
+        regex, groups = combined
+
+        self.stats['regex_calls'] += 1
+        if regex is None:
+            fired = {self._regexes[i][0] for i in candidates if self._regexes[i][2].search(message)}
+            return [pattern_type for pattern_type, _ in groups if pattern_type in fired]
+
+        found = regex.match(message)
+        return [pattern_type for pattern_type, name in groups if found.group(name) is not None]
+
+
+class PatternWindow:
+    """Sliding-window match count for one pattern type, kept in fixed time buckets
+
+    A ring of window/bucket_seconds slots holds each bucket's count and first/last match
+    time; slots are reused as time moves on, so memory is fixed per pattern type no matter
+    how many lines match. Only the most recent `max_exemplars` entries are kept for alerts.
+    """
+
+    def __init__(self, window_minutes: int, bucket_seconds: int = 60, max_exemplars: int = 10):
+        self.bucket_seconds = bucket_seconds
+        self.size = max(1, math.ceil(window_minutes * 60 / bucket_seconds))
+        self._buckets = [-1] * self.size  # absolute bucket number held by each slot
+        self._counts = [0] * self.size
+        self._first = [0.0] * self.size
+        self._last = [0.0] * self.size
+        self.exemplars = deque(maxlen=max_exemplars)  # (epoch seconds, log entry)
+        self.newest_bucket = -1
+        self.total = 0
+
+    def _oldest_bucket(self, at: float) -> int:
+        # Out-of-order entries are judged against the newest bucket seen so far
+        return max(int(at // self.bucket_seconds), self.newest_bucket) - self.size + 1
+
+    def add(self, at: float, log_entry: Dict[str, Any]) -> int:
+        """Count a match at epoch `at` and return the count in the window ending there"""
+        self.total += 1
+        bucket = int(at // self.bucket_seconds)
+        slot = bucket % self.size
+        if self._buckets[slot] != bucket:
+            if self._buckets[slot] > bucket:
+                # Arrived after its bucket left the ring
+                return self.count(at)
+            self._buckets[slot] = bucket
+            self.newest_bucket = max(self.newest_bucket, bucket)
+            self._counts[slot] = 0
+            self._first[slot] = self._last[slot] = at
+
+        self._counts[slot] += 1
+        self._first[slot] = min(self._first[slot], at)
+        self._last[slot] = max(self._last[slot], at)
+        self.exemplars.append((at, log_entry))
+        return self.count(at)
+
+    def _live_slots(self, at: float) -> List[int]:
+        oldest = self._oldest_bucket(at)
+        return [slot for slot, bucket in enumerate(self._buckets) if bucket >= oldest]
+
+    def count(self, at: float) -> int:
+        """Matches in the window ending at epoch `at` (or at the newest match, if later)"""
+        return sum(self._counts[slot] for slot in self._live_slots(at))
+
+    def span_minutes(self, at: float) -> float:
+        """Minutes between the first and last match in the window"""
+        slots = self._live_slots(at)
+        if not slots:
+            return 0.0
+        return (max(self._last[s] for s in slots) - min(self._first[s] for s in slots)) / 60.0
+
+    def recent_exemplars(self, at: float) -> List[Tuple[float, Dict[str, Any]]]:
+        """Kept exemplar entries that fall inside the window ending at epoch `at`"""
+        start = self._oldest_bucket(at) * self.bucket_seconds
+        return [(when, entry) for when, entry in self.exemplars if when >= start]
+
+
 @dataclass
 class PatternMatch:
     """Detected pattern match"""
@@ -79,20 +252,54 @@ class PatternMatch:
     alert_id: str = field(default_factory=lambda: f"alert_{int(time.time())}")
 
 
+class AggregatorShard:
+    """One processing thread's bounded queue with its drop count and latency sample"""
+
+    def __init__(self, index: int, queue_size: int, latency_samples: int = 1024):
+        self.index = index
+        self.queue: Queue = Queue(maxsize=queue_size)
+        self.thread: Optional[threading.Thread] = None
+        self.processed = 0
+        self.dropped = 0
+        self.latencies = deque(maxlen=latency_samples)  # seconds per processed entry
+
+    def p99_latency_ms(self) -> Optional[float]:
+        """99th percentile processing time over the recent sample"""
+        sample = sorted(self.latencies)
+        if not sample:
+            return None
+        return sample[max(0, math.ceil(len(sample) * 0.99) - 1)] * 1000
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            'shard': self.index,
+            'queue_depth': self.queue.qsize(),
+            'queue_capacity': self.queue.maxsize,
+            'processed': self.processed,
+            'dropped': self.dropped,
+            'p99_latency_ms': self.p99_latency_ms(),
+        }
+
+
 class MaritimeLogAggregator:
-    """Advanced log aggregator with maritime pattern recognition"""
+    """Advanced log aggregator with maritime pattern recognition
     
-    def __init__(self, max_buffer_size: int = 10000):
+    Entries are spread over `shards` processing threads, each with its own queue of
+    `queue_size` entries; entries for one vessel always land on the same shard.
+    """
+    
+    def __init__(self, max_buffer_size: int = 10000, shards: int = 1, queue_size: int = 5000):
         self.log_buffer = deque(maxlen=max_buffer_size)
         self.pattern_matches = deque(maxlen=1000)  # Store recent pattern matches
-        self.processing_queue = Queue(maxsize=5000)
+        self.shards = [AggregatorShard(i, queue_size) for i in range(max(1, shards))]
+        self._round_robin = itertools.count()
         self.is_processing = False
-        self.processing_thread = None
         self.lock = threading.Lock()
+        self.stats_lock = threading.Lock()
         
         # Pattern storage
         self.patterns: Dict[MaritimePatternType, LogPattern] = {}
-        self.active_patterns: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
+        self.pattern_windows: Dict[MaritimePatternType, PatternWindow] = {}
         
         # Performance metrics
         self.processing_stats = {
@@ -105,11 +312,13 @@ class MaritimeLogAggregator:
         
         # Initialize maritime patterns
         self._initialize_maritime_patterns()
+        self.pattern_matcher = MaritimePatternMatcher(self.patterns)
+        
+        self.logger = get_structured_logger()
         
         # Start processing
         self.start_processing()
         
-        self.logger = get_structured_logger()
         self.logger.info(
             "Maritime log aggregator initialized",
             component=ComponentType.AUDIT_SYSTEM.value,
@@ -261,61 +470,77 @@ class MaritimeLogAggregator:
             auto_escalate=True
         )
     
+    def _shard_for(self, log_entry: Dict[str, Any]) -> AggregatorShard:
+        """Vessel entries stick to one shard; everything else is spread round-robin"""
+        vessel_id = log_entry.get('vessel_id')
+        if vessel_id is not None:
+            return self.shards[hash(vessel_id) % len(self.shards)]
+        return self.shards[next(self._round_robin) % len(self.shards)]
+    
     def add_log_entry(self, log_entry: Dict[str, Any]):
         """Add log entry for processing"""
+        shard = self._shard_for(log_entry)
         try:
-            self.processing_queue.put_nowait(log_entry)
-        except:
+            shard.queue.put_nowait(log_entry)
+        except Full:
             # Queue full, drop oldest entries
+            shard.dropped += 1
             try:
-                self.processing_queue.get_nowait()
-                self.processing_queue.put_nowait(log_entry)
-            except Empty:
+                shard.queue.get_nowait()
+                shard.queue.put_nowait(log_entry)
+            except (Empty, Full):
                 pass
     
     def start_processing(self):
-        """Start log processing thread"""
+        """Start one processing thread per shard"""
         if self.is_processing:
             return
         
         self.is_processing = True
-        self.processing_thread = threading.Thread(target=self._processing_loop, daemon=True)
-        self.processing_thread.start()
+        for shard in self.shards:
+            shard.thread = threading.Thread(target=self._processing_loop, args=(shard,), daemon=True)
+            shard.thread.start()
         
         self.logger.info(
             "Log processing started",
-            component=ComponentType.AUDIT_SYSTEM.value
+            component=ComponentType.AUDIT_SYSTEM.value,
+            shards=len(self.shards)
         )
     
     def stop_processing(self):
-        """Stop log processing thread"""
+        """Stop the processing threads"""
         self.is_processing = False
-        if self.processing_thread and self.processing_thread.is_alive():
-            self.processing_thread.join(timeout=5)
+        for shard in self.shards:
+            if shard.thread and shard.thread.is_alive():
+                shard.thread.join(timeout=5)
         
         self.logger.info(
             "Log processing stopped",
             component=ComponentType.AUDIT_SYSTEM.value
         )
     
-    def _processing_loop(self):
-        """Main log processing loop"""
+    def _processing_loop(self, shard: AggregatorShard):
+        """Processing loop for one shard"""
         while self.is_processing:
             try:
                 # Process queued log entries
                 processed_count = 0
-                start_time = time.time()
                 
                 while processed_count < 100:  # Process in batches
                     try:
-                        log_entry = self.processing_queue.get(timeout=1)
+                        log_entry = shard.queue.get(timeout=1)
+                        started = time.perf_counter()
                         self._process_log_entry(log_entry)
+                        shard.latencies.append(time.perf_counter() - started)
+                        shard.processed += 1
                         processed_count += 1
-                        self.processing_stats['logs_processed'] += 1
+                        with self.stats_lock:
+                            self.processing_stats['logs_processed'] += 1
                     except Empty:
                         break
                     except Exception as e:
-                        self.processing_stats['processing_errors'] += 1
+                        with self.stats_lock:
+                            self.processing_stats['processing_errors'] += 1
                         self.logger.error(
                             "Error processing log entry",
                             component=ComponentType.AUDIT_SYSTEM.value,
@@ -325,9 +550,6 @@ class MaritimeLogAggregator:
                 # Update processing time
                 self.processing_stats['last_processing_time'] = datetime.now(timezone.utc)
                 
-                # Clean up old pattern matches
-                self._cleanup_old_patterns()
-                
                 # Brief sleep to prevent CPU spinning
                 if processed_count == 0:
                     time.sleep(0.1)
@@ -340,6 +562,15 @@ class MaritimeLogAggregator:
                 )
                 time.sleep(1)
     
+    def get_processing_stats(self) -> Dict[str, Any]:
+        """processing_stats plus live per-shard queue depth, drops and p99 latency"""
+        with self.stats_lock:
+            stats = self.processing_stats.copy()
+        stats['shards'] = [shard.get_stats() for shard in self.shards]
+        stats['logs_dropped'] = sum(shard.dropped for shard in self.shards)
+        stats['queue_depth'] = sum(shard['queue_depth'] for shard in stats['shards'])
+        return stats
+    
     def _process_log_entry(self, log_entry: Dict[str, Any]):
         """Process individual log entry for patterns"""
         with self.lock:
@@ -355,53 +586,64 @@ class MaritimeLogAggregator:
         except:
             timestamp = datetime.now(timezone.utc)
         
-        # Check against all patterns
-        for pattern_type, pattern in self.patterns.items():
-            if self._matches_pattern(message, pattern, log_entry):
-                self._handle_pattern_match(pattern_type, pattern, log_entry, timestamp)
+        # One pass over the message for all patterns
+        for pattern_type in self._matched_pattern_types(message, log_entry):
+            self._handle_pattern_match(pattern_type, self.patterns[pattern_type], log_entry, timestamp)
     
-    def _matches_pattern(self, message: str, pattern: LogPattern, log_entry: Dict[str, Any]) -> bool:
-        """Check if log entry matches a pattern"""
-        # Check message against regex patterns
-        for compiled_pattern in pattern.compiled_patterns:
-            if compiled_pattern.search(message):
-                return True
+    def _matched_pattern_types(self, message: str, log_entry: Dict[str, Any]) -> List[MaritimePatternType]:
+        """Pattern types the log entry matches, in pattern definition order"""
+        matched = self.pattern_matcher.match(message)
         
         # Additional context-based matching for maritime operations
-        if pattern.pattern_type == MaritimePatternType.SECURITY_BREACH:
+        if (MaritimePatternType.SECURITY_BREACH in self.patterns
+                and MaritimePatternType.SECURITY_BREACH not in matched):
             level = log_entry.get('level', '').upper()
             if level in ['SECURITY', 'CRITICAL'] and 'security' in message.lower():
-                return True
+                matched.append(MaritimePatternType.SECURITY_BREACH)
+                order = list(self.patterns)
+                matched.sort(key=order.index)
         
-        return False
+        return matched
     
     def _handle_pattern_match(self, pattern_type: MaritimePatternType, pattern: LogPattern, log_entry: Dict[str, Any], timestamp: datetime):
         """Handle detected pattern match"""
-        pattern_key = f"{pattern_type.value}_{timestamp.strftime('%Y%m%d_%H%M')}"
-        
-        # Add to active patterns
-        self.active_patterns[pattern_key].append({
-            'log_entry': log_entry,
-            'timestamp': timestamp,
-            'pattern_type': pattern_type
-        })
-        
-        # Check if threshold is met
-        time_window_start = timestamp - timedelta(minutes=pattern.time_window_minutes)
-        recent_matches = [
-            match for match in self.active_patterns[pattern_key]
-            if match['timestamp'] >= time_window_start
-        ]
+        at = timestamp.timestamp()
+        
+        with self.lock:
+            window = self.pattern_windows.get(pattern_type)
+            if window is None:
+                window = self.pattern_windows[pattern_type] = PatternWindow(pattern.time_window_minutes)
+            occurrence_count = window.add(at, log_entry)
+            
+            # Check if threshold is met
+            if occurrence_count < pattern.occurrence_threshold:
+                return
+            time_span = window.span_minutes(at)
+            exemplars = window.recent_exemplars(at)
         
-        if len(recent_matches) >= pattern.occurrence_threshold:
-            self._generate_pattern_alert(pattern_type, pattern, recent_matches, timestamp)
+        matches = [
+            {
+                'log_entry': entry,
+                'timestamp': datetime.fromtimestamp(when, timezone.utc),
+                'pattern_type': pattern_type
+            }
+            for when, entry in exemplars
+        ]
+        self._generate_pattern_alert(pattern_type, pattern, matches, timestamp,
+                                     occurrence_count=occurrence_count, time_span_minutes=time_span)
     
-    def _generate_pattern_alert(self, pattern_type: MaritimePatternType, pattern: LogPattern, matches: List[Dict[str, Any]], timestamp: datetime):
-        """Generate alert for detected pattern"""
+    def _generate_pattern_alert(self, pattern_type: MaritimePatternType, pattern: LogPattern, matches: List[Dict[str, Any]], timestamp: datetime,
+                                occurrence_count: Optional[int] = None, time_span_minutes: Optional[float] = None):
+        """Generate alert for detected pattern; `matches` holds the window's exemplar entries"""
         try:
+            if occurrence_count is None:
+                occurrence_count = len(matches)
+            
             # Calculate time span
-            timestamps = [match['timestamp'] for match in matches]
-            time_span = (max(timestamps) - min(timestamps)).total_seconds() / 60.0
+            time_span = time_span_minutes
+            if time_span is None:
+                timestamps = [match['timestamp'] for match in matches]
+                time_span = (max(timestamps) - min(timestamps)).total_seconds() / 60.0 if timestamps else 0.0
             
             # Extract maritime context
             maritime_context = {}
@@ -423,7 +665,7 @@ class MaritimeLogAggregator:
                 severity=pattern.severity,
                 timestamp=timestamp,
                 log_entries=[match['log_entry'] for match in matches],
-                occurrence_count=len(matches),
+                occurrence_count=occurrence_count,
                 time_span_minutes=time_span,
                 maritime_context=maritime_context,
                 impact_assessment=pattern.maritime_impact,
@@ -435,8 +677,9 @@ class MaritimeLogAggregator:
                 self.pattern_matches.append(pattern_match)
             
             # Update stats
-            self.processing_stats['patterns_detected'] += 1
-            self.processing_stats['alerts_generated'] += 1
+            with self.stats_lock:
+                self.processing_stats['patterns_detected'] += 1
+                self.processing_stats['alerts_generated'] += 1
             
             # Log the alert
             self.logger.log(
@@ -445,7 +688,7 @@ class MaritimeLogAggregator:
                 component=ComponentType.AUDIT_SYSTEM.value,
                 pattern_type=pattern_type.value,
                 severity=pattern.severity.value,
-                occurrence_count=len(matches),
+                occurrence_count=occurrence_count,
                 time_span_minutes=time_span,
                 maritime_impact=pattern.maritime_impact,
                 recommendations=recommendations,
@@ -460,7 +703,8 @@ class MaritimeLogAggregator:
                 self._escalate_alert(pattern_match)
                 
         except Exception as e:
-            self.processing_stats['processing_errors'] += 1
+            with self.stats_lock:
+                self.processing_stats['processing_errors'] += 1
             self.logger.error(
                 "Error generating pattern alert",
                 component=ComponentType.AUDIT_SYSTEM.value,
@@ -526,26 +770,11 @@ class MaritimeLogAggregator:
             requires_immediate_attention=True
         )
     
-    def _cleanup_old_patterns(self):
-        """Clean up old pattern tracking data"""
-        cutoff_time = datetime.now(timezone.utc) - timedelta(hours=24)
-        
+    def active_pattern_count(self) -> int:
+        """Pattern types with matches inside their current window"""
+        now = time.time()
         with self.lock:
-            # Clean up active patterns
-            keys_to_remove = []
-            for pattern_key, matches in self.active_patterns.items():
-                # Remove old matches
-                self.active_patterns[pattern_key] = [
-                    match for match in matches
-                    if match['timestamp'] > cutoff_time
-                ]
-                
-                # Remove empty pattern keys
-                if not self.active_patterns[pattern_key]:
-                    keys_to_remove.append(pattern_key)
-            
-            for key in keys_to_remove:
-                del self.active_patterns[key]
+            return sum(1 for window in self.pattern_windows.values() if window.count(now))
     
     def get_recent_patterns(self, hours: int = 24) -> List[PatternMatch]:
         """Get recent pattern matches"""
@@ -578,8 +807,9 @@ class MaritimeLogAggregator:
             'severity_counts': dict(severity_counts),
             'top_patterns': top_patterns,
             'alert_frequency_per_hour': round(alert_frequency, 2),
-            'processing_stats': self.processing_stats.copy(),
-            'active_pattern_keys': len(self.active_patterns),
+            'processing_stats': self.get_processing_stats(),
+            'matcher_stats': self.pattern_matcher.stats.copy(),
+            'active_pattern_keys': self.active_pattern_count(),
             'buffer_size': len(self.log_buffer)
         }
     
@@ -635,16 +865,285 @@ class MaritimeLogAggregator:
         }
 
 
+DEFAULT_AGGREGATOR_SOCKET = '/tmp/stevedores-log-aggregator.sock'
+MAX_SHIPPED_ENTRY_BYTES = 64 * 1024
+
+
+class LogShipper:
+    """Ships log entries from a web worker to the aggregator process over a Unix socket
+    
+    Entries are newline-delimited JSON on a non-blocking stream connection. Sending never
+    blocks the request thread: bytes the socket cannot take yet wait in a buffer of at most
+    `max_pending_bytes`, and entries that do not fit, or that are lost because the
+    aggregator is not running, are dropped and counted.
+    """
+    
+    RECONNECT_INTERVAL = 1.0
+    
+    def __init__(self, socket_path: str = DEFAULT_AGGREGATOR_SOCKET, max_pending_bytes: int = 256 * 1024):
+        self.socket_path = socket_path
+        self.max_pending_bytes = max_pending_bytes
+        self.sock: Optional[socket.socket] = None
+        self._pending = bytearray()
+        self._next_connect = 0.0
+        self._lock = threading.Lock()
+        self.stats = {'sent': 0, 'dropped': 0, 'oversized': 0, 'connects': 0}
+    
+    def _connect(self) -> bool:
+        now = time.monotonic()
+        if now < self._next_connect:
+            return False
+        self._next_connect = now + self.RECONNECT_INTERVAL
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.setblocking(False)
+        try:
+            sock.connect(self.socket_path)
+        except OSError:
+            sock.close()
+            return False
+        self.sock = sock
+        self.stats['connects'] += 1
+        return True
+    
+    def _flush(self):
+        try:
+            while self._pending:
+                sent = self.sock.send(self._pending)
+                del self._pending[:sent]
+        except BlockingIOError:
+            pass
+        except OSError:
+            # Aggregator went away: entries not fully written are lost
+            lost = self._pending.count(b'\n')
+            self.stats['sent'] -= lost
+            self.stats['dropped'] += lost
+            self._pending.clear()
+            self.sock.close()
+            self.sock = None
+    
+    def add_log_entry(self, log_entry: Dict[str, Any]):
+        """Queue one entry for the aggregator, dropping it rather than waiting"""
+        data = json.dumps(log_entry, default=str).encode('utf-8') + b'\n'
+        if len(data) > MAX_SHIPPED_ENTRY_BYTES:
+            self.stats['oversized'] += 1
+            self.stats['dropped'] += 1
+            return
+        
+        with self._lock:
+            if self.sock is None and not self._connect():
+                self.stats['dropped'] += 1
+                return
+            if self._pending:
+                self._flush()
+            if self.sock is None or len(self._pending) + len(data) > self.max_pending_bytes:
+                self.stats['dropped'] += 1
+                return
+            self._pending += data
+            self.stats['sent'] += 1
+            self._flush()
+    
+    def get_stats(self) -> Dict[str, Any]:
+        stats = self.stats.copy()
+        stats['pending_bytes'] = len(self._pending)
+        stats['connected'] = self.sock is not None
+        return stats
+    
+    def close(self):
+        with self._lock:
+            if self.sock is not None:
+                self._flush()
+            if self.sock is not None:
+                self.sock.close()
+                self.sock = None
+
+
+def aggregator_stats_path(socket_path: str) -> str:
+    """Where the aggregator process publishes its dashboard snapshot"""
+    return socket_path + '.stats.json'
+
+
+class LogAggregatorServer:
+    """Standalone aggregator process: reads shipped entries from a Unix socket into a sharded aggregator
+    
+    Every `stats_interval` seconds the server writes a snapshot of its statistics,
+    pattern summary and alert counts to `stats_path` for the web workers' dashboard
+    (see read_aggregator_process_stats()).
+    """
+    
+    def __init__(self, socket_path: str = DEFAULT_AGGREGATOR_SOCKET, shards: int = 4, queue_size: int = 5000,
+                 stats_path: Optional[str] = None, stats_interval: float = 5.0):
+        self.socket_path = socket_path
+        self.stats_path = stats_path or aggregator_stats_path(socket_path)
+        self.stats_interval = stats_interval
+        self.aggregator = MaritimeLogAggregator(shards=shards, queue_size=queue_size)
+        self.alert_system = None
+        self.stats = {'connections': 0, 'received': 0, 'malformed': 0}
+        self.sock: Optional[socket.socket] = None
+        self._running = False
+        self._thread: Optional[threading.Thread] = None
+    
+    def enable_alerts(self):
+        """Escalate this process's pattern alerts through its own maritime alert system"""
+        from .maritime_alerts import init_maritime_alert_system, attach_pattern_alerts
+        
+        self.alert_system = init_maritime_alert_system()
+        attach_pattern_alerts(self.aggregator, self.alert_system)
+        return self.alert_system
+    
+    def _bind(self):
+        if os.path.exists(self.socket_path):
+            os.unlink(self.socket_path)  # stale socket from a previous run
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.bind(self.socket_path)
+        self.sock.listen(128)
+        self.sock.setblocking(False)
+    
+    def _receive(self, line: bytes):
+        try:
+            log_entry = json.loads(line)
+        except ValueError:
+            self.stats['malformed'] += 1
+            return
+        self.stats['received'] += 1
+        self.aggregator.add_log_entry(log_entry)
+    
+    def serve_forever(self):
+        """Accept worker connections and feed their entries to the aggregator until stop()"""
+        import selectors
+        
+        if self.sock is None:
+            self._bind()
+        self._running = True
+        selector = selectors.DefaultSelector()
+        selector.register(self.sock, selectors.EVENT_READ)
+        partial: Dict[socket.socket, bytes] = {}
+        next_snapshot = 0.0
+        
+        try:
+            while self._running:
+                if time.monotonic() >= next_snapshot:
+                    self.write_snapshot()
+                    next_snapshot = time.monotonic() + self.stats_interval
+                for key, _ in selector.select(timeout=0.5):
+                    if key.fileobj is self.sock:
+                        try:
+                            conn, _ = self.sock.accept()
+                        except BlockingIOError:
+                            continue
+                        conn.setblocking(False)
+                        selector.register(conn, selectors.EVENT_READ)
+                        partial[conn] = b''
+                        self.stats['connections'] += 1
+                        continue
+                    
+                    conn = key.fileobj
+                    try:
+                        chunk = conn.recv(65536)
+                    except BlockingIOError:
+                        continue
+                    except OSError:
+                        chunk = b''
+                    if not chunk:
+                        selector.unregister(conn)
+                        conn.close()
+                        del partial[conn]
+                        continue
+                    
+                    *lines, rest = (partial[conn] + chunk).split(b'\n')
+                    if len(rest) > MAX_SHIPPED_ENTRY_BYTES:
+                        self.stats['malformed'] += 1
+                        rest = b''
+                    partial[conn] = rest
+                    for line in lines:
+                        self._receive(line)
+        finally:
+            for conn in partial:
+                conn.close()
+            selector.close()
+    
+    def start(self) -> threading.Thread:
+        """Serve on a background thread (for embedding and tests)"""
+        self._bind()
+        self._thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self._thread.start()
+        return self._thread
+    
+    def stop(self):
+        self._running = False
+        if self._thread:
+            self._thread.join(timeout=5)
+        if self.sock:
+            self.sock.close()
+            self.sock = None
+        for path in (self.socket_path, self.stats_path):
+            if os.path.exists(path):
+                os.unlink(path)
+        self.aggregator.stop_processing()
+    
+    def get_stats(self) -> Dict[str, Any]:
+        stats = self.aggregator.get_processing_stats()
+        stats['server'] = self.stats.copy()
+        return stats
+    
+    def snapshot(self) -> Dict[str, Any]:
+        """Dashboard view of this process: the fields routes/logging_dashboard.py reads from an in-process aggregator"""
+        aggregator = self.aggregator
+        snapshot = {
+            'written_at': time.time(),
+            'pid': os.getpid(),
+            'status': 'active' if aggregator.is_processing else 'inactive',
+            'buffer_size': len(aggregator.log_buffer),
+            'buffer_capacity': aggregator.log_buffer.maxlen,
+            'active_patterns': aggregator.active_pattern_count(),
+            'processing_stats': self.get_stats(),
+            'pattern_summary': aggregator.get_pattern_summary(24),
+            'maritime_dashboard': aggregator.get_maritime_dashboard_data(),
+            'alerts': None
+        }
+        if self.alert_system is not None:
+            snapshot['alerts'] = self.alert_system.get_alert_statistics(24)
+        return snapshot
+    
+    def write_snapshot(self):
+        """Atomically replace the stats file so readers never see a partial snapshot"""
+        tmp_path = f"{self.stats_path}.{os.getpid()}.tmp"
+        try:
+            with open(tmp_path, 'w') as f:
+                json.dump(self.snapshot(), f, default=str)
+            os.replace(tmp_path, self.stats_path)
+        except Exception as e:
+            self.aggregator.logger.error(
+                "Error writing aggregator stats snapshot",
+                component=ComponentType.AUDIT_SYSTEM.value,
+                exception=e
+            )
+
+
+def read_aggregator_process_stats(path: Optional[str] = None, max_age: float = 30.0) -> Optional[Dict[str, Any]]:
+    """Latest snapshot from the aggregator process, or None if it is missing or older than max_age seconds"""
+    if path is None:
+        path = aggregator_stats_path(os.getenv('LOG_AGGREGATOR_SOCKET') or DEFAULT_AGGREGATOR_SOCKET)
+    try:
+        with open(path) as f:
+            snapshot = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if time.time() - snapshot.get('written_at', 0) > max_age:
+        return None
+    return snapshot
+
+
 # Global aggregator instance
 _log_aggregator: Optional[MaritimeLogAggregator] = None
+_log_shipper: Optional[LogShipper] = None
 
 
-def init_log_aggregator() -> MaritimeLogAggregator:
+def init_log_aggregator(shards: int = 1, queue_size: int = 5000) -> MaritimeLogAggregator:
     """Initialize the global log aggregator"""
     global _log_aggregator
     
     if _log_aggregator is None:
-        _log_aggregator = MaritimeLogAggregator()
+        _log_aggregator = MaritimeLogAggregator(shards=shards, queue_size=queue_size)
     
     return _log_aggregator
 
@@ -654,10 +1153,36 @@ def get_log_aggregator() -> Optional[MaritimeLogAggregator]:
     return _log_aggregator
 
 
+def get_log_shipper() -> Optional[LogShipper]:
+    """Get the worker's log shipper when aggregation runs in a separate process"""
+    return _log_shipper
+
+
 def configure_log_aggregation(app):
-    """Configure Flask app with log aggregation"""
-    # Initialize aggregator
-    aggregator = init_log_aggregator()
+    """Configure Flask app with log aggregation
+    
+    LOG_AGGREGATION_MODE 'thread' (default) aggregates in this process on
+    LOG_AGGREGATION_SHARDS threads; 'process' ships entries to the aggregator process
+    listening on LOG_AGGREGATOR_SOCKET, which the gunicorn configs start through
+    start_aggregator_process().
+    
+    In process mode get_log_aggregator() returns None inside web workers: pattern
+    matches live in the aggregator process, which escalates them through its own
+    maritime alert system and publishes its statistics for the dashboard through
+    read_aggregator_process_stats().
+    """
+    global _log_shipper
+    
+    def setting(name, default):
+        return app.config.get(name) or os.getenv(name) or default
+    
+    if setting('LOG_AGGREGATION_MODE', 'thread') == 'process':
+        if _log_shipper is None:
+            _log_shipper = LogShipper(setting('LOG_AGGREGATOR_SOCKET', DEFAULT_AGGREGATOR_SOCKET))
+        aggregator = _log_shipper
+    else:
+        # Initialize aggregator
+        aggregator = init_log_aggregator(shards=int(setting('LOG_AGGREGATION_SHARDS', 1)))
     
     # Hook into structured logger to feed aggregator
     original_log = logging.Logger._log
@@ -686,7 +1211,93 @@ def configure_log_aggregation(app):
 
 # Export public interface
 __all__ = [
-    'PatternSeverity', 'MaritimePatternType', 'LogPattern', 'PatternMatch',
-    'MaritimeLogAggregator', 'init_log_aggregator', 'get_log_aggregator',
-    'configure_log_aggregation'
-]
\ No newline at end of file
+    'PatternSeverity', 'MaritimePatternType', 'LogPattern', 'PatternMatch', 'MaritimePatternMatcher',
+    'PatternWindow',
+    'AggregatorShard', 'MaritimeLogAggregator', 'LogShipper', 'LogAggregatorServer',
+    'aggregator_stats_path', 'read_aggregator_process_stats',
+    'init_log_aggregator', 'get_log_aggregator', 'get_log_shipper', 'configure_log_aggregation',
+    'start_aggregator_process', 'stop_aggregator_process'
+]
+
+
+# Standalone aggregator spawned by the gunicorn master (LOG_AGGREGATION_MODE=process)
+_aggregator_process = None
+
+
+def start_aggregator_process(log: Optional[logging.Logger] = None):
+    """Spawn the aggregator process when LOG_AGGREGATION_MODE=process - call from gunicorn's on_starting
+    
+    Returns the Popen handle, or None when aggregation runs in the workers or the spawn failed.
+    """
+    global _aggregator_process
+    import subprocess
+    
+    log = log or logging.getLogger(__name__)
+    if os.getenv('LOG_AGGREGATION_MODE', 'thread') != 'process':
+        return None
+    if _aggregator_process is not None and _aggregator_process.poll() is None:
+        return _aggregator_process
+    
+    command = [sys.executable, '-m', 'utils.log_aggregator',
+               '--shards', os.getenv('LOG_AGGREGATION_SHARDS', '4')]
+    if os.getenv('LOG_AGGREGATOR_SOCKET'):
+        command += ['--socket', os.environ['LOG_AGGREGATOR_SOCKET']]
+    try:
+        _aggregator_process = subprocess.Popen(
+            command, cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        )
+    except Exception as e:
+        log.error(f"Failed to start log aggregator process: {e}")
+        return None
+    log.info(f"📊 Log aggregator process started (pid {_aggregator_process.pid})")
+    return _aggregator_process
+
+
+def stop_aggregator_process(timeout: float = 10.0):
+    """Terminate the aggregator process started by start_aggregator_process - call from gunicorn's on_exit"""
+    global _aggregator_process
+    process, _aggregator_process = _aggregator_process, None
+    if process is None or process.poll() is not None:
+        return
+    process.terminate()
+    try:
+        process.wait(timeout=timeout)
+    except Exception:
+        process.kill()
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Run the standalone aggregator: python -m utils.log_aggregator --socket PATH --shards N"""
+    import argparse
+    import signal
+    
+    parser = argparse.ArgumentParser(description='Stevedores log aggregator process')
+    parser.add_argument('--socket', default=os.getenv('LOG_AGGREGATOR_SOCKET', DEFAULT_AGGREGATOR_SOCKET))
+    parser.add_argument('--shards', type=int, default=int(os.getenv('LOG_AGGREGATION_SHARDS', 4)))
+    parser.add_argument('--queue-size', type=int, default=5000)
+    args = parser.parse_args(argv)
+    
+    server = LogAggregatorServer(args.socket, shards=args.shards, queue_size=args.queue_size)
+    try:
+        server.enable_alerts()
+    except Exception as e:
+        # Without the alert system pattern alerts would only be logged, never escalated
+        server.aggregator.logger.error(
+            "Log aggregator process cannot start without maritime alert integration",
+            component=ComponentType.AUDIT_SYSTEM.value,
+            exception=e
+        )
+        server.aggregator.stop_processing()
+        return 1
+    signal.signal(signal.SIGTERM, lambda *_: setattr(server, '_running', False))
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.stop()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
\ No newline at end of file
@@ -74,6 +74,7 @@ class AlertRule:
     escalation_rules: List[Dict[str, Any]] = field(default_factory=list)
     maritime_context_required: bool = True
     business_hours_only: bool = False
+    acknowledgment_required: bool = False
     tags: Dict[str, str] = field(default_factory=dict)
     
     def __post_init__(self):
@@ -494,7 +495,9 @@ class MaritimeAlertSystem:
             affected_systems=self._identify_affected_systems(event_data),
             estimated_impact=self._estimate_impact(rule.alert_type, event_data),
             recommended_actions=self._generate_recommendations(rule.alert_type, event_data),
-            acknowledgment_required=rule.priority in [AlertPriority.CRITICAL, AlertPriority.EMERGENCY],
+            acknowledgment_required=(
+                rule.acknowledgment_required or rule.priority in [AlertPriority.CRITICAL, AlertPriority.EMERGENCY]
+            ),
             tags={**rule.tags, **event_data.get('tags', {})}
         )
         
@@ -945,8 +948,47 @@ def get_maritime_alert_system() -> Optional[MaritimeAlertSystem]:
     return _maritime_alert_system
 
 
+def attach_pattern_alerts(aggregator, alert_system: MaritimeAlertSystem):
+    """Feed the aggregator's pattern alerts into the alert system for rule evaluation and escalation"""
+    # Override pattern match handler to trigger alerts
+    original_generate_alert = aggregator._generate_pattern_alert
+    
+    def enhanced_generate_alert(pattern_type, pattern, matches, timestamp, occurrence_count=None, **kwargs):
+        # Call original method
+        result = original_generate_alert(pattern_type, pattern, matches, timestamp,
+                                         occurrence_count=occurrence_count, **kwargs)
+        
+        # Trigger alert system evaluation
+        event_data = {
+            'pattern_type': pattern_type.value,
+            'severity': pattern.severity.value,
+            'occurrence_count': occurrence_count if occurrence_count is not None else len(matches),
+            'timestamp': timestamp.isoformat(),
+            'maritime_context': {},
+            'message': f"Pattern detected: {pattern_type.value}",
+            'compliance_flags': pattern.compliance_flags
+        }
+        
+        # Extract maritime context from matches
+        for match in matches:
+            log_entry = match.get('log_entry', {})
+            if 'vessel_id' in log_entry:
+                event_data['maritime_context']['vessel_id'] = log_entry['vessel_id']
+            if 'berth_id' in log_entry:
+                event_data['maritime_context']['berth_id'] = log_entry['berth_id']
+        
+        alert_system.evaluate_event(event_data)
+        return result
+    
+    aggregator._generate_pattern_alert = enhanced_generate_alert
+
+
 def configure_alert_integration(app):
-    """Configure Flask app with alert system integration"""
+    """Configure Flask app with alert system integration
+    
+    With LOG_AGGREGATION_MODE=process there is no aggregator in the web worker;
+    the aggregator process attaches pattern alerts to its own alert system instead.
+    """
     # Initialize alert system
     alert_system = init_maritime_alert_system()
     
@@ -955,36 +997,7 @@ def configure_alert_integration(app):
     aggregator = get_log_aggregator()
     
     if aggregator:
-        # Override pattern match handler to trigger alerts
-        original_generate_alert = aggregator._generate_pattern_alert
-        
-        def enhanced_generate_alert(pattern_type, pattern, matches, timestamp):
-            # Call original method
-            result = original_generate_alert(pattern_type, pattern, matches, timestamp)
-            
-            # Trigger alert system evaluation
-            event_data = {
-                'pattern_type': pattern_type.value,
-                'severity': pattern.severity.value,
-                'occurrence_count': len(matches),
-                'timestamp': timestamp.isoformat(),
-                'maritime_context': {},
-                'message': f"Pattern detected: {pattern_type.value}",
-                'compliance_flags': pattern.compliance_flags
-            }
-            
-            # Extract maritime context from matches
-            for match in matches:
-                log_entry = match.get('log_entry', {})
-                if 'vessel_id' in log_entry:
-                    event_data['maritime_context']['vessel_id'] = log_entry['vessel_id']
-                if 'berth_id' in log_entry:
-                    event_data['maritime_context']['berth_id'] = log_entry['berth_id']
-            
-            alert_system.evaluate_event(event_data)
-            return result
-        
-        aggregator._generate_pattern_alert = enhanced_generate_alert
+        attach_pattern_alerts(aggregator, alert_system)
     
     return alert_system
 
@@ -993,5 +1006,5 @@ def configure_alert_integration(app):
 __all__ = [
     'AlertPriority', 'AlertChannel', 'MaritimeAlertType', 'AlertRule', 'AlertEvent',
     'MaritimeAlertSystem', 'init_maritime_alert_system', 'get_maritime_alert_system',
-    'configure_alert_integration'
+    'attach_pattern_alerts', 'configure_alert_integration'
 ]
\ No newline at end of file
@@ -4,6 +4,7 @@ Secure offline authentication with encrypted token storage for maritime operatio
 """
 
 import os
+import hmac
 import json
 import hashlib
 import logging
@@ -118,8 +119,8 @@ class OfflineAuthToken:
 class OfflineAuthenticationManager:
     """Secure offline authentication manager for maritime operations"""
     
-    def __init__(self):
-        self.cache = get_encrypted_cache()
+    def __init__(self, cache=None):
+        self.cache = cache or get_encrypted_cache()
         self.audit_logger = get_audit_logger()
         
         # Authentication configuration
@@ -152,6 +153,11 @@ class OfflineAuthenticationManager:
         # Initialize encryption for sensitive data
         self.auth_cipher = self._initialize_auth_encryption()
         
+        # Salt for username index keys so cache keys do not reveal usernames
+        self.username_index_salt = hashlib.sha256(
+            f"offline-username-index-{os.environ.get('STEVEDORES_AUTH_KEY', 'default-key')}".encode()
+        ).digest()
+        
         logger.info("Offline authentication manager initialized")
     
     def _initialize_auth_encryption(self) -> Fernet:
@@ -176,6 +182,11 @@ class OfflineAuthenticationManager:
             logger.error(f"Failed to initialize auth encryption: {e}")
             raise
     
+    def _username_index_key(self, username: str) -> str:
+        """Cache key of the username -> token index entry (salted HMAC of the username)"""
+        digest = hmac.new(self.username_index_salt, username.encode('utf-8'), hashlib.sha256).hexdigest()
+        return f"offline_username_index_{digest}"
+    
     def _hash_password(self, password: str, salt: Optional[str] = None) -> Tuple[str, str]:
         """Hash password with salt for secure storage"""
         try:
@@ -326,10 +337,10 @@ class OfflineAuthenticationManager:
                 operation_type="offline_authentication"
             )
             
-            # Store user index for lookups
+            # Index the token by username so offline login is a single lookup
             self.cache.store(
-                key=f"offline_user_index_{user_id}",
-                data={'token_id': token_id, 'username': username},
+                key=self._username_index_key(username),
+                data={'token_id': token_id, 'user_id': user_id},
                 ttl=self.config['max_offline_days'] * 86400,
                 classification=CacheClassification.INTERNAL,
                 operation_type="user_index"
@@ -550,27 +561,22 @@ class OfflineAuthenticationManager:
     def _find_user_token(self, username: str) -> Optional[OfflineAuthToken]:
         """Find user's offline authentication token"""
         try:
-            # First, try to find by username in user index
-            user_data = None
-            for user_id in range(1, 1000):  # Practical limit for searching
-                index_data = self.cache.retrieve(f"offline_user_index_{user_id}")
-                if index_data and index_data.get('username') == username:
-                    user_data = index_data
-                    break
-            
-            if not user_data:
+            # Look up the token ID in the username index
+            index_data = self.cache.retrieve(self._username_index_key(username))
+            if not index_data:
                 return None
             
             # Get the token
-            token_id = user_data['token_id']
-            encrypted_token_data = self.cache.retrieve(f"offline_auth_{token_id}")
+            encrypted_token_data = self.cache.retrieve(f"offline_auth_{index_data['token_id']}")
             
             if not encrypted_token_data:
                 return None
             
             # Decrypt token data
-            token_data = self._decrypt_token_data(encrypted_token_data)
-            return OfflineAuthToken.from_dict(token_data)
+            token = OfflineAuthToken.from_dict(self._decrypt_token_data(encrypted_token_data))
+            
+            # Guard against index key collisions
+            return token if token.username == username else None
             
         except Exception as e:
             logger.error(f"Failed to find user token for {username}: {e}")
@@ -618,6 +624,15 @@ class OfflineAuthenticationManager:
             bool: Success status
         """
         try:
+            # Drop the username index entry if it still points at this token
+            encrypted_token_data = self.cache.retrieve(f"offline_auth_{token_id}")
+            if encrypted_token_data:
+                username = self._decrypt_token_data(encrypted_token_data)['username']
+                index_key = self._username_index_key(username)
+                index_data = self.cache.retrieve(index_key)
+                if index_data and index_data.get('token_id') == token_id:
+                    self.cache.delete(index_key)
+            
             # Remove token from cache
             success = self.cache.delete(f"offline_auth_{token_id}")
             
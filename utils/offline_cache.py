@@ -0,0 +1,188 @@
+"""
+Offline Cache Stores
+Pluggable storage for OfflineDataManager snapshots shared across gunicorn workers
+
+LocalCacheStore is a bounded in-process LRU. RedisCacheStore keeps the shared
+copy plus a per-key version counter. LayeredCacheStore puts a local LRU in
+front of the shared store and revalidates its copy against the version counter
+(a tiny GET) at most every local_ttl seconds, so every worker serves the same
+snapshot without re-reading or re-parsing it on each request.
+"""
+
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class LocalCacheStore:
+    """Bounded in-process LRU with per-entry expiry - the default when nothing is shared"""
+
+    def __init__(self, max_entries: int = 512):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Tuple[Any, Optional[float]]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            value, expires_at = entry
+            if expires_at is not None and expires_at <= time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None) -> bool:
+        expires_at = time.monotonic() + ttl if ttl else None
+        with self._lock:
+            self._entries[key] = (value, expires_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return True
+
+    def delete(self, key: str) -> bool:
+        with self._lock:
+            self._entries.pop(key, None)
+        return True
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {'backend': 'local', 'entries': len(self._entries), 'max_entries': self.max_entries}
+
+
+class RedisCacheStore:
+    """Shared JSON snapshots in Redis, each with a version counter bumped on every write"""
+
+    def __init__(self, redis_client, prefix: str = 'offline_cache:'):
+        self.redis = redis_client
+        self.prefix = prefix
+
+    def _keys(self, key: str) -> Tuple[str, str]:
+        return f'{self.prefix}{key}', f'{self.prefix}{key}:version'
+
+    def get_version(self, key: str) -> Optional[int]:
+        _, version_key = self._keys(key)
+        version = self.redis.get(version_key)
+        return int(version) if version is not None else None
+
+    def get_entry(self, key: str) -> Optional[Tuple[int, Any]]:
+        """(version, data) or None"""
+        data_key, _ = self._keys(key)
+        raw = self.redis.get(data_key)
+        if raw is None:
+            return None
+        if isinstance(raw, bytes):
+            raw = raw.decode('utf-8')
+        try:
+            payload = json.loads(raw)
+            return payload['version'], payload['data']
+        except (ValueError, KeyError, TypeError):
+            logger.warning(f"Discarding unreadable offline cache entry {key}")
+            return None
+
+    def get(self, key: str) -> Optional[Any]:
+        entry = self.get_entry(key)
+        return entry[1] if entry else None
+
+    def set_entry(self, key: str, value: Any, ttl: Optional[float] = None) -> Optional[int]:
+        """Store value and return its new version"""
+        data_key, version_key = self._keys(key)
+        version = self.redis.incr(version_key)
+        if version is None:
+            return None
+        ttl = int(ttl) if ttl else None
+        if not self.redis.set(data_key, json.dumps({'version': version, 'data': value}, default=str), ex=ttl):
+            return None
+        if ttl:
+            # The counter outlives the payload so a re-created key never reuses an old version
+            self.redis.expire(version_key, ttl * 2)
+        return version
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None) -> bool:
+        return self.set_entry(key, value, ttl) is not None
+
+    def delete(self, key: str) -> bool:
+        data_key, version_key = self._keys(key)
+        self.redis.delete(data_key)
+        self.redis.incr(version_key)  # Local copies in other workers see the bump and drop theirs
+        return True
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {'backend': 'redis', 'prefix': self.prefix}
+
+
+class LayeredCacheStore:
+    """Local LRU in front of a shared RedisCacheStore, revalidated by version"""
+
+    def __init__(self, shared: RedisCacheStore, local: Optional[LocalCacheStore] = None, local_ttl: float = 2.0):
+        self.shared = shared
+        self.local = local or LocalCacheStore()
+        self.local_ttl = local_ttl
+        self.hits = {'local': 0, 'revalidated': 0, 'shared': 0, 'miss': 0}
+
+    def get(self, key: str) -> Optional[Any]:
+        now = time.monotonic()
+        cached = self.local.get(key)
+        if cached is not None:
+            version, value, checked_at = cached
+            if now - checked_at < self.local_ttl:
+                self.hits['local'] += 1
+                return value
+            if self.shared.get_version(key) == version:
+                self.local.set(key, (version, value, now))
+                self.hits['revalidated'] += 1
+                return value
+
+        entry = self.shared.get_entry(key)
+        if entry is None:
+            self.local.delete(key)
+            self.hits['miss'] += 1
+            return None
+
+        version, value = entry
+        self.local.set(key, (version, value, now))
+        self.hits['shared'] += 1
+        return value
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None) -> bool:
+        version = self.shared.set_entry(key, value, ttl)
+        if version is None:
+            self.local.delete(key)
+            return False
+        self.local.set(key, (version, value, time.monotonic()), ttl)
+        return True
+
+    def delete(self, key: str) -> bool:
+        self.local.delete(key)
+        return self.shared.delete(key)
+
+    def clear(self):
+        self.local.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {'backend': 'layered', 'local': self.local.get_stats(), 'hits': dict(self.hits)}
+
+
+def create_offline_cache_store(redis_url: Optional[str] = None, local_ttl: float = 2.0):
+    """Layered Redis-backed store when Redis is configured, otherwise a local LRU"""
+    if redis_url and not redis_url.startswith('memory://'):
+        try:
+            from utils.redis_client import get_redis_client
+            return LayeredCacheStore(RedisCacheStore(get_redis_client(redis_url)), local_ttl=local_ttl)
+        except Exception as e:
+            logger.warning(f"Offline cache using per-process storage only: {e}")
+    return LocalCacheStore()
+
+
+__all__ = ['LocalCacheStore', 'RedisCacheStore', 'LayeredCacheStore', 'create_offline_cache_store']
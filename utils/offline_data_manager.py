@@ -7,6 +7,7 @@ import json
 from datetime import datetime, timedelta
 from typing import Dict, List, Optional, Any
 from enum import Enum
+from utils.offline_cache import create_offline_cache_store
 
 class DataStatus(Enum):
     FRESH = "fresh"
@@ -17,7 +18,7 @@ class DataStatus(Enum):
 class OfflineDataManager:
     """Manages offline data storage and retrieval for dashboard operations"""
     
-    def __init__(self):
+    def __init__(self, store=None):
         self.cache_duration = {
             'vessels': 300,  # 5 minutes
             'cargo_tallies': 60,  # 1 minute (more frequent for real-time data)
@@ -25,6 +26,42 @@ class OfflineDataManager:
             'sync_status': 30  # 30 seconds
         }
         
+        # Entries outlive their fresh (1x) and stale (2x) windows so the offline
+        # fallback can still serve them, flagged as expired
+        self.retention_multiplier = 12
+        
+        # Pluggable store - resolved from the app's REDIS_URL on first use when not given
+        self._store = store
+    
+    @property
+    def store(self):
+        """Shared cache store (local LRU in front of Redis when configured)"""
+        if self._store is None:
+            redis_url = None
+            try:
+                from flask import current_app
+                redis_url = current_app.config.get('REDIS_URL')
+            except RuntimeError:
+                pass  # Outside an app context - per-process storage
+            self._store = create_offline_cache_store(redis_url)
+        return self._store
+    
+    def invalidate_vessel(self, vessel_id: int, progress: Optional[float] = None) -> bool:
+        """
+        Write-through after a vessel's tallies or progress changed on the server.
+        
+        Drops the vessel's cached tally list and updates its progress in the
+        shared vessel snapshot, so every worker serves the new values.
+        """
+        try:
+            self._clear_cache_data(f'cargo_tallies_{vessel_id}')
+            if progress is not None:
+                self.update_vessel_progress(str(vessel_id), progress, is_offline_id=False)
+            return True
+        except Exception as e:
+            print(f"Error invalidating vessel cache: {e}")
+            return False
+        
     def cache_vessel_data(self, vessels: List[Dict], source: str = "server") -> bool:
         """Cache vessel data for offline access"""
         try:
@@ -288,14 +325,16 @@ class OfflineDataManager:
             else:
                 # Clear all cache
                 cache_types = ['vessels', 'offline_vessels', 'users', 'sync_status']
+                
+                # Clear cargo tallies for every vessel in the snapshot being dropped
+                vessel_cache = self._get_cache_data('vessels') or {'vessels': []}
+                for vessel in vessel_cache['vessels']:
+                    if vessel.get('id') is not None:
+                        self._clear_cache_data(f"cargo_tallies_{vessel['id']}")
+                
                 for cache_type in cache_types:
                     self._clear_cache_data(cache_type)
                 
-                # Clear cargo tallies (multiple keys)
-                # In a real implementation, this would iterate through IndexedDB
-                for i in range(100):  # Assuming max 100 vessels
-                    self._clear_cache_data(f'cargo_tallies_{i}')
-                
                 return True
                 
         except Exception as e:
@@ -303,30 +342,23 @@ class OfflineDataManager:
             return False
     
     def _store_cache_data(self, key: str, data: Dict) -> bool:
-        """Store data in cache (simulated with in-memory storage)"""
-        # In a real implementation, this would use IndexedDB
-        if not hasattr(self, '_cache'):
-            self._cache = {}
-        
-        self._cache[key] = data
-        return True
+        """Store data in the shared cache with a TTL derived from cache_duration"""
+        return self.store.set(key, data, self._ttl_for(key))
     
     def _get_cache_data(self, key: str) -> Optional[Dict]:
         """Retrieve data from cache"""
-        if not hasattr(self, '_cache'):
-            self._cache = {}
-        
-        return self._cache.get(key)
+        return self.store.get(key)
     
     def _clear_cache_data(self, key: str) -> bool:
         """Clear specific cache data"""
-        if not hasattr(self, '_cache'):
-            self._cache = {}
-        
-        if key in self._cache:
-            del self._cache[key]
-        
-        return True
+        return self.store.delete(key)
+    
+    def _ttl_for(self, key: str) -> Optional[int]:
+        """Retention for a cache key - offline-created vessels are unsynced user data and never expire"""
+        if key == 'offline_vessels':
+            return None
+        data_type = 'cargo_tallies' if key.startswith('cargo_tallies_') else key
+        return self.cache_duration.get(data_type, 300) * self.retention_multiplier
     
     def _get_data_status(self, data_type: str, timestamp_str: str) -> DataStatus:
         """Determine the status of cached data"""
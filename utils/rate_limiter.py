@@ -9,74 +9,92 @@ from flask import current_app, request, g
 import logging
 import time
 import threading
-from collections import defaultdict, deque
+from collections import OrderedDict
 from datetime import datetime, timedelta
 from typing import Dict, Any, Optional
 
 logger = logging.getLogger(__name__)
 
-class InMemoryRateLimiter:
-    """Fallback in-memory rate limiter when Redis is unavailable"""
+# Sliding-window counter over two fixed buckets, checked and counted atomically.
+# KEYS: current bucket, previous bucket. ARGV: limit, window, seconds into the current bucket.
+SLIDING_WINDOW_SCRIPT = """
+local current = tonumber(redis.call('GET', KEYS[1]) or '0')
+local previous = tonumber(redis.call('GET', KEYS[2]) or '0')
+local limit = tonumber(ARGV[1])
+local window = tonumber(ARGV[2])
+local elapsed = tonumber(ARGV[3])
+if previous * (window - elapsed) / window + current >= limit then
+    return 0
+end
+redis.call('INCR', KEYS[1])
+redis.call('EXPIRE', KEYS[1], window * 2)
+return 1
+"""
+
+class _RateLimitShard:
+    """One lock and one LRU of (key, window) -> [bucket_start, current, previous]"""
+    
+    __slots__ = ('lock', 'entries')
     
     def __init__(self):
-        self.requests = defaultdict(deque)  # IP -> timestamps
-        self.locks = defaultdict(threading.Lock)
-        self.cleanup_interval = 300  # 5 minutes
-        self.last_cleanup = time.time()
+        self.lock = threading.Lock()
+        self.entries = OrderedDict()
+
+class InMemoryRateLimiter:
+    """
+    Fallback in-memory rate limiter when Redis is unavailable
+    
+    A sliding-window counter: each key keeps the request count of the
+    current fixed bucket and of the previous one, and the previous count is
+    weighted by how much of it still overlaps the window. Memory per key is
+    constant however many requests arrive. Keys are spread over sharded
+    locks and each shard is an LRU, so at most max_keys clients are tracked.
+    """
+    
+    def __init__(self, max_keys: int = 100000, shards: int = 16):
+        self.max_keys = max_keys
+        self._shards = [_RateLimitShard() for _ in range(shards)]
+        self._shard_capacity = max(1, -(-max_keys // shards))
+        self.evictions = 0
     
     def is_allowed(self, key: str, limit: int, window: int) -> bool:
         """Check if request is allowed under rate limit"""
         now = time.time()
+        bucket_start = now - now % window
+        entry_key = (key, window)
+        shard = self._shards[hash(entry_key) % len(self._shards)]
         
-        # Periodic cleanup of old entries
-        if now - self.last_cleanup > self.cleanup_interval:
-            self._cleanup_old_entries(now)
-            self.last_cleanup = now
-        
-        with self.locks[key]:
-            request_times = self.requests[key]
+        with shard.lock:
+            entry = shard.entries.get(entry_key)
+            if entry is None:
+                entry = shard.entries[entry_key] = [bucket_start, 0, 0]
+                if len(shard.entries) > self._shard_capacity:
+                    shard.entries.popitem(last=False)
+                    self.evictions += 1
+            else:
+                shard.entries.move_to_end(entry_key)
+                if entry[0] != bucket_start:
+                    # Roll the buckets forward; a gap of more than one bucket clears both
+                    entry[2] = entry[1] if bucket_start - entry[0] == window else 0
+                    entry[0], entry[1] = bucket_start, 0
             
-            # Remove requests outside the current window
-            cutoff = now - window
-            while request_times and request_times[0] < cutoff:
-                request_times.popleft()
-            
-            # Check if under limit
-            if len(request_times) < limit:
-                request_times.append(now)
+            estimate = entry[2] * (window - (now - bucket_start)) / window + entry[1]
+            if estimate < limit:
+                entry[1] += 1
                 return True
             
             return False
     
-    def _cleanup_old_entries(self, now: float):
-        """Clean up old entries to prevent memory bloat"""
-        keys_to_remove = []
-        
-        for key, request_times in self.requests.items():
-            with self.locks[key]:
-                # Remove all entries older than 1 hour
-                cutoff = now - 3600
-                while request_times and request_times[0] < cutoff:
-                    request_times.popleft()
-                
-                # If no recent requests, mark for removal
-                if not request_times:
-                    keys_to_remove.append(key)
-        
-        # Remove empty entries
-        for key in keys_to_remove:
-            self.requests.pop(key, None)
-            self.locks.pop(key, None)
-        
-        if keys_to_remove:
-            logger.info(f"Rate limiter cleanup: removed {len(keys_to_remove)} inactive entries")
+    def __len__(self) -> int:
+        return sum(len(shard.entries) for shard in self._shards)
 
 class ResilientRateLimiter:
     """Production-ready rate limiter with Redis and fallback"""
     
-    def __init__(self):
+    def __init__(self, max_keys: int = 100000):
         self.limiter = None
-        self.fallback_limiter = InMemoryRateLimiter()
+        self.fallback_limiter = InMemoryRateLimiter(max_keys)
+        self.redis_client = None
         self.redis_available = False
         self.last_redis_check = 0
         self.redis_check_interval = 30  # Check Redis every 30 seconds
@@ -86,8 +104,8 @@ class ResilientRateLimiter:
         try:
             # Always use in-memory storage first for reliability
             self.limiter = Limiter(
-                app,
                 key_func=self._get_rate_limit_key,
+                app=app,
                 default_limits=["1000 per hour", "100 per minute"],
                 storage_uri="memory://",
                 on_breach=self._rate_limit_handler,
@@ -106,7 +124,8 @@ class ResilientRateLimiter:
                 if redis_url and redis_url != 'memory://':
                     redis_client = get_redis_client(redis_url)
                     if redis_client and redis_client.ping():
-                        logger.info("✅ Redis available for rate limiting (using memory for now)")
+                        logger.info("✅ Redis available for manual rate limit checks")
+                        self.redis_client = redis_client
                         self.redis_available = True
                     else:
                         logger.info("⚠️  Redis not available, using in-memory rate limiting")
@@ -118,8 +137,8 @@ class ResilientRateLimiter:
             logger.error(f"❌ Rate limiter initialization failed: {e}")
             # Create minimal limiter to prevent app failure
             self.limiter = Limiter(
-                app,
                 key_func=self._get_rate_limit_key,
+                app=app,
                 default_limits=["1000 per hour"],
                 storage_uri="memory://",
                 headers_enabled=True
@@ -166,7 +185,7 @@ class ResilientRateLimiter:
         
         try:
             from .redis_client import get_redis_client
-            redis_client = get_redis_client()
+            redis_client = self.redis_client or get_redis_client()
             self.redis_available = redis_client.ping()
             self.last_redis_check = now
             
@@ -177,26 +196,29 @@ class ResilientRateLimiter:
         return self.redis_available
     
     def manual_rate_limit_check(self, key: str, limit: int = 100, window: int = 3600) -> bool:
-        """Manual rate limit check using fallback mechanism"""
-        if not self.limiter:
-            # Use fallback limiter
-            return self.fallback_limiter.is_allowed(key, limit, window)
+        """Manual rate limit check - shared through Redis when available, in memory otherwise"""
+        if self.redis_client is not None and self.check_redis_health():
+            allowed = self._redis_is_allowed(key, limit, window)
+            if allowed is not None:
+                return allowed
         
+        return self.fallback_limiter.is_allowed(key, limit, window)
+    
+    def _redis_is_allowed(self, key: str, limit: int, window: int) -> Optional[bool]:
+        """Sliding-window check in one Lua call; None when Redis could not answer"""
+        now = time.time()
+        bucket_start = int(now // window) * window
+        prefix = f"ratelimit:{{{key}}}:{window}"
         try:
-            # Try to use Flask-Limiter's internal storage
-            storage = self.limiter._storage
-            current_count = storage.get(key) or 0
-            
-            if current_count >= limit:
-                return False
-            
-            # Increment counter
-            storage.incr(key, window)
-            return True
-            
+            result = self.redis_client.eval_script(
+                SLIDING_WINDOW_SCRIPT,
+                keys=[f"{prefix}:{bucket_start}", f"{prefix}:{bucket_start - window}"],
+                args=[limit, window, now - bucket_start]
+            )
         except Exception as e:
             logger.warning(f"Rate limit check failed, using fallback: {e}")
-            return self.fallback_limiter.is_allowed(key, limit, window)
+            return None
+        return None if result is None else bool(result)
     
     def get_rate_limit_info(self) -> Dict[str, Any]:
         """Get rate limiter status information"""
@@ -204,7 +226,8 @@ class ResilientRateLimiter:
             "limiter_initialized": self.limiter is not None,
             "redis_available": self.check_redis_health(),
             "storage_type": "redis" if self.redis_available else "memory",
-            "fallback_entries": len(self.fallback_limiter.requests) if self.fallback_limiter else 0
+            "fallback_entries": len(self.fallback_limiter) if self.fallback_limiter else 0,
+            "fallback_evictions": self.fallback_limiter.evictions if self.fallback_limiter else 0
         }
 
 # Global rate limiter instance
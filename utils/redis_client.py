@@ -21,12 +21,16 @@ import threading
 import random
 import json
 import hashlib
+import heapq
+import math
 from typing import Optional, Any, Dict, List, Callable, Union
 from functools import wraps
 from datetime import datetime, timedelta
 from collections import defaultdict, OrderedDict
 from dataclasses import dataclass, asdict
 from enum import Enum
+from contextlib import contextmanager
+from flask import g, has_app_context
 import weakref
 
 logger = logging.getLogger(__name__)
@@ -51,6 +55,11 @@ class RedisMetrics:
     last_success_time: Optional[float] = None
     connection_pool_size: int = 0
     active_connections: int = 0
+    round_trips: int = 0
+    commands_sent: int = 0
+    pipelines_executed: int = 0
+    timeouts: int = 0
+    deadline_exceeded: int = 0
     
     @property
     def success_rate(self) -> float:
@@ -63,6 +72,13 @@ class RedisMetrics:
     def failure_rate(self) -> float:
         """Calculate failure rate percentage"""
         return 100.0 - self.success_rate
+    
+    @property
+    def commands_per_round_trip(self) -> float:
+        """Average number of commands carried by each Redis round trip"""
+        if self.round_trips == 0:
+            return 0.0
+        return self.commands_sent / self.round_trips
 
 class AdvancedCircuitBreaker:
     """Enterprise-grade circuit breaker for Redis operations with intelligent failure detection"""
@@ -273,6 +289,111 @@ class AdvancedCircuitBreaker:
                 }
             }
 
+class RedisDeadlineExceeded(redis.TimeoutError):
+    """The request's Redis time budget ran out before the command could complete"""
+
+# Deadline state of the calling thread: `scope` is set by redis_deadline(), `active` while a
+# command runs so DeadlineConnection can shrink its socket timeout to what is left
+_deadline_state = threading.local()
+
+def set_request_deadline(budget_seconds: float):
+    """Give the current Flask request `budget_seconds` of Redis time, shared by all its calls"""
+    g.redis_deadline = time.monotonic() + budget_seconds
+
+def current_redis_deadline() -> Optional[float]:
+    """Earliest of the request deadline and any enclosing redis_deadline() scope (monotonic)"""
+    deadline = getattr(_deadline_state, 'scope', None)
+    if has_app_context():
+        request_deadline = g.get('redis_deadline')
+        if request_deadline is not None and (deadline is None or request_deadline < deadline):
+            deadline = request_deadline
+    return deadline
+
+def remaining_redis_budget() -> Optional[float]:
+    """Seconds of Redis time left for the caller, or None when no deadline applies"""
+    deadline = current_redis_deadline()
+    return None if deadline is None else max(0.0, deadline - time.monotonic())
+
+@contextmanager
+def redis_deadline(seconds: float):
+    """Bound every Redis call made inside the block by one shared deadline"""
+    previous = getattr(_deadline_state, 'scope', None)
+    deadline = time.monotonic() + seconds
+    _deadline_state.scope = deadline if previous is None else min(previous, deadline)
+    try:
+        yield
+    finally:
+        _deadline_state.scope = previous
+
+def init_redis_deadlines(app):
+    """Start a Redis time budget (REDIS_REQUEST_BUDGET seconds, 0 disables) for every request"""
+    budget = float(app.config.get('REDIS_REQUEST_BUDGET', 2.0))
+    if budget <= 0:
+        return
+
+    @app.before_request
+    def _start_redis_deadline():
+        set_request_deadline(budget)
+
+# Commands other workers depend on seeing (tag bumps, invalidation messages, shared state).
+# They still reach Redis after the request budget is spent, bounded by write_min_timeout.
+# eval covers scripts such as the shared rate limiter's INCR, which otherwise falls back per worker.
+WRITE_OPERATIONS = frozenset({
+    'set', 'setex', 'mset', 'delete', 'incr', 'incrby', 'expire', 'hset', 'hdel', 'publish', 'eval'
+})
+
+class _DeadlineConnectionMixin:
+    """Caps the socket timeout of each send and read at the time left before the active deadline"""
+
+    def _apply_deadline(self) -> bool:
+        deadline = getattr(_deadline_state, 'active', None)
+        if deadline is None or self._sock is None:
+            return False
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            raise RedisDeadlineExceeded("Redis request deadline exceeded")
+        if self.socket_timeout is not None:
+            remaining = min(remaining, self.socket_timeout)
+        self._sock.settimeout(remaining)
+        return True
+
+    def _restore_timeout(self):
+        if self._sock is not None:
+            self._sock.settimeout(self.socket_timeout)
+
+    def send_packed_command(self, command, check_health=True):
+        if not self._sock:
+            self.connect()
+        applied = self._apply_deadline()
+        try:
+            return super().send_packed_command(command, check_health)
+        finally:
+            if applied:
+                self._restore_timeout()
+
+    def read_response(self, *args, **kwargs):
+        applied = self._apply_deadline()
+        try:
+            return super().read_response(*args, **kwargs)
+        finally:
+            if applied:
+                self._restore_timeout()
+
+class DeadlineConnection(_DeadlineConnectionMixin, redis.Connection):
+    pass
+
+class DeadlineSSLConnection(_DeadlineConnectionMixin, redis.SSLConnection):
+    pass
+
+class DeadlineUnixDomainSocketConnection(_DeadlineConnectionMixin, redis.UnixDomainSocketConnection):
+    pass
+
+_DEADLINE_CONNECTION_CLASSES = {
+    redis.Connection: DeadlineConnection,
+    redis.SSLConnection: DeadlineSSLConnection,
+    redis.UnixDomainSocketConnection: DeadlineUnixDomainSocketConnection,
+}
+
 class RetryStrategy:
     """Advanced retry strategy with exponential backoff and jitter"""
     
@@ -296,6 +417,9 @@ class RetryStrategy:
         for attempt in range(self.max_attempts):
             try:
                 return func(*args, **kwargs)
+            except RedisDeadlineExceeded:
+                # Backing off cannot help once the budget is spent
+                raise
             except Exception as e:
                 last_exception = e
                 
@@ -316,70 +440,108 @@ class RetryStrategy:
         raise last_exception
 
 class InMemoryFallbackCache:
-    """Memory-efficient LRU cache with TTL for Redis fallback"""
+    """Memory-efficient LRU cache with TTL for Redis fallback
+    
+    Expiry is lazy: a read checks only the key it touches. Expiry times also go
+    into a min-heap so writes can evict a bounded number of already-expired
+    entries from the front, and the heap is rebuilt when overwritten keys leave
+    too many stale records in it. Entries are bounded by count and by an
+    estimate of their size in bytes.
+    """
     
-    def __init__(self, max_size: int = 1000, default_ttl: int = 300):
+    # Expired entries reclaimed per write - keeps set() O(log n) amortized
+    EVICTION_BATCH = 16
+    
+    def __init__(self, max_size: int = 1000, default_ttl: int = 300, max_bytes: Optional[int] = None):
         self.max_size = max_size
         self.default_ttl = default_ttl
+        self.max_bytes = max_bytes
         
+        # key -> (value, expires_at or None, size_bytes), oldest first
         self._cache = OrderedDict()
-        self._expiry = {}
+        self._expiry_heap = []  # (expires_at, key) - may hold stale records for rewritten keys
+        self._ttl_entries = 0
+        self._bytes = 0
         self._lock = threading.RLock()
         
         # Statistics
         self.hits = 0
         self.misses = 0
         self.evictions = 0
+        self.expirations = 0
         
-        logger.info(f"In-memory fallback cache initialized: max_size={max_size}, ttl={default_ttl}s")
+        logger.info(f"In-memory fallback cache initialized: max_size={max_size}, ttl={default_ttl}s, "
+                    f"max_bytes={max_bytes}")
+    
+    @staticmethod
+    def _estimate_size(key: str, value: Any) -> int:
+        """Approximate memory held by one entry"""
+        if isinstance(value, (bytes, bytearray, str)):
+            value_size = len(value)
+        else:
+            try:
+                value_size = len(json.dumps(value, default=str))
+            except (TypeError, ValueError):
+                value_size = 64
+        return len(key) + value_size + 64  # Per-entry overhead for the tuple and dict slot
+    
+    def _remove(self, key: str):
+        """Drop key from the cache and its accounting"""
+        _, expires_at, size = self._cache.pop(key)
+        self._bytes -= size
+        if expires_at is not None:
+            self._ttl_entries -= 1
+    
+    def _live_entry(self, key: str, now: float):
+        """The entry for key, or None after expiring it on access"""
+        entry = self._cache.get(key)
+        if entry is None:
+            return None
+        if entry[1] is not None and now > entry[1]:
+            self._remove(key)
+            self.expirations += 1
+            return None
+        return entry
     
     def get(self, key: str) -> Optional[Any]:
         """Get value from cache"""
         with self._lock:
-            self._cleanup_expired()
-            
-            if key in self._cache and key not in self._expiry:  # No TTL
-                value = self._cache.pop(key)
-                self._cache[key] = value  # Move to end (LRU)
-                self.hits += 1
-                return value
-            
-            elif key in self._cache and key in self._expiry:
-                if time.time() <= self._expiry[key]:
-                    value = self._cache.pop(key)
-                    self._cache[key] = value  # Move to end (LRU)
-                    self.hits += 1
-                    return value
-                else:
-                    # Expired
-                    del self._cache[key]
-                    del self._expiry[key]
+            entry = self._live_entry(key, time.monotonic())
+            if entry is None:
+                self.misses += 1
+                return None
             
-            self.misses += 1
-            return None
+            self._cache.move_to_end(key)  # LRU
+            self.hits += 1
+            return entry[0]
     
     def set(self, key: str, value: Any, ttl: Optional[int] = None) -> bool:
         """Set value in cache with optional TTL"""
         with self._lock:
-            # Remove if exists
+            now = time.monotonic()
+            self._evict_expired(now, self.EVICTION_BATCH)
+            
             if key in self._cache:
-                del self._cache[key]
-                self._expiry.pop(key, None)
+                self._remove(key)
             
-            # Evict oldest if at max size
-            if len(self._cache) >= self.max_size:
-                oldest_key = next(iter(self._cache))
-                del self._cache[oldest_key]
-                self._expiry.pop(oldest_key, None)
-                self.evictions += 1
+            if ttl is None and self.default_ttl > 0:
+                ttl = self.default_ttl
+            expires_at = now + ttl if ttl is not None else None
+            size = self._estimate_size(key, value)
             
-            # Add new entry
-            self._cache[key] = value
+            # Evict least recently used entries until the new one fits
+            while self._cache and (len(self._cache) >= self.max_size or
+                                   (self.max_bytes and self._bytes + size > self.max_bytes)):
+                self._remove(next(iter(self._cache)))
+                self.evictions += 1
             
-            if ttl is not None:
-                self._expiry[key] = time.time() + ttl
-            elif self.default_ttl > 0:
-                self._expiry[key] = time.time() + self.default_ttl
+            self._cache[key] = (value, expires_at, size)
+            self._bytes += size
+            if expires_at is not None:
+                self._ttl_entries += 1
+                heapq.heappush(self._expiry_heap, (expires_at, key))
+                if len(self._expiry_heap) > 2 * len(self._cache) + 64:
+                    self._compact_heap()
             
             return True
     
@@ -387,41 +549,54 @@ class InMemoryFallbackCache:
         """Delete key from cache"""
         with self._lock:
             if key in self._cache:
-                del self._cache[key]
-                self._expiry.pop(key, None)
+                self._remove(key)
                 return True
             return False
     
     def exists(self, key: str) -> bool:
         """Check if key exists and is not expired"""
         with self._lock:
-            if key not in self._cache:
-                return False
-            
-            if key in self._expiry and time.time() > self._expiry[key]:
-                del self._cache[key]
-                del self._expiry[key]
-                return False
-            
-            return True
+            return self._live_entry(key, time.monotonic()) is not None
+    
+    def ttl(self, key: str) -> int:
+        """Seconds until key expires with Redis TTL semantics: -1 without a TTL, -2 if missing"""
+        with self._lock:
+            now = time.monotonic()
+            entry = self._live_entry(key, now)
+            if entry is None:
+                return -2
+            return -1 if entry[1] is None else math.ceil(entry[1] - now)
+    
+    def _evict_expired(self, now: float, limit: Optional[int] = None) -> int:
+        """Pop expired records off the heap front, removing entries they still describe"""
+        removed = 0
+        heap = self._expiry_heap
+        while heap and heap[0][0] < now and (limit is None or removed < limit):
+            expires_at, key = heapq.heappop(heap)
+            entry = self._cache.get(key)
+            if entry is not None and entry[1] == expires_at:
+                self._remove(key)
+                self.expirations += 1
+                removed += 1
+        return removed
+    
+    def _compact_heap(self):
+        """Rebuild the heap from live entries, dropping records for rewritten or deleted keys"""
+        self._expiry_heap = [(entry[1], key) for key, entry in self._cache.items() if entry[1] is not None]
+        heapq.heapify(self._expiry_heap)
     
     def _cleanup_expired(self):
         """Clean up expired entries"""
-        if not self._expiry:
-            return
-        
-        now = time.time()
-        expired_keys = [key for key, expiry in self._expiry.items() if now > expiry]
-        
-        for key in expired_keys:
-            self._cache.pop(key, None)
-            self._expiry.pop(key, None)
+        with self._lock:
+            return self._evict_expired(time.monotonic())
     
     def clear(self):
         """Clear all cache entries"""
         with self._lock:
             self._cache.clear()
-            self._expiry.clear()
+            self._expiry_heap = []
+            self._ttl_entries = 0
+            self._bytes = 0
     
     def get_stats(self) -> Dict[str, Any]:
         """Get cache statistics"""
@@ -434,13 +609,88 @@ class InMemoryFallbackCache:
             return {
                 'size': len(self._cache),
                 'max_size': self.max_size,
+                'bytes': self._bytes,
+                'max_bytes': self.max_bytes,
                 'hits': self.hits,
                 'misses': self.misses,
                 'hit_rate_percent': round(hit_rate, 2),
                 'evictions': self.evictions,
-                'entries_with_ttl': len(self._expiry)
+                'expirations': self.expirations,
+                'entries_with_ttl': self._ttl_entries
             }
 
+class PipelineResult:
+    """Placeholder for a pipelined command's reply, filled in when the pipeline executes"""
+    
+    __slots__ = ('value', 'ready')
+    
+    def __init__(self):
+        self.value = None
+        self.ready = False
+    
+    def __repr__(self):
+        return f"PipelineResult({self.value!r})" if self.ready else "PipelineResult(<pending>)"
+
+class RedisPipeline:
+    """
+    Commands queued for one round trip through EnterpriseRedisClient
+    
+    Any redis-py command can be queued (pipe.get, pipe.set, pipe.hset, ...);
+    each call returns a PipelineResult. execute() sends the queue through the
+    circuit breaker and retry strategy as a single unit - or, while Redis is
+    unavailable, applies it to the fallback cache - and returns the replies.
+    As a context manager the queue is executed on a clean exit:
+    
+        with redis_client.pipeline() as pipe:
+            summary = pipe.get('vessel_summary')
+            pipe.incr('dashboard_views')
+        summary.value
+    """
+    
+    def __init__(self, client: 'EnterpriseRedisClient', transaction: bool = False):
+        self._client = client
+        self.transaction = transaction
+        self._commands = []
+        self._results = []
+    
+    def __getattr__(self, name: str) -> Callable[..., PipelineResult]:
+        if name.startswith('_'):
+            raise AttributeError(name)
+        
+        def queue(*args, **kwargs) -> PipelineResult:
+            result = PipelineResult()
+            self._commands.append((name, args, kwargs))
+            self._results.append(result)
+            return result
+        
+        return queue
+    
+    def __len__(self) -> int:
+        return len(self._commands)
+    
+    def execute(self) -> List[Any]:
+        if not self._commands:
+            return []
+        commands, results = self._commands, self._results
+        self._commands, self._results = [], []
+        
+        replies = self._client._execute_pipeline(commands, self.transaction) or [None] * len(commands)
+        for result, reply in zip(results, replies):
+            result.value, result.ready = reply, True
+        return replies
+    
+    def reset(self):
+        self._commands, self._results = [], []
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        if exc_type is None:
+            self.execute()
+        else:
+            self.reset()
+
 class EnterpriseRedisClient:
     """Enterprise-grade Redis client with comprehensive resilience patterns
     
@@ -466,7 +716,9 @@ class EnterpriseRedisClient:
                  health_check_interval: int = 30,
                  fallback_cache_size: int = 1000,
                  fallback_ttl: int = 300,
-                 retry_strategy: Optional[RetryStrategy] = None):
+                 fallback_max_bytes: Optional[int] = 64 * 1024 * 1024,
+                 retry_strategy: Optional[RetryStrategy] = None,
+                 write_min_timeout: float = 0.5):
         
         # Configuration
         self.redis_url = redis_url
@@ -474,12 +726,15 @@ class EnterpriseRedisClient:
         self.connection_timeout = connection_timeout
         self.socket_timeout = socket_timeout
         self.health_check_interval = health_check_interval
+        # Time a write still gets once the caller's Redis budget is (nearly) spent
+        self.write_min_timeout = write_min_timeout
         
         # Core components
         self._client: Optional[redis.Redis] = None
         self._circuit_breaker = AdvancedCircuitBreaker()
         self._connection_pool = None
-        self._fallback_cache = InMemoryFallbackCache(fallback_cache_size, fallback_ttl)
+        self._fallback_cache = InMemoryFallbackCache(fallback_cache_size, fallback_ttl, fallback_max_bytes)
+        self._scripts = {}  # Lua source -> redis-py Script (EVALSHA with EVAL on NOSCRIPT)
         self._retry_strategy = retry_strategy or RetryStrategy()
         
         # Metrics and monitoring
@@ -540,6 +795,10 @@ class EnterpriseRedisClient:
                     self.redis_url,
                     **pool_kwargs
                 )
+                # Socket timeouts follow the caller's remaining deadline instead of a watchdog thread
+                self._connection_pool.connection_class = _DEADLINE_CONNECTION_CLASSES.get(
+                    self._connection_pool.connection_class, self._connection_pool.connection_class
+                )
                 
                 self._client = redis.Redis(
                     connection_pool=self._connection_pool,
@@ -608,6 +867,19 @@ class EnterpriseRedisClient:
     
     def _execute_with_fallback(self, operation_name: str, operation_func: Callable, *args, **kwargs) -> Any:
         """Execute Redis operation with comprehensive fallback and retry logic"""
+        return self._execute(
+            operation_name,
+            operation_func,
+            lambda: self._fallback_operation(operation_name, *args, **kwargs)
+        )
+    
+    def _execute(self, operation_name: str, operation_func: Callable, fallback: Callable[[], Any],
+                 commands: int = 1, write: Optional[bool] = None) -> Any:
+        """Run one Redis round trip carrying `commands` commands through the circuit breaker and retries
+        
+        Writes (see WRITE_OPERATIONS) get at least write_min_timeout even when the caller's
+        budget is spent, so shared state is not silently kept in this process's fallback.
+        """
         start_time = time.time()
         
         # Update metrics
@@ -619,18 +891,31 @@ class EnterpriseRedisClient:
             logger.debug(f"No Redis client available, using fallback for {operation_name}")
             with self._metrics_lock:
                 self._metrics.fallback_hits += 1
-            return self._fallback_operation(operation_name, *args, **kwargs)
+            return fallback()
+        
+        # Out of budget: answer reads locally rather than queue behind a slow Redis
+        deadline = current_redis_deadline()
+        if write is None:
+            write = operation_name in WRITE_OPERATIONS
+        if deadline is not None and write:
+            deadline = max(deadline, time.monotonic() + self.write_min_timeout)
+        if deadline is not None and deadline <= time.monotonic():
+            logger.debug(f"Redis deadline exceeded, using fallback for {operation_name}")
+            with self._metrics_lock:
+                self._metrics.deadline_exceeded += 1
+                self._metrics.fallback_hits += 1
+            return fallback()
         
         # Try Redis with circuit breaker and retry
         try:
-            result = self._retry_strategy.execute(
-                lambda: self._circuit_breaker.call(operation_func)
-            )
+            result = self._retry_strategy.execute(self._attempt, operation_func, deadline)
             
             # Update success metrics
             execution_time = (time.time() - start_time) * 1000
             with self._metrics_lock:
                 self._metrics.successful_requests += 1
+                self._metrics.round_trips += 1
+                self._metrics.commands_sent += commands
                 # Update rolling average response time
                 if self._metrics.avg_response_time_ms == 0:
                     self._metrics.avg_response_time_ms = execution_time
@@ -647,8 +932,12 @@ class EnterpriseRedisClient:
             with self._metrics_lock:
                 self._metrics.failed_requests += 1
                 self._metrics.fallback_hits += 1
+                if isinstance(e, RedisDeadlineExceeded):
+                    self._metrics.deadline_exceeded += 1
+                elif isinstance(e, redis.TimeoutError):
+                    self._metrics.timeouts += 1
             
-            return self._fallback_operation(operation_name, *args, **kwargs)
+            return fallback()
             
         except Exception as e:
             logger.error(f"Unexpected error in Redis {operation_name}: {e}, using fallback")
@@ -657,7 +946,18 @@ class EnterpriseRedisClient:
                 self._metrics.failed_requests += 1
                 self._metrics.fallback_hits += 1
             
-            return self._fallback_operation(operation_name, *args, **kwargs)
+            return fallback()
+    
+    def _attempt(self, operation_func: Callable, deadline: Optional[float]) -> Any:
+        """One try of operation_func with the caller's deadline applied to the connection's socket"""
+        if deadline is not None and deadline <= time.monotonic():
+            raise RedisDeadlineExceeded("Redis request deadline exceeded")
+        previous = getattr(_deadline_state, 'active', None)
+        _deadline_state.active = deadline
+        try:
+            return self._circuit_breaker.call(operation_func)
+        finally:
+            _deadline_state.active = previous
     
     def _fallback_operation(self, operation_name: str, *args, **kwargs) -> Any:
         """Handle operations using intelligent in-memory fallback"""
@@ -695,6 +995,9 @@ class EnterpriseRedisClient:
             elif operation_name == 'ping':
                 return False  # Indicate Redis is not available but fallback is working
                 
+            elif operation_name == 'publish':
+                return 0  # No remote subscribers reachable - callers fan out locally
+                
             elif operation_name in ['incr', 'incrby']:
                 if len(args) >= 1:
                     key = args[0]
@@ -721,7 +1024,7 @@ class EnterpriseRedisClient:
                         return self._fallback_cache.set(key, value, ttl)
                 return False
                 
-            elif operation_name in ['hget', 'hset', 'hdel', 'hexists']:
+            elif operation_name in ['hget', 'hset', 'hdel', 'hexists', 'hgetall']:
                 # Simple hash operations using JSON encoding
                 if operation_name == 'hset' and len(args) >= 3:
                     hash_key, field, value = args[0], args[1], args[2]
@@ -749,6 +1052,26 @@ class EnterpriseRedisClient:
                         except json.JSONDecodeError:
                             pass
                     return None
+                
+                elif operation_name in ['hdel', 'hexists', 'hgetall'] and len(args) >= 1:
+                    hash_key, fields = args[0], args[1:]
+                    hash_data = self._fallback_cache.get(hash_key) or b'{}'
+                    if isinstance(hash_data, bytes):
+                        hash_data = hash_data.decode('utf-8')
+                    try:
+                        hash_dict = json.loads(hash_data)
+                    except json.JSONDecodeError:
+                        hash_dict = {}
+                    
+                    if operation_name == 'hgetall':
+                        return hash_dict
+                    if operation_name == 'hexists':
+                        return bool(fields) and fields[0] in hash_dict
+                    
+                    removed = [field for field in fields if hash_dict.pop(field, None) is not None]
+                    if removed:
+                        self._fallback_cache.set(hash_key, json.dumps(hash_dict).encode('utf-8'))
+                    return len(removed)
                     
             # Default: log unknown operation and return None
             logger.debug(f"Unsupported fallback operation: {operation_name}")
@@ -781,40 +1104,81 @@ class EnterpriseRedisClient:
         return self._execute_with_fallback('get', _get_operation, key)
     
     def delete(self, *keys: str) -> int:
-        """Delete one or more keys"""
+        """Delete one or more keys in a single command"""
         def _delete_operation():
             return self._client.delete(*keys)
         
-        if len(keys) == 1:
-            result = self._execute_with_fallback('delete', _delete_operation, keys[0])
-        else:
-            # For multiple keys, try each individually in fallback
-            result = 0
-            for key in keys:
-                def _single_delete():
-                    return self._client.delete(key)
-                if self._execute_with_fallback('delete', _single_delete, key):
-                    result += 1
+        def _fallback():
+            return sum(1 for key in keys if self._fallback_cache.delete(key))
         
+        result = self._execute('delete', _delete_operation, _fallback)
         return result or 0
     
     def exists(self, *keys: str) -> int:
-        """Check if one or more keys exist"""
+        """Count how many of the keys exist, in a single command"""
         def _exists_operation():
             return self._client.exists(*keys)
         
-        if len(keys) == 1:
-            result = self._execute_with_fallback('exists', _exists_operation, keys[0])
-            return int(bool(result))
-        else:
-            # For multiple keys, check each individually in fallback
-            count = 0
-            for key in keys:
-                def _single_exists():
-                    return self._client.exists(key)
-                if self._execute_with_fallback('exists', _single_exists, key):
-                    count += 1
-            return count
+        def _fallback():
+            return sum(1 for key in keys if self._fallback_cache.exists(key))
+        
+        result = self._execute('exists', _exists_operation, _fallback)
+        return int(result or 0)
+    
+    def mget(self, *keys: str) -> List[Optional[Any]]:
+        """Get several keys in one round trip"""
+        if not keys:
+            return []
+        
+        def _mget_operation():
+            return self._client.mget(keys)
+        
+        def _fallback():
+            return [self._fallback_cache.get(key) for key in keys]
+        
+        return self._execute('mget', _mget_operation, _fallback)
+    
+    def mset(self, mapping: Dict[str, Any], ex: Optional[int] = None) -> bool:
+        """Set several keys in one round trip - MSET, or pipelined SETs when they expire"""
+        if not mapping:
+            return True
+        
+        def _mset_operation():
+            if ex is None:
+                return self._client.mset(mapping)
+            pipe = self._client.pipeline(transaction=False)
+            for key, value in mapping.items():
+                pipe.set(key, value, ex=ex)
+            return all(pipe.execute())
+        
+        def _fallback():
+            return all([self._fallback_cache.set(key, value, ex) for key, value in mapping.items()])
+        
+        return bool(self._execute('mset', _mset_operation, _fallback, commands=1 if ex is None else len(mapping)))
+    
+    def pipeline(self, transaction: bool = False) -> 'RedisPipeline':
+        """Queue commands and send them in one round trip; usable as a context manager"""
+        return RedisPipeline(self, transaction)
+    
+    def transaction(self) -> 'RedisPipeline':
+        """Pipeline executed atomically with MULTI/EXEC"""
+        return RedisPipeline(self, transaction=True)
+    
+    def _execute_pipeline(self, commands: List[tuple], transaction: bool) -> List[Any]:
+        """Send queued (name, args, kwargs) commands as one unit, or apply them to the fallback cache"""
+        def _pipeline_operation():
+            pipe = self._client.pipeline(transaction=transaction)
+            for name, args, kwargs in commands:
+                getattr(pipe, name)(*args, **kwargs)
+            return pipe.execute()
+        
+        def _fallback():
+            return [self._fallback_operation(name, *args, **kwargs) for name, args, kwargs in commands]
+        
+        with self._metrics_lock:
+            self._metrics.pipelines_executed += 1
+        return self._execute('pipeline', _pipeline_operation, _fallback, commands=len(commands),
+                             write=any(name in WRITE_OPERATIONS for name, _, _ in commands))
     
     def incr(self, key: str, amount: int = 1) -> int:
         """Increment the value of key by amount"""
@@ -841,13 +1205,12 @@ class EnterpriseRedisClient:
             return self._client.ttl(key)
         
         if not self._client or not self._initialized:
-            # Fallback doesn't support TTL queries accurately
-            return -1 if self._fallback_cache.exists(key) else -2
+            return self._fallback_cache.ttl(key)
         
         try:
             return self._circuit_breaker.call(_ttl_operation)
         except:
-            return -1 if self._fallback_cache.exists(key) else -2
+            return self._fallback_cache.ttl(key)
     
     # Hash operations
     def hget(self, name: str, key: str) -> Optional[Any]:
@@ -881,6 +1244,42 @@ class EnterpriseRedisClient:
         result = self._execute_with_fallback('hexists', _hexists_operation, name, key)
         return bool(result)
     
+    def hgetall(self, name: str) -> Dict[Any, Any]:
+        """Get all fields and values of a hash"""
+        def _hgetall_operation():
+            return self._client.hgetall(name)
+        
+        result = self._execute_with_fallback('hgetall', _hgetall_operation, name)
+        return result or {}
+    
+    # Scripting
+    def eval_script(self, script: str, keys: List[str], args: List[Any]) -> Any:
+        """Run a Lua script atomically; None while Redis is unavailable (no fallback)"""
+        def _eval_operation():
+            registered = self._scripts.get(script)
+            if registered is None or registered.registered_client is not self._client:
+                registered = self._scripts[script] = self._client.register_script(script)
+            return registered(keys=keys, args=args)
+        
+        return self._execute_with_fallback('eval', _eval_operation, script, keys, args)
+    
+    # Pub/sub operations
+    def publish(self, channel: str, message: Any) -> int:
+        """Publish message to channel, returns number of receiving subscribers"""
+        def _publish_operation():
+            return self._client.publish(channel, message)
+        
+        result = self._execute_with_fallback('publish', _publish_operation, channel, message)
+        return result or 0
+    
+    def pubsub(self):
+        """Get a PubSub handle on the live connection, or None while Redis is unavailable"""
+        if not self._client or not self._initialized:
+            return None
+        if self._circuit_breaker.state in (CircuitBreakerState.OPEN, CircuitBreakerState.FORCE_OPEN):
+            return None
+        return self._client.pubsub(ignore_subscribe_messages=True)
+    
     def ping(self) -> bool:
         """Health check ping with enhanced diagnostics"""
         if not self._client or not self._initialized:
@@ -964,11 +1363,7 @@ class EnterpriseRedisClient:
     
     def cleanup_fallback_cache(self) -> int:
         """Clean up expired entries in fallback cache"""
-        initial_size = len(self._fallback_cache._cache)
-        self._fallback_cache._cleanup_expired()
-        final_size = len(self._fallback_cache._cache)
-        
-        cleaned_count = initial_size - final_size
+        cleaned_count = self._fallback_cache._cleanup_expired()
         if cleaned_count > 0:
             logger.info(f"Cleaned up {cleaned_count} expired fallback cache entries")
         
@@ -1079,6 +1474,10 @@ class EnterpriseRedisClient:
         """Get comprehensive metrics for monitoring and alerting"""
         with self._metrics_lock:
             metrics_data = asdict(self._metrics)
+            # asdict() leaves out the derived properties
+            metrics_data['success_rate'] = self._metrics.success_rate
+            metrics_data['failure_rate'] = self._metrics.failure_rate
+            metrics_data['commands_per_round_trip'] = self._metrics.commands_per_round_trip
         
         # Add circuit breaker stats
         metrics_data['circuit_breaker'] = self._circuit_breaker.get_stats()
@@ -1346,36 +1745,18 @@ def get_redis_alerts(client: Optional[EnterpriseRedisClient] = None) -> List[Dic
     return alerts
 
 # Utility decorators
-def redis_operation_timeout(timeout_seconds: int = 5):
-    """Decorator to add timeout to Redis operations"""
+def redis_operation_timeout(timeout_seconds: float = 5):
+    """Decorator bounding all Redis calls made by func with one shared deadline
+    
+    Runs on the caller's thread: the deadline shrinks each command's socket timeout and, once
+    spent, further reads are answered by the fallback cache and counted in deadline_exceeded.
+    Writes still get the client's write_min_timeout.
+    """
     def decorator(func):
         @wraps(func)
         def wrapper(*args, **kwargs):
-            def target():
+            with redis_deadline(timeout_seconds):
                 return func(*args, **kwargs)
-            
-            result = [None]
-            exception = [None]
-            
-            def run_target():
-                try:
-                    result[0] = target()
-                except Exception as e:
-                    exception[0] = e
-            
-            thread = threading.Thread(target=run_target)
-            thread.daemon = True
-            thread.start()
-            thread.join(timeout_seconds)
-            
-            if thread.is_alive():
-                logger.warning(f"Redis operation {func.__name__} timed out after {timeout_seconds}s")
-                raise redis.TimeoutError(f"Operation timed out after {timeout_seconds}s")
-            
-            if exception[0]:
-                raise exception[0]
-            
-            return result[0]
         return wrapper
     return decorator
 
@@ -1392,5 +1773,10 @@ __all__ = [
     'redis_health_check',
     'check_rate_limit',
     'get_redis_alerts',
-    'redis_operation_timeout'
+    'redis_operation_timeout',
+    'redis_deadline',
+    'RedisDeadlineExceeded',
+    'set_request_deadline',
+    'remaining_redis_budget',
+    'init_redis_deadlines'
 ]
\ No newline at end of file
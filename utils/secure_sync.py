@@ -5,8 +5,12 @@ End-to-end encrypted synchronization with conflict resolution for maritime opera
 
 import os
 import json
+import time
+import uuid
 import hashlib
 import logging
+import sqlite3
+import threading
 from typing import Dict, Any, Optional, List, Tuple, Union
 from datetime import datetime, timezone, timedelta
 from dataclasses import dataclass, asdict
@@ -14,7 +18,7 @@ from enum import Enum
 from cryptography.fernet import Fernet
 from flask import current_app, g
 
-from .encrypted_cache import get_encrypted_cache, CacheClassification
+from .encrypted_cache import get_encrypted_cache
 from .audit_logger import get_audit_logger, AuditEventType, AuditSeverity
 
 logger = logging.getLogger(__name__)
@@ -101,17 +105,177 @@ class SyncTransaction:
         expiry_hours = 24 if self.maritime_urgency == "normal" else 6
         return datetime.now(timezone.utc) > created + timedelta(hours=expiry_hours)
 
+class SyncTransactionQueue:
+    """
+    Durable priority queue of sync transactions in a single SQLite file
+    
+    Pending work is read through an index on (status, priority, timestamp),
+    so taking the next `limit` transactions does not touch the rest of the
+    queue. lease() moves a batch to in_progress in one UPDATE ... RETURNING
+    statement, so two workers never receive the same transaction; leases
+    that outlive lease_seconds return to the queue. The connection is shared
+    between threads, so every statement, reads included, runs under _lock.
+    """
+    
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False, isolation_level=None)
+        try:
+            os.chmod(db_path, 0o600)
+        except OSError:
+            pass
+        
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('PRAGMA synchronous=NORMAL')
+        self._conn.execute('PRAGMA busy_timeout=5000')
+        self._conn.execute('''
+            CREATE TABLE IF NOT EXISTS sync_transactions (
+                transaction_id TEXT PRIMARY KEY,
+                status TEXT NOT NULL,
+                priority INTEGER NOT NULL,
+                timestamp TEXT NOT NULL,
+                expires_at REAL NOT NULL,
+                table_name TEXT NOT NULL,
+                lease_owner TEXT,
+                lease_expires_at REAL,
+                payload TEXT NOT NULL
+            )
+        ''')
+        self._conn.execute(
+            'CREATE INDEX IF NOT EXISTS ix_sync_transactions_queue '
+            'ON sync_transactions (status, priority DESC, timestamp)'
+        )
+        self._conn.execute(
+            'CREATE INDEX IF NOT EXISTS ix_sync_transactions_expires_at ON sync_transactions (expires_at)'
+        )
+    
+    @staticmethod
+    def _expires_at(transaction: SyncTransaction) -> float:
+        created = datetime.fromisoformat(transaction.timestamp.replace('Z', '+00:00'))
+        expiry_hours = 24 if transaction.maritime_urgency == "normal" else 6
+        return (created + timedelta(hours=expiry_hours)).timestamp()
+    
+    @staticmethod
+    def _to_transaction(payload: str, status: str) -> SyncTransaction:
+        transaction = SyncTransaction.from_dict(json.loads(payload))
+        transaction.status = SyncStatus(status)
+        return transaction
+    
+    def put(self, transaction: SyncTransaction):
+        """Insert or update a transaction; the lease is kept only while it stays in progress"""
+        with self._lock:
+            self._conn.execute(
+                '''
+                INSERT INTO sync_transactions
+                    (transaction_id, status, priority, timestamp, expires_at, table_name, payload)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT (transaction_id) DO UPDATE SET
+                    status = excluded.status,
+                    priority = excluded.priority,
+                    payload = excluded.payload,
+                    lease_owner = CASE WHEN excluded.status = 'in_progress' THEN lease_owner END,
+                    lease_expires_at = CASE WHEN excluded.status = 'in_progress' THEN lease_expires_at END
+                ''',
+                (transaction.transaction_id, transaction.status.value, transaction.priority,
+                 transaction.timestamp, self._expires_at(transaction), transaction.table_name,
+                 json.dumps(transaction.to_dict()))
+            )
+    
+    def get(self, transaction_id: str) -> Optional[SyncTransaction]:
+        with self._lock:
+            row = self._conn.execute(
+                'SELECT payload, status FROM sync_transactions WHERE transaction_id = ?', (transaction_id,)
+            ).fetchone()
+        return self._to_transaction(*row) if row else None
+    
+    def delete(self, transaction_id: str) -> bool:
+        with self._lock:
+            return self._conn.execute(
+                'DELETE FROM sync_transactions WHERE transaction_id = ?', (transaction_id,)
+            ).rowcount > 0
+    
+    def pending(self, limit: int) -> List[SyncTransaction]:
+        """Highest priority, oldest first pending transactions that have not expired"""
+        with self._lock:
+            rows = self._conn.execute(
+                '''
+                SELECT payload, status FROM sync_transactions
+                WHERE status = 'pending' AND expires_at > ?
+                ORDER BY priority DESC, timestamp
+                LIMIT ?
+                ''',
+                (time.time(), limit)
+            ).fetchall()
+        return [self._to_transaction(*row) for row in rows]
+    
+    def lease(self, limit: int, owner: str, lease_seconds: float) -> List[SyncTransaction]:
+        """Atomically move up to `limit` pending transactions to in_progress for `owner`"""
+        now = time.time()
+        with self._lock:
+            # Return transactions whose worker died mid-batch to the queue
+            self._conn.execute(
+                '''
+                UPDATE sync_transactions SET status = 'pending', lease_owner = NULL, lease_expires_at = NULL
+                WHERE status = 'in_progress' AND lease_expires_at < ?
+                ''',
+                (now,)
+            )
+            rows = self._conn.execute(
+                '''
+                UPDATE sync_transactions
+                SET status = 'in_progress', lease_owner = ?, lease_expires_at = ?
+                WHERE transaction_id IN (
+                    SELECT transaction_id FROM sync_transactions
+                    WHERE status = 'pending' AND expires_at > ?
+                    ORDER BY priority DESC, timestamp
+                    LIMIT ?
+                )
+                RETURNING payload, status
+                ''',
+                (owner, now + lease_seconds, now, limit)
+            ).fetchall()
+        
+        transactions = [self._to_transaction(*row) for row in rows]
+        transactions.sort(key=lambda x: (-x.priority, x.timestamp))
+        return transactions
+    
+    def delete_expired(self) -> int:
+        with self._lock:
+            return self._conn.execute(
+                'DELETE FROM sync_transactions WHERE expires_at <= ?', (time.time(),)
+            ).rowcount
+    
+    def counts(self) -> List[Tuple[str, str, int, int, int]]:
+        """(status, table_name, priority, count, size) groups for status reporting"""
+        with self._lock:
+            return self._conn.execute(
+                '''
+                SELECT status, table_name, priority, COUNT(*), SUM(length(payload))
+                FROM sync_transactions GROUP BY status, table_name, priority
+                '''
+            ).fetchall()
+    
+    def oldest_pending(self) -> Optional[str]:
+        with self._lock:
+            return self._conn.execute(
+                "SELECT MIN(timestamp) FROM sync_transactions WHERE status = 'pending'"
+            ).fetchone()[0]
+
 class SecureSyncManager:
     """Secure synchronization manager with maritime-specific features"""
     
-    def __init__(self):
-        self.cache = get_encrypted_cache()
+    def __init__(self, sync_dir: str = None, cache=None):
+        self.cache = cache or get_encrypted_cache()
         self.audit_logger = get_audit_logger()
         
         # Synchronization configuration
-        self.sync_queue_dir = os.path.join('sync', 'queue')
-        self.conflict_dir = os.path.join('sync', 'conflicts')
-        self.backup_dir = os.path.join('sync', 'backups')
+        sync_dir = sync_dir or 'sync'
+        self.sync_queue_dir = os.path.join(sync_dir, 'queue')
+        self.conflict_dir = os.path.join(sync_dir, 'conflicts')
+        self.backup_dir = os.path.join(sync_dir, 'backups')
+        self.worker_id = uuid.uuid4().hex
+        self.lease_seconds = 300
         
         # Maritime-specific settings
         self.priority_tables = {
@@ -134,8 +298,10 @@ class SecureSyncManager:
             'users': ConflictResolution.SERVER_WINS
         }
         
-        # Initialize directories
+        # Initialize directories and the transaction queue
         self._setup_sync_directories()
+        self.queue = SyncTransactionQueue(os.path.join(sync_dir, 'queue.db'))
+        self._migrate_legacy_queue_files()
         
         logger.info("Secure sync manager initialized for maritime operations")
     
@@ -157,6 +323,19 @@ class SecureSyncManager:
             logger.error(f"Failed to setup sync directories: {e}")
             raise
     
+    def _migrate_legacy_queue_files(self):
+        """Move transactions from the previous one-file-per-transaction queue into the queue database"""
+        for filename in os.listdir(self.sync_queue_dir):
+            if not filename.endswith('.sync'):
+                continue
+            file_path = os.path.join(self.sync_queue_dir, filename)
+            try:
+                with open(file_path, 'r') as f:
+                    self.queue.put(SyncTransaction.from_dict(json.load(f)))
+            except Exception as e:
+                logger.warning(f"Dropping unreadable sync transaction {filename}: {e}")
+            os.unlink(file_path)
+    
     def _encrypt_sync_data(self, data: Any) -> Tuple[str, str]:
         """Encrypt data for synchronization and return encrypted data + hash"""
         try:
@@ -304,23 +483,11 @@ class SecureSyncManager:
             )
             
             # Save to queue
-            queue_file = os.path.join(self.sync_queue_dir, f"{transaction_id}.sync")
-            with open(queue_file, 'w') as f:
-                json.dump(transaction.to_dict(), f)
-            
-            # Cache transaction for quick access
-            self.cache.store(
-                key=f"sync_transaction_{transaction_id}",
-                data=transaction.to_dict(),
-                ttl=86400,  # 24 hours
-                classification=CacheClassification.INTERNAL,
-                vessel_id=vessel_id,
-                operation_type="sync_operation"
-            )
+            self.queue.put(transaction)
             
             # Log sync operation
             self.audit_logger.log_event(
-                AuditEventType.DATA_SYNC,
+                AuditEventType.SYNC_STARTED,
                 f"Sync operation queued: {operation.value} {table_name}",
                 details={
                     'transaction_id': transaction_id,
@@ -351,50 +518,21 @@ class SecureSyncManager:
     def get_pending_transactions(self, limit: int = 50) -> List[SyncTransaction]:
         """Get pending synchronization transactions ordered by priority"""
         try:
-            transactions = []
-            
-            # Get all sync files
-            if not os.path.exists(self.sync_queue_dir):
-                return transactions
-            
-            for filename in os.listdir(self.sync_queue_dir):
-                if not filename.endswith('.sync'):
-                    continue
-                
-                file_path = os.path.join(self.sync_queue_dir, filename)
-                
-                try:
-                    with open(file_path, 'r') as f:
-                        transaction_data = json.load(f)
-                    
-                    transaction = SyncTransaction.from_dict(transaction_data)
-                    
-                    # Skip expired transactions
-                    if transaction.is_expired():
-                        os.unlink(file_path)
-                        continue
-                    
-                    # Only include pending transactions
-                    if transaction.status == SyncStatus.PENDING:
-                        transactions.append(transaction)
-                
-                except Exception as e:
-                    logger.warning(f"Failed to load sync transaction {filename}: {e}")
-                    # Remove corrupted files
-                    try:
-                        os.unlink(file_path)
-                    except Exception:
-                        pass
-            
-            # Sort by priority (higher first) and then by timestamp
-            transactions.sort(key=lambda x: (-x.priority, x.timestamp))
-            
-            return transactions[:limit]
+            return self.queue.pending(limit)
             
         except Exception as e:
             logger.error(f"Failed to get pending transactions: {e}")
             return []
     
+    def lease_pending_transactions(self, limit: int = 50) -> List[SyncTransaction]:
+        """Claim pending transactions for this worker so no other worker processes them"""
+        try:
+            return self.queue.lease(limit, self.worker_id, self.lease_seconds)
+            
+        except Exception as e:
+            logger.error(f"Failed to lease pending transactions: {e}")
+            return []
+    
     def process_sync_transaction(self, transaction: SyncTransaction) -> bool:
         """
         Process a synchronization transaction with conflict detection
@@ -432,7 +570,7 @@ class SecureSyncManager:
                 
                 # Log successful sync
                 self.audit_logger.log_maritime_operation(
-                    AuditEventType.DATA_SYNC,
+                    AuditEventType.SYNC_COMPLETED,
                     f"Sync completed: {transaction.operation.value} {transaction.table_name}",
                     vessel_id=transaction.vessel_id,
                     details={
@@ -549,7 +687,7 @@ class SecureSyncManager:
                 
                 # Log conflict resolution
                 self.audit_logger.log_event(
-                    AuditEventType.DATA_SYNC,
+                    AuditEventType.CONFLICT_RESOLVED,
                     f"Sync conflict resolved: {resolution.value}",
                     details={
                         'transaction_id': transaction.transaction_id,
@@ -666,7 +804,7 @@ class SecureSyncManager:
             
             # Log conflict
             self.audit_logger.log_event(
-                AuditEventType.DATA_SYNC,
+                AuditEventType.SYNC_FAILED,
                 f"Sync conflict requires manual resolution: {transaction.table_name}",
                 details={
                     'transaction_id': transaction.transaction_id,
@@ -707,21 +845,9 @@ class SecureSyncManager:
             return False
     
     def _save_transaction(self, transaction: SyncTransaction):
-        """Save transaction to file"""
+        """Save transaction to the queue"""
         try:
-            queue_file = os.path.join(self.sync_queue_dir, f"{transaction.transaction_id}.sync")
-            with open(queue_file, 'w') as f:
-                json.dump(transaction.to_dict(), f)
-            
-            # Update cache
-            self.cache.store(
-                key=f"sync_transaction_{transaction.transaction_id}",
-                data=transaction.to_dict(),
-                ttl=86400,  # 24 hours
-                classification=CacheClassification.INTERNAL,
-                vessel_id=transaction.vessel_id,
-                operation_type="sync_operation"
-            )
+            self.queue.put(transaction)
             
         except Exception as e:
             logger.error(f"Failed to save transaction {transaction.transaction_id}: {e}")
@@ -729,13 +855,7 @@ class SecureSyncManager:
     def _cleanup_transaction(self, transaction: SyncTransaction):
         """Clean up completed transaction"""
         try:
-            # Remove from queue
-            queue_file = os.path.join(self.sync_queue_dir, f"{transaction.transaction_id}.sync")
-            if os.path.exists(queue_file):
-                os.unlink(queue_file)
-            
-            # Remove from cache
-            self.cache.delete(f"sync_transaction_{transaction.transaction_id}")
+            self.queue.delete(transaction.transaction_id)
             
             logger.debug(f"Cleaned up transaction: {transaction.transaction_id}")
             
@@ -755,51 +875,25 @@ class SecureSyncManager:
                 'total_size': 0
             }
             
-            if not os.path.exists(self.sync_queue_dir):
-                return status
-            
-            for filename in os.listdir(self.sync_queue_dir):
-                if not filename.endswith('.sync'):
-                    continue
+            for status_value, table_name, priority, count, size in self.queue.counts():
+                status['total_size'] += size
                 
-                file_path = os.path.join(self.sync_queue_dir, filename)
+                # Count by status
+                if status_value == SyncStatus.PENDING.value:
+                    status['pending_transactions'] += count
+                elif status_value == SyncStatus.FAILED.value:
+                    status['failed_transactions'] += count
+                elif status_value == SyncStatus.CONFLICT.value:
+                    status['conflict_transactions'] += count
                 
-                try:
-                    file_size = os.path.getsize(file_path)
-                    status['total_size'] += file_size
-                    
-                    with open(file_path, 'r') as f:
-                        transaction_data = json.load(f)
-                    
-                    transaction = SyncTransaction.from_dict(transaction_data)
-                    
-                    # Count by status
-                    if transaction.status == SyncStatus.PENDING:
-                        status['pending_transactions'] += 1
-                        
-                        # Track oldest pending
-                        if not status['oldest_pending'] or transaction.timestamp < status['oldest_pending']:
-                            status['oldest_pending'] = transaction.timestamp
-                            
-                    elif transaction.status == SyncStatus.FAILED:
-                        status['failed_transactions'] += 1
-                        
-                    elif transaction.status == SyncStatus.CONFLICT:
-                        status['conflict_transactions'] += 1
-                    
-                    # Count by table
-                    if transaction.table_name not in status['by_table']:
-                        status['by_table'][transaction.table_name] = 0
-                    status['by_table'][transaction.table_name] += 1
-                    
-                    # Count by priority
-                    priority_key = f"priority_{transaction.priority}"
-                    if priority_key not in status['by_priority']:
-                        status['by_priority'][priority_key] = 0
-                    status['by_priority'][priority_key] += 1
+                # Count by table
+                status['by_table'][table_name] = status['by_table'].get(table_name, 0) + count
                 
-                except Exception:
-                    continue
+                # Count by priority
+                priority_key = f"priority_{priority}"
+                status['by_priority'][priority_key] = status['by_priority'].get(priority_key, 0) + count
+            
+            status['oldest_pending'] = self.queue.oldest_pending()
             
             return status
             
@@ -810,7 +904,7 @@ class SecureSyncManager:
     def process_sync_batch(self, batch_size: int = 10) -> Dict[str, Any]:
         """Process a batch of synchronization transactions"""
         try:
-            transactions = self.get_pending_transactions(batch_size)
+            transactions = self.lease_pending_transactions(batch_size)
             
             results = {
                 'processed': 0,
@@ -849,7 +943,7 @@ class SecureSyncManager:
             # Log batch results
             if results['processed'] > 0:
                 self.audit_logger.log_event(
-                    AuditEventType.DATA_SYNC,
+                    AuditEventType.SYNC_COMPLETED,
                     f"Sync batch processed: {results['succeeded']}/{results['processed']} succeeded",
                     details=results,
                     severity=AuditSeverity.LOW
@@ -865,38 +959,8 @@ class SecureSyncManager:
     
     def cleanup_expired_transactions(self) -> int:
         """Clean up expired transactions"""
-        cleaned_count = 0
-        
         try:
-            if not os.path.exists(self.sync_queue_dir):
-                return 0
-            
-            for filename in os.listdir(self.sync_queue_dir):
-                if not filename.endswith('.sync'):
-                    continue
-                
-                file_path = os.path.join(self.sync_queue_dir, filename)
-                
-                try:
-                    with open(file_path, 'r') as f:
-                        transaction_data = json.load(f)
-                    
-                    transaction = SyncTransaction.from_dict(transaction_data)
-                    
-                    if transaction.is_expired():
-                        os.unlink(file_path)
-                        cleaned_count += 1
-                        
-                        # Remove from cache
-                        self.cache.delete(f"sync_transaction_{transaction.transaction_id}")
-                
-                except Exception:
-                    # Remove corrupted files
-                    try:
-                        os.unlink(file_path)
-                        cleaned_count += 1
-                    except Exception:
-                        pass
+            cleaned_count = self.queue.delete_expired()
             
             if cleaned_count > 0:
                 logger.info(f"Cleaned up {cleaned_count} expired sync transactions")
@@ -5,17 +5,21 @@ Production-ready logging with maritime operations focus and Render integration
 
 import os
 import json
+import atexit
 import logging
+import logging.handlers
+import queue
 import time
 import threading
 from datetime import datetime, timezone
 from typing import Dict, Any, Optional, List, Union
 from enum import Enum
-from dataclasses import dataclass, asdict, field
+from dataclasses import dataclass, asdict, field, fields
 from contextlib import contextmanager
 from functools import wraps
 import traceback
 import uuid
+import weakref
 
 # Maritime-specific imports
 import psutil
@@ -134,21 +138,57 @@ class LogContext:
         return {k: v for k, v in data.items() if v is not None and v != [] and v != {}}
 
 
+# LogContext fields that StructuredLogger.log() writes as top-level record attributes
+LOG_CONTEXT_FIELDS = frozenset(f.name for f in fields(LogContext)) - {'message', 'extra_fields'}
+
+# Numeric levels for LogLevel; maritime levels are emitted as WARNING
+_LEVEL_NUMBERS = {level: getattr(logging, level.value, logging.WARNING) for level in LogLevel}
+
+# WSGI environ key holding the request fields captured by the first log call of a request
+_REQUEST_CONTEXT_ENVIRON_KEY = 'stevedores.log_request_context'
+
+# Async loggers whose listener is running; closed or collected loggers drop out
+_open_async_loggers: 'weakref.WeakSet[StructuredLogger]' = weakref.WeakSet()
+
+
+def _restart_pipelines_after_fork():
+    """Threads do not survive fork (gunicorn preload_app): give each open logger a listener in the worker"""
+    for structured_logger in list(_open_async_loggers):
+        structured_logger._start_pipeline()
+
+
+def _close_open_loggers():
+    """Write out every open logger's queued records at interpreter exit"""
+    for structured_logger in list(_open_async_loggers):
+        structured_logger.close()
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_restart_pipelines_after_fork)
+atexit.register(_close_open_loggers)
+
+
 class StructuredLogger:
     """Production-ready structured logger for maritime operations"""
     
-    def __init__(self, name: str = "stevedores", enable_render_streaming: bool = True):
+    def __init__(self, name: str = "stevedores", enable_render_streaming: bool = True,
+                 handlers: Optional[List[logging.Handler]] = None, async_logging: Optional[bool] = None):
         self.logger = logging.getLogger(name)
         self.enable_render_streaming = enable_render_streaming
         self.deployment_version = os.getenv('DEPLOYMENT_VERSION', '3.0.6')
         self.environment = os.getenv('FLASK_ENV', 'production')
         
-        # Performance optimization
-        self.log_buffer = []
-        self.buffer_size = int(os.getenv('LOG_BUFFER_SIZE_KB', '256')) * 1024  # Convert KB to bytes
-        self.flush_interval = int(os.getenv('LOG_FLUSH_INTERVAL_SECONDS', '10'))
-        self.last_flush = time.time()
-        self.buffer_lock = threading.Lock()
+        # Asynchronous pipeline: request threads only enqueue, a listener thread formats and writes
+        if async_logging is None:
+            async_logging = os.getenv('LOG_ASYNC_ENABLED', 'true').lower() == 'true'
+        self.async_logging = async_logging
+        self.queue_capacity = int(os.getenv('LOG_QUEUE_CAPACITY', '10000'))
+        self.overflow_policy = os.getenv('LOG_QUEUE_OVERFLOW', 'drop_newest')
+        self.block_timeout = int(os.getenv('LOG_QUEUE_BLOCK_MS', '50')) / 1000.0
+        self.batch_size = int(os.getenv('LOG_BATCH_SIZE', '256'))
+        self.sink_handlers: List[logging.Handler] = handlers if handlers is not None else []
+        self.queue_handler: Optional[BoundedQueueHandler] = None
+        self.listener: Optional[BatchingQueueListener] = None
         
         # Cost optimization settings
         self.sampling_rate = float(os.getenv('LOG_SAMPLING_RATE', '1.0'))
@@ -161,27 +201,61 @@ class StructuredLogger:
         self.performance_logging = os.getenv('LOG_PERFORMANCE_METRICS', 'true').lower() == 'true'
         self.security_logging = os.getenv('LOG_SECURITY_EVENTS', 'true').lower() == 'true'
         
+        # Process metrics are sampled on an interval and shared by every log call in between
+        self.performance_sample_interval = float(os.getenv('LOG_PERFORMANCE_SAMPLE_SECONDS', '1.0'))
+        self._performance_context: Dict[str, Any] = {}
+        self._performance_sampled_at = float('-inf')
+        self._performance_lock = threading.Lock()
+        self._process: Optional[psutil.Process] = None
+        
+        # LogContext defaults that are the same for every record from this logger
+        self._envelope = {
+            'component': '',
+            'security_classification': 'internal',
+            'deployment_version': self.deployment_version,
+            'environment': self.environment,
+            'service_name': 'stevedores-dashboard',
+        }
+        
         self._setup_logger()
-        self._start_background_flush()
     
     def _setup_logger(self):
         """Set up the structured logger configuration"""
         # Clear existing handlers
+        self.close()
         self.logger.handlers.clear()
         
         # Set log level
         log_level = os.getenv('LOG_LEVEL', 'INFO').upper()
         self.logger.setLevel(getattr(logging, log_level))
         
-        # Create JSON formatter for structured logging
+        if not self.sink_handlers:
+            self.sink_handlers = self._create_sink_handlers()
+        
+        if self.async_logging:
+            self._start_pipeline()
+            _open_async_loggers.add(self)
+        else:
+            for handler in self.sink_handlers:
+                self.logger.addHandler(handler)
+        
+        self.logger.info("Structured logging initialized", extra={
+            'component': ComponentType.WEB_SERVER.value,
+            'deployment_version': self.deployment_version,
+            'environment': self.environment
+        })
+    
+    def _create_sink_handlers(self) -> List[logging.Handler]:
+        """Console (Render log streaming) and optional rotating file handlers with JSON formatting"""
         formatter = JsonFormatter()
+        handlers = []
         
         # Console handler for Render log streaming
         if self.enable_render_streaming:
-            console_handler = logging.StreamHandler()
+            console_handler = BatchStreamHandler()
             console_handler.setFormatter(formatter)
             console_handler.setLevel(logging.INFO)
-            self.logger.addHandler(console_handler)
+            handlers.append(console_handler)
         
         # File handler for local development/backup
         if self.environment != 'production' or os.getenv('LOCAL_LOG_FILE_ENABLED', 'false').lower() == 'true':
@@ -189,62 +263,64 @@ class StructuredLogger:
                 log_dir = '/tmp/logs'
                 os.makedirs(log_dir, exist_ok=True)
                 
-                from logging.handlers import RotatingFileHandler
-                file_handler = RotatingFileHandler(
+                file_handler = BatchRotatingFileHandler(
                     f'{log_dir}/stevedores_structured.log',
                     maxBytes=50*1024*1024,  # 50MB
                     backupCount=5
                 )
                 file_handler.setFormatter(formatter)
                 file_handler.setLevel(logging.INFO)
-                self.logger.addHandler(file_handler)
+                handlers.append(file_handler)
             except Exception as e:
                 print(f"Failed to set up file logging: {e}")
         
-        self.logger.info("Structured logging initialized", extra={
-            'component': ComponentType.WEB_SERVER.value,
-            'deployment_version': self.deployment_version,
-            'environment': self.environment
-        })
-    
-    def _start_background_flush(self):
-        """Start background thread for buffer flushing"""
-        if not os.getenv('LOG_STREAMING_ENABLED', 'true').lower() == 'true':
-            return
-        
-        def flush_worker():
-            while True:
-                time.sleep(self.flush_interval)
-                self._flush_buffer()
-        
-        flush_thread = threading.Thread(target=flush_worker, daemon=True)
-        flush_thread.start()
-    
-    def _flush_buffer(self):
-        """Flush buffered logs"""
-        with self.buffer_lock:
-            if not self.log_buffer:
-                return
-            
-            # Process buffered logs
-            for log_entry in self.log_buffer:
-                self.logger.handle(log_entry)
-            
-            self.log_buffer.clear()
-            self.last_flush = time.time()
+        return handlers
+    
+    def _start_pipeline(self):
+        """Route the logger through a fresh bounded queue and listener thread"""
+        log_queue = queue.Queue(maxsize=self.queue_capacity)
+        handler = BoundedQueueHandler(log_queue, overflow=self.overflow_policy, block_timeout=self.block_timeout)
+        if self.queue_handler is not None:
+            self.logger.removeHandler(self.queue_handler)
+        self.logger.addHandler(handler)
+        self.queue_handler = handler
+        self.listener = BatchingQueueListener(log_queue, *self.sink_handlers, batch_size=self.batch_size)
+        self.listener.start()
+    
+    def flush(self, timeout: float = 5.0) -> bool:
+        """Wait until queued records are written; False if the timeout passed first"""
+        if self.listener is None:
+            for handler in self.sink_handlers:
+                handler.flush()
+            return True
+        return self.listener.wait_until_drained(timeout)
+    
+    def close(self):
+        """Write out queued records and stop the listener thread"""
+        _open_async_loggers.discard(self)
+        listener, self.listener = self.listener, None
+        if listener is not None and listener._thread is not None:
+            listener.stop()
+    
+    def get_pipeline_stats(self) -> Dict[str, Any]:
+        """Queue depth, overflow counters and listener batch counters"""
+        if self.queue_handler is None or self.listener is None:
+            return {'async': False}
+        stats = {'async': True, 'capacity': self.queue_capacity, 'overflow_policy': self.overflow_policy,
+                 'queue_depth': self.queue_handler.queue.qsize()}
+        stats.update(self.queue_handler.get_stats())
+        stats.update(self.listener.get_stats())
+        return stats
     
     def _should_sample_log(self) -> bool:
         """Determine if log should be sampled (for cost optimization)"""
         import random
         return random.random() <= self.sampling_rate
     
-    def _deduplicate_log(self, log_context: LogContext) -> bool:
+    def _deduplicate_log(self, component: str, level: str, message: str) -> bool:
         """Check if log should be deduplicated"""
-        if not self.deduplication:
-            return False
-        
         # Create deduplication key
-        dedup_key = f"{log_context.component}:{log_context.level}:{log_context.message[:100]}"
+        dedup_key = f"{component}:{level}:{message[:100]}"
         current_time = time.time()
         
         # Check if we've seen this log recently (within 60 seconds)
@@ -262,115 +338,126 @@ class StructuredLogger:
         
         return False
     
-    def _get_request_context(self) -> Dict[str, Any]:
-        """Extract request context for logging"""
-        context = {}
+    def _capture_request_context(self) -> Dict[str, Any]:
+        """Request fields that stay fixed for the whole request"""
+        context = {
+            # Used only when no hook has set g.request_id
+            'request_id': str(uuid.uuid4())[:8],
+            'ip_address': request.environ.get('HTTP_X_FORWARDED_FOR', request.remote_addr),
+            'user_agent': request.headers.get('User-Agent'),
+            'endpoint': request.endpoint,
+            'method': request.method,
+        }
         
+        # Get session context
         try:
-            if has_request_context():
-                context.update({
-                    'request_id': getattr(g, 'request_id', None) or str(uuid.uuid4())[:8],
-                    'ip_address': request.environ.get('HTTP_X_FORWARDED_FOR', request.remote_addr),
-                    'user_agent': request.headers.get('User-Agent'),
-                    'endpoint': request.endpoint,
-                    'method': request.method,
-                })
-                
-                # Get user context
-                if hasattr(g, 'jwt_claims'):
-                    context['user_id'] = g.jwt_claims.get('user_id')
-                
-                # Get session context
-                try:
-                    from flask import session
-                    context['session_id'] = session.get('_id')
-                except:
-                    pass
+            from flask import session
+            context['session_id'] = session.get('_id')
         except:
             pass
         
-        return context
+        return {key: value for key, value in context.items() if value is not None}
     
-    def _get_performance_context(self) -> Dict[str, Any]:
-        """Get performance metrics for logging"""
-        if not self.performance_logging:
+    def _get_request_context(self) -> Dict[str, Any]:
+        """Extract request context for logging, captured once per request and cached in the WSGI environ"""
+        try:
+            if not has_request_context():
+                return {}
+            
+            # Not g: an app context pushed before the request outlives it and is reused by the next one
+            context = request.environ.get(_REQUEST_CONTEXT_ENVIRON_KEY)
+            if context is None:
+                context = request.environ[_REQUEST_CONTEXT_ENVIRON_KEY] = self._capture_request_context()
+            
+            # request_id and the JWT claims can be set by hooks and views after the first log call
+            request_id = g.get('request_id')
+            claims = g.get('jwt_claims')
+            if not request_id and claims is None:
+                return context
+            
+            context = dict(context)
+            if request_id:
+                context['request_id'] = request_id
+            if claims is not None and claims.get('user_id') is not None:
+                context['user_id'] = claims.get('user_id')
+            return context
+        except:
             return {}
-        
+    
+    def _sample_performance_context(self):
+        """Read process memory and CPU into the shared performance context"""
         try:
-            process = psutil.Process()
-            memory_info = process.memory_info()
+            # A forked worker must not keep reporting its parent's process
+            if self._process is None or self._process.pid != os.getpid():
+                self._process = psutil.Process()
+                self._process.cpu_percent()
             
-            return {
-                'memory_usage_mb': memory_info.rss / (1024 * 1024),
-                'cpu_usage_percent': process.cpu_percent(),
+            self._performance_context = {
+                'memory_usage_mb': self._process.memory_info().rss / (1024 * 1024),
+                'cpu_usage_percent': self._process.cpu_percent(),
             }
         except:
+            self._performance_context = {}
+    
+    def _get_performance_context(self) -> Dict[str, Any]:
+        """Get performance metrics for logging, refreshed at most once per sample interval"""
+        if not self.performance_logging:
             return {}
+        
+        now = time.monotonic()
+        if now - self._performance_sampled_at >= self.performance_sample_interval:
+            # One thread refreshes; the others keep using the previous sample
+            if self._performance_lock.acquire(blocking=False):
+                try:
+                    self._sample_performance_context()
+                    self._performance_sampled_at = now
+                finally:
+                    self._performance_lock.release()
+        
+        return self._performance_context
     
     def log(self, level: LogLevel, message: str, **kwargs):
         """Main logging method with structured context"""
-        # Sampling check for cost optimization
-        if not self._should_sample_log():
+        # Calls below the logger level (or on a disabled logger) cost nothing else
+        levelno = _LEVEL_NUMBERS[level]
+        if not self.logger.isEnabledFor(levelno):
             return
         
-        # Create log context
-        log_context = LogContext(
-            level=level.value,
-            message=message,
-            deployment_version=self.deployment_version,
-            environment=self.environment,
-        )
+        # Sampling check for cost optimization
+        if self.sampling_rate < 1.0 and not self._should_sample_log():
+            return
         
-        # Add request context
-        request_context = self._get_request_context()
-        for key, value in request_context.items():
-            if hasattr(log_context, key):
-                setattr(log_context, key, value)
+        # Deduplication check
+        if self.deduplication and self._deduplicate_log(kwargs.get('component', ''), level.value, message):
+            return
         
-        # Add performance context
-        perf_context = self._get_performance_context()
-        for key, value in perf_context.items():
-            if hasattr(log_context, key):
-                setattr(log_context, key, value)
+        # Record attributes in LogContext precedence: defaults, request, performance, then call fields
+        log_data = {'level': level.value}
+        log_data.update(self._envelope)
+        log_data.update(self._get_request_context())
+        log_data.update(self._get_performance_context())
         
-        # Add custom fields
+        extra_fields = {}
         for key, value in kwargs.items():
-            if hasattr(log_context, key):
-                setattr(log_context, key, value)
+            if key not in LOG_CONTEXT_FIELDS:
+                extra_fields[key] = value
+            elif value is None or value == [] or value == {}:
+                # LogContext.to_dict() drops empty fields, including ones overriding context
+                log_data.pop(key, None)
+            elif key == 'maritime_operation':
+                log_data[key] = getattr(value, 'value', value)
             else:
-                log_context.extra_fields[key] = value
+                log_data[key] = value
+        if extra_fields:
+            log_data['extra_fields'] = extra_fields
         
-        # Deduplication check
-        if self._deduplicate_log(log_context):
-            return
-        
-        # Convert to dict for logging
-        log_data = log_context.to_dict()
-        
-        # Create log record
-        log_record = self.logger.makeRecord(
-            name=self.logger.name,
-            level=getattr(logging, level.value),
-            fn='',
-            lno=0,
-            msg=message,
-            args=(),
-            exc_info=None,
-            extra=log_data
-        )
+        # The message travels as msg; every other key is a LogContext field, none of which
+        # clash with LogRecord attributes, so they are set directly
+        log_record = self.logger.makeRecord(self.logger.name, levelno, '', 0, message, (), None)
+        log_record.__dict__.update(log_data)
         
-        # Buffer or immediate logging based on configuration
-        if os.getenv('LOG_STREAMING_ENABLED', 'true').lower() == 'true':
-            with self.buffer_lock:
-                self.log_buffer.append(log_record)
-                
-                # Flush if buffer is full or time threshold reached
-                buffer_size_bytes = sum(len(str(record.__dict__)) for record in self.log_buffer)
-                if (buffer_size_bytes >= self.buffer_size or 
-                    time.time() - self.last_flush >= self.flush_interval):
-                    self._flush_buffer()
-        else:
-            self.logger.handle(log_record)
+        # Enqueued for the listener thread when async, written in place otherwise
+        self.logger.handle(log_record)
     
     def debug(self, message: str, **kwargs):
         """Log debug message"""
@@ -457,31 +544,226 @@ class StructuredLogger:
         self.log(level, message, **kwargs)
 
 
+def _compile_json_encoder():
+    """Build the log entry serializer once; json.dumps() sets up a new encoder on every call"""
+    c_make_encoder = getattr(json.encoder, 'c_make_encoder', None)
+    if c_make_encoder is None:
+        return json.JSONEncoder(default=str, ensure_ascii=False).encode
+    
+    # Same output as json.dumps(default=str, ensure_ascii=False). Without circular-reference
+    # markers it can be shared by every thread; a cyclic field fails with RecursionError,
+    # which the handler reports like any other formatting error
+    iterencode = c_make_encoder(None, str, json.encoder.encode_basestring, None, ': ', ', ', False, False, True)
+    return lambda log_entry: ''.join(iterencode(log_entry, 0))
+
+
 class JsonFormatter(logging.Formatter):
     """JSON formatter for structured logging"""
     
+    # Standard LogRecord attributes; everything else on a record is a structured field
+    RECORD_ATTRIBUTES = frozenset(logging.LogRecord('', 0, '', 0, '', (), None).__dict__) | {'message', 'asctime'}
+    
+    _encode = staticmethod(_compile_json_encoder())
+    
     def format(self, record):
         # Base log entry
         log_entry = {
-            'timestamp': datetime.now(timezone.utc).isoformat(),
+            # Event time, not formatting time - records may be formatted later on the listener thread
+            'timestamp': datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
             'level': record.levelname,
             'message': record.getMessage(),
             'logger': record.name,
         }
         
         # Add extra fields from the record
+        reserved = self.RECORD_ATTRIBUTES
         for key, value in record.__dict__.items():
-            if key not in ['name', 'msg', 'args', 'levelname', 'levelno', 'pathname', 
-                          'filename', 'module', 'lineno', 'funcName', 'created', 
-                          'msecs', 'relativeCreated', 'thread', 'threadName', 
-                          'processName', 'process', 'stack_info', 'exc_info', 'exc_text']:
+            if key not in reserved:
                 log_entry[key] = value
         
         # Handle exceptions
         if record.exc_info:
             log_entry['exception'] = self.formatException(record.exc_info)
         
-        return json.dumps(log_entry, default=str, ensure_ascii=False)
+        return self._encode(log_entry)
+
+
+# Asynchronous logging pipeline
+class BoundedQueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler for a bounded queue with an explicit overflow policy
+    
+    When the queue is full: 'drop_newest' discards the incoming record, 'drop_oldest'
+    evicts the oldest queued record, and 'block' waits up to `block_timeout` seconds
+    before discarding. Records at `preserve_level` or above always evict the oldest
+    record rather than being discarded.
+    """
+    
+    POLICIES = ('drop_newest', 'drop_oldest', 'block')
+    
+    def __init__(self, log_queue: queue.Queue, overflow: str = 'drop_newest',
+                 block_timeout: float = 0.05, preserve_level: int = logging.ERROR):
+        super().__init__(log_queue)
+        if overflow not in self.POLICIES:
+            raise ValueError(f"Unknown log queue overflow policy: {overflow}")
+        self.overflow = overflow
+        self.block_timeout = block_timeout
+        self.preserve_level = preserve_level
+        self._stats_lock = threading.Lock()
+        self.stats = {'enqueued': 0, 'dropped': 0, 'evicted': 0, 'blocked': 0, 'high_watermark': 0}
+    
+    def prepare(self, record):
+        # StructuredLogger records carry no args or exc_info and are never reused, so
+        # skip the merge-and-copy unless there is something to merge
+        if record.args or record.exc_info:
+            return super().prepare(record)
+        return record
+    
+    def _evict_oldest(self) -> bool:
+        try:
+            self.queue.get_nowait()
+        except queue.Empty:
+            return False
+        self.queue.task_done()
+        return True
+    
+    def enqueue(self, record):
+        log_queue = self.queue
+        try:
+            log_queue.put_nowait(record)
+        except queue.Full:
+            if self.overflow == 'block' and record.levelno < self.preserve_level:
+                with self._stats_lock:
+                    self.stats['blocked'] += 1
+                try:
+                    log_queue.put(record, timeout=self.block_timeout)
+                except queue.Full:
+                    with self._stats_lock:
+                        self.stats['dropped'] += 1
+                    return
+            elif self.overflow == 'drop_oldest' or record.levelno >= self.preserve_level:
+                evicted = self._evict_oldest()
+                try:
+                    log_queue.put_nowait(record)
+                except queue.Full:
+                    with self._stats_lock:
+                        self.stats['dropped'] += 1
+                    return
+                finally:
+                    if evicted:
+                        with self._stats_lock:
+                            self.stats['evicted'] += 1
+            else:
+                with self._stats_lock:
+                    self.stats['dropped'] += 1
+                return
+        
+        depth = log_queue.qsize()
+        with self._stats_lock:
+            self.stats['enqueued'] += 1
+            if depth > self.stats['high_watermark']:
+                self.stats['high_watermark'] = depth
+    
+    def get_stats(self) -> Dict[str, int]:
+        with self._stats_lock:
+            return dict(self.stats)
+
+
+class _BatchEmitMixin:
+    """Formats a batch of records and writes them with a single write and flush"""
+    
+    def emit_batch(self, records: List[logging.LogRecord]):
+        lines = []
+        for record in records:
+            if record.levelno < self.level or not self.filter(record):
+                continue
+            try:
+                lines.append(self.format(record))
+            except Exception:
+                self.handleError(record)
+        if not lines:
+            return
+        
+        text = self.terminator.join(lines) + self.terminator
+        with self.lock:
+            try:
+                self._write_batch(text)
+            except Exception:
+                self.handleError(records[-1])
+    
+    def _write_batch(self, text: str):
+        self.stream.write(text)
+        self.flush()
+
+
+class BatchStreamHandler(_BatchEmitMixin, logging.StreamHandler):
+    """StreamHandler that writes listener batches in one call"""
+
+
+class BatchRotatingFileHandler(_BatchEmitMixin, logging.handlers.RotatingFileHandler):
+    """RotatingFileHandler that writes listener batches in one call, rolling over between batches"""
+    
+    def _write_batch(self, text: str):
+        if self.stream is None:
+            self.stream = self._open()
+        if self.maxBytes > 0 and self.stream.tell() > 0 and self.stream.tell() + len(text) >= self.maxBytes:
+            self.doRollover()
+        super()._write_batch(text)
+
+
+class BatchingQueueListener(logging.handlers.QueueListener):
+    """QueueListener that drains up to `batch_size` records per wake-up and writes them together"""
+    
+    def __init__(self, log_queue: queue.Queue, *handlers: logging.Handler, batch_size: int = 256):
+        super().__init__(log_queue, *handlers, respect_handler_level=True)
+        self.batch_size = batch_size
+        self.stats = {'batches': 0, 'written': 0, 'largest_batch': 0}
+    
+    def handle_batch(self, records: List[logging.LogRecord]):
+        for handler in self.handlers:
+            if hasattr(handler, 'emit_batch'):
+                handler.emit_batch(records)
+            else:
+                for record in records:
+                    if record.levelno >= handler.level:
+                        handler.handle(record)
+        self.stats['batches'] += 1
+        self.stats['written'] += len(records)
+        self.stats['largest_batch'] = max(self.stats['largest_batch'], len(records))
+    
+    def _monitor(self):
+        log_queue = self.queue
+        while True:
+            batch = [log_queue.get()]
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(log_queue.get_nowait())
+                except queue.Empty:
+                    break
+            
+            stopping = any(item is self._sentinel for item in batch)
+            records = [self.prepare(item) for item in batch if item is not self._sentinel]
+            try:
+                if records:
+                    self.handle_batch(records)
+            finally:
+                for _ in batch:
+                    log_queue.task_done()
+            if stopping:
+                break
+    
+    def wait_until_drained(self, timeout: float) -> bool:
+        """Block until every queued record has been written or `timeout` seconds pass"""
+        deadline = time.monotonic() + timeout
+        with self.queue.all_tasks_done:
+            while self.queue.unfinished_tasks:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                self.queue.all_tasks_done.wait(remaining)
+        return True
+    
+    def get_stats(self) -> Dict[str, int]:
+        return dict(self.stats)
 
 
 # Context managers and decorators
@@ -650,7 +932,8 @@ def configure_flask_logging(app):
 # Export all public interfaces
 __all__ = [
     'LogLevel', 'MaritimeOperationType', 'ComponentType', 'LogContext',
-    'StructuredLogger', 'JsonFormatter', 'maritime_operation_context',
+    'StructuredLogger', 'JsonFormatter', 'BoundedQueueHandler', 'BatchingQueueListener',
+    'BatchStreamHandler', 'BatchRotatingFileHandler', 'maritime_operation_context',
     'log_performance', 'init_structured_logger', 'get_structured_logger',
     'configure_flask_logging'
 ]
\ No newline at end of file
@@ -0,0 +1,410 @@
+"""
+Set-Based Sync Batch Processor
+Applies queued offline changes with grouped, prefetched queries and one commit per batch
+
+Records are grouped by (table, operation). Each group prefetches the rows it
+references with a single IN (...) query, computes conflict hashes over a
+canonical narrow projection of the row, and writes creates and updates in
+bulk. Queue status changes are committed in the same transaction as the data.
+If a batch fails as a whole, it is replayed record by record inside
+savepoints so one bad record cannot block the rest of the queue.
+"""
+
+import hashlib
+import json
+import logging
+import time
+from collections import Counter, OrderedDict
+from datetime import date, datetime, time as dt_time, timezone
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import types as sqltypes
+
+from models.sync_change import create_sync_change_model
+
+logger = logging.getLogger(__name__)
+
+# Canonical projections used for sync conflict hashes - the fields offline clients edit
+VESSEL_SYNC_FIELDS = (
+    'name', 'shipping_line', 'vessel_type', 'port_of_call', 'operation_type',
+    'berth_assignment', 'operations_manager', 'total_cargo_capacity', 'cargo_type',
+    'shift_start', 'shift_end', 'drivers_assigned', 'tico_vehicles_needed',
+    'status', 'current_berth', 'progress_percentage'
+)
+CARGO_TALLY_SYNC_FIELDS = ('vessel_id', 'tally_type', 'cargo_count', 'location', 'notes', 'shift_period')
+
+SYNC_PROJECTIONS = {
+    'vessels': VESSEL_SYNC_FIELDS,
+    'cargo_tallies': CARGO_TALLY_SYNC_FIELDS
+}
+
+# Client-only keys stripped before data reaches the models
+_CONTROL_KEYS = ('client_timestamp', 'base_hash')
+
+
+def _canonical_value(value):
+    """Normalize a value so client JSON and database values hash identically"""
+    if value is None or isinstance(value, bool):
+        return value
+    if isinstance(value, (int, float)):
+        return float(value)
+    if isinstance(value, (datetime, date, dt_time)):
+        return value.isoformat()
+    return str(value)
+
+
+def canonical_sync_hash(fields, values: Dict[str, Any]) -> str:
+    """Hash the given fields of a row or payload in a fixed order"""
+    payload = json.dumps([_canonical_value(values.get(field)) for field in fields])
+    return hashlib.sha256(payload.encode()).hexdigest()[:16]
+
+
+def _serializable(values: Dict[str, Any]) -> Dict[str, Any]:
+    """JSON-safe copy of a projection for conflict responses"""
+    return {
+        key: value.isoformat() if isinstance(value, (datetime, date, dt_time)) else value
+        for key, value in values.items()
+    }
+
+
+def _coerce_value(column_type, value):
+    """Convert JSON strings into the Python types date/time columns require"""
+    if not isinstance(value, str):
+        return value
+    if isinstance(column_type, sqltypes.DateTime):
+        parsed = datetime.fromisoformat(value.replace('Z', '+00:00'))
+        if parsed.tzinfo:
+            parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+        return parsed
+    if isinstance(column_type, sqltypes.Date):
+        return date.fromisoformat(value[:10])
+    if isinstance(column_type, sqltypes.Time):
+        return dt_time.fromisoformat(value)
+    return value
+
+
+class SyncRecordError(Exception):
+    """A single record cannot be applied - reported per record, never aborts the batch"""
+
+
+class SyncBatchProcessor:
+    """Applies a claimed batch of sync records with set-based queries in one transaction"""
+
+    def __init__(self, sync_manager, db, Vessel, CargoTally, CargoTallyTotal, chunk_size: int = 100):
+        self.sync_manager = sync_manager
+        self.db = db
+        self.Vessel = Vessel
+        self.CargoTally = CargoTally
+        self.CargoTallyTotal = CargoTallyTotal
+        self.chunk_size = chunk_size
+
+        self._handlers = {
+            ('vessels', 'create'): self._create_vessels,
+            ('vessels', 'update'): self._update_vessels,
+            ('cargo_tallies', 'create'): self._create_tallies,
+            ('cargo_tallies', 'update'): self._update_tallies
+        }
+
+    def process(self, limit: int) -> Tuple[List, Dict[str, Dict[str, Any]], Dict[str, Any]]:
+        """
+        Claim up to limit pending records and apply them.
+
+        Returns (records, results keyed by sync id, timing report).
+        """
+        started = time.perf_counter()
+        records = self.sync_manager.claim_pending_records(limit)
+        report = {'claimed': len(records), 'groups': {}, 'fallback': False}
+
+        if records:
+            groups: Dict[Tuple[str, str], List] = OrderedDict()
+            for record in records:
+                groups.setdefault((record.table, record.operation), []).append(record)
+
+            results = {}
+            try:
+                for (table, operation), group in groups.items():
+                    group_started = time.perf_counter()
+                    self._apply_group(table, operation, group, results)
+                    report['groups'][f'{table}:{operation}'] = {
+                        'records': len(group),
+                        'duration_ms': round((time.perf_counter() - group_started) * 1000, 2)
+                    }
+                self.sync_manager.apply_results(results, commit=False)
+                self.db.session.commit()
+            except Exception as e:
+                logger.warning(f"Sync batch of {len(records)} records failed ({e}), replaying record by record")
+                self.db.session.rollback()
+                report['fallback'] = True
+                results = self._process_individually(records)
+        else:
+            results = {}
+
+        duration = time.perf_counter() - started
+        report['duration_ms'] = round(duration * 1000, 2)
+        report['rows_per_second'] = round(len(records) / duration, 1) if records and duration > 0 else None
+        return records, results, report
+
+    def _apply_group(self, table, operation, group, results):
+        handler = self._handlers.get((table, operation))
+        if handler is None:
+            for record in group:
+                results[record.id] = {'success': False, 'error': f'Unsupported sync operation: {table} {operation}'}
+            return
+        handler(group, results)
+
+    def _process_individually(self, records) -> Dict[str, Dict[str, Any]]:
+        """Replay each record in its own savepoint, then commit all outcomes together"""
+        results = {}
+        for record in records:
+            record_results = {}
+            try:
+                with self.db.session.begin_nested():
+                    self._apply_group(record.table, record.operation, [record], record_results)
+                results.update(record_results)
+            except Exception as e:
+                results[record.id] = {'success': False, 'error': str(e)}
+        self.sync_manager.apply_results(results, commit=False)
+        self.db.session.commit()
+        return results
+
+    # Row preparation
+
+    def _prepare(self, record, model, excluded=(), strict=True, user_column=None):
+        """Split record data into model columns (coerced) and the optional base hash"""
+        data = dict(record.data)
+        base_hash = data.get('base_hash')
+        for key in _CONTROL_KEYS:
+            data.pop(key, None)
+
+        # /sync/queue stamps the submitting user - map it onto the model column
+        user_id = data.pop('user_id', None)
+        if user_column and user_id is not None:
+            data.setdefault(user_column, user_id)
+
+        columns = model.__table__.columns
+        row = {}
+        unknown = []
+        for key, value in data.items():
+            if key in excluded:
+                continue
+            column = columns.get(key)
+            if column is None:
+                unknown.append(key)
+                continue
+            try:
+                row[key] = _coerce_value(column.type, value)
+            except ValueError:
+                raise SyncRecordError(f'Invalid value for {key}: {value!r}')
+
+        if unknown and strict:
+            raise SyncRecordError(f"Unknown field(s) for {model.__tablename__}: {', '.join(sorted(unknown))}")
+        return row, base_hash
+
+    @staticmethod
+    def _record_id(record):
+        try:
+            return int(record.data.get('id'))
+        except (TypeError, ValueError):
+            return None
+
+    def _fetch_projection(self, model, fields, ids):
+        """One narrow IN query for the projection of the referenced rows"""
+        if not ids:
+            return {}
+        columns = [getattr(model, field) for field in fields]
+        rows = self.db.session.query(model.id, *columns).filter(model.id.in_(ids)).all()
+        return {row[0]: dict(zip(fields, row[1:])) for row in rows}
+
+    def _fetch_rows(self, model, ids):
+        if not ids:
+            return {}
+        return {row.id: row for row in model.query.filter(model.id.in_(ids)).all()}
+
+    def _check_existing(self, fields, row, existing):
+        """Result for a create whose explicit id already exists - replay or conflict"""
+        sent = [field for field in fields if field in row]
+        if canonical_sync_hash(sent, row) == canonical_sync_hash(sent, existing):
+            return {'success': True, 'server_hash': canonical_sync_hash(fields, existing)}
+        return {'success': False, 'conflict': True, 'server_data': _serializable(existing)}
+
+    # Group handlers
+
+    def _create_tallies(self, group, results):
+        prepared = []
+        for record in group:
+            try:
+                row, _ = self._prepare(record, self.CargoTally, user_column='recorded_by_id')
+                if not isinstance(row.get('vessel_id'), int) or not isinstance(row.get('cargo_count'), int):
+                    raise SyncRecordError('vessel_id and cargo_count must be integers')
+                row.setdefault('tally_type', 'loaded')
+            except SyncRecordError as e:
+                results[record.id] = {'success': False, 'error': str(e)}
+                continue
+            prepared.append((record, row))
+
+        # Replayed creates carry the id they were given the first time
+        existing = self._fetch_projection(
+            self.CargoTally, CARGO_TALLY_SYNC_FIELDS, [row['id'] for _, row in prepared if 'id' in row]
+        )
+        inserts = []
+        for record, row in prepared:
+            if row.get('id') in existing:
+                results[record.id] = {**self._check_existing(CARGO_TALLY_SYNC_FIELDS, row, existing[row['id']]),
+                                      'vessel_id': row['vessel_id']}
+            else:
+                inserts.append((record, row))
+
+        if not inserts:
+            return
+        vessels = self._fetch_rows(self.Vessel, {row['vessel_id'] for _, row in inserts})
+        self.CargoTally.create_tallies_bulk(
+            [row for _, row in inserts], vessels, chunk_size=self.chunk_size, commit=False
+        )
+        for record, row in inserts:
+            results[record.id] = {
+                'success': True,
+                'vessel_id': row['vessel_id'],
+                'server_hash': canonical_sync_hash(CARGO_TALLY_SYNC_FIELDS, row)
+            }
+
+    def _update_tallies(self, group, results):
+        tallies = self._fetch_rows(self.CargoTally, {self._record_id(r) for r in group} - {None})
+        deltas = Counter()
+        entry_deltas = Counter()
+
+        for record in group:
+            tally = tallies.get(self._record_id(record))
+            if tally is None:
+                results[record.id] = {'success': False, 'error': 'Cargo tally not found'}
+                continue
+            try:
+                changes, base_hash = self._prepare(record, self.CargoTally, excluded=('id', 'timestamp'), strict=False)
+            except SyncRecordError as e:
+                results[record.id] = {'success': False, 'error': str(e)}
+                continue
+
+            current = {field: getattr(tally, field) for field in CARGO_TALLY_SYNC_FIELDS}
+            if base_hash and base_hash != canonical_sync_hash(CARGO_TALLY_SYNC_FIELDS, current):
+                results[record.id] = {'success': False, 'conflict': True, 'server_data': _serializable(current)}
+                continue
+
+            old_key, old_count = (tally.vessel_id, tally.tally_type), tally.cargo_count
+            for key, value in changes.items():
+                setattr(tally, key, value)
+            new_key = (tally.vessel_id, tally.tally_type)
+
+            # Move the tally's contribution between running totals if it changed
+            if old_key == new_key:
+                deltas[new_key] += tally.cargo_count - old_count
+            else:
+                deltas[old_key] -= old_count
+                entry_deltas[old_key] -= 1
+                deltas[new_key] += tally.cargo_count
+                entry_deltas[new_key] += 1
+
+            results[record.id] = {
+                'success': True,
+                'vessel_id': tally.vessel_id,
+                'server_hash': canonical_sync_hash(
+                    CARGO_TALLY_SYNC_FIELDS, {field: getattr(tally, field) for field in CARGO_TALLY_SYNC_FIELDS}
+                )
+            }
+
+        self.db.session.flush()
+        affected = set()
+        for key in set(deltas) | set(entry_deltas):
+            if deltas[key] or entry_deltas[key]:
+                self.CargoTallyTotal.apply_delta(key[0], key[1], deltas[key], entries=entry_deltas[key])
+                affected.add(key[0])
+
+        vessels = self._fetch_rows(self.Vessel, affected)
+        for vessel_id in affected:
+            self.CargoTally._update_vessel_progress(vessel_id, vessel=vessels.get(vessel_id), commit=False)
+
+    def _create_vessels(self, group, results):
+        prepared = []
+        for record in group:
+            try:
+                row, _ = self._prepare(record, self.Vessel, user_column='created_by_id')
+                if not row.get('name'):
+                    raise SyncRecordError('Vessel name is required')
+            except SyncRecordError as e:
+                results[record.id] = {'success': False, 'error': str(e)}
+                continue
+            prepared.append((record, row))
+
+        existing = self._fetch_projection(
+            self.Vessel, VESSEL_SYNC_FIELDS, [row['id'] for _, row in prepared if 'id' in row]
+        )
+        created = []
+        for record, row in prepared:
+            if row.get('id') in existing:
+                results[record.id] = {**self._check_existing(VESSEL_SYNC_FIELDS, row, existing[row['id']]),
+                                      'vessel_id': row['id']}
+            else:
+                vessel = self.Vessel(**row)
+                self.db.session.add(vessel)
+                created.append((record, vessel))
+
+        if not created:
+            return
+        self.db.session.flush()
+        for record, vessel in created:
+            results[record.id] = {
+                'success': True,
+                'vessel_id': vessel.id,
+                'server_hash': canonical_sync_hash(
+                    VESSEL_SYNC_FIELDS, {field: getattr(vessel, field) for field in VESSEL_SYNC_FIELDS}
+                )
+            }
+
+    def _update_vessels(self, group, results):
+        current = self._fetch_projection(
+            self.Vessel, VESSEL_SYNC_FIELDS, {self._record_id(r) for r in group} - {None}
+        )
+        mappings = {}
+        now = datetime.utcnow()
+
+        for record in group:
+            vessel_id = self._record_id(record)
+            projection = current.get(vessel_id)
+            if projection is None:
+                results[record.id] = {'success': False, 'error': 'Vessel not found'}
+                continue
+            try:
+                changes, base_hash = self._prepare(record, self.Vessel, excluded=('id', 'created_at'), strict=False)
+            except SyncRecordError as e:
+                results[record.id] = {'success': False, 'error': str(e)}
+                continue
+
+            if base_hash and base_hash != canonical_sync_hash(VESSEL_SYNC_FIELDS, projection):
+                results[record.id] = {'success': False, 'conflict': True, 'server_data': _serializable(projection)}
+                continue
+
+            # Later records for the same vessel in this batch win field by field
+            mappings.setdefault(vessel_id, {'id': vessel_id}).update(changes, updated_at=now)
+            projection.update({key: value for key, value in changes.items() if key in projection})
+            results[record.id] = {
+                'success': True,
+                'vessel_id': vessel_id,
+                'server_hash': canonical_sync_hash(VESSEL_SYNC_FIELDS, projection)
+            }
+
+        if mappings:
+            self.db.session.bulk_update_mappings(self.Vessel, list(mappings.values()))
+            # Bulk updates bypass the flush hooks that feed the delta sync change log
+            create_sync_change_model(self.db).record([
+                {'table_name': 'vessels', 'row_id': vessel_id, 'vessel_id': vessel_id,
+                 'operation': 'upsert', 'changed_fields': [key for key in mapping if key != 'id']}
+                for vessel_id, mapping in mappings.items()
+            ])
+
+
+__all__ = [
+    'SyncBatchProcessor',
+    'SyncRecordError',
+    'canonical_sync_hash',
+    'SYNC_PROJECTIONS',
+    'VESSEL_SYNC_FIELDS',
+    'CARGO_TALLY_SYNC_FIELDS'
+]
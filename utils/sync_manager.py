@@ -5,10 +5,14 @@ Handles conflict resolution and data consistency for maritime operations
 
 import json
 import hashlib
+import threading
+from collections import Counter, defaultdict
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional, Any, Tuple
+from typing import Callable, Dict, List, Optional, Any, Tuple
 from enum import Enum
 from dataclasses import dataclass, asdict
+from sqlalchemy import DateTime, bindparam, text
+from sqlalchemy.exc import IntegrityError
 
 class SyncStatus(Enum):
     PENDING = "pending"
@@ -37,12 +41,401 @@ class SyncRecord:
     conflict_data: Optional[Dict[str, Any]] = None
     retry_count: int = 0
     last_sync_attempt: Optional[str] = None
+    priority: int = 0  # Higher priority records are synced first
+
+class MemorySyncQueueStore:
+    """In-process sync queue store - records are bucketed by status and priority, counters kept incrementally"""
+    
+    def __init__(self):
+        self._records: Dict[str, SyncRecord] = {}
+        # (status, priority) -> insertion-ordered set of sync ids
+        self._buckets: Dict[Tuple[SyncStatus, int], Dict[str, None]] = defaultdict(dict)
+        self._counts: Counter = Counter()
+        self._lock = threading.RLock()
+    
+    def add(self, record: SyncRecord) -> SyncRecord:
+        """Insert record, replacing any existing record with the same id"""
+        with self._lock:
+            existing = self._records.get(record.id)
+            if existing is not None:
+                self._unindex(existing)
+            self._records[record.id] = record
+            self._index(record)
+            return record
+    
+    def get(self, sync_id: str) -> Optional[SyncRecord]:
+        with self._lock:
+            return self._records.get(sync_id)
+    
+    def transition(self, sync_id: str, mutate: Callable[[SyncRecord], bool]) -> Optional[SyncRecord]:
+        """Apply mutate to a record and re-index it; returns None if missing or mutate declines"""
+        with self._lock:
+            record = self._records.get(sync_id)
+            if record is None:
+                return None
+            previous = (record.status, record.priority, record.table)
+            if not mutate(record):
+                return None
+            if (record.status, record.priority, record.table) != previous:
+                self._unindex(record, *previous)
+                self._index(record)
+            return record
+    
+    def transition_many(self, mutations: Dict[str, Callable[[SyncRecord], bool]], commit: bool = True) -> Dict[str, SyncRecord]:
+        """Apply one mutate per sync id; returns the records that changed"""
+        with self._lock:
+            changed = {}
+            for sync_id, mutate in mutations.items():
+                record = self.transition(sync_id, mutate)
+                if record is not None:
+                    changed[sync_id] = record
+            return changed
+    
+    def claim(self, sync_ids: List[str], claimed_at: datetime) -> Dict[str, SyncRecord]:
+        """Move the listed records from pending to syncing; returns only the records this call claimed"""
+        with self._lock:
+            claimed = {}
+            for sync_id in sync_ids:
+                record = self._records.get(sync_id)
+                if record is None or record.status != SyncStatus.PENDING:
+                    continue
+                self._unindex(record)
+                record.status = SyncStatus.SYNCING
+                record.last_sync_attempt = claimed_at.isoformat()
+                self._index(record)
+                claimed[sync_id] = record
+            return claimed
+    
+    def pending(self, limit: Optional[int] = None) -> List[SyncRecord]:
+        """Pending records, highest priority first, oldest first within a priority"""
+        with self._lock:
+            priorities = sorted((p for s, p in self._buckets if s == SyncStatus.PENDING), reverse=True)
+            result = []
+            for priority in priorities:
+                for sync_id in self._buckets[(SyncStatus.PENDING, priority)]:
+                    result.append(self._records[sync_id])
+                    if limit and len(result) >= limit:
+                        return result
+            return result
+    
+    def by_status(self, status: SyncStatus) -> List[SyncRecord]:
+        with self._lock:
+            return [self._records[sync_id]
+                    for (bucket_status, _), ids in self._buckets.items() if bucket_status == status
+                    for sync_id in ids]
+    
+    def stalled(self, cutoff: datetime) -> List[SyncRecord]:
+        """Records stuck in syncing since before cutoff"""
+        return [r for r in self.by_status(SyncStatus.SYNCING)
+                if r.last_sync_attempt and datetime.fromisoformat(r.last_sync_attempt) < cutoff]
+    
+    def oldest_pending(self) -> Optional[datetime]:
+        """Queue time of the oldest pending record"""
+        timestamps = [r.timestamp for r in self.by_status(SyncStatus.PENDING)]
+        return datetime.fromisoformat(min(timestamps)) if timestamps else None
+    
+    def delete_synced_before(self, cutoff: datetime) -> int:
+        with self._lock:
+            expired = [r for r in self.by_status(SyncStatus.SYNCED)
+                       if datetime.fromisoformat(r.timestamp) < cutoff]
+            for record in expired:
+                self._unindex(record)
+                del self._records[record.id]
+            return len(expired)
+    
+    def counts(self) -> Dict[Tuple[str, str], int]:
+        """Record counts keyed by (table, status value)"""
+        with self._lock:
+            return {key: count for key, count in self._counts.items() if count}
+    
+    def _index(self, record: SyncRecord):
+        self._buckets[(record.status, record.priority)][record.id] = None
+        self._counts[(record.table, record.status.value)] += 1
+    
+    def _unindex(self, record: SyncRecord, status: Optional[SyncStatus] = None,
+                 priority: Optional[int] = None, table: Optional[str] = None):
+        status = status or record.status
+        priority = record.priority if priority is None else priority
+        key = (status, priority)
+        bucket = self._buckets.get(key)
+        if bucket is not None:
+            bucket.pop(record.id, None)
+            if not bucket:
+                del self._buckets[key]
+        self._counts[(table or record.table, status.value)] -= 1
+
+class DatabaseSyncQueueStore:
+    """
+    Durable sync queue store backed by the application database.
+    
+    Records survive gunicorn worker recycling and are shared by all workers.
+    Status counters live in sync_queue_counters and are adjusted in the same
+    transaction as each status change, so statistics never scan the queue.
+    """
+    
+    # Bound IN (...) lists so large batches stay under database parameter limits
+    IN_CHUNK_SIZE = 500
+    
+    def __init__(self, db=None):
+        self._db = db
+    
+    def _models(self):
+        """Resolve db and models lazily - the store is created before the app finishes importing"""
+        if self._db is None:
+            from app import db
+            self._db = db
+        from models.sync_queue import create_sync_queue_entry_model, create_sync_queue_counter_model
+        return self._db, create_sync_queue_entry_model(self._db), create_sync_queue_counter_model(self._db)
+    
+    def add(self, record: SyncRecord) -> SyncRecord:
+        """Insert record, replacing any existing record with the same id"""
+        db, Entry, QueueCounter = self._models()
+        try:
+            entry = Entry.query.filter_by(sync_id=record.id).first()
+            if entry is None:
+                try:
+                    with db.session.begin_nested():
+                        entry = Entry(sync_id=record.id, created_at=datetime.fromisoformat(record.timestamp))
+                        self._apply(entry, record)
+                        db.session.add(entry)
+                except IntegrityError:
+                    # Another worker queued the same id first - replace it instead
+                    entry = Entry.query.filter_by(sync_id=record.id).one()
+                    self._replace(db, QueueCounter, entry, record)
+                else:
+                    QueueCounter.apply_delta(record.table, record.status.value, 1)
+            else:
+                self._replace(db, QueueCounter, entry, record)
+            db.session.commit()
+            return record
+        except Exception:
+            db.session.rollback()
+            raise
+    
+    def get(self, sync_id: str) -> Optional[SyncRecord]:
+        db, Entry, QueueCounter = self._models()
+        entry = Entry.query.filter_by(sync_id=sync_id).first()
+        return self._to_record(entry) if entry else None
+    
+    def transition(self, sync_id: str, mutate: Callable[[SyncRecord], bool]) -> Optional[SyncRecord]:
+        """Apply mutate to a record and persist it with its counter changes in one commit"""
+        db, Entry, QueueCounter = self._models()
+        try:
+            entry = Entry.query.filter_by(sync_id=sync_id).first()
+            if entry is None:
+                return None
+            record = self._to_record(entry)
+            if not mutate(record):
+                return None
+            self._replace(db, QueueCounter, entry, record)
+            db.session.commit()
+            return record
+        except Exception:
+            db.session.rollback()
+            raise
+    
+    def transition_many(self, mutations: Dict[str, Callable[[SyncRecord], bool]], commit: bool = True) -> Dict[str, SyncRecord]:
+        """
+        Apply one mutate per sync id with a single IN lookup and aggregated counter updates.
+        
+        With commit=False the changes are left in the session so callers can
+        commit them together with the data the records describe.
+        """
+        db, Entry, QueueCounter = self._models()
+        changed = {}
+        deltas = Counter()
+        try:
+            sync_ids = list(mutations)
+            for start in range(0, len(sync_ids), self.IN_CHUNK_SIZE):
+                chunk = sync_ids[start:start + self.IN_CHUNK_SIZE]
+                for entry in Entry.query.filter(Entry.sync_id.in_(chunk)).all():
+                    record = self._to_record(entry)
+                    if not mutations[entry.sync_id](record):
+                        continue
+                    if (entry.table_name, entry.status) != (record.table, record.status.value):
+                        deltas[(entry.table_name, entry.status)] -= 1
+                        deltas[(record.table, record.status.value)] += 1
+                    self._apply(entry, record)
+                    changed[entry.sync_id] = record
+            db.session.flush()
+            for (table_name, status), delta in deltas.items():
+                if delta:
+                    QueueCounter.apply_delta(table_name, status, delta)
+            if commit:
+                db.session.commit()
+            return changed
+        except Exception:
+            db.session.rollback()
+            raise
+    
+    def claim(self, sync_ids: List[str], claimed_at: datetime) -> Dict[str, SyncRecord]:
+        """
+        Move the listed records from pending to syncing; returns only the records this call claimed.
+        
+        The status check happens in the UPDATE's WHERE clause, so when two
+        workers race for the same rows the database hands each row to one of
+        them. Databases with UPDATE ... RETURNING (Postgres, SQLite 3.35+)
+        claim a chunk per statement; others issue one conditional UPDATE per
+        row and read its rowcount.
+        """
+        db, Entry, QueueCounter = self._models()
+        if self._supports_update_returning(db.engine.dialect):
+            claim_chunk = text(
+                f'UPDATE {Entry.__tablename__} '
+                'SET status = :syncing, last_sync_attempt = :claimed_at, updated_at = :claimed_at '
+                'WHERE status = :pending AND sync_id IN :sync_ids RETURNING sync_id'
+            ).bindparams(bindparam('sync_ids', expanding=True), bindparam('claimed_at', type_=DateTime()))
+        else:
+            claim_chunk = None
+            claim_row = Entry.__table__.update().where(
+                Entry.status == SyncStatus.PENDING.value
+            ).values(status=SyncStatus.SYNCING.value, last_sync_attempt=claimed_at)
+        won = []
+        try:
+            for start in range(0, len(sync_ids), self.IN_CHUNK_SIZE):
+                chunk = sync_ids[start:start + self.IN_CHUNK_SIZE]
+                if claim_chunk is not None:
+                    rows = db.session.execute(claim_chunk, {
+                        'syncing': SyncStatus.SYNCING.value, 'pending': SyncStatus.PENDING.value,
+                        'claimed_at': claimed_at, 'sync_ids': chunk
+                    })
+                    won.extend(row[0] for row in rows)
+                else:
+                    won.extend(sync_id for sync_id in chunk
+                               if db.session.execute(claim_row.where(Entry.sync_id == sync_id)).rowcount)
+            
+            claimed = {}
+            deltas = Counter()
+            for start in range(0, len(won), self.IN_CHUNK_SIZE):
+                chunk = won[start:start + self.IN_CHUNK_SIZE]
+                # populate_existing: the session may still hold these rows as they were when read as pending
+                for entry in Entry.query.filter(Entry.sync_id.in_(chunk)).populate_existing().all():
+                    claimed[entry.sync_id] = self._to_record(entry)
+                    deltas[entry.table_name] += 1
+            for table_name, count in deltas.items():
+                QueueCounter.apply_delta(table_name, SyncStatus.PENDING.value, -count)
+                QueueCounter.apply_delta(table_name, SyncStatus.SYNCING.value, count)
+            db.session.commit()
+            return claimed
+        except Exception:
+            db.session.rollback()
+            raise
+    
+    def pending(self, limit: Optional[int] = None) -> List[SyncRecord]:
+        """Pending records, highest priority first, oldest first within a priority"""
+        db, Entry, QueueCounter = self._models()
+        query = Entry.query.filter_by(status=SyncStatus.PENDING.value).order_by(
+            Entry.priority.desc(), Entry.created_at, Entry.id
+        )
+        if limit:
+            query = query.limit(limit)
+        return [self._to_record(entry) for entry in query.all()]
+    
+    def by_status(self, status: SyncStatus) -> List[SyncRecord]:
+        db, Entry, QueueCounter = self._models()
+        entries = Entry.query.filter_by(status=status.value).order_by(Entry.created_at, Entry.id).all()
+        return [self._to_record(entry) for entry in entries]
+    
+    def stalled(self, cutoff: datetime) -> List[SyncRecord]:
+        """Records stuck in syncing since before cutoff (e.g. their worker was recycled mid-batch)"""
+        db, Entry, QueueCounter = self._models()
+        entries = Entry.query.filter(
+            Entry.status == SyncStatus.SYNCING.value,
+            Entry.last_sync_attempt < cutoff
+        ).all()
+        return [self._to_record(entry) for entry in entries]
+    
+    def oldest_pending(self) -> Optional[datetime]:
+        """Queue time of the oldest pending record"""
+        db, Entry, QueueCounter = self._models()
+        return db.session.query(db.func.min(Entry.created_at)).filter(
+            Entry.status == SyncStatus.PENDING.value
+        ).scalar()
+    
+    def delete_synced_before(self, cutoff: datetime) -> int:
+        db, Entry, QueueCounter = self._models()
+        try:
+            expired = Entry.query.filter(
+                Entry.status == SyncStatus.SYNCED.value,
+                Entry.created_at < cutoff
+            )
+            per_table = expired.with_entities(Entry.table_name, db.func.count(Entry.id)).group_by(Entry.table_name).all()
+            deleted = expired.delete(synchronize_session=False)
+            db.session.flush()
+            for table_name, count in per_table:
+                QueueCounter.apply_delta(table_name, SyncStatus.SYNCED.value, -count)
+            db.session.commit()
+            return deleted
+        except Exception:
+            db.session.rollback()
+            raise
+    
+    def counts(self) -> Dict[Tuple[str, str], int]:
+        """Record counts keyed by (table, status value)"""
+        db, Entry, QueueCounter = self._models()
+        return {key: count for key, count in QueueCounter.get_counts().items() if count}
+    
+    @staticmethod
+    def _supports_update_returning(dialect) -> bool:
+        """SQLAlchemy 1.4 only compiles RETURNING for some dialects, so SQLite is checked by library version"""
+        if dialect.name == 'sqlite':
+            return dialect.dbapi.sqlite_version_info >= (3, 35)
+        return bool(getattr(dialect, 'update_returning', getattr(dialect, 'full_returning', False)))
+    
+    def _replace(self, db, QueueCounter, entry, record: SyncRecord):
+        """Overwrite entry from record and move it between counters if its table/status changed"""
+        previous = (entry.table_name, entry.status)
+        self._apply(entry, record)
+        db.session.flush()
+        if (entry.table_name, entry.status) != previous:
+            QueueCounter.apply_delta(previous[0], previous[1], -1)
+            QueueCounter.apply_delta(entry.table_name, entry.status, 1)
+    
+    @staticmethod
+    def _apply(entry, record: SyncRecord):
+        entry.table_name = record.table
+        entry.operation = record.operation
+        entry.priority = record.priority
+        entry.data = json.dumps(record.data, default=str)
+        entry.client_hash = record.client_hash
+        entry.server_hash = record.server_hash
+        entry.conflict_data = json.dumps(record.conflict_data, default=str) if record.conflict_data is not None else None
+        entry.status = record.status.value
+        entry.retry_count = record.retry_count
+        entry.last_sync_attempt = datetime.fromisoformat(record.last_sync_attempt) if record.last_sync_attempt else None
+    
+    @staticmethod
+    def _to_record(entry) -> SyncRecord:
+        return SyncRecord(
+            id=entry.sync_id,
+            table=entry.table_name,
+            operation=entry.operation,
+            data=json.loads(entry.data),
+            timestamp=entry.created_at.isoformat(),
+            client_hash=entry.client_hash,
+            server_hash=entry.server_hash,
+            status=SyncStatus(entry.status),
+            conflict_data=json.loads(entry.conflict_data) if entry.conflict_data else None,
+            retry_count=entry.retry_count,
+            last_sync_attempt=entry.last_sync_attempt.isoformat() if entry.last_sync_attempt else None,
+            priority=entry.priority
+        )
+
+# Statistics keys for each status (kept from the original list-based statistics)
+_STATUS_STAT_KEYS = {
+    SyncStatus.PENDING: 'pending',
+    SyncStatus.SYNCING: 'syncing',
+    SyncStatus.SYNCED: 'synced',
+    SyncStatus.CONFLICT: 'conflicts',
+    SyncStatus.ERROR: 'errors'
+}
 
 class SyncManager:
     """Manages offline/online data synchronization with conflict resolution"""
     
-    def __init__(self):
-        self.sync_queue = []
+    def __init__(self, store=None):
+        # In-process store by default; routes use DatabaseSyncQueueStore so the queue is durable
+        self.store = store or MemorySyncQueueStore()
         self.conflict_resolvers = {
             'vessels': self._resolve_vessel_conflict,
             'cargo_tallies': self._resolve_cargo_tally_conflict,
@@ -50,8 +443,10 @@ class SyncManager:
         }
         self.max_retry_count = 3
         self.sync_batch_size = 10
+        self.stalled_sync_timeout = 300  # seconds before an abandoned 'syncing' record is retried
         
-    def add_to_sync_queue(self, table: str, operation: str, data: Dict[str, Any], record_id: Optional[str] = None) -> str:
+    def add_to_sync_queue(self, table: str, operation: str, data: Dict[str, Any],
+                          record_id: Optional[str] = None, priority: int = 0) -> str:
         """Add a record to the sync queue"""
         sync_id = record_id or self._generate_sync_id(table, data)
         
@@ -64,125 +459,170 @@ class SyncManager:
             operation=operation,
             data=data,
             timestamp=datetime.utcnow().isoformat(),
-            client_hash=data_hash
+            client_hash=data_hash,
+            priority=priority
         )
         
-        # Remove existing record with same ID to avoid duplicates
-        self.sync_queue = [r for r in self.sync_queue if r.id != sync_id]
-        self.sync_queue.append(sync_record)
+        # Replaces any existing record with the same ID to avoid duplicates
+        self.store.add(sync_record)
         
         return sync_id
     
     def get_pending_sync_records(self, limit: Optional[int] = None) -> List[SyncRecord]:
         """Get pending sync records"""
-        pending = [r for r in self.sync_queue if r.status == SyncStatus.PENDING]
-        if limit:
-            return pending[:limit]
-        return pending
+        self.recover_stalled_records()
+        return self.store.pending(limit)
+    
+    def has_pending_records(self) -> bool:
+        """Check for pending records using the status counters"""
+        return self.get_sync_statistics()['pending'] > 0
+    
+    def get_queue_lag_seconds(self) -> float:
+        """Age of the oldest pending record - how far the queue is behind"""
+        oldest = self.store.oldest_pending()
+        return max(0.0, (datetime.utcnow() - oldest).total_seconds()) if oldest else 0.0
+    
+    def recover_stalled_records(self) -> int:
+        """Return records left in 'syncing' by a crashed or recycled worker to the pending queue"""
+        cutoff = datetime.utcnow() - timedelta(seconds=self.stalled_sync_timeout)
+        recovered = 0
+        for record in self.store.stalled(cutoff):
+            if self.store.transition(record.id, self._set_status(SyncStatus.PENDING, expected=SyncStatus.SYNCING)):
+                recovered += 1
+        return recovered
+    
+    def claim_pending_records(self, limit: Optional[int] = None) -> List[SyncRecord]:
+        """
+        Move a batch of pending records to syncing and return the ones this worker won.
+        
+        Records another drainer claims between the read and the claim are
+        left out, so concurrent workers never apply the same record twice.
+        """
+        pending = self.get_pending_sync_records(limit)
+        claimed = self.store.claim([record.id for record in pending], datetime.utcnow())
+        return [claimed[record.id] for record in pending if record.id in claimed]
+    
+    def apply_results(self, results: Dict[str, Dict[str, Any]], commit: bool = True) -> Dict[str, SyncRecord]:
+        """
+        Record per-record processing results in one store write.
+        
+        Each result uses the processor result format: success with a
+        server_hash, a conflict with server_data, or an error message.
+        """
+        def outcome(result):
+            def mutate(record):
+                if result.get('success'):
+                    record.status = SyncStatus.SYNCED
+                    record.server_hash = result.get('server_hash', '')
+                elif result.get('conflict'):
+                    record.status = SyncStatus.CONFLICT
+                    record.conflict_data = result.get('server_data')
+                else:
+                    record.retry_count += 1
+                    record.status = SyncStatus.PENDING if record.retry_count < self.max_retry_count else SyncStatus.ERROR
+                return True
+            return mutate
+        
+        return self.store.transition_many(
+            {sync_id: outcome(result) for sync_id, result in results.items()}, commit=commit
+        )
     
     def mark_as_syncing(self, sync_id: str) -> bool:
         """Mark a sync record as currently syncing"""
-        for record in self.sync_queue:
-            if record.id == sync_id:
-                record.status = SyncStatus.SYNCING
-                record.last_sync_attempt = datetime.utcnow().isoformat()
-                return True
-        return False
+        def mutate(record):
+            record.status = SyncStatus.SYNCING
+            record.last_sync_attempt = datetime.utcnow().isoformat()
+            return True
+        return self.store.transition(sync_id, mutate) is not None
     
     def mark_as_synced(self, sync_id: str, server_hash: str) -> bool:
         """Mark a sync record as successfully synced"""
-        for record in self.sync_queue:
-            if record.id == sync_id:
-                record.status = SyncStatus.SYNCED
-                record.server_hash = server_hash
-                return True
-        return False
+        def mutate(record):
+            record.status = SyncStatus.SYNCED
+            record.server_hash = server_hash
+            return True
+        return self.store.transition(sync_id, mutate) is not None
     
     def mark_as_conflict(self, sync_id: str, server_data: Dict[str, Any]) -> bool:
         """Mark a sync record as having a conflict"""
-        for record in self.sync_queue:
-            if record.id == sync_id:
-                record.status = SyncStatus.CONFLICT
-                record.conflict_data = server_data
-                return True
-        return False
+        def mutate(record):
+            record.status = SyncStatus.CONFLICT
+            record.conflict_data = server_data
+            return True
+        return self.store.transition(sync_id, mutate) is not None
     
     def mark_as_error(self, sync_id: str, error_message: str) -> bool:
         """Mark a sync record as having an error"""
-        for record in self.sync_queue:
-            if record.id == sync_id:
+        def mutate(record):
+            record.retry_count += 1
+            # Reset to pending if under retry limit
+            if record.retry_count < self.max_retry_count:
+                record.status = SyncStatus.PENDING
+            else:
                 record.status = SyncStatus.ERROR
-                record.retry_count += 1
-                # Reset to pending if under retry limit
-                if record.retry_count < self.max_retry_count:
-                    record.status = SyncStatus.PENDING
-                return True
-        return False
+            return True
+        return self.store.transition(sync_id, mutate) is not None
     
     def resolve_conflict(self, sync_id: str, resolution: ConflictResolution = ConflictResolution.MERGE) -> Optional[Dict[str, Any]]:
         """Resolve a conflict between client and server data"""
-        for record in self.sync_queue:
-            if record.id == sync_id and record.status == SyncStatus.CONFLICT:
-                if record.table in self.conflict_resolvers:
-                    resolver = self.conflict_resolvers[record.table]
-                    resolved_data = resolver(record.data, record.conflict_data, resolution)
-                    
-                    if resolved_data:
-                        # Update record with resolved data
-                        record.data = resolved_data
-                        record.client_hash = self._calculate_hash(resolved_data)
-                        record.status = SyncStatus.PENDING
-                        record.conflict_data = None
-                        
-                        return resolved_data
-                    
-        return None
+        resolved = {}
+        
+        def mutate(record):
+            if record.status != SyncStatus.CONFLICT or record.table not in self.conflict_resolvers:
+                return False
+            resolver = self.conflict_resolvers[record.table]
+            resolved_data = resolver(record.data, record.conflict_data, resolution)
+            if not resolved_data:
+                return False
+            
+            # Update record with resolved data
+            record.data = resolved_data
+            record.client_hash = self._calculate_hash(resolved_data)
+            record.status = SyncStatus.PENDING
+            record.conflict_data = None
+            resolved['data'] = resolved_data
+            return True
+        
+        self.store.transition(sync_id, mutate)
+        return resolved.get('data')
     
     def get_sync_statistics(self) -> Dict[str, Any]:
-        """Get sync queue statistics"""
-        stats = {
-            'total_records': len(self.sync_queue),
-            'pending': len([r for r in self.sync_queue if r.status == SyncStatus.PENDING]),
-            'syncing': len([r for r in self.sync_queue if r.status == SyncStatus.SYNCING]),
-            'synced': len([r for r in self.sync_queue if r.status == SyncStatus.SYNCED]),
-            'conflicts': len([r for r in self.sync_queue if r.status == SyncStatus.CONFLICT]),
-            'errors': len([r for r in self.sync_queue if r.status == SyncStatus.ERROR]),
-            'by_table': {}
-        }
+        """Get sync queue statistics from the incremental status counters"""
+        stats = {key: 0 for key in _STATUS_STAT_KEYS.values()}
+        stats['total_records'] = 0
+        stats['by_table'] = {}
         
-        # Count by table
-        for record in self.sync_queue:
-            table = record.table
-            if table not in stats['by_table']:
-                stats['by_table'][table] = {
-                    'total': 0,
-                    'pending': 0,
-                    'synced': 0,
-                    'conflicts': 0,
-                    'errors': 0
-                }
+        for (table, status), count in self.store.counts().items():
+            key = _STATUS_STAT_KEYS[SyncStatus(status)]
+            stats[key] += count
+            stats['total_records'] += count
             
-            stats['by_table'][table]['total'] += 1
-            stats['by_table'][table][record.status.value] += 1
+            table_stats = stats['by_table'].setdefault(
+                table, {'total': 0, **{k: 0 for k in _STATUS_STAT_KEYS.values()}}
+            )
+            table_stats['total'] += count
+            table_stats[key] += count
         
         return stats
     
     def cleanup_synced_records(self, older_than_hours: int = 24) -> int:
         """Clean up old synced records"""
         cutoff_time = datetime.utcnow() - timedelta(hours=older_than_hours)
-        original_count = len(self.sync_queue)
-        
-        self.sync_queue = [
-            record for record in self.sync_queue
-            if not (record.status == SyncStatus.SYNCED and 
-                   datetime.fromisoformat(record.timestamp) < cutoff_time)
-        ]
-        
-        return original_count - len(self.sync_queue)
+        return self.store.delete_synced_before(cutoff_time)
     
     def get_conflicts(self) -> List[SyncRecord]:
         """Get all records with conflicts"""
-        return [r for r in self.sync_queue if r.status == SyncStatus.CONFLICT]
+        return self.store.by_status(SyncStatus.CONFLICT)
+    
+    @staticmethod
+    def _set_status(status: SyncStatus, expected: Optional[SyncStatus] = None):
+        """Build a transition that moves a record to status (only from expected, if given)"""
+        def mutate(record):
+            if expected is not None and record.status != expected:
+                return False
+            record.status = status
+            return True
+        return mutate
     
     def _generate_sync_id(self, table: str, data: Dict[str, Any]) -> str:
         """Generate a unique sync ID"""
@@ -306,7 +746,7 @@ class BackgroundSyncScheduler:
         if not self.network_status.is_online:
             return False
             
-        if not self.sync_manager.get_pending_sync_records():
+        if not self.sync_manager.has_pending_records():
             return False
             
         if self.last_sync is None:
@@ -315,9 +755,11 @@ class BackgroundSyncScheduler:
         time_since_last_sync = datetime.utcnow() - self.last_sync
         return time_since_last_sync.total_seconds() >= self.sync_interval
     
-    def start_sync(self) -> bool:
-        """Start a sync operation"""
-        if self.should_sync():
+    def start_sync(self, force: bool = False) -> bool:
+        """Start a sync operation - force skips the interval and pending checks"""
+        if self.sync_in_progress:
+            return False
+        if force or self.should_sync():
             self.sync_in_progress = True
             self.last_sync = datetime.utcnow()
             return True
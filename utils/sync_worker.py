@@ -0,0 +1,236 @@
+"""
+Background Sync Worker
+Drains the persistent sync queue off the request thread
+
+The worker runs either as a daemon thread inside a web worker
+(SYNC_WORKER_MODE=thread) or in its own process via `flask sync-worker`
+(SYNC_WORKER_MODE=external). It processes back-to-back batches while a backlog
+exists, sleeps for the scheduler's sync_interval once the queue is drained,
+shrinks batches and pauses between them on a poor connection, and backs off
+exponentially after failed batches.
+
+Several drainers may run at once - one thread per web worker, an external
+worker and inline /sync/process requests. SyncManager.claim_pending_records
+hands each pending record to exactly one of them, so none needs to be elected.
+"""
+
+import logging
+import os
+import random
+import signal
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class SyncWorker:
+    """Drains the sync queue in batches with adaptive backoff and drain metrics"""
+
+    def __init__(self, scheduler, process_batch: Callable[[int], Dict[str, Any]],
+                 batch_size: int = 100, max_backoff: float = 300.0,
+                 poor_connection_pause: float = 5.0, metrics_window: float = 60.0):
+        self.scheduler = scheduler
+        # process_batch(batch_size) returns the /sync/process summary for one batch
+        self.process_batch = process_batch
+        self.batch_size = batch_size
+        self.max_backoff = max_backoff
+        self.poor_connection_pause = poor_connection_pause
+        self.metrics_window = metrics_window
+
+        self.app = None
+        self.state = 'stopped'
+        self.batches = 0
+        self.records_processed = 0
+        self.failures = 0
+        self.consecutive_failures = 0
+        self.last_error = None
+        self.last_batch = None
+        self.next_run_at = None
+
+        self._history = deque()  # (monotonic time, records processed) per batch
+        self._started_at = time.monotonic()
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._wake = threading.Event()
+        self._thread = None
+        self._pid = None
+
+    def configure(self, app):
+        """Bind the Flask app and pick up worker settings from its config"""
+        self.app = app
+        self.batch_size = app.config.get('SYNC_WORKER_BATCH_SIZE', self.batch_size)
+        self.max_backoff = app.config.get('SYNC_WORKER_MAX_BACKOFF', self.max_backoff)
+        self.scheduler.sync_interval = app.config.get('SYNC_INTERVAL_SECONDS', self.scheduler.sync_interval)
+
+    @property
+    def is_running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive() and self._pid == os.getpid()
+
+    def start(self, app) -> bool:
+        """Start the worker thread once per process (threads do not survive a fork)"""
+        if self.is_running:
+            return False
+        with self._lock:
+            if self.is_running:
+                return False
+            self.configure(app)
+            self._stop.clear()
+            self._pid = os.getpid()
+            self._thread = threading.Thread(target=self._run, name='sync-worker', daemon=True)
+            self._thread.start()
+        logger.info(f"Sync worker started (batch size {self.batch_size}, interval {self.scheduler.sync_interval}s)")
+        return True
+
+    def stop(self, timeout: float = 5.0):
+        """Stop the worker after its current batch"""
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join(timeout)
+        self._thread = None
+        self.state = 'stopped'
+
+    def wake(self):
+        """Run the next scheduling step now instead of waiting out the current delay"""
+        self._wake.set()
+
+    def run_forever(self, app):
+        """Drain the queue in the foreground until SIGTERM/SIGINT - used by `flask sync-worker`"""
+        self.configure(app)
+        self._stop.clear()
+
+        def handle_signal(signum, frame):
+            logger.info(f"Sync worker received signal {signum}, stopping after current batch")
+            self._stop.set()
+            self._wake.set()
+
+        signal.signal(signal.SIGTERM, handle_signal)
+        signal.signal(signal.SIGINT, handle_signal)
+        self._run()
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                delay = self.run_once()
+            except Exception as e:
+                logger.error(f"Sync worker step failed: {e}")
+                delay = self.scheduler.sync_interval
+
+            self.next_run_at = time.monotonic() + delay
+            if delay > 0:
+                self._wake.wait(delay)
+                self._wake.clear()
+        self.state = 'stopped'
+
+    def run_once(self) -> float:
+        """Run one scheduling step and return the seconds to wait before the next"""
+        network = self.scheduler.network_status
+        with self.app.app_context():
+            if not network.is_online:
+                self.state = 'offline'
+                return self._backoff_delay() if self.consecutive_failures else self.scheduler.sync_interval
+
+            if not self.scheduler.sync_manager.has_pending_records():
+                self.state = 'idle'
+                return self.scheduler.sync_interval
+
+            if not self.scheduler.start_sync(force=True):
+                # A forced sync request is already running this batch
+                return self.poor_connection_pause
+
+            batch_size = self.current_batch_size()
+            try:
+                summary = self.process_batch(batch_size)
+            except Exception as e:
+                self.scheduler.complete_sync(False)
+                return self._record_failure(str(e))
+
+            metadata = summary.get('metadata', {})
+            if summary.get('processed', 0) == 0 and summary.get('errors', 0) > 0:
+                # Nothing applied - treat like a failed round trip rather than retrying at once
+                self.scheduler.complete_sync(False)
+                return self._record_failure(f"{summary['errors']} records failed", summary)
+
+            self.scheduler.complete_sync(True)
+            if self.consecutive_failures and network.connection_quality == 'poor':
+                network.mark_online()  # The degradation came from our own failures - recovered
+            self._record_batch(summary)
+
+            if metadata.get('claimed', 0) < batch_size:
+                self.state = 'idle'
+                return self.scheduler.sync_interval
+
+            self.state = 'draining'
+            return self.poor_connection_pause if network.connection_quality == 'poor' else 0.0
+
+    def current_batch_size(self) -> int:
+        """Smaller batches on a poor connection so each round trip stays short"""
+        if self.scheduler.network_status.connection_quality == 'poor':
+            return max(1, self.batch_size // 4)
+        return self.batch_size
+
+    def _backoff_delay(self) -> float:
+        delay = min(self.max_backoff, self.scheduler.sync_interval * 2 ** max(0, self.consecutive_failures - 1))
+        return delay + random.uniform(0, delay * 0.1)
+
+    def _record_batch(self, summary: Dict[str, Any]):
+        processed = summary.get('processed', 0)
+        with self._lock:
+            self.batches += 1
+            self.records_processed += processed
+            self.consecutive_failures = 0
+            self.last_batch = summary.get('metadata')
+            self._history.append((time.monotonic(), processed))
+
+    def _record_failure(self, error: str, summary: Optional[Dict[str, Any]] = None) -> float:
+        with self._lock:
+            self.batches += 1
+            self.failures += 1
+            self.consecutive_failures += 1
+            self.last_error = error
+            if summary is not None:
+                self.last_batch = summary.get('metadata')
+        self.state = 'backoff'
+        delay = self._backoff_delay()
+        logger.warning(f"Sync batch failed ({error}), retrying in {delay:.1f}s")
+        return delay
+
+    def get_drain_rate(self) -> float:
+        """Records applied per second over the metrics window"""
+        now = time.monotonic()
+        with self._lock:
+            while self._history and now - self._history[0][0] > self.metrics_window:
+                self._history.popleft()
+            drained = sum(count for _, count in self._history)
+        span = min(self.metrics_window, now - self._started_at)
+        return drained / span if span > 0 else 0.0
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """Queue depth, lag and drain rate plus worker state - needs an app context"""
+        manager = self.scheduler.sync_manager
+        stats = manager.get_sync_statistics()
+        next_run = self.next_run_at - time.monotonic() if self.next_run_at and self.is_running else None
+        return {
+            'state': self.state,
+            'running': self.is_running,
+            'queue_depth': stats['pending'],
+            'in_flight': stats['syncing'],
+            'lag_seconds': round(manager.get_queue_lag_seconds(), 1),
+            'drain_rate_per_second': round(self.get_drain_rate(), 2),
+            'batch_size': self.current_batch_size(),
+            'sync_interval': self.scheduler.sync_interval,
+            'connection_quality': self.scheduler.network_status.connection_quality,
+            'batches': self.batches,
+            'records_processed': self.records_processed,
+            'failures': self.failures,
+            'consecutive_failures': self.consecutive_failures,
+            'last_error': self.last_error,
+            'last_batch': self.last_batch,
+            'next_run_in_seconds': round(max(0.0, next_run), 1) if next_run is not None else None
+        }
+
+
+__all__ = ['SyncWorker']